@@ -4,31 +4,48 @@ Authentication Utilities Module
 Provides password hashing, JWT token management, and user authentication.
 Uses bcrypt for password hashing and python-jose for JWT.
 
+bcrypt takes ~250 ms of CPU per call at the default cost, so async code
+should use the *_async variants, which run on a small dedicated thread
+pool instead of the event loop.
+
+get_current_user returns a UserPrincipal (a read-only snapshot of the
+user's columns) from a short-lived in-process cache, so most
+authenticated requests skip the user lookup query.
+
 Usage:
-    from auth import verify_password, get_password_hash, create_access_token
+    from auth import verify_password_async, get_password_hash_async, create_access_token
     
     # Hash a password
-    hashed = get_password_hash("my_password")
+    hashed = await get_password_hash_async("my_password")
     
     # Verify a password
-    if verify_password("my_password", hashed):
+    if await verify_password_async("my_password", hashed):
         token = create_access_token({"sub": user.email})
 """
 
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
 
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import Session, lazyload
 
 from config.settings import settings
 from core import schemas, models, database
 from utils.logging import get_logger
 from utils.exceptions import AuthenticationError
+from utils.telemetry import metrics
 
 logger = get_logger(__name__)
 
@@ -72,14 +89,105 @@ def get_password_hash(password: str) -> str:
         str: Bcrypt hashed password
         
     Note:
-        Uses default bcrypt salt rounds (12).
+        Cost factor comes from settings.BCRYPT_ROUNDS (default 12).
         For production, consider increasing to 14+ for better security.
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a hash was made with a different cost than BCRYPT_ROUNDS.
+    
+    Args:
+        hashed_password: bcrypt hash ("$2b$12$...")
+        
+    Returns:
+        bool: True if the password should be rehashed on next login
+    """
+    try:
+        return int(hashed_password.split('$')[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+# =============================================================================
+# Password Hashing Worker Pool
+# =============================================================================
+
+# bcrypt releases the GIL, so hashing on these threads leaves the event
+# loop free. The pool is deliberately small: a login burst queues here
+# instead of taking every CPU core from the rest of the app.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Get or create the password hashing thread pool."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+            thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+
+def _timed_call(func: Callable[..., Any], *args: Any) -> tuple:
+    started = time.perf_counter()
+    result = func(*args)
+    return result, started, time.perf_counter()
+
+
+async def _run_password_hashing(operation: str, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a bcrypt call on the hashing pool, recording queue metrics.
+    
+    Metrics:
+        auth.password_hash.pending: calls queued or running (gauge)
+        auth.password_hash.queue_wait: ms spent waiting for a worker
+        auth.password_hash.duration: ms spent hashing
+    """
+    global _hash_pending
+    tags = {"op": operation}
+    queued = time.perf_counter()
+    
+    _hash_pending += 1
+    metrics.gauge("auth.password_hash.pending", _hash_pending)
+    try:
+        loop = asyncio.get_running_loop()
+        result, started, finished = await loop.run_in_executor(
+            _get_hash_executor(), _timed_call, func, *args
+        )
+    finally:
+        _hash_pending -= 1
+        metrics.gauge("auth.password_hash.pending", _hash_pending)
+    
+    metrics.timing("auth.password_hash.queue_wait", (started - queued) * 1000, tags=tags)
+    metrics.timing("auth.password_hash.duration", (finished - started) * 1000, tags=tags)
+    return result
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password hashing pool."""
+    return await _run_password_hashing("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password hashing pool."""
+    return await _run_password_hashing("hash", get_password_hash, password)
+
+
+def shutdown_password_hashing() -> None:
+    """Stop the password hashing pool (called on app shutdown)."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
 # =============================================================================
 # JWT Token Management
 # =============================================================================
@@ -147,6 +255,199 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
+# =============================================================================
+# Principal Cache
+# =============================================================================
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """
+    Read-only copy of an authenticated User's columns.
+    
+    Detached from any DB session, so it is safe to cache and share across
+    requests. Relationships (submissions, behavioral_profile, snippets)
+    are not included - query them by user id.
+    """
+    id: int
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    mobile: Optional[str]
+    country: Optional[str]
+    state: Optional[str]
+    city: Optional[str]
+    pincode: Optional[str]
+    profiling_enabled: bool
+    created_at: Optional[datetime]
+    
+    @classmethod
+    def from_model(cls, user: models.User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            mobile=user.mobile,
+            country=user.country,
+            state=user.state,
+            city=user.city,
+            pincode=user.pincode,
+            profiling_enabled=user.profiling_enabled,
+            created_at=user.created_at,
+        )
+    
+    @property
+    def full_name(self) -> str:
+        """Get user's full name (same rule as User.full_name)."""
+        parts = [self.first_name, self.last_name]
+        return " ".join(p for p in parts if p) or "Unknown"
+
+
+class PrincipalCache:
+    """
+    TTL + LRU cache of token subject (email) -> UserPrincipal.
+    
+    Entries are invalidated when a User row is updated or deleted through
+    the ORM (see _invalidate_flushed_users); the TTL bounds staleness for
+    changes made by other processes or bulk UPDATE statements.
+    """
+    
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+    
+    def get(self, subject: str) -> Optional[UserPrincipal]:
+        """Return the cached principal, or None if missing/expired."""
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(subject)
+                self._hits += 1
+                metrics.increment("auth.principal_cache.hit")
+                return entry[0]
+            if entry is not None:
+                del self._entries[subject]
+            self._misses += 1
+        metrics.increment("auth.principal_cache.miss")
+        return None
+    
+    def put(self, subject: str, principal: UserPrincipal) -> None:
+        with self._lock:
+            self._entries[subject] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate_user(self, user_id: Optional[int] = None, email: Optional[str] = None) -> int:
+        """Drop a user's entry by id and/or email (update / delete / profiling toggle)."""
+        with self._lock:
+            stale = [
+                subject for subject, (principal, _) in self._entries.items()
+                if principal.id == user_id or subject == email
+            ]
+            for subject in stale:
+                del self._entries[subject]
+        if stale:
+            metrics.increment("auth.principal_cache.invalidated", value=len(stale))
+        return len(stale)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else 0.0,
+            }
+
+
+# Singleton instance
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get singleton principal cache."""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+            max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+        )
+    return _principal_cache
+
+
+def invalidate_user_principal(user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+    """Drop a user from the principal cache (no-op if the cache was never used)."""
+    if _principal_cache is not None:
+        _principal_cache.invalidate_user(user_id=user_id, email=email)
+
+
+_PENDING_INVALIDATIONS = "principal_cache_invalidations"
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_users(session: Session, flush_context) -> None:
+    """
+    Invalidate users changed in a flush, and again once the transaction
+    commits so a request that re-cached pre-commit data is corrected.
+    """
+    changed = [
+        (obj.id, obj.email)
+        for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, models.User) and obj.id is not None
+    ]
+    if changed:
+        for user_id, email in changed:
+            invalidate_user_principal(user_id, email)
+        session.info.setdefault(_PENDING_INVALIDATIONS, []).extend(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for user_id, email in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        invalidate_user_principal(user_id, email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+async def resolve_user_principal(email: str, db: AsyncSession) -> Optional[UserPrincipal]:
+    """
+    Look up a user by email, cache-first.
+    
+    Only the users row is loaded (relationships are not), so a miss costs
+    a single query.
+    """
+    cache = get_principal_cache()
+    principal = cache.get(email)
+    if principal is not None:
+        return principal
+    
+    result = await db.execute(
+        select(models.User)
+        .options(lazyload("*"))
+        .filter(models.User.email == email)
+    )
+    user = result.scalars().first()
+    if user is None:
+        return None
+    
+    principal = UserPrincipal.from_model(user)
+    cache.put(email, principal)
+    return principal
+
+
 # =============================================================================
 # User Authentication Dependencies
 # =============================================================================
@@ -154,26 +455,27 @@ def decode_access_token(token: str) -> Optional[dict]:
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(database.get_db)
-) -> models.User:
+) -> UserPrincipal:
     """
     FastAPI dependency to get the current authenticated user.
     
     Extracts and validates the JWT token from the Authorization header,
-    then fetches the corresponding user from the database.
+    then resolves the user through the principal cache (falling back to
+    the database).
     
     Args:
         token: JWT token from Authorization header (injected)
         db: Database session (injected)
         
     Returns:
-        User: Authenticated user model instance
+        UserPrincipal: Read-only snapshot of the authenticated user
         
     Raises:
         HTTPException: 401 if token is invalid or user not found
         
     Usage:
         @router.get("/me")
-        async def get_me(user: User = Depends(get_current_user)):
+        async def get_me(user: UserPrincipal = Depends(get_current_user)):
             return user
     """
     credentials_exception = HTTPException(
@@ -200,11 +502,7 @@ async def get_current_user(
         logger.warning(f"JWT decode failed: {e}")
         raise credentials_exception
     
-    # Fetch user from database
-    result = await db.execute(
-        select(models.User).filter(models.User.email == token_data.email)
-    )
-    user = result.scalars().first()
+    user = await resolve_user_principal(token_data.email, db)
     
     if user is None:
         logger.warning(f"User not found for email: {token_data.email}")
@@ -216,14 +514,14 @@ async def get_current_user(
 async def get_current_user_optional(
     token: Optional[str] = Depends(oauth2_scheme),
     db: AsyncSession = Depends(database.get_db)
-) -> Optional[models.User]:
+) -> Optional[UserPrincipal]:
     """
     Optional version of get_current_user that returns None for unauthenticated requests.
     
     Useful for endpoints that work for both authenticated and anonymous users.
     
     Returns:
-        Optional[User]: User if authenticated, None otherwise
+        Optional[UserPrincipal]: User if authenticated, None otherwise
     """
     if not token:
         return None
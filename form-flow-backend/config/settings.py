@@ -48,6 +48,26 @@ class Settings(BaseSettings):
         default=30,
         description="JWT token expiration time in minutes"
     )
+    BCRYPT_ROUNDS: int = Field(
+        default=12,
+        description="bcrypt cost factor for new password hashes"
+    )
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=2,
+        description="Threads dedicated to password hashing and verification"
+    )
+    PASSWORD_REHASH_ON_LOGIN: bool = Field(
+        default=True,
+        description="Rehash passwords on login when BCRYPT_ROUNDS has changed"
+    )
+    PRINCIPAL_CACHE_TTL_SECONDS: float = Field(
+        default=30.0,
+        description="How long resolved users are cached for authenticated requests"
+    )
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = Field(
+        default=10000,
+        description="Maximum users held in the principal cache"
+    )
     
     # ==========================================================================
     # External API Keys
@@ -89,6 +109,14 @@ class Settings(BaseSettings):
         description="Maximum seconds to wait for CAPTCHA solution"
     )
     
+    # ==========================================================================
+    # Form Submission
+    # ==========================================================================
+    GOOGLE_FORMS_DIRECT_SUBMIT: bool = Field(
+        default=True,
+        description="POST Google Forms answers to formResponse without a browser when possible"
+    )
+    
     # ==========================================================================
     # Redis Configuration (for caching and rate limiting)
     # ==========================================================================
@@ -137,6 +165,10 @@ class Settings(BaseSettings):
         default=None,
         description="Custom path to local model (defaults to models/phi-2)"
     )
+    LOCAL_LLM_PREFIX_CACHE_MB: int = Field(
+        default=1024,
+        description="Memory budget for cached prompt-prefix KV states (0 disables)"
+    )
     
     # ==========================================================================
     # Smart Question Engine Configuration
@@ -165,6 +197,18 @@ class Settings(BaseSettings):
         default="eleven_turbo_v2_5",
         description="ElevenLabs model for TTS"
     )
+    SPEECH_MANIFEST_MAX_FORMS: int = Field(
+        default=64,
+        description="Forms kept in the per-form speech prompt manifest"
+    )
+    SPEECH_MANIFEST_MAX_MB: int = Field(
+        default=32,
+        description="Memory budget for cached speech prompt audio"
+    )
+    SPEECH_PREFETCH_AHEAD: int = Field(
+        default=3,
+        description="Field prompts generated ahead of the current one"
+    )
     
     model_config = ConfigDict(
         env_file=".env",
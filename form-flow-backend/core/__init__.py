@@ -22,8 +22,7 @@ from .dependencies import (
     get_form_submitter,
     get_gemini_service,
     get_vosk_service,
-    get_speech_data,
-    update_speech_data,
+    get_speech_manifest,
     clear_speech_data,
 )
 
@@ -51,7 +50,6 @@ __all__ = [
     "get_form_submitter",
     "get_gemini_service",
     "get_vosk_service",
-    "get_speech_data",
-    "update_speech_data",
+    "get_speech_manifest",
     "clear_speech_data",
 ]
@@ -14,7 +14,7 @@ Usage:
         ...
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict
 
 from config.settings import settings
 from utils.logging import get_logger
@@ -31,6 +31,7 @@ _speech_service = None
 _form_submitter = None
 _gemini_service = None
 _vosk_service = None
+_speech_manifest = None
 _services_initialized = False
 
 
@@ -136,25 +137,31 @@ def get_vosk_service():
 
 
 # =============================================================================
-# Speech Data Cache (now uses Redis when available)
+# Speech Manifest (per-form TTS prompt cache)
 # =============================================================================
 
-_global_speech_data: Dict[str, Any] = {}
-
-
-def get_speech_data() -> Dict[str, Any]:
-    """Get speech data cache."""
-    return _global_speech_data
-
-
-def update_speech_data(new_data: Dict[str, Any]) -> None:
-    """Update speech data cache."""
-    _global_speech_data.update(new_data)
+def get_speech_manifest():
+    """
+    Get SpeechManifest - bounded per-(form, field) TTS audio with prefetch.
+    """
+    global _speech_manifest
+    
+    if _speech_manifest is None:
+        from services.voice.speech_manifest import SpeechManifest
+        
+        _speech_manifest = SpeechManifest(
+            max_forms=settings.SPEECH_MANIFEST_MAX_FORMS,
+            max_bytes=settings.SPEECH_MANIFEST_MAX_MB * 1024 * 1024,
+            prefetch_ahead=settings.SPEECH_PREFETCH_AHEAD,
+        )
+    
+    return _speech_manifest
 
 
 def clear_speech_data() -> None:
-    """Clear speech data cache."""
-    _global_speech_data.clear()
+    """Clear cached speech audio and registered forms."""
+    if _speech_manifest is not None:
+        _speech_manifest.clear()
 
 
 # =============================================================================
@@ -169,4 +176,5 @@ def get_initialized_services() -> Dict[str, bool]:
         "form_submitter": _form_submitter is not None,
         "gemini_service": _gemini_service is not None,
         "vosk_service": _vosk_service is not None,
+        "speech_manifest": _speech_manifest is not None,
     }
@@ -67,11 +67,52 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Debug mode: {settings.DEBUG}")
     
+    # Imported before create_all so the dead_letter_queue, webhook_outbox
+    # and LLM usage tables are registered
+    from services.plugin.population.retry_worker import get_dlq_retry_worker
+    from services.plugin.population.webhook_dispatcher import get_webhook_dispatcher
+    from services.plugin.question.cost_tracker import CostTracker
+    
     # Create database tables
     async with database.engine.begin() as conn:
         await conn.run_sync(models.Base.metadata.create_all)
         logger.info("Database tables initialized")
     
+    # Deployments upgraded from before the LLM usage rollups have usage
+    # logs but empty rollup tables; build them once
+    try:
+        async with database.SessionLocal() as db:
+            await CostTracker(db).backfill_rollups_if_empty()
+    except Exception as e:
+        logger.warning(f"LLM usage rollup backfill failed: {e}")
+    
+    # Periodically write back vocabulary correction usage counts
+    from services.voice.vocabulary import get_vocabulary_service
+    vocabulary_service = get_vocabulary_service()
+    vocabulary_flusher = asyncio.create_task(
+        vocabulary_service.run_usage_flusher(database.SessionLocal)
+    )
+    
+    # Periodically write back plugin API key last_used_at timestamps
+    from services.plugin.api_key_cache import get_api_key_cache
+    api_key_cache = get_api_key_cache()
+    api_key_flusher = asyncio.create_task(
+        api_key_cache.run_last_used_flusher(database.SessionLocal)
+    )
+    
+    # Batched background writer for security audit logs
+    from services.plugin.security.audit import get_audit_sink
+    audit_sink = get_audit_sink()
+    audit_sink.start(database.SessionLocal)
+    
+    # Retry failed plugin inserts from the dead letter queue
+    dlq_retry_worker = get_dlq_retry_worker()
+    dlq_retry_worker.start(database.SessionLocal)
+    
+    # Deliver plugin webhooks from the persistent outbox
+    webhook_dispatcher = get_webhook_dispatcher()
+    webhook_dispatcher.start(database.SessionLocal)
+    
     # Validate AI dependencies and warn if degraded
     try:
         from services.ai.dependency_checker import validate_ai_dependencies
@@ -100,6 +141,33 @@ async def lifespan(app: FastAPI):
     from services.form.browser_pool import close_browser_pool
     await close_browser_pool()
     
+    # Persist any buffered analytics events
+    from services.ai.analytics import get_form_analytics
+    await get_form_analytics().flush()
+    
+    # Stop the vocabulary usage flusher and persist what is left
+    vocabulary_flusher.cancel()
+    async with database.SessionLocal() as db:
+        await vocabulary_service.flush_usage(db)
+    
+    # Same for API key last_used_at
+    api_key_flusher.cancel()
+    async with database.SessionLocal() as db:
+        await api_key_cache.flush_last_used(db)
+    
+    # Write out queued audit rows
+    await audit_sink.stop()
+    
+    await dlq_retry_worker.stop()
+    await webhook_dispatcher.stop()
+    await webhook_dispatcher.webhook_service.close()
+    
+    from auth import shutdown_password_hashing
+    shutdown_password_hashing()
+
+    from services.form.google_forms_direct import get_google_forms_direct_submitter
+    await get_google_forms_direct_submitter().close()
+
     await database.engine.dispose()
 
 
@@ -227,6 +295,7 @@ async def health_check():
         - API key configuration
         - Lazy-loaded services status
         - Background task queue stats
+        - Principal cache hit rate
     
     Returns:
         dict: Health status with component details
@@ -234,6 +303,7 @@ async def health_check():
     from utils.cache import check_redis_health
     from core.dependencies import get_initialized_services
     from utils.tasks import get_queue_stats
+    from auth import get_principal_cache
     
     db_healthy = await database.check_database_health()
     redis_healthy = await check_redis_health()
@@ -248,6 +318,7 @@ async def health_check():
         },
         "services_loaded": get_initialized_services(),
         "task_queue": get_queue_stats(),
+        "principal_cache": get_principal_cache().get_stats(),
         "version": settings.APP_VERSION
     }
 
@@ -5,14 +5,15 @@ Provides dashboard analytics and AI-powered insights using Gemini.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 from collections import defaultdict
 import os
 
 from core.database import get_db
-from core.models import User, FormSubmission
+from core.models import FormSubmission
 import auth as auth_utils
 from utils.logging import get_logger
 
@@ -23,15 +24,18 @@ router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 @router.get("/dashboard")
 async def get_dashboard_analytics(
-    current_user: User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: auth_utils.UserPrincipal = Depends(auth_utils.get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get comprehensive dashboard analytics with charts data and AI insights.
     """
     try:
         # Get user submissions
-        submissions = current_user.submissions or []
+        result = await db.execute(
+            select(FormSubmission).where(FormSubmission.user_id == current_user.id)
+        )
+        submissions = list(result.scalars().all())
         
         # === SUMMARY STATS ===
         total_forms = len(submissions)
@@ -21,6 +21,7 @@ from datetime import timedelta
 from core import models, schemas, database
 import auth as auth_utils
 from utils.logging import get_logger
+from utils.telemetry import metrics
 
 logger = get_logger(__name__)
 
@@ -75,7 +76,7 @@ async def register(
         )
     
     # Create user with hashed password
-    hashed_password = auth_utils.get_password_hash(user.password)
+    hashed_password = await auth_utils.get_password_hash_async(user.password)
     db_user = models.User(
         email=user.email,
         password_hash=hashed_password,
@@ -143,7 +144,7 @@ async def login_for_access_token(
     user = result.scalars().first()
     
     # Verify credentials
-    if not user or not auth_utils.verify_password(form_data.password, user.password_hash):
+    if not user or not await auth_utils.verify_password_async(form_data.password, user.password_hash):
         logger.warning(f"Failed login attempt for: {form_data.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -151,6 +152,14 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade hashes made with an old cost factor while we have the password
+    if (auth_utils.settings.PASSWORD_REHASH_ON_LOGIN
+            and auth_utils.password_needs_rehash(user.password_hash)):
+        user.password_hash = await auth_utils.get_password_hash_async(form_data.password)
+        await db.commit()
+        metrics.increment("auth.password_rehash")
+        logger.info(f"Rehashed password for: {user.email}")
+    
     # Create access token
     access_token_expires = timedelta(
         minutes=auth_utils.settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -178,7 +187,7 @@ async def login_for_access_token(
     }
 )
 async def read_users_me(
-    current_user: models.User = Depends(auth_utils.get_current_user),
+    current_user: auth_utils.UserPrincipal = Depends(auth_utils.get_current_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """
@@ -216,7 +225,7 @@ async def read_users_me(
     }
 )
 async def get_history(
-    current_user: models.User = Depends(auth_utils.get_current_user),
+    current_user: auth_utils.UserPrincipal = Depends(auth_utils.get_current_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """
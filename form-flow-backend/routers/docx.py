@@ -6,11 +6,12 @@ Endpoints for uploading and filling Word documents.
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import StreamingResponse
-from typing import Dict, Any
+from typing import Dict, Any, List
 import io
 import uuid
 
-from services.docx.docx_parser import parse_docx_fields, DocxParser
+from services.docx.docx_parser import DocxParser
+from services.docx.placeholder_index import PlaceholderIndex
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -20,6 +21,9 @@ router = APIRouter(prefix="/docx", tags=["Word Documents"])
 # In-memory storage for uploaded documents (replace with Redis/DB for production)
 _docx_storage: Dict[str, bytes] = {}
 
+# Placeholder index built at upload time, keyed like _docx_storage
+_docx_index_storage: Dict[str, PlaceholderIndex] = {}
+
 
 @router.post("/upload")
 async def upload_docx(file: UploadFile = File(...)) -> Dict[str, Any]:
@@ -51,18 +55,23 @@ async def upload_docx(file: UploadFile = File(...)) -> Dict[str, Any]:
                 detail="Legacy .doc format is not supported. Please save as .docx and re-upload."
             )
         
-        # Parse document
-        result = parse_docx_fields(content)
-        
-        if not result.get("success"):
+        # Parse document (also builds the placeholder index)
+        try:
+            parser = DocxParser(content)
+            parser.parse()
+            result = parser.to_schema()
+        except Exception as e:
+            logger.error(f"Failed to parse docx: {e}", exc_info=True)
             raise HTTPException(
                 status_code=400,
-                detail=result.get("message", "Failed to parse document")
+                detail="Failed to parse Word document"
             )
         
         # Store for later filling
         docx_id = result.get("docx_id")
         _docx_storage[docx_id] = content
+        if parser.placeholder_index is not None:
+            _docx_index_storage[docx_id] = parser.placeholder_index
         
         logger.info(f"Parsed Word document: {file.filename}, {result.get('total_fields')} fields found")
         
@@ -97,8 +106,10 @@ async def fill_docx(docx_id: str, data: Dict[str, str]) -> Dict[str, Any]:
         # Load original document
         content = _docx_storage[docx_id]
         
-        # Fill document using service
-        filled_content, filled_count = fill_docx_template(content, data)
+        # Fill document using service (reuses the upload-time index)
+        filled_content, filled_count = fill_docx_template(
+            content, data, index=_docx_index_storage.get(docx_id)
+        )
         
         # Generate download ID
         download_id = str(uuid.uuid4())
@@ -119,6 +130,45 @@ async def fill_docx(docx_id: str, data: Dict[str, str]) -> Dict[str, Any]:
         )
 
 
+@router.post("/fill-batch")
+async def fill_docx_batch_endpoint(docx_id: str, rows: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Generate one filled document per row from a previously uploaded template.
+    """
+    if docx_id not in _docx_storage:
+        raise HTTPException(
+            status_code=404,
+            detail="Document not found. Please re-upload."
+        )
+    
+    try:
+        from services.docx.docx_filler import fill_docx_batch
+        
+        results = fill_docx_batch(
+            _docx_storage[docx_id], rows, index=_docx_index_storage.get(docx_id)
+        )
+        
+        download_ids = []
+        for filled_content, _ in results:
+            download_id = str(uuid.uuid4())
+            _docx_storage[f"filled_{download_id}"] = filled_content
+            download_ids.append(download_id)
+        
+        return {
+            "success": True,
+            "download_ids": download_ids,
+            "documents_generated": len(download_ids),
+            "message": "Documents filled successfully"
+        }
+        
+    except Exception as e:
+        logger.error(f"Error batch filling document: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fill documents: {str(e)}"
+        )
+
+
 @router.get("/download/{download_id}")
 async def download_docx(download_id: str):
     """Download a filled Word document."""
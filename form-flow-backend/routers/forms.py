@@ -10,7 +10,7 @@ import time as _time
 from services.form.parser import get_form_schema, create_template
 from core.dependencies import (
     get_voice_processor, get_speech_service, get_form_submitter, 
-    get_gemini_service, update_speech_data
+    get_gemini_service, get_speech_manifest
 )
 from services.voice.processor import VoiceProcessor
 from services.voice.speech import SpeechService
@@ -87,42 +87,6 @@ def _sync_build_smart_prompts(
     return enhanced_schema, form_context
 
 
-def _sync_generate_eager_tts(
-    form_schema: List[Dict],
-    speech_service: SpeechService,
-    max_eager: int = 2
-) -> Dict:
-    """
-    Hybrid TTS: generate ElevenLabs audio for the first `max_eager` fields eagerly.
-    Remaining fields are marked as lazy (generated on-demand or via browser synthesis).
-    """
-    speech_data = {}
-    generated_count = 0
-    
-    for form in form_schema:
-        for field in form.get('fields', []):
-            fname = field.get('name')
-            if not fname:
-                continue
-            
-            if generated_count < max_eager:
-                # EAGER: Generate high-quality audio now for instant playback
-                try:
-                    prompt = speech_service._create_field_prompt(field)
-                    audio = speech_service.text_to_speech(prompt)
-                    if audio:
-                        speech_data[fname] = {'audio': audio, 'eager': True}
-                        generated_count += 1
-                        continue
-                except Exception as e:
-                    print(f"⚠️ Eager TTS failed for {fname}: {e}")
-            
-            # LAZY: Mark for on-demand generation when field is focused
-            speech_data[fname] = {'lazy': True, 'use_browser_synthesis': True}
-    
-    return speech_data
-
-
 # =============================================================================
 # BACKGROUND MAGIC FILL
 # =============================================================================
@@ -226,28 +190,15 @@ async def _process_scraped_form(
         form_schema, voice_processor
     )
     
-    # Task B: Hybrid TTS — eager first 2, lazy rest (sync → run in executor)
-    tts_future = None
-    if generate_speech:
-        tts_future = loop.run_in_executor(
-            _executor,
-            _sync_generate_eager_tts,
-            form_schema, speech_service, 2
-        )
+    # Task B: TTS for the first fields in conversation order; later fields are
+    # prefetched as the user moves through the form (see /speech/{field_name})
+    speech_manifest = get_speech_manifest()
+    speech_form_id = speech_manifest.register_form(url, form_schema)
+    tts_tasks = speech_manifest.prefetch(speech_form_id, None, speech_service) if generate_speech else []
     
     # Await all in parallel
-    if tts_future:
-        (enhanced_schema, form_context), speech_data = await asyncio.gather(
-            prompts_future, tts_future
-        )
-    else:
-        enhanced_schema, form_context = await prompts_future
-        speech_data = {}
-    
-    # Update global speech state with eager audio
-    eager_speech = {k: v for k, v in speech_data.items() if v.get('eager')}
-    if eager_speech:
-        update_speech_data(eager_speech)
+    (enhanced_schema, form_context), *_ = await asyncio.gather(prompts_future, *tts_tasks)
+    speech_form = speech_manifest.get_form(speech_form_id)
 
     # Statistics
     total_fields = sum(len(form.get('fields', [])) for form in form_schema)
@@ -261,8 +212,8 @@ async def _process_scraped_form(
         "form_schema": enhanced_schema,
         "form_template": create_template(form_schema),
         "form_context": form_context,
-        "speech_available": len(eager_speech) > 0,
-        "speech_fields": list(speech_data.keys()),
+        "speech_available": bool(speech_form and speech_form.cached),
+        "speech_fields": list(speech_form.order) if speech_form else [],
         "statistics": {
             "total_fields": total_fields,
             "visible_fields": non_hidden_fields,
@@ -18,7 +18,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 
 from core.database import get_db
-from core.models import User
 from core.plugin_schemas import (
     PluginCreate, PluginUpdate, PluginResponse, PluginSummary,
     APIKeyCreate, APIKeyResponse, APIKeyCreated,
@@ -32,7 +31,7 @@ from services.plugin import (
     PluginNotFoundError,
     APIKeyInvalidError,
 )
-from auth import get_current_user
+from auth import get_current_user, UserPrincipal
 from utils.rate_limit import limiter
 from utils.logging import get_logger
 
@@ -71,7 +70,7 @@ async def create_plugin(
     request: Request,  # Required for rate limiter
     data: PluginCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Create a new plugin.
@@ -90,7 +89,7 @@ async def create_plugin(
 async def list_plugins(
     include_inactive: bool = Query(False, description="Include deactivated plugins"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     List all plugins for the current user.
@@ -120,7 +119,7 @@ async def list_plugins(
 async def get_plugin(
     plugin_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get a plugin by ID.
@@ -144,7 +143,7 @@ async def update_plugin(
     plugin_id: int,
     data: PluginUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Update a plugin.
@@ -167,7 +166,7 @@ async def update_plugin(
 async def delete_plugin(
     plugin_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Delete (deactivate) a plugin.
@@ -198,7 +197,7 @@ async def create_api_key(
     plugin_id: int,
     data: APIKeyCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Generate a new API key.
@@ -233,7 +232,7 @@ async def create_api_key(
 async def list_api_keys(
     plugin_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     List all API keys for a plugin.
@@ -257,7 +256,7 @@ async def revoke_api_key(
     plugin_id: int,
     key_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Revoke an API key.
@@ -279,7 +278,7 @@ async def revoke_api_key(
 @router.get("/stats/summary")
 async def get_plugin_stats(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get aggregate statistics for user's plugins."""
     service = PluginService(db)
@@ -301,7 +300,7 @@ async def rotate_api_key(
     plugin_id: int,
     key_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Rotate an API key.
@@ -338,7 +337,7 @@ async def rotate_api_key(
 async def export_user_data(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Export all user data (GDPR Article 15 - Right of access).
@@ -365,7 +364,7 @@ async def delete_user_data(
     confirm: bool = Query(..., description="Must be true to confirm deletion"),
     keep_audit_logs: bool = Query(True, description="Keep audit logs for compliance"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Delete all user data (GDPR Article 17 - Right to erasure).
@@ -390,7 +389,7 @@ async def delete_user_data(
 @router.get("/gdpr/retention-status")
 async def get_retention_status(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get data retention status for user's data.
@@ -415,7 +414,7 @@ async def validate_api_key_dependency(
 ):
     """
     Dependency to validate API key and plugin ID from headers.
-    Returns tuple of (api_key_record, plugin).
+    Returns tuple of (api_key, plugin) as cached read-only snapshots.
     """
     service = PluginService(db)
     try:
@@ -20,12 +20,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 
-from core import database, models
+from core import database
 from services.ai.profile import ProfileService, ProfileConfig
 from services.ai.profile.service import ProfileService as LegacyProfileService, get_profile_service
 import auth
 from utils.logging import get_logger
-from sqlalchemy.future import select
 
 logger = get_logger(__name__)
 
@@ -80,7 +79,7 @@ class MessageResponse(BaseModel):
 async def get_current_user(
     request: Request,
     db: AsyncSession = Depends(database.get_db)
-) -> models.User:
+) -> auth.UserPrincipal:
     """
     Extract and validate current user from JWT token.
     
@@ -89,7 +88,7 @@ async def get_current_user(
         db: Database session
         
     Returns:
-        User model instance
+        UserPrincipal for the token's user (cached, see auth.resolve_user_principal)
         
     Raises:
         HTTPException: If authentication fails
@@ -113,10 +112,7 @@ async def get_current_user(
         if not email:
             raise HTTPException(status_code=401, detail="Invalid token payload")
         
-        result = await db.execute(
-            select(models.User).where(models.User.email == email)
-        )
-        user = result.scalar_one_or_none()
+        user = await auth.resolve_user_principal(email, db)
         
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
@@ -10,9 +10,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from core.database import get_db
-from core.models import Snippet, User
+from core.models import Snippet
 from core.schemas import SnippetCreate, SnippetUpdate, SnippetResponse
-from auth import get_current_user
+from auth import get_current_user, UserPrincipal
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -23,7 +23,7 @@ router = APIRouter(prefix="/snippets", tags=["Snippets"])
 @router.post("", response_model=SnippetResponse, status_code=status.HTTP_201_CREATED)
 async def create_snippet(
     snippet: SnippetCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new snippet for the current user."""
@@ -56,7 +56,7 @@ async def create_snippet(
 @router.get("", response_model=List[SnippetResponse])
 async def list_snippets(
     active_only: bool = False,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """List all snippets for the current user."""
@@ -71,7 +71,7 @@ async def list_snippets(
 @router.get("/{snippet_id}", response_model=SnippetResponse)
 async def get_snippet(
     snippet_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific snippet by ID."""
@@ -90,7 +90,7 @@ async def get_snippet(
 async def update_snippet(
     snippet_id: int,
     update_data: SnippetUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update an existing snippet."""
@@ -133,7 +133,7 @@ async def update_snippet(
 @router.delete("/{snippet_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_snippet(
     snippet_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a snippet."""
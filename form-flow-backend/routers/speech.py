@@ -8,12 +8,14 @@ Endpoints:
     POST /transcribe - Transcribe audio to text using Vosk
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Response, UploadFile, File
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, Optional
 
 from services.voice.speech import SpeechService
+from services.voice.speech_manifest import SpeechManifest, form_key
 from services.voice.vosk import VoskService
-from core.dependencies import get_speech_service, get_vosk_service, get_speech_data
+from core.dependencies import get_speech_service, get_vosk_service, get_speech_manifest
 from utils.logging import get_logger, log_api_call
 
 logger = get_logger(__name__)
@@ -25,6 +27,12 @@ router = APIRouter(tags=["Speech & Audio"])
 # Text-to-Speech
 # =============================================================================
 
+async def _prepend(first_chunk: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield first_chunk
+    async for chunk in rest:
+        yield chunk
+
+
 @router.get(
     "/speech/{field_name}",
     summary="Get speech audio for form field",
@@ -38,20 +46,26 @@ router = APIRouter(tags=["Speech & Audio"])
 )
 async def get_field_speech_audio(
     field_name: str,
+    form_url: Optional[str] = Query(None, description="URL of the form the field belongs to"),
     speech_service: SpeechService = Depends(get_speech_service),
-    speech_data: dict = Depends(get_speech_data)
+    speech_manifest: SpeechManifest = Depends(get_speech_manifest)
 ):
     """
     Get text-to-speech audio for a specific form field.
     
-    First checks the speech cache for pre-generated audio.
-    If not found, generates audio on-demand using ElevenLabs.
+    First checks the form's speech manifest for pre-generated audio.
+    If not found, streams audio from the provider as it is generated
+    (shared with any concurrent request for the same prompt) and stores
+    it in the manifest once complete. Either way, prompts for the next
+    fields in conversation order are generated in the background.
     
     Args:
         field_name: Name of the form field
+        form_url: Form the field belongs to (defaults to the most recent
+            scraped form that has this field)
         
     Returns:
-        Response: Audio file as audio/mpeg
+        StreamingResponse: Audio as audio/mpeg (204 if no audio is available)
         
     Raises:
         HTTPException: 500 if speech generation fails
@@ -59,22 +73,16 @@ async def get_field_speech_audio(
     try:
         logger.debug(f"Speech requested for field: {field_name}")
         
-        # Check cache first
-        if field_name in speech_data:
-            audio_data = speech_data[field_name].get('audio')
-            if audio_data:
-                logger.debug(f"Returning cached audio for: {field_name}")
-                return Response(content=audio_data, media_type="audio/mpeg")
+        form_id = form_key(form_url) if form_url else speech_manifest.find_form(field_name)
+        
+        # Cached, already being prefetched, or streamed on demand
+        stream = speech_manifest.stream_audio(form_id, field_name, speech_service)
         
-        # Generate on demand if not cached
-        logger.info(f"Generating speech on demand for: {field_name}")
-        field_info = {'name': field_name, 'type': 'text', 'label': field_name}
-        prompt_text = speech_service._create_field_prompt(field_info)
-        audio_data = speech_service.text_to_speech(prompt_text)
+        # Wait for the first chunk so providers that fail up front still get a 204
+        first_chunk = await anext(stream, None)
         
-        if audio_data:
-            log_api_call("ElevenLabs", "text-to-speech", success=True)
-            return Response(content=audio_data, media_type="audio/mpeg")
+        if first_chunk:
+            return StreamingResponse(_prepend(first_chunk, stream), media_type="audio/mpeg")
         else:
             log_api_call("ElevenLabs", "text-to-speech", success=False, error="No audio returned")
             # Return empty response with 204 status to indicate client should use browser TTS
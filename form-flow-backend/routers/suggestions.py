@@ -14,6 +14,8 @@ from services.ai.profile.suggestions import (
 from services.ai.form_intent import get_form_intent_inferrer, FormIntent
 from core import database
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.models import UserProfile
 import auth
 
 logger = logging.getLogger(__name__)
@@ -62,6 +64,14 @@ class IntelligentSuggestionRequest(BaseModel):
     session_id: Optional[str] = None
 
 
+class SuggestionPrefetchRequest(BaseModel):
+    """Request to pre-generate suggestions for a whole form on load."""
+    all_field_labels: List[str]
+    form_purpose: Optional[str] = "General"
+    form_url: Optional[str] = None
+    previous_answers: Optional[Dict[str, str]] = None
+
+
 class IntelligentSuggestionItem(BaseModel):
     """Single intelligent suggestion with behavioral context."""
     value: str
@@ -187,8 +197,9 @@ async def get_smart_suggestions(
                 logger.info(f"👤 [API] User identified: {user_id}")
                 
                 # Get profile confidence if available
-                if hasattr(user, 'behavioral_profile') and user.behavioral_profile:
-                    profile_confidence = user.behavioral_profile.confidence_score
+                profile_confidence = await db.scalar(
+                    select(UserProfile.confidence_score).where(UserProfile.user_id == user.id)
+                )
             else:
                 logger.info("👻 [API] User not identified, using anonymous mode")
         except Exception as e:
@@ -254,6 +265,49 @@ async def get_smart_suggestions(
         )
 
 
+@router.post("/smart-suggestions/prefetch")
+async def prefetch_smart_suggestions(
+    data: SuggestionPrefetchRequest,
+    request: Request,
+    db: AsyncSession = Depends(database.get_db),
+):
+    """
+    Pre-generate profile-based suggestions for every field of a form.
+    
+    Call when a form loads. One LLM call covers all fields and runs in the
+    background; subsequent /smart-suggestions requests for this form are
+    served from the cached batch.
+    """
+    try:
+        token = request.headers.get("Authorization", "").replace("Bearer ", "")
+        if not token:
+            return {"scheduled": False, "fields": 0}
+        user = await auth.get_current_user(token, db)
+        
+        form_intent = None
+        if data.form_url and data.all_field_labels:
+            intent_inferrer = get_form_intent_inferrer()
+            form_intent = await intent_inferrer.infer_intent(data.form_url, data.all_field_labels)
+        
+        from services.ai.profile.suggestions import get_profile_suggestion_engine
+        scheduled = await get_profile_suggestion_engine().prefetch_form(
+            user_id=user.id,
+            form_context={
+                "purpose": data.form_purpose or "General",
+                "url": data.form_url,
+                "field_labels": data.all_field_labels,
+            },
+            previous_answers=data.previous_answers or {},
+            db=db,
+            form_intent=form_intent,
+        )
+        return {"scheduled": scheduled, "fields": len(data.all_field_labels)}
+        
+    except Exception as e:
+        logger.error(f"Suggestion prefetch failed: {e}")
+        return {"scheduled": False, "fields": 0}
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -5,20 +5,31 @@ Tracks and analyzes form performance for optimization.
 
 Features:
 - Event tracking (starts, completions, errors, abandonments)
+- Append-only event log (Redis Stream, bounded in-memory fallback)
+- Batched ingestion with incremental per-form, per-day rollups
 - Bottleneck identification
 - Error hotspot detection
 - AI-powered recommendations
 - Conversion funnel analysis
+
+Storage layout (Redis):
+    analytics:log:{form_id}                 Stream of raw events (capped)
+    analytics:rollup:{form_id}:{YYYY-MM-DD} Hash of counters for that day
+    analytics:session:{form_id}:{sid}       JSON session state (dedupe, dropouts)
+
+Insights are computed from the daily rollups only, so reading them costs
+O(days) hash reads regardless of how many events were tracked.
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from collections import defaultdict
+from typing import Dict, List, Optional, Any, Tuple
+from collections import defaultdict, deque, OrderedDict
+import asyncio
 import hashlib
 import json
 
 from utils.logging import get_logger
-from utils.cache import get_cached, set_cached
+from utils.cache import get_redis_client
 
 logger = get_logger(__name__)
 
@@ -43,16 +54,62 @@ class FormAnalytics:
     """
     Track and analyze form performance.
     All data is privacy-preserved (no PII stored).
+
+    Events are buffered in memory and flushed in batches (every
+    ``BATCH_SIZE`` events or ``FLUSH_INTERVAL_SECONDS``). Each flush appends
+    the raw events to the per-form log and applies counter increments to
+    the per-day rollups, which are what insights are served from.
     """
-    
-    def __init__(self):
-        self._events_key_prefix = "analytics:events"
-        self._insights_key_prefix = "analytics:insights"
-    
+
+    BATCH_SIZE = 50
+    FLUSH_INTERVAL_SECONDS = 2.0
+    MAX_EVENTS_PER_FORM = 1000
+    RETENTION_DAYS = 30
+    SESSION_TTL_SECONDS = 24 * 3600
+    MAX_LOCAL_SESSIONS = 10000
+
+    def __init__(self, redis_client=None):
+        self._events_key_prefix = "analytics:log"
+        self._rollup_key_prefix = "analytics:rollup"
+        self._session_key_prefix = "analytics:session"
+
+        self._redis = redis_client
+        self._use_redis = True
+
+        # Ingestion buffer
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # Local fallback storage (used when Redis is unavailable)
+        self._local_log: Dict[str, deque] = {}
+        self._local_rollups: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._local_sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def _get_redis(self):
+        """Get Redis client, falling back to local storage if unavailable."""
+        if not self._use_redis:
+            return None
+        if self._redis is None:
+            try:
+                self._redis = await get_redis_client()
+            except Exception as e:
+                logger.warning(f"Redis unavailable for analytics, using local storage: {e}")
+            if self._redis is None:
+                self._use_redis = False
+        return self._redis
+
+    # =========================================================================
+    # Ingestion
+    # =========================================================================
+
     async def track_event(self, event: Dict[str, Any]) -> None:
         """
         Track a form interaction event.
-        
+
+        The event is only normalized and buffered here; persistence happens
+        in batches so the request path never pays for a storage round trip.
+
         Event structure:
         {
             "type": "field_focus",
@@ -68,44 +125,319 @@ class FormAnalytics:
         }
         """
         # Privacy: hash user ID if present
-        if 'user_id' in event:
+        if event.get('user_id'):
             event['user_id'] = self._hash_id(event['user_id'])
-        
+
         # Privacy: never store actual values
-        if 'value' in event.get('metadata', {}):
+        if 'value' in (event.get('metadata') or {}):
             del event['metadata']['value']
-        
+
         # Add timestamp if not present
-        if 'timestamp' not in event:
+        if not event.get('timestamp'):
             event['timestamp'] = datetime.now().isoformat()
-        
-        # Store event
-        form_id = event.get('form_id', 'unknown')
-        events_key = f"{self._events_key_prefix}:{form_id}"
-        
-        # Get existing events
-        existing = await get_cached(events_key)
-        events = json.loads(existing) if existing else []
-        
-        # Add new event
-        events.append(event)
-        
-        # Keep only last 1000 events per form
-        events = events[-1000:]
-        
-        # Save with 30-day expiry
-        await set_cached(events_key, json.dumps(events), expire=30 * 24 * 3600)
-        
-        logger.debug(f"Tracked event: {event['type']} for form {form_id}")
-    
+
+        event.setdefault('form_id', 'unknown')
+
+        self._buffer.append(event)
+
+        if len(self._buffer) >= self.BATCH_SIZE:
+            await self.flush()
+        else:
+            self._ensure_flush_task()
+
+        logger.debug(f"Tracked event: {event.get('type')} for form {event['form_id']}")
+
+    def _ensure_flush_task(self) -> None:
+        """Schedule a delayed flush so small bursts are still persisted."""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.FLUSH_INTERVAL_SECONDS)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Analytics background flush failed: {e}")
+
+    async def flush(self) -> int:
+        """
+        Persist buffered events and update rollups.
+
+        Returns:
+            Number of events flushed
+        """
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+
+            batch, self._buffer = self._buffer, []
+
+            by_form: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for event in batch:
+                by_form[event['form_id']].append(event)
+
+            session_keys = {
+                self._session_key(form_id, e.get('session_id') or 'unknown')
+                for form_id, events in by_form.items()
+                for e in events
+            }
+            sessions = await self._load_sessions(list(session_keys))
+
+            rollups: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+            for form_id, events in by_form.items():
+                for event in events:
+                    sid = event.get('session_id') or 'unknown'
+                    skey = self._session_key(form_id, sid)
+                    state = sessions.setdefault(skey, {})
+                    day = str(event['timestamp'])[:10]
+                    self._apply_event(event, state, rollups[self._rollup_key(form_id, day)])
+
+            await self._append_log(by_form)
+            await self._apply_rollups(rollups)
+            await self._save_sessions(sessions)
+
+            logger.debug(f"Flushed {len(batch)} analytics events across {len(by_form)} forms")
+            return len(batch)
+
+    @staticmethod
+    def _apply_event(
+        event: Dict[str, Any],
+        session: Dict[str, Any],
+        counters: Dict[str, float]
+    ) -> None:
+        """
+        Fold a single event into its session state and day counters.
+
+        Session state dedupes per-session flags (started, completed, ...)
+        so the rollup counts sessions rather than events.
+        """
+        etype = event.get('type')
+        field = event.get('field_id') or ''
+        metadata = event.get('metadata') or {}
+        timestamp = event.get('timestamp')
+
+        counters[f"type:{etype}"] += 1
+
+        if not session.get('counted'):
+            session['counted'] = 1
+            counters['sessions'] += 1
+
+        if etype == EventType.FORM_START:
+            session['start_time'] = timestamp
+        elif etype == EventType.FORM_SUBMIT:
+            if not session.get('completed'):
+                session['completed'] = 1
+                counters['completed'] += 1
+                start = session.get('start_time')
+                if start and timestamp:
+                    try:
+                        elapsed = (
+                            datetime.fromisoformat(timestamp) - datetime.fromisoformat(start)
+                        ).total_seconds()
+                        counters['completion_seconds'] += elapsed
+                        counters['completion_count'] += 1
+                    except (TypeError, ValueError):
+                        pass
+        elif etype == EventType.FORM_ABANDON:
+            if not session.get('abandoned'):
+                session['abandoned'] = 1
+                counters['abandoned'] += 1
+            counters[f"dropout:{session.get('last_field') or 'unknown'}"] += 1
+        elif etype == EventType.FIELD_CHANGE:
+            counters['fields_filled'] += 1
+        elif etype == EventType.FIELD_ERROR:
+            counters['errors'] += 1
+            error_msg = metadata.get('error', 'Unknown error')
+            counters[f"error:{field or 'unknown'}:{error_msg}"] += 1
+        elif etype in (EventType.VOICE_START, EventType.VOICE_END):
+            if not session.get('voice'):
+                session['voice'] = 1
+                counters['voice_sessions'] += 1
+
+        if etype == EventType.FIELD_FOCUS:
+            session['last_field'] = field
+
+        if etype in (EventType.FIELD_FOCUS, EventType.FIELD_BLUR):
+            duration = metadata.get('duration', 0) or 0
+            if field and duration > 0:
+                counters[f"field_ms:{field}"] += duration
+                counters[f"field_n:{field}"] += 1
+
+    # =========================================================================
+    # Storage (Redis with local fallback)
+    # =========================================================================
+
+    def _rollup_key(self, form_id: str, day: str) -> str:
+        return f"{self._rollup_key_prefix}:{form_id}:{day}"
+
+    def _session_key(self, form_id: str, session_id: str) -> str:
+        return f"{self._session_key_prefix}:{form_id}:{session_id}"
+
+    async def _append_log(self, by_form: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Append raw events to the per-form append-only log."""
+        redis = await self._get_redis()
+        if redis:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for form_id, events in by_form.items():
+                    key = f"{self._events_key_prefix}:{form_id}"
+                    for event in events:
+                        pipe.xadd(
+                            key,
+                            {"e": json.dumps(event)},
+                            maxlen=self.MAX_EVENTS_PER_FORM,
+                            approximate=True,
+                        )
+                    pipe.expire(key, self.RETENTION_DAYS * 24 * 3600)
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Redis event log append failed, using local storage: {e}")
+                self._use_redis = False
+
+        for form_id, events in by_form.items():
+            log = self._local_log.get(form_id)
+            if log is None:
+                log = self._local_log[form_id] = deque(maxlen=self.MAX_EVENTS_PER_FORM)
+            log.extend(events)
+
+    async def _apply_rollups(self, rollups: Dict[str, Dict[str, float]]) -> None:
+        """Apply counter increments to the per-day rollups."""
+        if not rollups:
+            return
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for key, counters in rollups.items():
+                    for metric, value in counters.items():
+                        pipe.hincrbyfloat(key, metric, value)
+                    pipe.expire(key, (self.RETENTION_DAYS + 1) * 24 * 3600)
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Redis rollup update failed, using local storage: {e}")
+                self._use_redis = False
+
+        for key, counters in rollups.items():
+            local = self._local_rollups[key]
+            for metric, value in counters.items():
+                local[metric] += value
+        self._prune_local_rollups()
+
+    def _prune_local_rollups(self) -> None:
+        """Drop local rollup buckets older than the retention window."""
+        cutoff = (datetime.now() - timedelta(days=self.RETENTION_DAYS + 1)).date().isoformat()
+        stale = [k for k in self._local_rollups if k.rsplit(':', 1)[-1] < cutoff]
+        for key in stale:
+            del self._local_rollups[key]
+
+    async def _load_rollups(self, keys: List[str]) -> List[Dict[str, float]]:
+        """Load rollup hashes for the given keys."""
+        redis = await self._get_redis()
+        if redis:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hgetall(key)
+                results = await pipe.execute()
+                return [
+                    {metric: float(value) for metric, value in (result or {}).items()}
+                    for result in results
+                ]
+            except Exception as e:
+                logger.warning(f"Redis rollup read failed, using local storage: {e}")
+                self._use_redis = False
+
+        return [dict(self._local_rollups[key]) for key in keys if key in self._local_rollups]
+
+    async def _load_sessions(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Load session state for the given keys in one round trip."""
+        if not keys:
+            return {}
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                values = await redis.mget(keys)
+                return {
+                    key: json.loads(value)
+                    for key, value in zip(keys, values)
+                    if value
+                }
+            except Exception as e:
+                logger.warning(f"Redis session read failed, using local storage: {e}")
+                self._use_redis = False
+
+        return {
+            key: dict(self._local_sessions[key])
+            for key in keys
+            if key in self._local_sessions
+        }
+
+    async def _save_sessions(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        """Persist session state in one round trip."""
+        if not sessions:
+            return
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for key, state in sessions.items():
+                    pipe.setex(key, self.SESSION_TTL_SECONDS, json.dumps(state))
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Redis session write failed, using local storage: {e}")
+                self._use_redis = False
+
+        for key, state in sessions.items():
+            self._local_sessions[key] = state
+            self._local_sessions.move_to_end(key)
+        while len(self._local_sessions) > self.MAX_LOCAL_SESSIONS:
+            self._local_sessions.popitem(last=False)
+
+    async def get_recent_events(self, form_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Read the most recent raw events for a form (newest last)."""
+        await self.flush()
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                entries = await redis.xrevrange(
+                    f"{self._events_key_prefix}:{form_id}", count=limit
+                )
+                return [json.loads(fields["e"]) for _, fields in reversed(entries)]
+            except Exception as e:
+                logger.warning(f"Redis event log read failed, using local storage: {e}")
+                self._use_redis = False
+
+        log = self._local_log.get(form_id)
+        if not log:
+            return []
+        return list(log)[-limit:]
+
+    # =========================================================================
+    # Insights
+    # =========================================================================
+
     async def get_form_insights(
-        self, 
-        form_id: str, 
+        self,
+        form_id: str,
         days: int = 30
     ) -> Dict[str, Any]:
         """
         Generate comprehensive insights for a form.
-        
+
+        Served from the per-day rollups; raw events are never rescanned.
+
         Returns:
         {
             "summary": {completion_rate, avg_time, error_rate},
@@ -115,18 +447,20 @@ class FormAnalytics:
             "recommendations": [AI suggestions]
         }
         """
-        # Try cache first
-        cache_key = f"{self._insights_key_prefix}:{form_id}"
-        cached = await get_cached(cache_key)
-        if cached:
-            return json.loads(cached)
-        
-        # Get events
-        events_key = f"{self._events_key_prefix}:{form_id}"
-        events_raw = await get_cached(events_key)
-        events = json.loads(events_raw) if events_raw else []
-        
-        if not events:
+        # Make sure buffered events are reflected
+        await self.flush()
+
+        today = datetime.now().date()
+        keys = [
+            self._rollup_key(form_id, (today - timedelta(days=offset)).isoformat())
+            for offset in range(days + 1)
+        ]
+        totals: Dict[str, float] = defaultdict(float)
+        for rollup in await self._load_rollups(keys):
+            for metric, value in rollup.items():
+                totals[metric] += value
+
+        if not totals:
             return {
                 "summary": {},
                 "bottlenecks": [],
@@ -134,211 +468,113 @@ class FormAnalytics:
                 "dropout_points": [],
                 "recommendations": []
             }
-        
-        # Filter by date
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-        events = [e for e in events if e.get('timestamp', '') >= cutoff]
-        
-        # Calculate insights
+
+        bottlenecks = self._identify_bottlenecks(totals)
+        errors = self._identify_errors(totals)
+        dropouts = self._identify_dropouts(totals)
+
         insights = {
-            "summary": self._calculate_summary(events),
-            "bottlenecks": self._identify_bottlenecks(events),
-            "error_hotspots": self._identify_errors(events),
-            "dropout_points": self._identify_dropouts(events),
-            "voice_stats": self._calculate_voice_stats(events),
-            "recommendations": self._generate_recommendations(events)
+            "summary": self._calculate_summary(totals),
+            "bottlenecks": bottlenecks,
+            "error_hotspots": errors,
+            "dropout_points": dropouts,
+            "voice_stats": self._calculate_voice_stats(totals),
+            "recommendations": self._generate_recommendations(bottlenecks, errors, dropouts)
         }
-        
-        # Cache for 1 hour
-        await set_cached(cache_key, json.dumps(insights), expire=3600)
-        
+
         return insights
-    
-    def _calculate_summary(self, events: List[Dict]) -> Dict[str, Any]:
+
+    @staticmethod
+    def _prefixed(totals: Dict[str, float], prefix: str) -> List[Tuple[str, float]]:
+        """Return (suffix, value) pairs for metrics starting with ``prefix``."""
+        return [
+            (metric[len(prefix):], value)
+            for metric, value in totals.items()
+            if metric.startswith(prefix)
+        ]
+
+    def _calculate_summary(self, totals: Dict[str, float]) -> Dict[str, Any]:
         """Calculate basic form metrics."""
-        sessions: Dict[str, Dict] = {}
-        
-        for event in events:
-            sid = event.get('session_id', 'unknown')
-            etype = event['type']
-            
-            if sid not in sessions:
-                sessions[sid] = {
-                    'started': False,
-                    'completed': False,
-                    'abandoned': False,
-                    'fields_filled': 0,
-                    'errors': 0,
-                    'voice_used': False,
-                    'start_time': None,
-                    'end_time': None
-                }
-            
-            s = sessions[sid]
-            timestamp = event.get('timestamp')
-            
-            if etype == EventType.FORM_START:
-                s['started'] = True
-                s['start_time'] = timestamp
-            elif etype == EventType.FORM_SUBMIT:
-                s['completed'] = True
-                s['end_time'] = timestamp
-            elif etype == EventType.FORM_ABANDON:
-                s['abandoned'] = True
-                s['end_time'] = timestamp
-            elif etype == EventType.FIELD_CHANGE:
-                s['fields_filled'] += 1
-            elif etype == EventType.FIELD_ERROR:
-                s['errors'] += 1
-            elif etype in [EventType.VOICE_START, EventType.VOICE_END]:
-                s['voice_used'] = True
-        
-        # Calculate rates
-        total = len(sessions)
+        total = totals.get('sessions', 0)
         if total == 0:
             return {}
-        
-        completed = sum(1 for s in sessions.values() if s['completed'])
-        abandoned = sum(1 for s in sessions.values() if s['abandoned'])
-        voice_users = sum(1 for s in sessions.values() if s['voice_used'])
-        
-        # Calculate avg completion time
-        times = []
-        for s in sessions.values():
-            if s['completed'] and s['start_time'] and s['end_time']:
-                try:
-                    start = datetime.fromisoformat(s['start_time'])
-                    end = datetime.fromisoformat(s['end_time'])
-                    times.append((end - start).total_seconds())
-                except:
-                    pass
-        
-        avg_time = sum(times) / len(times) if times else 0
-        
+
+        completion_count = totals.get('completion_count', 0)
+        avg_time = totals.get('completion_seconds', 0) / completion_count if completion_count else 0
+
         return {
-            "total_sessions": total,
-            "completion_rate": round(completed / total, 3),
-            "abandonment_rate": round(abandoned / total, 3),
+            "total_sessions": int(total),
+            "completion_rate": round(totals.get('completed', 0) / total, 3),
+            "abandonment_rate": round(totals.get('abandoned', 0) / total, 3),
             "avg_completion_time_seconds": round(avg_time, 1),
-            "avg_fields_filled": round(
-                sum(s['fields_filled'] for s in sessions.values()) / total, 1
-            ),
-            "avg_errors_per_session": round(
-                sum(s['errors'] for s in sessions.values()) / total, 2
-            ),
-            "voice_usage_rate": round(voice_users / total, 3)
+            "avg_fields_filled": round(totals.get('fields_filled', 0) / total, 1),
+            "avg_errors_per_session": round(totals.get('errors', 0) / total, 2),
+            "voice_usage_rate": round(totals.get('voice_sessions', 0) / total, 3)
         }
-    
-    def _identify_bottlenecks(self, events: List[Dict]) -> List[Dict]:
+
+    def _identify_bottlenecks(self, totals: Dict[str, float]) -> List[Dict]:
         """Find fields where users spend most time."""
-        field_times: Dict[str, List[int]] = defaultdict(list)
-        
-        for event in events:
-            if event['type'] in [EventType.FIELD_FOCUS, EventType.FIELD_BLUR]:
-                field = event.get('field_id', '')
-                duration = event.get('metadata', {}).get('duration', 0)
-                
-                if field and duration > 0:
-                    field_times[field].append(duration)
-        
         bottlenecks = []
-        for field, times in field_times.items():
-            avg_ms = sum(times) / len(times)
-            avg_seconds = avg_ms / 1000
-            
+        for field, total_ms in self._prefixed(totals, "field_ms:"):
+            count = totals.get(f"field_n:{field}", 0)
+            if not count:
+                continue
+            avg_seconds = total_ms / count / 1000
+
             if avg_seconds > 15:  # More than 15 seconds = bottleneck
                 severity = 'high' if avg_seconds > 45 else 'medium'
                 bottlenecks.append({
                     'field': field,
                     'avg_time_seconds': round(avg_seconds, 1),
-                    'sample_count': len(times),
+                    'sample_count': int(count),
                     'severity': severity
                 })
-        
+
         return sorted(bottlenecks, key=lambda x: x['avg_time_seconds'], reverse=True)[:10]
-    
-    def _identify_errors(self, events: List[Dict]) -> List[Dict]:
+
+    def _identify_errors(self, totals: Dict[str, float]) -> List[Dict]:
         """Find most common validation errors."""
-        errors: Dict[str, int] = defaultdict(int)
-        
-        for event in events:
-            if event['type'] == EventType.FIELD_ERROR:
-                field = event.get('field_id', 'unknown')
-                error_msg = event.get('metadata', {}).get('error', 'Unknown error')
-                
-                key = f"{field}:{error_msg}"
-                errors[key] += 1
-        
-        error_list = [
-            {
-                'field': k.split(':')[0],
-                'error': k.split(':', 1)[1] if ':' in k else k,
-                'count': v
-            }
-            for k, v in errors.items()
-        ]
-        
+        error_list = []
+        for key, count in self._prefixed(totals, "error:"):
+            field, _, error_msg = key.partition(':')
+            error_list.append({'field': field, 'error': error_msg, 'count': int(count)})
+
         return sorted(error_list, key=lambda x: x['count'], reverse=True)[:10]
-    
-    def _identify_dropouts(self, events: List[Dict]) -> List[Dict]:
+
+    def _identify_dropouts(self, totals: Dict[str, float]) -> List[Dict]:
         """Identify where users abandon the form."""
-        # Track last field before abandon
-        session_last_field: Dict[str, str] = {}
-        abandonments: Dict[str, int] = defaultdict(int)
-        
-        for event in events:
-            sid = event.get('session_id', '')
-            etype = event['type']
-            
-            if etype == EventType.FIELD_FOCUS:
-                session_last_field[sid] = event.get('field_id', '')
-            elif etype == EventType.FORM_ABANDON:
-                last_field = session_last_field.get(sid, 'unknown')
-                abandonments[last_field] += 1
-        
         dropout_list = [
-            {'field': field, 'dropout_count': count}
-            for field, count in abandonments.items()
+            {'field': field, 'dropout_count': int(count)}
+            for field, count in self._prefixed(totals, "dropout:")
         ]
-        
+
         return sorted(dropout_list, key=lambda x: x['dropout_count'], reverse=True)[:5]
-    
-    def _calculate_voice_stats(self, events: List[Dict]) -> Dict[str, Any]:
+
+    def _calculate_voice_stats(self, totals: Dict[str, float]) -> Dict[str, Any]:
         """Calculate voice-specific metrics."""
-        voice_sessions = 0
-        voice_errors = 0
-        clarifications_shown = 0
-        suggestions_accepted = 0
-        
-        for event in events:
-            etype = event['type']
-            
-            if etype == EventType.VOICE_START:
-                voice_sessions += 1
-            elif etype == EventType.VOICE_ERROR:
-                voice_errors += 1
-            elif etype == EventType.CLARIFICATION_SHOWN:
-                clarifications_shown += 1
-            elif etype == EventType.SUGGESTION_ACCEPTED:
-                suggestions_accepted += 1
-        
+        voice_sessions = totals.get(f"type:{EventType.VOICE_START}", 0)
+        voice_errors = totals.get(f"type:{EventType.VOICE_ERROR}", 0)
+        clarifications_shown = totals.get(f"type:{EventType.CLARIFICATION_SHOWN}", 0)
+        suggestions_accepted = totals.get(f"type:{EventType.SUGGESTION_ACCEPTED}", 0)
+
         return {
-            'voice_sessions': voice_sessions,
+            'voice_sessions': int(voice_sessions),
             'voice_error_rate': round(voice_errors / voice_sessions, 3) if voice_sessions > 0 else 0,
             'clarification_rate': round(clarifications_shown / voice_sessions, 3) if voice_sessions > 0 else 0,
             'suggestion_acceptance_rate': round(
                 suggestions_accepted / clarifications_shown, 3
             ) if clarifications_shown > 0 else 0
         }
-    
-    def _generate_recommendations(self, events: List[Dict]) -> List[Dict]:
+
+    def _generate_recommendations(
+        self,
+        bottlenecks: List[Dict],
+        errors: List[Dict],
+        dropouts: List[Dict]
+    ) -> List[Dict]:
         """Generate AI-powered recommendations."""
         recommendations = []
-        
-        bottlenecks = self._identify_bottlenecks(events)
-        errors = self._identify_errors(events)
-        dropouts = self._identify_dropouts(events)
-        
+
         # Bottleneck recommendations
         for bottleneck in bottlenecks[:3]:
             recommendations.append({
@@ -349,7 +585,7 @@ class FormAnalytics:
                              f"Consider adding placeholder text, voice hints, or autocomplete.",
                 'impact': 'high' if bottleneck['severity'] == 'high' else 'medium'
             })
-        
+
         # Error recommendations
         for error in errors[:3]:
             recommendations.append({
@@ -360,7 +596,7 @@ class FormAnalytics:
                              f"Improve error message or add real-time validation hints.",
                 'impact': 'high' if error['count'] > 10 else 'medium'
             })
-        
+
         # Dropout recommendations
         for dropout in dropouts[:2]:
             recommendations.append({
@@ -371,12 +607,12 @@ class FormAnalytics:
                              f"Consider making it optional or providing voice assistance.",
                 'impact': 'high'
             })
-        
+
         return recommendations
-    
+
     def _hash_id(self, user_id: str) -> str:
         """Hash user ID for privacy."""
-        return hashlib.sha256(user_id.encode()).hexdigest()[:16]
+        return hashlib.sha256(str(user_id).encode()).hexdigest()[:16]
 
 
 # Singleton instance
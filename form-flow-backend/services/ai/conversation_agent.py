@@ -35,6 +35,7 @@ from services.ai.extraction import (
     FallbackExtractor,
     FieldClusterer,
     ValueRefiner,
+    ExtractionPromptBuilder,
 )
 
 # Handlers - import from modular files
@@ -201,6 +202,7 @@ class ConversationAgent:
         # Initialize components
         self.fallback_extractor = FallbackExtractor
         self.clusterer = FieldClusterer()
+        self.prompt_builder = ExtractionPromptBuilder(self.clusterer)
         self.value_refiner = ValueRefiner()
         self.intent_recognizer = IntentRecognizer()
         self.suggestion_engine = SuggestionEngine()
@@ -245,6 +247,7 @@ class ConversationAgent:
         # Embed form schema into RAG for semantic field matching
         try:
             rag = get_rag_service()
+            self.prompt_builder.rag_service = rag
             embedded_count = rag.embed_form_schema(form_schema, form_id=session.id)
             if embedded_count > 0:
                 logger.info(f"Embedded {embedded_count} fields into RAG for session {session.id}")
@@ -391,7 +394,7 @@ class ConversationAgent:
         else:
             max_fields = None  # Smart Grouping: Allow natural batching
         
-        batches = self.clusterer.create_batches(remaining_fields, max_fields=max_fields)
+        batches = session.get_form_plan().create_batches(remaining_fields, max_fields=max_fields)
         current_batch = batches[0] if batches else []
         
         # Store current batch in session
@@ -438,7 +441,7 @@ class ConversationAgent:
             # Convert response message to include next question
             new_remaining = session.get_remaining_fields()
             if new_remaining:
-                next_batches = self.clusterer.create_batches(new_remaining)
+                next_batches = session.get_form_plan().create_batches(new_remaining)
                 if next_batches:
                     next_batch = next_batches[0]
                     next_labels = [f.get('label', f.get('name', '')) for f in next_batch[:3]]
@@ -555,7 +558,7 @@ class ConversationAgent:
             # Add next question
             new_remaining = session.get_remaining_fields()
             if new_remaining:
-                next_batches = self.clusterer.create_batches(new_remaining)
+                next_batches = session.get_form_plan().create_batches(new_remaining)
                 if next_batches:
                     next_batch = next_batches[0]
                     next_labels = [f.get('label', f.get('name', '')) for f in next_batch[:3]]
@@ -670,7 +673,7 @@ class ConversationAgent:
         else:
             max_fields = None  # Smart Grouping: Allow natural batching
         
-        batches = self.clusterer.create_batches(remaining_fields, max_fields=max_fields)
+        batches = session.get_form_plan().create_batches(remaining_fields, max_fields=max_fields)
         next_batch = batches[0] if batches else []
         
         # Check if form is complete (all required fields filled)
@@ -812,13 +815,16 @@ class ConversationAgent:
         if not fields_to_extract:
             fields_to_extract = remaining_fields
 
+        # Only the current batch and fields relevant to this utterance go in the prompt
+        prompt_fields = self.prompt_builder.select_fields(user_input, current_batch, fields_to_extract)
+
         # ------------------------------------------------------------------
         # 1. Try OpenRouter (Primary - Fast & High Quality)
         # ------------------------------------------------------------------
         if self.openrouter_llm:
             try:
                 logger.info("Using OpenRouter LLM (Primary)...")
-                batch_result = self.openrouter_llm.extract_all_fields(user_input, fields_to_extract)
+                batch_result = self.openrouter_llm.extract_all_fields(user_input, prompt_fields)
                 
                 if batch_result.get('extracted'):
                     logger.info(f"✅ OpenRouter extraction success: {batch_result['extracted']}")
@@ -845,11 +851,11 @@ class ConversationAgent:
                 if not fields_to_extract:
                     fields_to_extract = remaining_fields
                 
-                logger.info(f"Extracting from {len(fields_to_extract)} fields: {fields_to_extract[:5]}...")
+                logger.info(f"Extracting from {len(prompt_fields)} of {len(fields_to_extract)} fields: {prompt_fields[:5]}...")
                 
-                if fields_to_extract:
+                if prompt_fields:
                     # Use new batch extraction method
-                    batch_result = self.local_llm.extract_all_fields(user_input, fields_to_extract)
+                    batch_result = self.local_llm.extract_all_fields(user_input, prompt_fields)
                     
                     if batch_result.get('extracted'):
                         new_extracted = batch_result['extracted']
@@ -895,7 +901,7 @@ class ConversationAgent:
                     # So we just filter remaining_fields by what is now extracted
                     remaining_after = [f for f in remaining_fields if f.get('name') not in extracted]
                     if remaining_after:
-                        next_batches = self.clusterer.create_batches(remaining_after)
+                        next_batches = session.get_form_plan().create_batches(remaining_after)
                         if next_batches:
                             next_labels = [f.get('label', f.get('name', '')) for f in next_batches[0][:3]]
                             if len(next_labels) == 1:
@@ -935,7 +941,8 @@ class ConversationAgent:
         extracted, confidence = self.fallback_extractor.extract_with_intelligence(
             user_input=user_input,
             current_batch=current_batch,
-            remaining_fields=remaining_fields
+            remaining_fields=remaining_fields,
+            field_matchers=session.get_form_plan().candidate_matchers(current_batch, remaining_fields)
         )
         
         logger.info(f"Fallback extracted: {extracted}")
@@ -955,7 +962,7 @@ class ConversationAgent:
             # Add next question if more fields remain
             remaining_after = [f for f in remaining_fields if f.get('name') not in extracted]
             if remaining_after:
-                next_batches = self.clusterer.create_batches(remaining_after)
+                next_batches = session.get_form_plan().create_batches(remaining_after)
                 if next_batches:
                     next_labels = [f.get('label', f.get('name', '')) for f in next_batches[0][:3]]
                     if len(next_labels) == 1:
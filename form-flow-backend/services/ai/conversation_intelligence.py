@@ -24,6 +24,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+from services.ai.text_rules import RuleTable
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -210,6 +211,34 @@ class ConversationContext:
 # Intent Recognition
 # =============================================================================
 
+# Strong data signals: emails, dates, capitalized "First Last" names
+_DATA_SIGNAL = re.compile(
+    r'[\w.+-]+@[\w-]+\.[\w.-]+'
+    r'|\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
+    r'|[A-Z][a-z]+ [A-Z][a-z]+'
+)
+# Phone-like numbers (5+ digits), checked with spaces removed
+_PHONE_SIGNAL = re.compile(r'\d{5,}')
+_TRAILING_PUNCTUATION = re.compile(r'[.,!?]+$')
+
+
+def _compile_intent_rules(intent_patterns: Dict[UserIntent, List[str]]) -> Dict[str, RuleTable]:
+    """Rule tables for IntentRecognizer, built once when the class is defined."""
+    correction = intent_patterns.get(UserIntent.CORRECTION, [])
+    others = [
+        (pattern, intent)
+        for intent, patterns in intent_patterns.items()
+        if intent != UserIntent.CORRECTION
+        for pattern in patterns
+    ]
+    return {
+        'correction': RuleTable([(p, UserIntent.CORRECTION) for p in correction]),
+        'other': RuleTable(others),
+        'other_anchored': RuleTable([(p, i) for p, i in others if p.startswith('^')]),
+        'all': RuleTable(p for patterns in intent_patterns.values() for p in patterns),
+    }
+
+
 class IntentRecognizer:
     """
     Recognize user intents beyond data extraction.
@@ -268,12 +297,12 @@ class IntentRecognizer:
         ],
     }
     
+    # Compiled once at import; patterns keep their dict order
+    _RULES = _compile_intent_rules(INTENT_PATTERNS)
+    
     def __init__(self):
         """Initialize with compiled patterns."""
-        self._compiled_patterns = {
-            intent: [re.compile(p, re.IGNORECASE) for p in patterns]
-            for intent, patterns in self.INTENT_PATTERNS.items()
-        }
+        self._rules = self._RULES
     
     def detect_intent(self, user_input: str) -> Tuple[Optional[UserIntent], float]:
         """
@@ -293,12 +322,12 @@ class IntentRecognizer:
         
         # --- CHECK CORRECTION FIRST (before data signals) ---
         # Corrections often contain data (emails, names) but the intent is still correction
-        for pattern in self._compiled_patterns.get(UserIntent.CORRECTION, []):
-            if pattern.search(user_lower):
-                # Higher confidence for start-of-string matches
-                if pattern.pattern.startswith('^'):
-                    return UserIntent.CORRECTION, 0.95
-                return UserIntent.CORRECTION, 0.90
+        found = self._rules['correction'].search(user_lower)
+        if found:
+            # Higher confidence for start-of-string matches
+            if found[0].anchored:
+                return UserIntent.CORRECTION, 0.95
+            return UserIntent.CORRECTION, 0.90
         
         # --- PRIORITY GATING ---
         # Long input with strong data signals → bias toward DATA
@@ -308,26 +337,21 @@ class IntentRecognizer:
         
         # Short input that's mostly data → likely DATA
         if len(words) <= 5 and self._contains_strong_data_signals(user_input):
-            # Check if any intent pattern matches at start
-            for intent, patterns in self._compiled_patterns.items():
-                if intent == UserIntent.CORRECTION:
-                    continue  # Already checked above
-                for pattern in patterns:
-                    if pattern.pattern.startswith('^') and pattern.search(user_lower):
-                        # Intent at start, but also has data → return both signals
-                        return intent, 0.75  # Lower confidence due to mixed signals
+            # Check if any intent pattern matches at start (correction already checked above)
+            found = self._rules['other_anchored'].search(user_lower)
+            if found:
+                # Intent at start, but also has data → return both signals
+                return found[0].value, 0.75  # Lower confidence due to mixed signals
             return UserIntent.DATA, 0.85
         
         # --- STANDARD INTENT DETECTION ---
-        for intent, patterns in self._compiled_patterns.items():
-            if intent == UserIntent.CORRECTION:
-                continue  # Already checked above
-            for pattern in patterns:
-                if pattern.search(user_lower):
-                    # Higher confidence for start-of-string matches
-                    if pattern.pattern.startswith('^'):
-                        return intent, 0.95
-                    return intent, 0.85
+        found = self._rules['other'].search(user_lower)
+        if found:
+            rule = found[0]
+            # Higher confidence for start-of-string matches
+            if rule.anchored:
+                return rule.value, 0.95
+            return rule.value, 0.85
         
         # If no special intent, check if it contains data
         if self.has_data_content(user_input):
@@ -337,25 +361,9 @@ class IntentRecognizer:
     
     def _contains_strong_data_signals(self, user_input: str) -> bool:
         """Check if input contains strong data signals (emails, numbers, etc.)."""
-        import re
-        
-        # Email pattern
-        if re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', user_input):
-            return True
-        
-        # Phone-like numbers (5+ digits)
-        if re.search(r'\d{5,}', user_input.replace(' ', '')):
-            return True
-        
-        # Date patterns
-        if re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', user_input):
-            return True
-        
-        # Names with capitalization (First Last pattern)
-        if re.search(r'[A-Z][a-z]+ [A-Z][a-z]+', user_input):
+        if _DATA_SIGNAL.search(user_input):
             return True
-        
-        return False
+        return bool(_PHONE_SIGNAL.search(user_input.replace(' ', '')))
     
     def has_data_content(self, user_input: str) -> bool:
         """
@@ -371,9 +379,7 @@ class IntentRecognizer:
         cleaned = user_input.lower()
         
         # Remove all intent patterns
-        for patterns in self.INTENT_PATTERNS.values():
-            for pattern in patterns:
-                cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+        cleaned = self._rules['all'].sub(cleaned, '')
         
         # Check if substantial text remains
         remaining_words = cleaned.strip().split()
@@ -405,7 +411,7 @@ class IntentRecognizer:
                 field_identifier = match.group(1).strip().lower()
                 new_value = match.group(2).strip()
                 # Clean up trailing punctuation
-                new_value = re.sub(r'[.,!?]+$', '', new_value)
+                new_value = _TRAILING_PUNCTUATION.sub('', new_value)
                 return field_identifier, new_value
         
         return None
@@ -8,10 +8,14 @@ from services.ai.extraction.llm_extractor import LLMExtractor
 from services.ai.extraction.fallback_extractor import IntelligentFallbackExtractor as FallbackExtractor
 from services.ai.extraction.field_clusterer import FieldClusterer
 from services.ai.extraction.value_refiner import ValueRefiner
+from services.ai.extraction.prompt_builder import ExtractionPromptBuilder
+from services.ai.extraction.form_plan import FormPlan
 
 __all__ = [
     'LLMExtractor',
     'FallbackExtractor',
     'FieldClusterer',
     'ValueRefiner',
+    'ExtractionPromptBuilder',
+    'FormPlan',
 ]
@@ -15,6 +15,21 @@ from services.ai.normalizers import (
     normalize_text_smart,
     normalize_number_smart,
 )
+from services.ai.text_rules import RuleTable
+
+
+# Segment delimiters, applied in order (each rule sees the previous result)
+_SEGMENT_RULES = RuleTable([
+    (r'\s+and\s+', ' |AND| '),
+    (r'\s+also\s+', ' |AND| '),
+    (r'\s+plus\s+', ' |AND| '),
+    (r'\s+then\s+', ' |AND| '),
+    # Split on "in my X" or "for my X" to separate independent clauses
+    (r'\s+in\s+my\s+', ' |AND| my '),
+    (r'\s+for\s+my\s+', ' |AND| my '),
+    # Smart comma handling (don't split within email addresses or names)
+    (r',\s+(?=(?:my|the|and)\s)', ' |AND| '),
+])
 
 
 class IntelligentFallbackExtractor:
@@ -27,7 +42,8 @@ class IntelligentFallbackExtractor:
     def extract_with_intelligence(
         user_input: str,
         current_batch: List[Dict[str, Any]],
-        remaining_fields: List[Dict[str, Any]]
+        remaining_fields: List[Dict[str, Any]],
+        field_matchers: Optional[List[Dict[str, Any]]] = None
     ) -> Tuple[Dict[str, str], Dict[str, float]]:
         """
         Intelligent extraction using sentence segmentation and field type matching.
@@ -37,6 +53,10 @@ class IntelligentFallbackExtractor:
         2. For each segment, identify what field it's describing
         3. Extract the value portion from that segment
         4. Validate against field type expectations
+        
+        Args:
+            field_matchers: Prebuilt matchers for current + remaining fields
+                (e.g. from a FormPlan); built here when omitted
         """
         
         extracted = {}
@@ -49,8 +69,11 @@ class IntelligentFallbackExtractor:
         # This allows users to Provide "Country" even if we asked for "City"
         # We prioritize current_batch in matching implicitly by ordering or logic if needed,
         # but for now, just matching everything is safer for "smart" feel.
-        all_candidate_fields = current_batch + [f for f in remaining_fields if f not in current_batch]
-        field_matchers = IntelligentFallbackExtractor._create_field_matchers(all_candidate_fields)
+        if field_matchers is None:
+            batch_names = {f.get('name') for f in current_batch}
+            all_candidate_fields = current_batch + [f for f in remaining_fields if f.get('name') not in batch_names]
+            field_matchers = IntelligentFallbackExtractor._create_field_matchers(all_candidate_fields)
+        current_names = {f.get('name') for f in current_batch}
         
         # Step 3: Match segments to fields
         for segment in segments:
@@ -62,7 +85,7 @@ class IntelligentFallbackExtractor:
                 
                 # Check if segment mentions this field OR if it's implicitly the current topic
                 is_mentioned = IntelligentFallbackExtractor._segment_mentions_field(segment_lower, field_info)
-                is_current = field_info['name'] in [f.get('name') for f in current_batch]
+                is_current = field_info['name'] in current_names
                 
                 # Debug logging for dropdown fields
                 if field_info.get('type') == 'dropdown' or field_info.get('options'):
@@ -92,16 +115,7 @@ class IntelligentFallbackExtractor:
         Splits on: "and", "also", "plus", commas (smart comma detection)
         """
         # Replace common separators with a delimiter
-        text = re.sub(r'\s+and\s+', ' |AND| ', text, flags=re.IGNORECASE)
-        text = re.sub(r'\s+also\s+', ' |AND| ', text, flags=re.IGNORECASE)
-        text = re.sub(r'\s+plus\s+', ' |AND| ', text, flags=re.IGNORECASE)
-        text = re.sub(r'\s+then\s+', ' |AND| ', text, flags=re.IGNORECASE)
-        # Split on "in my X" or "for my X" to separate independent clauses
-        text = re.sub(r'\s+in\s+my\s+', ' |AND| my ', text, flags=re.IGNORECASE)
-        text = re.sub(r'\s+for\s+my\s+', ' |AND| my ', text, flags=re.IGNORECASE)
-        
-        # Smart comma handling (don't split within email addresses or names)
-        text = re.sub(r',\s+(?=(?:my|the|and)\s)', ' |AND| ', text, flags=re.IGNORECASE)
+        text = _SEGMENT_RULES.sub(text)
         
         # Split and clean
         segments = [s.strip() for s in text.split('|AND|') if s.strip()]
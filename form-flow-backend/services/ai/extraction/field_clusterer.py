@@ -6,7 +6,7 @@ Groups related fields together for efficient form filling.
 """
 
 import re
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -149,7 +149,9 @@ class FieldClusterer:
         self, 
         fields: List[Dict[str, Any]],
         max_complexity: int = None,
-        max_fields: int = None
+        max_fields: int = None,
+        cluster_of: Optional[Callable[[Dict[str, Any]], str]] = None,
+        complexity_of: Optional[Callable[[Dict[str, Any]], int]] = None,
     ) -> List[List[Dict[str, Any]]]:
         """
         Create intelligent question batches from remaining fields.
@@ -160,6 +162,8 @@ class FieldClusterer:
             fields: List of remaining fields
             max_complexity: Override default complexity budget
             max_fields: Override default max fields per batch
+            cluster_of: Precomputed cluster lookup (defaults to get_field_cluster)
+            complexity_of: Precomputed complexity lookup (defaults to get_field_complexity)
             
         Returns:
             List of batches, each batch is a list of fields
@@ -169,13 +173,15 @@ class FieldClusterer:
         
         max_complexity = max_complexity or self.MAX_BATCH_COMPLEXITY
         max_fields = max_fields or self.MAX_FIELDS_PER_BATCH
+        cluster_of = cluster_of or self.get_field_cluster
+        complexity_of = complexity_of or self.get_field_complexity
         
         logger.info(f"[CLUSTERER] create_batches called: {len(fields)} fields, max_fields={max_fields}, max_complexity={max_complexity}")
         
         # Group by cluster
         clustered = {}
         for field in fields:
-            cluster = self.get_field_cluster(field)
+            cluster = cluster_of(field)
             if cluster not in clustered:
                 clustered[cluster] = []
             clustered[cluster].append(field)
@@ -193,7 +199,7 @@ class FieldClusterer:
             current_complexity = 0
             
             for field in clustered[cluster]:
-                complexity = self.get_field_complexity(field)
+                complexity = complexity_of(field)
                 
                 # Check if adding this field would exceed limits
                 if (current_complexity + complexity > max_complexity or 
@@ -0,0 +1,146 @@
+"""
+Form Plan
+
+Per-session compiled view of a form schema.
+Cluster assignments, complexity scores, fallback matchers and name
+indexes are computed once when the session starts; each turn only
+updates which fields are still remaining.
+"""
+
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from services.ai.extraction.field_clusterer import FieldClusterer
+from services.ai.extraction.fallback_extractor import IntelligentFallbackExtractor
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Field types that are never asked about
+NON_INPUT_TYPES = ('submit', 'button', 'hidden')
+
+
+class FormPlan:
+    """
+    Compiled form plan for one conversation session.
+
+    Holds everything about the schema that does not change between turns,
+    plus the remaining-field list and question batches for the current
+    fill state. Both are recomputed only when the set of filled/skipped
+    fields changes, so repeated lookups within a turn are free.
+    """
+
+    def __init__(self, form_schema: List[Dict[str, Any]], clusterer: Optional[FieldClusterer] = None):
+        """
+        Args:
+            form_schema: Session schema (list of forms with 'fields')
+            clusterer: Clusterer used for cluster/complexity assignment and batching
+        """
+        self.clusterer = clusterer or FieldClusterer()
+
+        # Askable fields in schema order
+        self.fields: List[Dict[str, Any]] = [
+            f
+            for form in form_schema
+            for f in form.get('fields', [])
+            if f.get('type', '') not in NON_INPUT_TYPES and not f.get('hidden')
+        ]
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        for f in self.fields:
+            self.by_name.setdefault(f.get('name', ''), f)
+
+        self.clusters: Dict[str, str] = {
+            name: self.clusterer.get_field_cluster(f) for name, f in self.by_name.items()
+        }
+        self.complexity: Dict[str, int] = {
+            name: self.clusterer.get_field_complexity(f) for name, f in self.by_name.items()
+        }
+        self.matchers: Dict[str, Dict[str, Any]] = {
+            m['name']: m
+            for m in IntelligentFallbackExtractor._create_field_matchers(list(self.by_name.values()))
+        }
+
+        # Fill state
+        self._done: frozenset = frozenset()
+        self._remaining: List[Dict[str, Any]] = list(self.fields)
+        self._batches: Dict[Tuple[Optional[int], Optional[int]], List[List[Dict[str, Any]]]] = {}
+
+    # =========================================================================
+    # Fill State
+    # =========================================================================
+
+    def sync(self, filled: Iterable[str], skipped: Iterable[str]) -> 'FormPlan':
+        """Update the fill state; cheap when nothing changed since the last call."""
+        done = frozenset(filled).union(skipped)
+        if done != self._done:
+            self._done = done
+            self._remaining = [f for f in self.fields if f.get('name', '') not in done]
+            self._batches.clear()
+        return self
+
+    def remaining_fields(self) -> List[Dict[str, Any]]:
+        """Fields not yet filled or skipped, in schema order."""
+        return list(self._remaining)
+
+    # =========================================================================
+    # Batching
+    # =========================================================================
+
+    def cluster_of(self, field: Dict[str, Any]) -> str:
+        cluster = self.clusters.get(field.get('name', ''))
+        return cluster if cluster is not None else self.clusterer.get_field_cluster(field)
+
+    def complexity_of(self, field: Dict[str, Any]) -> int:
+        complexity = self.complexity.get(field.get('name', ''))
+        return complexity if complexity is not None else self.clusterer.get_field_complexity(field)
+
+    def create_batches(
+        self,
+        fields: List[Dict[str, Any]],
+        max_complexity: int = None,
+        max_fields: int = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        FieldClusterer.create_batches using the precomputed assignments.
+
+        Batches of the current remaining fields are memoized until the fill
+        state changes.
+        """
+        is_remaining = fields == self._remaining
+        key = (max_complexity, max_fields)
+        if is_remaining and key in self._batches:
+            return self._batches[key]
+
+        batches = self.clusterer.create_batches(
+            fields,
+            max_complexity=max_complexity,
+            max_fields=max_fields,
+            cluster_of=self.cluster_of,
+            complexity_of=self.complexity_of,
+        )
+        if is_remaining:
+            self._batches[key] = batches
+        return batches
+
+    # =========================================================================
+    # Extraction Candidates
+    # =========================================================================
+
+    def candidate_matchers(
+        self,
+        current_batch: List[Dict[str, Any]],
+        remaining_fields: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Fallback matchers for the current batch first, then the remaining fields."""
+        matchers = []
+        seen = set()
+        for f in (*current_batch, *remaining_fields):
+            name = f.get('name') or ''
+            if name in seen:
+                continue
+            seen.add(name)
+            matcher = self.matchers.get(name)
+            if matcher is None:
+                matcher = IntelligentFallbackExtractor._create_field_matchers([f])[0]
+            matchers.append(matcher)
+        return matchers
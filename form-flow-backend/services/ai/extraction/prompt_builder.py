@@ -0,0 +1,288 @@
+"""
+Extraction Prompt Builder
+
+Chooses which form fields go into a batch extraction prompt.
+Large forms (100+ fields) would otherwise send every field and option list
+to the LLM on each turn, so the prompt is pruned to the current batch plus
+the fields most relevant to what the user said, within a token budget.
+"""
+
+import re
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+from services.ai.extraction.field_clusterer import FieldClusterer
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Words that carry no signal for matching an utterance to a field
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'i', "i'm",
+    'im', 'in', 'is', 'it', 'me', 'my', 'of', 'on', 'or', 'our', 'so', 'the',
+    'their', 'this', 'to', 'was', 'we', 'with', 'you', 'your', 'yes', 'no',
+    'please', 'its', 'also', 'am', 'have', 'has', 'will', 'would',
+})
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Value shapes in the utterance that point at a field type
+VALUE_HINTS = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+"), ('email',), ('email', 'mail')),
+    (re.compile(r"(?:\+?\d[\s().-]?){7,}"), ('tel',), ('phone', 'mobile', 'tel', 'contact')),
+    (re.compile(r"\b\d{1,4}[/.-]\d{1,2}[/.-]\d{1,4}\b"), ('date',), ('date', 'dob', 'birth')),
+    (re.compile(r"https?://|www\.", re.IGNORECASE), ('url',), ('url', 'website', 'linkedin', 'github', 'portfolio')),
+]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, crudely singularized."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def option_label(option: Any) -> str:
+    """Display text of an option given as a dict or a plain value."""
+    if isinstance(option, dict):
+        return str(option.get('label', option.get('value', '')))
+    return str(option)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prompts)."""
+    return max(1, len(text) // 4)
+
+
+def field_line(field: Any) -> str:
+    """Schema line exactly as the LLM services render it."""
+    if not isinstance(field, dict):
+        return f"- {field}"
+    name = field.get('name', 'Unknown')
+    line = f"- {field.get('label', name)} (Type: {field.get('type', 'text')})"
+    options = field.get('options') or []
+    if options:
+        line += f" [Options: {', '.join(option_label(o) for o in options)}]"
+    return line
+
+
+class ExtractionPromptBuilder:
+    """
+    Relevance-pruned field selection for batch extraction prompts.
+
+    The current batch is always included. Other fields are ranked by
+    lexical overlap with the utterance (label, name and options), value
+    shapes such as emails or dates, the clusters of the current batch and,
+    when sentence embeddings are available, embedding similarity. The top-k
+    are added until the token budget is spent. Long option lists are cut
+    down to the options the user mentioned plus the first few.
+    """
+
+    DEFAULT_TOP_K = 8
+    DEFAULT_TOKEN_BUDGET = 600
+    MAX_OPTIONS = 10
+    INDEX_CACHE_SIZE = 64
+
+    # Scoring weights
+    LABEL_WEIGHT = 3.0
+    OPTION_WEIGHT = 2.0
+    VALUE_HINT_WEIGHT = 4.0
+    CLUSTER_WEIGHT = 0.5
+    EMBEDDING_WEIGHT = 3.0
+    MIN_EMBEDDING_SIMILARITY = 0.35
+
+    def __init__(
+        self,
+        clusterer: Optional[FieldClusterer] = None,
+        rag_service: Any = None,
+        top_k: int = DEFAULT_TOP_K,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_options: int = MAX_OPTIONS,
+    ):
+        """
+        Args:
+            clusterer: Field clusterer (shared with the agent)
+            rag_service: Optional RagService; its embedder is used when loaded
+            top_k: Maximum number of fields added beyond the current batch
+            token_budget: Token budget for the FORM FIELDS section
+            max_options: Options kept per field when the list is truncated
+        """
+        self.clusterer = clusterer or FieldClusterer()
+        self.rag_service = rag_service
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.max_options = max_options
+        # Per-schema token index (and embeddings), keyed by field names
+        self._index_cache: "OrderedDict[Tuple[str, ...], Dict[str, Any]]" = OrderedDict()
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def select_fields(
+        self,
+        user_input: str,
+        current_batch: List[Dict[str, Any]],
+        all_fields: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Pick the fields to send to the extraction LLM.
+
+        Args:
+            user_input: What the user said
+            current_batch: Fields just asked about (always kept)
+            all_fields: Every field of the form
+
+        Returns:
+            Field dicts in prompt order; option lists may be truncated copies
+        """
+        utterance_tokens = set(tokenize(user_input))
+        batch_names = {f.get('name') for f in current_batch if isinstance(f, dict)}
+
+        selected = [self._truncate_options(f, utterance_tokens) for f in current_batch]
+        used = sum(estimate_tokens(field_line(f)) for f in selected)
+
+        candidates = [
+            f for f in all_fields
+            if isinstance(f, dict) and f.get('name') not in batch_names
+        ]
+        if not candidates:
+            return selected
+
+        index = self._get_index(all_fields)
+        batch_clusters = {self.clusterer.get_field_cluster(f) for f in current_batch if isinstance(f, dict)}
+        hinted_types, hinted_words = self._value_hints(user_input)
+        similarities = self._embedding_similarities(user_input, index)
+
+        scored = []
+        for position, field in enumerate(candidates):
+            entry = index['fields'].get(field.get('name'))
+            if entry is None:
+                continue
+            score = self._score(entry, utterance_tokens, hinted_types, hinted_words)
+            similarity = similarities.get(field.get('name'), 0.0)
+            if similarity >= self.MIN_EMBEDDING_SIMILARITY:
+                score += self.EMBEDDING_WEIGHT * similarity
+            if score <= 0:
+                continue
+            if entry['cluster'] in batch_clusters:
+                score += self.CLUSTER_WEIGHT
+            scored.append((-score, position, field))
+
+        scored.sort(key=lambda item: (item[0], item[1]))
+        for _, _, field in scored[:self.top_k]:
+            pruned = self._truncate_options(field, utterance_tokens)
+            cost = estimate_tokens(field_line(pruned))
+            if used + cost > self.token_budget:
+                continue
+            selected.append(pruned)
+            used += cost
+
+        logger.debug(
+            f"Extraction prompt: {len(selected)}/{len(all_fields)} fields, ~{used} tokens"
+        )
+        return selected
+
+    # =========================================================================
+    # Scoring
+    # =========================================================================
+
+    def _score(
+        self,
+        entry: Dict[str, Any],
+        utterance_tokens: set,
+        hinted_types: set,
+        hinted_words: set,
+    ) -> float:
+        score = self.LABEL_WEIGHT * len(utterance_tokens & entry['label_tokens'])
+        score += self.OPTION_WEIGHT * min(len(utterance_tokens & entry['option_tokens']), 2)
+        if entry['type'] in hinted_types or entry['label_tokens'] & hinted_words:
+            score += self.VALUE_HINT_WEIGHT
+        return score
+
+    @staticmethod
+    def _value_hints(user_input: str) -> Tuple[set, set]:
+        types, words = set(), set()
+        for pattern, field_types, field_words in VALUE_HINTS:
+            if pattern.search(user_input):
+                types.update(field_types)
+                words.update(field_words)
+        return types, words
+
+    def _embedding_similarities(self, user_input: str, index: Dict[str, Any]) -> Dict[str, float]:
+        """Cosine similarity of the utterance to each field, if an embedder is loaded."""
+        embedder = getattr(self.rag_service, 'embedder', None)
+        if embedder is None:
+            return {}
+        try:
+            if index.get('embeddings') is None:
+                index['embeddings'] = self.rag_service._embed(index['documents'])
+            query = self.rag_service._embed([user_input])[0]
+        except Exception as e:
+            logger.warning(f"Embedding similarity unavailable: {e}")
+            return {}
+
+        query_norm = sum(q * q for q in query) ** 0.5 or 1.0
+        similarities = {}
+        for name, vector in zip(index['names'], index['embeddings']):
+            norm = sum(v * v for v in vector) ** 0.5 or 1.0
+            similarities[name] = sum(q * v for q, v in zip(query, vector)) / (query_norm * norm)
+        return similarities
+
+    # =========================================================================
+    # Field Index
+    # =========================================================================
+
+    def _get_index(self, all_fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Token sets per field, built once per schema."""
+        key = tuple(f.get('name', '') for f in all_fields if isinstance(f, dict))
+        index = self._index_cache.get(key)
+        if index is not None:
+            self._index_cache.move_to_end(key)
+            return index
+
+        index = {'fields': {}, 'names': [], 'documents': [], 'embeddings': None}
+        for field in all_fields:
+            if not isinstance(field, dict):
+                continue
+            name = field.get('name', '')
+            label = field.get('label') or field.get('display_name') or ''
+            # Split snake/camel case names into words
+            readable_name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name).replace('_', ' ')
+            options = ' '.join(option_label(o) for o in field.get('options') or [])
+            index['fields'][name] = {
+                'label_tokens': set(tokenize(f"{label} {readable_name}")),
+                'option_tokens': set(tokenize(options)),
+                'type': (field.get('type') or 'text').lower(),
+                'cluster': self.clusterer.get_field_cluster(field),
+            }
+            index['names'].append(name)
+            index['documents'].append(f"{label} {readable_name} {field.get('purpose', '')}".strip())
+
+        self._index_cache[key] = index
+        if len(self._index_cache) > self.INDEX_CACHE_SIZE:
+            self._index_cache.popitem(last=False)
+        return index
+
+    def _truncate_options(self, field: Any, utterance_tokens: set) -> Any:
+        """Copy of the field with at most max_options options, mentioned ones first."""
+        if not isinstance(field, dict):
+            return field
+        options = field.get('options') or []
+        if len(options) <= self.max_options:
+            return field
+
+        mentioned = [o for o in options if set(tokenize(option_label(o))) & utterance_tokens]
+        kept = mentioned[:self.max_options]
+        for option in options:
+            if len(kept) >= self.max_options:
+                break
+            if option not in kept:
+                kept.append(option)
+        return {**field, 'options': kept}
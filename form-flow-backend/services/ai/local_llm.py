@@ -14,15 +14,111 @@ Usage:
 import os
 import json
 import json
-from typing import Dict, List, Any, Optional
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 
 
 from utils.logging import get_logger
 from utils.exceptions import AIServiceError
+from utils.telemetry import metrics
 
 logger = get_logger(__name__)
 
 
+# =============================================================================
+# Prompt Prefix KV Cache
+# =============================================================================
+
+class PrefixKVCache:
+    """
+    LRU of transformer past-key-values for prompt prefixes.
+
+    The extraction prompt is a long static prefix (instructions + form
+    schema) followed by the user's utterance. Caching the attention state of
+    the prefix means each turn only encodes the short suffix. Entries are
+    keyed by prefix token ids; a lookup returns the longest cached entry
+    that is a prefix of the requested ids, so a new schema can still reuse
+    the cached instruction header. Bounded by total bytes.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int = 64):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, ...], Tuple[Any, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+
+    def lookup(self, token_ids: Sequence[int]) -> Tuple[int, Any]:
+        """
+        Find the longest cached prefix of token_ids.
+
+        Returns:
+            (prefix_length, kv) - (0, None) on a miss
+        """
+        token_ids = tuple(token_ids)
+        best_key = None
+        for key in self._entries:
+            if len(key) <= len(token_ids) and (best_key is None or len(key) > len(best_key)):
+                if token_ids[:len(key)] == key:
+                    best_key = key
+
+        if best_key is None:
+            self.misses += 1
+            return 0, None
+
+        if len(best_key) == len(token_ids):
+            self.hits += 1
+        else:
+            self.partial_hits += 1
+        self._entries.move_to_end(best_key)
+        return len(best_key), self._entries[best_key][0]
+
+    def store(self, token_ids: Sequence[int], kv: Any, nbytes: int) -> bool:
+        """Cache kv for token_ids, evicting least recently used entries."""
+        if nbytes > self.max_bytes:
+            return False
+        key = tuple(token_ids)
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (kv, nbytes)
+        self.total_bytes += nbytes
+        while self.total_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+        }
+
+
+def _kv_nbytes(kv: Any) -> int:
+    """Memory held by a transformers Cache (or legacy tuple of tensors)."""
+    tensors = []
+    if hasattr(kv, "layers"):
+        for layer in kv.layers:
+            tensors += [getattr(layer, "keys", None), getattr(layer, "values", None)]
+    elif hasattr(kv, "key_cache"):
+        tensors = list(kv.key_cache) + list(kv.value_cache)
+    else:
+        tensors = [t for layer in kv for t in layer]
+    return sum(t.numel() * t.element_size() for t in tensors if t is not None)
+
+
 class LocalLLMService:
     """
     Local-first LLM service with Gemini fallback.
@@ -64,6 +160,17 @@ class LocalLLMService:
         self._initialized = False
         self._cache = {}  # Simple in-memory cache
         
+        # Attention state of static prompt prefixes (instructions + schema)
+        prefix_cache_mb = 1024
+        try:
+            from config.settings import settings
+            prefix_cache_mb = settings.LOCAL_LLM_PREFIX_CACHE_MB
+        except Exception:
+            pass
+        self.prefix_cache = PrefixKVCache(prefix_cache_mb * 1024 * 1024) if prefix_cache_mb > 0 else None
+        # One generation at a time: cached KV entries are extended in place
+        self._inference_lock = threading.Lock()
+        
         # Initialize Gemini fallback if available
         self.gemini_llm = None
         if gemini_api_key:
@@ -267,14 +374,14 @@ class LocalLLMService:
         schema_text = "\n".join(schema_lines)
         
         # 2. Construct the Smart Prompt
-        # We tell the LLM to map the speech to the fields, respecting options
-        prompt = f"""Instruct: You are a smart form-filling assistant. Map the user's speech to the following form fields.
+        # We tell the LLM to map the speech to the fields, respecting options.
+        # Everything before the speech is static for a given schema so its
+        # attention state can be cached between turns.
+        header = """Instruct: You are a smart form-filling assistant. Map the user's speech to the following form fields.
         
 FORM FIELDS:
-{schema_text}
-
-USER SPEECH:
-"{user_input}"
+"""
+        schema = f"""{schema_text}
 
 INSTRUCTIONS:
 1. Extract values for any fields mentioned in the speech.
@@ -284,36 +391,18 @@ INSTRUCTIONS:
 5. Output format: "Field Label: Value"
 6. Do NOT generate any code or extra text.
 
+USER SPEECH:
+"""
+        suffix = f""""{user_input}"
+
 Output:"""
 
         # 3. Running Inference
-        import torch
-        inputs = self.tokenizer(prompt, return_tensors="pt")
-        if self.model.device.type == "cuda":
-            inputs = inputs.to("cuda")
-        
-        with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
-                max_new_tokens=256,
-                temperature=0.1,
-                do_sample=False,
-                pad_token_id=self.tokenizer.eos_token_id,
-                repetition_penalty=1.1, # Prevent repetition
-                eos_token_id=self.tokenizer.eos_token_id
-            )
-        
-        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        generated = self._generate([header, schema], suffix, max_new_tokens=256).strip()
         
         # 4. Parse the Output
-        # Remove prompt to get just the generated text
-        try:
-            if "Output:" in response:
-                generated = response.split("Output:")[-1].strip()
-            else:
-                generated = response[len(prompt):].strip()
-        except:
-            generated = response[len(prompt):].strip()
+        if "Output:" in generated:
+            generated = generated.split("Output:")[-1].strip()
             
         logger.info(f"LLM Batch Extraction Output:\n{generated}")
         
@@ -456,6 +545,90 @@ Output:"""
         }
 
 
+    # =========================================================================
+    # Inference
+    # =========================================================================
+
+    def _generate(self, prefix_parts: List[str], suffix: str, max_new_tokens: int = 256) -> str:
+        """
+        Greedy generation for the prompt prefix_parts + suffix.
+
+        The KV state after each prefix part is cached, so the instruction
+        header is shared by every schema and a session's schema prefix is
+        encoded once; each turn only encodes the suffix.
+
+        Returns:
+            The generated continuation only
+        """
+        import torch
+
+        part_ids = [
+            self.tokenizer(part, return_tensors="pt", add_special_tokens=(i == 0)).input_ids
+            for i, part in enumerate(prefix_parts + [suffix])
+        ]
+        input_ids = torch.cat(part_ids, dim=-1).to(self.model.device)
+        boundaries = []
+        for ids in part_ids[:-1]:
+            boundaries.append((boundaries[-1] if boundaries else 0) + ids.shape[-1])
+        prefix_len = boundaries[-1]
+
+        with self._inference_lock, torch.no_grad():
+            past = self._prefix_kv(input_ids, boundaries)
+            try:
+                outputs = self.model.generate(
+                    input_ids=input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    past_key_values=past,
+                    max_new_tokens=max_new_tokens,
+                    do_sample=False,
+                    pad_token_id=self.tokenizer.eos_token_id,
+                    repetition_penalty=1.1, # Prevent repetition
+                    eos_token_id=self.tokenizer.eos_token_id
+                )
+            finally:
+                # generate() appends the suffix and output to the cache; drop them
+                if past is not None and past.get_seq_length() > prefix_len:
+                    past.crop(prefix_len - past.get_seq_length())
+
+        return self.tokenizer.decode(outputs[0, input_ids.shape[-1]:], skip_special_tokens=True)
+
+    def _prefix_kv(self, input_ids, boundaries: List[int]) -> Any:
+        """KV state for input_ids[:boundaries[-1]], encoding only the uncached tail."""
+        if self.prefix_cache is None:
+            return None
+
+        from transformers import DynamicCache
+
+        token_ids = input_ids[0, :boundaries[-1]].tolist()
+        started = time.perf_counter()
+        cached_len, cached = self.prefix_cache.lookup(token_ids)
+        if cached_len == len(token_ids):
+            metrics.increment("local_llm.prefix_cache", tags={"result": "hit"})
+            return cached
+
+        if cached is not None:
+            # The cached entry stays valid for other schemas
+            past = copy.deepcopy(cached)
+            metrics.increment("local_llm.prefix_cache", tags={"result": "partial"})
+        else:
+            past = DynamicCache()
+            metrics.increment("local_llm.prefix_cache", tags={"result": "miss"})
+
+        # Encode part by part, checkpointing at each boundary
+        position = cached_len
+        for boundary in boundaries:
+            if boundary <= position:
+                continue
+            self.model(input_ids=input_ids[:, position:boundary], past_key_values=past, use_cache=True)
+            position = boundary
+            if boundary != boundaries[-1]:
+                self.prefix_cache.store(token_ids[:boundary], copy.deepcopy(past), _kv_nbytes(past))
+
+        self.prefix_cache.store(token_ids, past, _kv_nbytes(past))
+        metrics.timing("local_llm.prefix_encode", (time.perf_counter() - started) * 1000)
+        return past
+
+
 # Singleton instance
 _local_llm_instance: Optional[LocalLLMService] = None
 
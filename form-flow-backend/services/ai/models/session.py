@@ -78,6 +78,9 @@ class ConversationSession:
     _init_skipped_fields: Optional[List[str]] = field(default=None, repr=False)
     _init_confidence_scores: Optional[Dict[str, float]] = field(default=None, repr=False)
     
+    # Compiled form plan (derived from form_schema, never persisted)
+    _form_plan: Optional[Any] = field(default=None, repr=False, compare=False)
+    
     def __post_init__(self):
         """
         Initialize session after construction.
@@ -353,24 +356,19 @@ class ConversationSession:
                     count += 1
         return count
     
+    def get_form_plan(self):
+        """Compiled plan for form_schema, synced to the current fill state."""
+        if self._form_plan is None:
+            from services.ai.extraction.form_plan import FormPlan
+            self._form_plan = FormPlan(self.form_schema)
+        return self._form_plan.sync(
+            self.form_data_manager.get_filled_fields(),
+            self.form_data_manager.get_skipped_field_names(),
+        )
+    
     def get_remaining_fields(self) -> List[Dict[str, Any]]:
         """Get fields that haven't been filled or skipped yet."""
-        remaining = []
-        filled = self.form_data_manager.get_filled_fields()
-        skipped = self.form_data_manager.get_skipped_field_names()
-        
-        for form in self.form_schema:
-            for f in form.get('fields', []):
-                field_name = f.get('name', '')
-                field_type = f.get('type', '')
-                
-                if field_type in ['submit', 'button', 'hidden'] or f.get('hidden'):
-                    continue
-                if field_name in filled or field_name in skipped:
-                    continue
-                    
-                remaining.append(f)
-        return remaining
+        return self.get_form_plan().remaining_fields()
     
     # =========================================================================
     # Serialization
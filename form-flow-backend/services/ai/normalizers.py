@@ -19,6 +19,8 @@ Usage:
 import re
 from typing import Optional
 
+from services.ai.text_rules import compile_prefix_chain
+
 
 # Known email domains for context-aware "at" → "@" conversion
 KNOWN_DOMAINS = [
@@ -28,6 +30,90 @@ KNOWN_DOMAINS = [
 ]
 
 
+# =============================================================================
+# Compiled Rules
+# =============================================================================
+# Each normalizer strips its conversational prefixes in order; the steps are
+# folded into one anchored regex per normalizer (see compile_prefix_chain).
+
+_EMAIL_PREFIX_PATTERNS = [
+    r"^(?:my\s+)?(?:email\s+)?(?:address|addresses)?\s+(?:is\s+)?",
+    r"^(?:it'?s?\s+)",
+    r"^(?:my\s+)?email\s+(?:is\s+)?",
+]
+_EMAIL_PREFIXES = compile_prefix_chain(_EMAIL_PREFIX_PATTERNS)
+
+_PHONE_PREFIX_PATTERNS = [
+    r"^(?:my\s+)?(?:phone|mobile|cell|contact|number)\s+(?:number\s+)?(?:is\s+)?",
+    r"^(?:it'?s?\s+)?",
+    r"^(?:call\s+me\s+(?:at|on)\s+)?",
+    r"^(?:you\s+can\s+reach\s+me\s+(?:at|on)\s+)?",
+    r"^(?:here'?s?\s+)?(?:my\s+)?(?:number\s+)?",
+]
+_PHONE_PREFIXES = compile_prefix_chain(_PHONE_PREFIX_PATTERNS)
+
+_NAME_PREFIX_PATTERNS = [
+    r"^(?:hi\s+)?(?:my\s+)?(?:name\s+is\s+)",
+    r"^(?:i'?m\s+)",
+    r"^(?:this\s+is\s+)",
+    r"^(?:it'?s?\s+)",
+    r"^(?:call\s+me\s+)",
+    r"^(?:you\s+can\s+call\s+me\s+)",
+    r"^(?:hey\s+)?(?:i\s+am\s+)",
+]
+_NAME_PREFIXES = compile_prefix_chain(_NAME_PREFIX_PATTERNS)
+
+_TEXT_PREFIX_PATTERNS = [
+    r"^(?:it'?s?\s+)",
+    r"^(?:i\s+(?:work|am)\s+(?:at|for|with)\s+)",
+    r"^(?:my\s+\w+\s+is\s+)",
+    r"^(?:the\s+\w+\s+is\s+)",
+    r"^(?:we\s+are\s+)",
+]
+_TEXT_PREFIXES = compile_prefix_chain(_TEXT_PREFIX_PATTERNS)
+
+_NUMBER_PREFIX_PATTERNS = [
+    r"^(?:it'?s?\s+)?",
+    r"^(?:i\s+have\s+)?",
+    r"^(?:my\s+\w+\s+is\s+)?",
+    r"^(?:about\s+)?",
+    r"^(?:around\s+)?",
+]
+_NUMBER_PREFIXES = compile_prefix_chain(_NUMBER_PREFIX_PATTERNS)
+
+_SPACES_AROUND_AT = re.compile(r'\s*@\s*')
+_AT_KNOWN_DOMAIN = re.compile(rf"\s+at\s+({'|'.join(KNOWN_DOMAINS)})(\.\w+)?", re.IGNORECASE)
+_AT_DOMAIN_WITH_TLD = re.compile(r'\s+at\s+(\w+\.(com|org|net|edu|gov|io|co|in|info|biz|me))', re.IGNORECASE)
+_AT_THE_RATE = re.compile(r'\s+at\s*the\s*rate\s*(of\s*)?', re.IGNORECASE)
+_AT_SIGN = re.compile(r'\s+at\s*sign\s*', re.IGNORECASE)
+_SPACES_BEFORE_TLD = re.compile(r'\s*\.\s*(com|org|net|edu|gov|io|co|in)\b')
+_LOCAL_PART_WORD = re.compile(r'^[a-zA-Z0-9._\-+]+$')
+_DOMAIN_PREFIX = re.compile(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_STRICT_EMAIL = re.compile(r'(\S+@\S+\.\w+)')
+_LOCAL_PART_JUNK = re.compile(r'[^\w.\-+]')
+_NON_PHONE_CHARS = re.compile(r'[^\d+]')
+_FIRST_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+# STOP WORDS: When walking backwards from @, stop at these
+_EMAIL_STOP_WORDS = frozenset({
+    'is', 'at', 'my', 'the', 'email', 'address', 'and', 'also', 'with', 
+    'for', 'to', 'from', 'of', 'in', 'on', 'as', 'by', 'or', 'but',
+    'you', 'your', 'i', 'am', 'are', 'was', 'were', 'be', 'been', 
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 
+    'could', 'should', 'can', 'may', 'might', 'must', 'shall',
+    'this', 'that', 'it', 'its', 'he', 'she', 'they', 'them',
+    'relationship', 'contact', 'here', 'guys', 'client', 'customer',
+})
+
+# Auto-complete common domains
+_DOMAIN_COMPLETIONS = {
+    'gmail': 'gmail.com', 'geemail': 'gmail.com', 'gmal': 'gmail.com',
+    'yahoo': 'yahoo.com', 'yaho': 'yahoo.com',
+    'hotmail': 'hotmail.com', 'outlook': 'outlook.com',
+    'icloud': 'icloud.com', 'protonmail': 'protonmail.com',
+}
+
+
 def normalize_email_smart(text: str) -> str:
     """
     Smart email normalization that avoids corrupting names like "Atharva" to "@harva".
@@ -56,13 +142,7 @@ def normalize_email_smart(text: str) -> str:
     text = text.lower().strip()
     
     # Step 1: Remove conversational prefixes (NEW)
-    prefixes = [
-        r"^(?:my\s+)?(?:email\s+)?(?:address|addresses)?\s+(?:is\s+)?",
-        r"^(?:it'?s?\s+)",
-        r"^(?:my\s+)?email\s+(?:is\s+)?",
-    ]
-    for prefix in prefixes:
-        text = re.sub(prefix, '', text, flags=re.IGNORECASE)
+    text = _EMAIL_PREFIXES.sub('', text, count=1)
     
     text = text.strip()
 
@@ -76,32 +156,21 @@ def normalize_email_smart(text: str) -> str:
     text = text.replace(' dot', '.')
     
     # Step 3: Normalize spaces around existing @ symbol
-    text = re.sub(r'\s*@\s*', '@', text)
+    text = _SPACES_AROUND_AT.sub('@', text)
     
     # Step 4: Context-aware "at" → "@" conversion
-    domain_pattern = '|'.join(KNOWN_DOMAINS)
-    text = re.sub(rf'\s+at\s+({domain_pattern})(\.\w+)?', r'@\1\2', text, flags=re.IGNORECASE)
-    text = re.sub(r'\s+at\s+(\w+\.(com|org|net|edu|gov|io|co|in|info|biz|me))', r'@\1', text, flags=re.IGNORECASE)
-    text = re.sub(r'\s+at\s*the\s*rate\s*(of\s*)?', '@', text, flags=re.IGNORECASE)
-    text = re.sub(r'\s+at\s*sign\s*', '@', text, flags=re.IGNORECASE)
+    if 'at' in text:
+        text = _AT_KNOWN_DOMAIN.sub(r'@\1\2', text)
+        text = _AT_DOMAIN_WITH_TLD.sub(r'@\1', text)
+        text = _AT_THE_RATE.sub('@', text)
+        text = _AT_SIGN.sub('@', text)
     
     # Step 5: Clean up spaces around @ and before TLD dots
-    text = re.sub(r'\s*@\s*', '@', text)
-    text = re.sub(r'\s*\.\s*(com|org|net|edu|gov|io|co|in)\b', r'.\1', text)
+    text = _SPACES_AROUND_AT.sub('@', text)
+    text = _SPACES_BEFORE_TLD.sub(r'.\1', text)
     
     # Step 6: Extract and clean email
     if '@' in text:
-        # STOP WORDS: When walking backwards from @, stop at these
-        STOP_WORDS = {
-            'is', 'at', 'my', 'the', 'email', 'address', 'and', 'also', 'with', 
-            'for', 'to', 'from', 'of', 'in', 'on', 'as', 'by', 'or', 'but',
-            'you', 'your', 'i', 'am', 'are', 'was', 'were', 'be', 'been', 
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 
-            'could', 'should', 'can', 'may', 'might', 'must', 'shall',
-            'this', 'that', 'it', 'its', 'he', 'she', 'they', 'them',
-            'relationship', 'contact', 'here', 'guys', 'client', 'customer',
-        }
-        
         # 1. Try Look-back extraction first (handles spaces: "Atharva karwal@gmail.com")
         at_index = text.find('@')
         if at_index > 0:
@@ -114,7 +183,7 @@ def normalize_email_smart(text: str) -> str:
             for part in reversed(candidates):
                 # Stop if we hit a stop word or invalid char
                 # Allow dots, underscores, dashes, plus in local part
-                if re.match(r'^[a-zA-Z0-9._\-+]+$', part) and part.lower() not in STOP_WORDS:
+                if _LOCAL_PART_WORD.match(part) and part.lower() not in _EMAIL_STOP_WORDS:
                     valid_parts.insert(0, part)
                 else:
                     break
@@ -122,13 +191,13 @@ def normalize_email_smart(text: str) -> str:
             if valid_parts:
                 local = "".join(valid_parts)
                 # Get domain (first word after @)
-                domain_match = re.search(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', after_at)
+                domain_match = _DOMAIN_PREFIX.search(after_at)
                 if domain_match:
                     domain = domain_match.group(0)
                     return f"{local}@{domain}"
 
         # 2. Fallback to strict extraction (non-whitespace around @)
-        strict_match = re.search(r'(\S+@\S+\.\w+)', text)
+        strict_match = _STRICT_EMAIL.search(text)
         if strict_match:
              parts = strict_match.group(1).split('@')
              if len(parts) == 2:
@@ -141,18 +210,12 @@ def normalize_email_smart(text: str) -> str:
             domain = parts[1].strip()
             
             # Clean local part
-            local_cleaned = re.sub(r'[^\w.\-+]', '', local_part)
+            local_cleaned = _LOCAL_PART_JUNK.sub('', local_part)
             domain = domain.replace(' ', '').strip()
             
             # Auto-complete common domains
-            domain_completions = {
-                'gmail': 'gmail.com', 'geemail': 'gmail.com', 'gmal': 'gmail.com',
-                'yahoo': 'yahoo.com', 'yaho': 'yahoo.com',
-                'hotmail': 'hotmail.com', 'outlook': 'outlook.com',
-                'icloud': 'icloud.com', 'protonmail': 'protonmail.com',
-            }
-            if domain in domain_completions:
-                domain = domain_completions[domain]
+            if domain in _DOMAIN_COMPLETIONS:
+                domain = _DOMAIN_COMPLETIONS[domain]
             
             return f"{local_cleaned}@{domain}"
 
@@ -180,19 +243,10 @@ def normalize_phone_smart(text: str) -> str:
     text = text.lower().strip()
     
     # Remove conversational prefixes
-    prefixes = [
-        r"^(?:my\s+)?(?:phone|mobile|cell|contact|number)\s+(?:number\s+)?(?:is\s+)?",
-        r"^(?:it'?s?\s+)?",
-        r"^(?:call\s+me\s+(?:at|on)\s+)?",
-        r"^(?:you\s+can\s+reach\s+me\s+(?:at|on)\s+)?",
-        r"^(?:here'?s?\s+)?(?:my\s+)?(?:number\s+)?",
-    ]
-    
-    for prefix in prefixes:
-        text = re.sub(prefix, '', text, flags=re.IGNORECASE)
+    text = _PHONE_PREFIXES.sub('', text, count=1)
     
     # Extract just digits and + sign
-    phone = re.sub(r'[^\d+]', '', text)
+    phone = _NON_PHONE_CHARS.sub('', text)
     
     return phone if phone else text.strip()
 
@@ -218,18 +272,7 @@ def normalize_name_smart(text: str) -> str:
     text = text.strip()
     
     # Remove conversational prefixes
-    prefixes = [
-        r"^(?:hi\s+)?(?:my\s+)?(?:name\s+is\s+)",
-        r"^(?:i'?m\s+)",
-        r"^(?:this\s+is\s+)",
-        r"^(?:it'?s?\s+)",
-        r"^(?:call\s+me\s+)",
-        r"^(?:you\s+can\s+call\s+me\s+)",
-        r"^(?:hey\s+)?(?:i\s+am\s+)",
-    ]
-    
-    for prefix in prefixes:
-        text = re.sub(prefix, '', text, flags=re.IGNORECASE)
+    text = _NAME_PREFIXES.sub('', text, count=1)
     
     return text.strip().title()
 
@@ -255,16 +298,7 @@ def normalize_text_smart(text: str) -> str:
     text = text.strip()
     
     # Remove conversational prefixes
-    prefixes = [
-        r"^(?:it'?s?\s+)",
-        r"^(?:i\s+(?:work|am)\s+(?:at|for|with)\s+)",
-        r"^(?:my\s+\w+\s+is\s+)",
-        r"^(?:the\s+\w+\s+is\s+)",
-        r"^(?:we\s+are\s+)",
-    ]
-    
-    for prefix in prefixes:
-        text = re.sub(prefix, '', text, flags=re.IGNORECASE)
+    text = _TEXT_PREFIXES.sub('', text, count=1)
     
     return text.strip()
 
@@ -290,19 +324,10 @@ def normalize_number_smart(text: str) -> str:
     text = text.lower().strip()
     
     # Remove conversational prefixes
-    prefixes = [
-        r"^(?:it'?s?\s+)?",
-        r"^(?:i\s+have\s+)?",
-        r"^(?:my\s+\w+\s+is\s+)?",
-        r"^(?:about\s+)?",
-        r"^(?:around\s+)?",
-    ]
-    
-    for prefix in prefixes:
-        text = re.sub(prefix, '', text, flags=re.IGNORECASE)
+    text = _NUMBER_PREFIXES.sub('', text, count=1)
     
     # Extract the first number found
-    match = re.search(r'\d+(?:\.\d+)?', text)
+    match = _FIRST_NUMBER.search(text)
     if match:
         return match.group()
     
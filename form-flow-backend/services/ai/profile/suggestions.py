@@ -4,9 +4,13 @@ Profile-Based Intelligent Suggestions
 3-tier suggestion system using behavioral profiles for intelligent form field suggestions.
 """
 
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
 from enum import Enum
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import json
@@ -14,6 +18,7 @@ from services.ai.gemini import get_gemini_service
 from pydantic import BaseModel, Field
 
 from utils.logging import get_logger
+from utils.telemetry import metrics
 
 logger = get_logger(__name__)
 
@@ -35,6 +40,11 @@ class SuggestionResponse(BaseModel):
     suggestions: List[str] = Field(description="List of suggested values")
     reasoning: str = Field(description="Why these suggestions were made based on the profile")
 
+
+class FormSuggestionResponse(BaseModel):
+    """Structured response for a whole-form LLM suggestion batch."""
+    fields: Dict[str, SuggestionResponse] = Field(description="Suggestions keyed by field name")
+
 @dataclass
 class IntelligentSuggestion:
     """A single intelligent suggestion with context."""
@@ -46,6 +56,38 @@ class IntelligentSuggestion:
     alternative_framing: Optional[str] = None
 
 
+@dataclass
+class FormSuggestionSet:
+    """Prefetched suggestions for every field of one form."""
+    suggestions: Dict[str, List[IntelligentSuggestion]]  # Keyed by normalized name and label
+    answers: Dict[str, str]                               # previous_answers the batch was built from
+    created_at: float = field(default_factory=time.monotonic)
+
+    def lookup(self, field_context: Dict[str, Any]) -> Optional[List[IntelligentSuggestion]]:
+        for key in (field_context.get('name'), field_context.get('label')):
+            found = self.suggestions.get(_normalize(key))
+            if found:
+                return found
+        return None
+
+
+def _normalize(value: Any) -> str:
+    return str(value or '').strip().lower()
+
+
+def _profile_value(profile: Any, name: str, default: Any = None) -> Any:
+    """Read a profile attribute from a UserProfile or its cached dict."""
+    if isinstance(profile, dict):
+        return profile.get(name, default)
+    return getattr(profile, name, default)
+
+
+def _format_previous_answers(previous_answers: Dict[str, str]) -> str:
+    if not previous_answers:
+        return "None"
+    return "\n".join([f"- {k}: {v}" for k, v in previous_answers.items() if v])
+
+
 class ProfileSuggestionEngine:
     """
     Intelligent suggestion engine using behavioral profiles.
@@ -54,10 +96,23 @@ class ProfileSuggestionEngine:
     - Tier 1: Profile-based suggestions using LLM
     - Tier 2: Blended patterns + profile context
     - Tier 3: Pattern-only for new/anonymous users
+    
+    When the form's field list is known, suggestions for all fields are
+    generated in one LLM call per (user, profile version, form) and served
+    from a bounded cache; per-field requests only wait for that call once.
     """
     
+    # Form-level prefetch cache
+    FORM_CACHE_SIZE = 256
+    FORM_CACHE_TTL_SECONDS = 3600
+    # Minimum gap between background refreshes of one form
+    REFRESH_MIN_INTERVAL_SECONDS = 10
+    
     def __init__(self):
         self._cache = {}
+        self._form_cache: "OrderedDict[Tuple, FormSuggestionSet]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._last_refresh: Dict[Tuple, float] = {}
     
     async def get_suggestions(
         self,
@@ -88,6 +143,12 @@ class ProfileSuggestionEngine:
                 # STRICT: Always use Tier 1 if profile exists. Ignore confidence score.
                 logger.info(f"👤 [Lifecycle] Profile Found. Confidence: {getattr(profile, 'confidence_score', 0)}")
                 logger.info("🚀 [Lifecycle] FORCING Tier 1: PROFILE_BASED (Ignoring confidence score)")
+                if form_context.get('field_labels') or form_context.get('fields'):
+                    prefetched = await self._form_level_suggestions(
+                        user_id, profile, field_context, form_context, previous_answers, form_intent
+                    )
+                    if prefetched:
+                        return prefetched
                 return await self._tier1_profile_based(profile, field_context, form_context, previous_answers, form_intent)
             else:
                 # STRICT: No profile = No suggestions.
@@ -134,7 +195,6 @@ class ProfileSuggestionEngine:
         """Generate suggestions using LLM and user profile."""
         if previous_answers is None:
             previous_answers = {}
-        from services.ai.gemini import get_gemini_service
         gemini = get_gemini_service()
         
         if not gemini or not gemini.llm:
@@ -142,7 +202,7 @@ class ProfileSuggestionEngine:
             return None
 
         # Extract profile text safely
-        profile_text = getattr(profile, 'profile_text', str(profile))
+        profile_text = _profile_value(profile, 'profile_text') or str(profile)
         
         # Context extraction
         field_name = field_context.get("name", "unknown")
@@ -152,9 +212,7 @@ class ProfileSuggestionEngine:
         form_type = form_intent.form_type if form_intent else "public_facing"
 
         # Format previous answers for context
-        previous_answers_str = "None"
-        if previous_answers:
-            previous_answers_str = "\\n".join([f"- {k}: {v}" for k, v in previous_answers.items() if v])
+        previous_answers_str = _format_previous_answers(previous_answers)
 
         logger.debug(f"🤖 [Lifecycle] LLM Prompting for '{field_label}' with context: {len(previous_answers)} previous answers...")
 
@@ -237,6 +295,258 @@ FORMAT:
         
         return None
     
+    # =========================================================================
+    # Form-Level Prefetch
+    # =========================================================================
+    
+    async def prefetch_form(
+        self,
+        user_id: int,
+        form_context: Dict[str, Any],
+        previous_answers: Dict[str, str],
+        db: AsyncSession,
+        form_intent: Optional[FormIntent],
+    ) -> bool:
+        """
+        Start generating suggestions for every field of a form (on form load).
+        
+        Returns immediately once the profile is loaded; the LLM call runs
+        in the background and later per-field requests are served from it.
+        
+        Returns:
+            True if a batch is cached or being generated
+        """
+        from .service import get_profile_service
+        profile = await get_profile_service().get_profile(db, user_id)
+        if not profile or not self._form_fields(form_context):
+            return False
+        
+        key = self._form_key(user_id, profile, form_context)
+        if self._get_cached_form(key) is None:
+            self._start_batch(key, profile, form_context, previous_answers, form_intent)
+        return True
+    
+    async def _form_level_suggestions(
+        self,
+        user_id: int,
+        profile: Any,
+        field_context: Dict[str, Any],
+        form_context: Dict[str, Any],
+        previous_answers: Dict[str, str],
+        form_intent: Optional[FormIntent],
+    ) -> Optional[List[IntelligentSuggestion]]:
+        """Serve a field from the form's suggestion batch, generating it once if needed."""
+        key = self._form_key(user_id, profile, form_context)
+        entry = self._get_cached_form(key)
+        
+        if entry is None:
+            metrics.increment("suggestions.form_cache", tags={"result": "miss"})
+            task = self._inflight.get(key) or self._start_batch(
+                key, profile, form_context, previous_answers, form_intent
+            )
+            # Shielded: other fields of the same form are waiting on this call too
+            entry = await asyncio.shield(task)
+            if entry is None:
+                return None
+        else:
+            metrics.increment("suggestions.form_cache", tags={"result": "hit"})
+            if self._answers_changed(entry, previous_answers):
+                self._schedule_refresh(key, profile, form_context, previous_answers, form_intent)
+        
+        return entry.lookup(field_context)
+    
+    def _get_cached_form(self, key: Tuple) -> Optional[FormSuggestionSet]:
+        entry = self._form_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.FORM_CACHE_TTL_SECONDS:
+            del self._form_cache[key]
+            return None
+        self._form_cache.move_to_end(key)
+        return entry
+    
+    def _store_form(self, key: Tuple, entry: FormSuggestionSet):
+        self._form_cache[key] = entry
+        self._form_cache.move_to_end(key)
+        while len(self._form_cache) > self.FORM_CACHE_SIZE:
+            evicted, _ = self._form_cache.popitem(last=False)
+            self._last_refresh.pop(evicted, None)
+    
+    def _start_batch(
+        self,
+        key: Tuple,
+        profile: Any,
+        form_context: Dict[str, Any],
+        previous_answers: Dict[str, str],
+        form_intent: Optional[FormIntent],
+    ) -> asyncio.Task:
+        """Run one batched LLM call for the form, deduplicated per key."""
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+        
+        async def run() -> Optional[FormSuggestionSet]:
+            try:
+                entry = await self._generate_form_suggestions(
+                    profile, form_context, dict(previous_answers or {}), form_intent
+                )
+                if entry is not None:
+                    self._store_form(key, entry)
+                return entry
+            except Exception as e:
+                logger.error(f"❌ [Prefetch] Form suggestion batch failed: {e}")
+                return None
+            finally:
+                self._inflight.pop(key, None)
+        
+        task = asyncio.create_task(run())
+        self._inflight[key] = task
+        return task
+    
+    def _schedule_refresh(
+        self,
+        key: Tuple,
+        profile: Any,
+        form_context: Dict[str, Any],
+        previous_answers: Dict[str, str],
+        form_intent: Optional[FormIntent],
+    ):
+        """Regenerate the batch in the background; the stale one keeps serving."""
+        now = time.monotonic()
+        if key in self._inflight or now - self._last_refresh.get(key, 0) < self.REFRESH_MIN_INTERVAL_SECONDS:
+            return
+        self._last_refresh[key] = now
+        metrics.increment("suggestions.form_cache", tags={"result": "refresh"})
+        self._start_batch(key, profile, form_context, previous_answers, form_intent)
+    
+    @staticmethod
+    def _answers_changed(entry: FormSuggestionSet, previous_answers: Dict[str, str]) -> bool:
+        """
+        Whether new answers could change the suggestions.
+        
+        Answers already seen, or that just accept one of the batch's own
+        suggestions, confirm the batch and do not trigger a refresh.
+        """
+        for name, value in (previous_answers or {}).items():
+            if not value or entry.answers.get(name) == value:
+                continue
+            suggested = entry.lookup({'name': name}) or []
+            if _normalize(value) in {_normalize(s.value) for s in suggested}:
+                continue
+            return True
+        return False
+    
+    @staticmethod
+    def _form_fields(form_context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        fields = list(form_context.get('fields') or [])
+        known = {_normalize(f.get('name')) for f in fields}
+        for label in form_context.get('field_labels') or []:
+            if label and _normalize(label) not in known:
+                fields.append({'name': label, 'label': label})
+                known.add(_normalize(label))
+        return fields
+    
+    def _form_key(
+        self,
+        user_id: int,
+        profile: Any,
+        form_context: Dict[str, Any],
+    ) -> Tuple:
+        """(user, profile version, form fingerprint)"""
+        fields = self._form_fields(form_context)
+        fingerprint = hashlib.sha1("\n".join([
+            form_context.get('url') or '',
+            form_context.get('purpose') or '',
+            *sorted(f"{f.get('name')}|{f.get('label', '')}" for f in fields),
+        ]).encode()).hexdigest()
+        return (user_id, _profile_value(profile, 'version', 1), fingerprint)
+    
+    async def _generate_form_suggestions(
+        self,
+        profile: Any,
+        form_context: Dict[str, Any],
+        previous_answers: Dict[str, str],
+        form_intent: Optional[FormIntent],
+    ) -> Optional[FormSuggestionSet]:
+        """One LLM call producing suggestions for every field of the form."""
+        gemini = get_gemini_service()
+        if not gemini or not gemini.llm:
+            logger.error("❌ [Prefetch] Gemini Service Unavailable")
+            return None
+        
+        fields = self._form_fields(form_context)
+        form_purpose = form_intent.intent if form_intent else form_context.get("purpose", "General Form")
+        persona = form_intent.persona if form_intent else "Customer"
+        fields_str = "\n".join(
+            f"- {f.get('label', f.get('name'))} (Internal Name: {f.get('name')})" for f in fields
+        )
+        
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an intelligent form-filling assistant.
+Generate relevant, context-aware suggestions for EVERY field of a form based on a user's profile and the form's intent.
+
+CONTEXT:
+- **Form Intent:** {form_intent}
+- **Persona to Adopt:** {persona}
+- **User Profile:** {profile}
+- **Previous Answers (Context):**
+{previous_answers_context}
+
+FIELDS:
+{fields}
+
+INSTRUCTIONS:
+1.  Write from the perspective of the persona (first person for "Customer" or "Applicant").
+2.  Tailor generic fields ("Description", "Message", "Comments") to the Form Intent.
+3.  Use the profile for specific details and the previous answers for consistency. Do NOT contradict previous answers.
+4.  NEVER describe the user in the third person.
+5.  Give 1-3 suggestions per field; omit fields you cannot suggest anything useful for.
+
+FORMAT (keys are the Internal Names):
+{{
+  "fields": {{
+    "internal_name": {{"suggestions": ["Value 1", "Value 2"], "reasoning": "Based on the Form Intent ('{form_intent}') ..."}}
+  }}
+}}
+"""),
+        ])
+        
+        parser = JsonOutputParser(pydantic_object=FormSuggestionResponse)
+        chain = prompt | gemini.llm | parser
+        
+        start_time = time.perf_counter()
+        result = await chain.ainvoke({
+            "profile": _profile_value(profile, 'profile_text') or str(profile),
+            "form_intent": form_purpose,
+            "persona": persona,
+            "previous_answers_context": _format_previous_answers(previous_answers),
+            "fields": fields_str,
+        })
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        metrics.timing("suggestions.form_batch_latency", duration_ms)
+        logger.info(f"🤖 [Prefetch] Batch for {len(fields)} fields in {duration_ms:.0f}ms")
+        
+        labels = {_normalize(f.get('name')): f.get('label') for f in fields}
+        suggestions: Dict[str, List[IntelligentSuggestion]] = {}
+        for name, item in ((result or {}).get("fields") or {}).items():
+            if not isinstance(item, dict) or not item.get("suggestions"):
+                continue
+            values = [
+                IntelligentSuggestion(
+                    value=str(val),
+                    confidence=0.85,
+                    tier=SuggestionTier.PROFILE_BASED,
+                    reasoning=item.get("reasoning", f"Inferred from profile for form with intent: {form_purpose}"),
+                    behavioral_match="llm_inference"
+                )
+                for val in item["suggestions"]
+            ]
+            suggestions[_normalize(name)] = values
+            if labels.get(_normalize(name)):
+                suggestions.setdefault(_normalize(labels[_normalize(name)]), values)
+        
+        return FormSuggestionSet(suggestions=suggestions, answers=dict(previous_answers))
+    
     def _tier2_blended(
         self,
         profile: Any,
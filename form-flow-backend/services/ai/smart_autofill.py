@@ -7,18 +7,19 @@ Provides intelligent suggestions with confidence scores.
 Features:
 - Learning from form history
 - Confidence-based suggestions
-- Privacy-aware (hashes sensitive data)
+- Privacy-aware (sensitive fields are never stored)
 - Personalized per user
+- Incremental per-user index (field -> value -> frequency/recency)
+- Prefix lookups via a per-field trie
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import hashlib
+from typing import Dict, List, Optional, Any, Set, Tuple
+from collections import OrderedDict
 import json
-from collections import defaultdict
 
 from utils.logging import get_logger
-from utils.cache import get_cached, set_cached
+from utils.cache import get_cached, set_cached, delete_cached, get_redis_client
 
 # RAG service for semantic field matching
 try:
@@ -30,13 +31,151 @@ except ImportError:
 logger = get_logger(__name__)
 
 
+class PrefixTrie:
+    """
+    Case-insensitive prefix index over a small set of values.
+    
+    Every node keeps the set of original values below it, so a prefix
+    lookup is O(len(prefix)) regardless of how many values are stored.
+    """
+    
+    __slots__ = ('_root',)
+    
+    def __init__(self):
+        self._root: Dict[str, Any] = {'values': set(), 'children': {}}
+    
+    def insert(self, value: str) -> None:
+        node = self._root
+        node['values'].add(value)
+        for char in value.lower():
+            node = node['children'].setdefault(char, {'values': set(), 'children': {}})
+            node['values'].add(value)
+    
+    def remove(self, value: str) -> None:
+        path = [self._root]
+        for char in value.lower():
+            child = path[-1]['children'].get(char)
+            if child is None:
+                break
+            path.append(child)
+        for node in path:
+            node['values'].discard(value)
+        # Prune empty branches bottom-up
+        key = value.lower()
+        for depth in range(len(path) - 1, 0, -1):
+            if not path[depth]['values']:
+                del path[depth - 1]['children'][key[depth - 1]]
+    
+    def starting_with(self, prefix: str) -> Set[str]:
+        node = self._root
+        for char in prefix.lower():
+            node = node['children'].get(char)
+            if node is None:
+                return set()
+        return node['values']
+
+
+class UserAutofillIndex:
+    """
+    Inverted index of one user's submitted values.
+    
+    Layout: field_name -> value -> [count, first_used, last_used].
+    Ranked suggestions are memoized per field and dropped when that field
+    gets a new value. SmartAutofill keeps these as an in-process read cache
+    only and discards a user's copy on every learn, so the next read
+    rebuilds it from Redis.
+    """
+    
+    def __init__(self, max_values_per_field: int = 50):
+        self.max_values_per_field = max_values_per_field
+        self.fields: Dict[str, Dict[str, List[Any]]] = {}
+        self._tries: Dict[str, PrefixTrie] = {}
+        self._ranked: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+    
+    def add(self, field_name: str, value: str, timestamp: str) -> None:
+        """Record one occurrence of ``value`` for ``field_name``."""
+        values = self.fields.setdefault(field_name, {})
+        stats = values.get(value)
+        
+        if stats is None:
+            if len(values) >= self.max_values_per_field:
+                # Evict the least recently used value
+                stale = min(values, key=lambda v: values[v][2])
+                del values[stale]
+                if field_name in self._tries:
+                    self._tries[field_name].remove(stale)
+            values[value] = [1, timestamp, timestamp]
+            if field_name in self._tries:
+                self._tries[field_name].insert(value)
+        else:
+            stats[0] += 1
+            stats[2] = timestamp
+        
+        self._ranked.pop(field_name, None)
+    
+    def ranked(self, field_name: str, scorer) -> List[Dict[str, Any]]:
+        """
+        Ranked suggestions for a field (highest confidence first).
+        
+        Memoized per field; recomputed when the field changes or the day
+        rolls over (recency buckets are day-based).
+        """
+        today = datetime.now().date().isoformat()
+        cached = self._ranked.get(field_name)
+        if cached and cached[0] == today:
+            return cached[1]
+        
+        values = self.fields.get(field_name)
+        if not values:
+            return []
+        
+        ranked = scorer(values)
+        self._ranked[field_name] = (today, ranked)
+        return ranked
+    
+    def matching(self, field_name: str, prefix: str) -> Set[str]:
+        """Values of ``field_name`` starting with ``prefix`` (case-insensitive)."""
+        trie = self._tries.get(field_name)
+        if trie is None:
+            trie = PrefixTrie()
+            for value in self.fields.get(field_name, {}):
+                trie.insert(value)
+            self._tries[field_name] = trie
+        return trie.starting_with(prefix)
+    
+    def field_to_json(self, field_name: str) -> str:
+        return json.dumps(self.fields.get(field_name, {}))
+    
+    def to_dict(self) -> Dict[str, Dict[str, List[Any]]]:
+        return {name: dict(values) for name, values in self.fields.items()}
+    
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        max_values_per_field: int = 50
+    ) -> "UserAutofillIndex":
+        index = cls(max_values_per_field)
+        for field_name, values in (data or {}).items():
+            if isinstance(values, str):
+                values = json.loads(values)
+            index.fields[field_name] = {v: list(stats) for v, stats in values.items()}
+        return index
+
+
 class SmartAutofill:
     """
     Learns from user's previous forms to suggest values.
     Provides top suggestions with confidence scores.
+    
+    Each user's history is kept as a ``UserAutofillIndex``: a recently
+    used set of indexes lives in process memory, and the persisted copy is
+    a Redis hash with separate count / first-used / last-used entries per
+    value, so a submission only increments the values it contained and
+    concurrent workers never overwrite each other's counts.
     """
     
-    # Fields that should be hashed for privacy
+    # Fields that are never learned for privacy
     SENSITIVE_FIELDS = {
         'ssn', 'social_security', 'tax_id',
         'credit_card', 'card_number', 'cvv', 'cvc',
@@ -55,14 +194,30 @@ class SmartAutofill:
         'url': '🔗'
     }
     
-    def __init__(self, max_history: int = 50, max_suggestions: int = 5):
+    INDEX_KEY_PREFIX = "autofill_index"
+    INDEX_TTL_SECONDS = 30 * 24 * 3600
+    LEGACY_HISTORY_PREFIX = "autofill_history"
+    
+    # Redis hash layout: "<field>\x1f<value>\x1f{c,f,l}" -> count / first / last used
+    SEP = "\x1f"
+    VERSION_FIELD = "__version__"
+    
+    def __init__(
+        self,
+        max_history: int = 50,
+        max_suggestions: int = 5,
+        max_cached_users: int = 1000
+    ):
         """
         Args:
-            max_history: Maximum form submissions to analyze
+            max_history: Maximum distinct values remembered per field
             max_suggestions: Maximum suggestions to return
+            max_cached_users: Maximum user indexes kept in process memory
         """
         self.max_history = max_history
         self.max_suggestions = max_suggestions
+        self.max_cached_users = max_cached_users
+        self._indexes: "OrderedDict[str, Tuple[UserAutofillIndex, Optional[str]]]" = OrderedDict()
     
     async def get_suggestions(
         self,
@@ -83,42 +238,18 @@ class SmartAutofill:
         Returns:
             List of suggestions with confidence scores
         """
-        # Try to get from cache first
-        cache_key = f"autofill:{user_id}:{field_name}"
-        cached = await get_cached(cache_key)
-        
-        if cached:
-            suggestions = json.loads(cached)
-            # Filter by current value if provided
-            if current_value:
-                suggestions = [
-                    s for s in suggestions
-                    if s['value'].lower().startswith(current_value.lower())
-                ]
-            return suggestions[:self.max_suggestions]
-        
-        # Get user's form history from storage
-        history = await self._get_user_history(user_id)
+        index = await self._get_index(user_id)
         
-        if not history:
-            return []
-        
-        # Analyze values for this field
-        suggestions = self._analyze_field_values(
-            history=history,
-            field_name=field_name,
-            field_type=field_type
-        )
-        
-        # Cache for 1 hour
-        await set_cached(cache_key, json.dumps(suggestions), expire=3600)
-        
-        # Filter by current value
+        ranked = index.ranked(field_name, self._score_values)
         if current_value:
-            suggestions = [
-                s for s in suggestions
-                if s['value'].lower().startswith(current_value.lower())
-            ]
+            matches = index.matching(field_name, current_value)
+            ranked = [s for s in ranked if s['value'] in matches]
+        
+        emoji = self.FIELD_TYPE_MAP.get(field_type, '')
+        suggestions = [
+            {**s, 'label': f"{emoji} {s['value']}" if emoji else s['value']}
+            for s in ranked[:self.max_suggestions]
+        ]
         
         # Enhance with RAG if history is insufficient
         if len(suggestions) < self.max_suggestions and RAG_AVAILABLE:
@@ -151,22 +282,11 @@ class SmartAutofill:
         Build a comprehensive user profile from their form submission history.
         Returns a dictionary of {field_name: value} for the most likely values.
         """
-        history = await self._get_user_history(user_id)
-        if not history:
-            return {}
-
-        # 1. Identify all unique, non-sensitive fields in history
-        unique_fields = set()
-        for entry in history:
-            for name, data in entry.get('fields', {}).items():
-                if data.get('type') == 'normal':
-                    unique_fields.add(name)
+        index = await self._get_index(user_id)
         
-        # 2. Get best value for each field
         profile = {}
-        for field_name in unique_fields:
-            # We treat everything as 'text' for generic profile building
-            suggestions = self._analyze_field_values(history, field_name, 'text')
+        for field_name in index.fields:
+            suggestions = index.ranked(field_name, self._score_values)
             if suggestions:
                 # Take the top confidence suggestion
                 profile[field_name] = suggestions[0]['value']
@@ -182,112 +302,53 @@ class SmartAutofill:
         """
         Learn from a form submission for future suggestions.
         
+        Only the fields present in ``form_data`` are updated, persisted and
+        invalidated; the rest of the user's index is untouched.
+        
         Args:
             user_id: User identifier
             form_data: Dictionary of field_name -> value
             form_id: Optional form identifier
         """
-        # Get existing history
-        history_key = f"autofill_history:{user_id}"
-        history_raw = await get_cached(history_key)
-        history = json.loads(history_raw) if history_raw else []
-        
-        # Prepare learned data (hash sensitive fields)
-        learned_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'form_id': form_id,
-            'fields': {}
-        }
+        timestamp = datetime.now().isoformat()
+        updates = []
         
         for field_name, value in form_data.items():
             if not value or not isinstance(value, str):
                 continue
             
-            # Check if sensitive
-            is_sensitive = any(
-                s in field_name.lower() 
-                for s in self.SENSITIVE_FIELDS
-            )
-            
-            if is_sensitive:
-                # Hash sensitive data (can match but not reverse)
-                learned_entry['fields'][field_name] = {
-                    'hash': self._hash_value(value, user_id),
-                    'type': 'sensitive'
-                }
-            else:
-                learned_entry['fields'][field_name] = {
-                    'value': value,
-                    'type': 'normal'
-                }
-        
-        # Add to history
-        history.append(learned_entry)
-        
-        # Keep only recent history
-        history = history[-self.max_history:]
-        
-        # Save updated history (30 days TTL)
-        await set_cached(history_key, json.dumps(history), expire=30 * 24 * 3600)
-        
-        # Invalidate suggestion caches for updated fields
-        for field_name in form_data.keys():
-            cache_key = f"autofill:{user_id}:{field_name}"
-            # Let cache expire naturally
-        
-        logger.info(f"Learned from submission: {len(form_data)} fields")
-    
-    def _analyze_field_values(
-        self,
-        history: List[Dict],
-        field_name: str,
-        field_type: str
-    ) -> List[Dict[str, Any]]:
-        """Analyze field values from history and generate suggestions."""
-        value_stats: Dict[str, Dict] = defaultdict(lambda: {
-            'count': 0,
-            'first_used': None,
-            'last_used': None
-        })
-        
-        # Collect value occurrences
-        for entry in history:
-            fields = entry.get('fields', {})
-            field_data = fields.get(field_name, {})
-            
-            # Skip sensitive or missing
-            if field_data.get('type') == 'sensitive':
+            # Never learn sensitive values
+            if self._is_sensitive(field_name):
                 continue
             
-            value = field_data.get('value')
-            if not value:
-                continue
-            
-            timestamp = entry.get('timestamp', datetime.now().isoformat())
-            
-            stats = value_stats[value]
-            stats['count'] += 1
-            
-            if stats['first_used'] is None:
-                stats['first_used'] = timestamp
-            stats['last_used'] = timestamp
+            updates.append((field_name, value, 1, timestamp, timestamp))
         
-        if not value_stats:
-            return []
+        if updates:
+            # Make sure a legacy history blob is migrated before counting on top of it
+            await self._get_index(user_id)
+            await self._write_values(user_id, updates)
+            self._indexes.pop(user_id, None)
         
-        # Calculate confidence scores
-        total_occurrences = sum(s['count'] for s in value_stats.values())
+        logger.info(f"Learned from submission: {len(updates)} fields")
+    
+    def _is_sensitive(self, field_name: str) -> bool:
+        lowered = field_name.lower()
+        return any(s in lowered for s in self.SENSITIVE_FIELDS)
+    
+    def _score_values(self, values: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """Rank a field's values by frequency, recency and consistency."""
+        total_occurrences = sum(stats[0] for stats in values.values())
         suggestions = []
         
-        for value, stats in value_stats.items():
+        for value, (count, _first_used, last_used) in values.items():
             # Frequency score (how often used)
-            frequency_score = stats['count'] / total_occurrences
+            frequency_score = count / total_occurrences
             
             # Recency score (how recently used)
-            recency_score = self._calculate_recency_score(stats['last_used'])
+            recency_score = self._calculate_recency_score(last_used)
             
             # Consistency score (used multiple times)
-            consistency_score = min(stats['count'] / 5, 1.0)
+            consistency_score = min(count / 5, 1.0)
             
             # Combined confidence (weighted average)
             confidence = (
@@ -296,16 +357,11 @@ class SmartAutofill:
                 consistency_score * 0.2
             )
             
-            # Format label
-            emoji = self.FIELD_TYPE_MAP.get(field_type, '')
-            label = f"{emoji} {value}" if emoji else value
-            
             suggestions.append({
                 'value': value,
                 'confidence': round(confidence, 2),
-                'usage_count': stats['count'],
-                'last_used': stats['last_used'],
-                'label': label
+                'usage_count': count,
+                'last_used': last_used,
             })
         
         # Sort by confidence
@@ -313,14 +369,180 @@ class SmartAutofill:
         
         return suggestions
     
-    async def _get_user_history(self, user_id: str) -> List[Dict]:
-        """Get user's form submission history."""
-        history_key = f"autofill_history:{user_id}"
-        history_raw = await get_cached(history_key)
+    # =========================================================================
+    # Index storage
+    # =========================================================================
+    
+    def _index_key(self, user_id: str) -> str:
+        return f"{self.INDEX_KEY_PREFIX}:{user_id}"
+    
+    async def _get_index(self, user_id: str) -> UserAutofillIndex:
+        """
+        Get the user's index, reusing the in-process copy while it is current.
         
-        if history_raw:
-            return json.loads(history_raw)
-        return []
+        With Redis, the copy is checked against the hash's version counter
+        (one HGET) so a submission learned by another worker is seen on the
+        next lookup.
+        """
+        entry = self._indexes.get(user_id)
+        if entry is not None:
+            index, version = entry
+            if await self._current_version(user_id) == version:
+                self._indexes.move_to_end(user_id)
+                return index
+        
+        index, version = await self._load_index(user_id)
+        self._indexes[user_id] = (index, version)
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_cached_users:
+            self._indexes.popitem(last=False)
+        return index
+    
+    async def _current_version(self, user_id: str) -> Optional[str]:
+        redis = await get_redis_client()
+        if not redis:
+            return None  # in-memory fallback is per-process; learns drop the copy
+        try:
+            return await redis.hget(self._index_key(user_id), self.VERSION_FIELD)
+        except Exception as e:
+            logger.debug(f"Redis autofill version check failed: {e}")
+            return "unknown"
+    
+    async def _load_index(self, user_id: str) -> Tuple[UserAutofillIndex, Optional[str]]:
+        key = self._index_key(user_id)
+        redis = await get_redis_client()
+        
+        if redis:
+            try:
+                data = await redis.hgetall(key)
+                if not data:
+                    return await self._migrate_legacy_history(user_id, redis)
+                
+                version = data.pop(self.VERSION_FIELD, None)
+                index, evicted = self._index_from_hash(data)
+                if evicted:
+                    await redis.hdel(key, *evicted)
+                return index, version
+            except Exception as e:
+                logger.debug(f"Redis autofill index load failed: {e}")
+        
+        data = await get_cached(key)
+        if data is None:
+            return await self._migrate_legacy_history(user_id, None)
+        return UserAutofillIndex.from_dict(data, self.max_history), None
+    
+    def _index_from_hash(self, data: Dict[str, str]) -> Tuple[UserAutofillIndex, List[str]]:
+        """
+        Build an index from the per-value hash entries.
+        
+        Returns the index plus the hash entries of values beyond
+        ``max_history`` for the field (least recently used first out).
+        """
+        fields: Dict[str, Dict[str, List[Any]]] = {}
+        for hash_field, raw in data.items():
+            parts = hash_field.split(self.SEP)
+            if len(parts) != 3:
+                continue
+            field_name, value, stat = parts
+            stats = fields.setdefault(field_name, {}).setdefault(value, [0, "", ""])
+            if stat == "c":
+                stats[0] = int(raw)
+            elif stat == "f":
+                stats[1] = raw
+            elif stat == "l":
+                stats[2] = raw
+        
+        index = UserAutofillIndex(self.max_history)
+        evicted = []
+        for field_name, values in fields.items():
+            # A value evicted while another worker was counting it can come back without timestamps
+            for stats in values.values():
+                stats[1] = stats[1] or stats[2]
+                stats[2] = stats[2] or stats[1]
+            if len(values) > self.max_history:
+                by_recency = sorted(values, key=lambda v: values[v][2], reverse=True)
+                for value in by_recency[self.max_history:]:
+                    del values[value]
+                    evicted += [self.SEP.join((field_name, value, stat)) for stat in "cfl"]
+            index.fields[field_name] = values
+        return index, evicted
+    
+    async def _write_values(self, user_id: str, updates: List[Tuple[str, str, int, str, str]]) -> None:
+        """
+        Apply (field, value, count, first_used, last_used) updates.
+        
+        In Redis each value's count is a separate hash entry bumped with
+        HINCRBY, so concurrent learns from several workers add up instead
+        of overwriting each other; the version bump tells other workers'
+        in-process copies to reload.
+        """
+        key = self._index_key(user_id)
+        redis = await get_redis_client()
+        
+        if redis:
+            try:
+                pipe = redis.pipeline(transaction=True)
+                for field_name, value, count, first_used, last_used in updates:
+                    prefix = f"{field_name}{self.SEP}{value}{self.SEP}"
+                    pipe.hincrby(key, prefix + "c", count)
+                    pipe.hsetnx(key, prefix + "f", first_used)
+                    pipe.hset(key, prefix + "l", last_used)
+                pipe.hincrby(key, self.VERSION_FIELD, 1)
+                pipe.expire(key, self.INDEX_TTL_SECONDS)
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.debug(f"Redis autofill index write failed: {e}")
+        
+        # In-memory fallback: read-merge-write of the stored copy
+        index = UserAutofillIndex.from_dict(await get_cached(key) or {}, self.max_history)
+        for field_name, value, count, first_used, last_used in updates:
+            for _ in range(count):
+                index.add(field_name, value, last_used)
+            index.fields[field_name][value][1] = min(index.fields[field_name][value][1], first_used)
+        await set_cached(key, index.to_dict(), ttl=self.INDEX_TTL_SECONDS)
+    
+    async def _migrate_legacy_history(self, user_id: str, redis) -> Tuple[UserAutofillIndex, Optional[str]]:
+        """
+        Convert a pre-index ``autofill_history:{user}`` blob on first access.
+        
+        The blob is read and deleted in one step (GETDEL) so only one
+        worker migrates it.
+        """
+        legacy_key = f"{self.LEGACY_HISTORY_PREFIX}:{user_id}"
+        history = None
+        try:
+            if redis:
+                history = await redis.getdel(legacy_key)
+            else:
+                history = await get_cached(legacy_key)
+                await delete_cached(legacy_key)
+            # Written as json.dumps(list) through set_cached, which encodes again
+            while isinstance(history, str):
+                history = json.loads(history)
+        except Exception as e:
+            logger.warning(f"Legacy autofill history for {user_id} unreadable: {e}")
+            history = None
+        
+        if not history:
+            return UserAutofillIndex(self.max_history), None
+        
+        index = UserAutofillIndex(self.max_history)
+        for entry in history:
+            timestamp = entry.get('timestamp') or datetime.now().isoformat()
+            for field_name, data in (entry.get('fields') or {}).items():
+                value = data.get('value')
+                if data.get('type') == 'normal' and isinstance(value, str) and value \
+                        and not self._is_sensitive(field_name):
+                    index.add(field_name, value, timestamp)
+        
+        await self._write_values(user_id, [
+            (field_name, value, count, first_used, last_used)
+            for field_name, values in index.fields.items()
+            for value, (count, first_used, last_used) in values.items()
+        ])
+        logger.info(f"Migrated legacy autofill history for {user_id}: {len(index.fields)} fields")
+        return await self._load_index(user_id)
     
     def _calculate_recency_score(self, last_used: str) -> float:
         """Calculate recency score (more recent = higher)."""
@@ -338,11 +560,6 @@ class SmartAutofill:
                 return 0.2
         except Exception:
             return 0.5
-    
-    def _hash_value(self, value: str, salt: str) -> str:
-        """Hash a value for privacy-preserving storage."""
-        combined = f"{value}:{salt}"
-        return hashlib.sha256(combined.encode()).hexdigest()[:16]
 
 
 class CrossFieldInference:
@@ -27,9 +27,33 @@ try:
 except ImportError:
     LANGCHAIN_AVAILABLE = False
 
+from services.ai.text_rules import RuleTable, compile_word_table, replace_words
+
 logger = logging.getLogger(__name__)
 
 
+# Compiled rules for the rule-based fallback
+_WHITESPACE = re.compile(r'\s+')
+_SPOKEN_EMAIL = re.compile(r'[\w\.-]+\s*(?:at|@)\s*[\w\.-]+\s*(?:dot|\.)\s*\w+', re.IGNORECASE)
+_SPOKEN_AT = re.compile(r'\s*at\s*', re.IGNORECASE)
+_SPOKEN_DOT = re.compile(r'\s*dot\s*', re.IGNORECASE)
+_NON_DIGITS = re.compile(r'[^\d]')
+_REPEATED_PUNCTUATION = re.compile(r'([.!?])\1+')
+_SENTENCE_START = re.compile(r'(^|[.!?]\s+)([a-z])')
+
+_WORD_TO_NUM = {
+    'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
+    'ten': '10', 'eleven': '11', 'twelve': '12'
+}
+_NUMBER_WORDS = compile_word_table(_WORD_TO_NUM)
+
+
+def _filler_rules(fillers: List[str]) -> RuleTable:
+    """Whole-word removal rules for filler words, applied in list order."""
+    return RuleTable(r'\b' + re.escape(filler) + r'\b' for filler in fillers)
+
+
 class RefineStyle(str, Enum):
     """Output formatting styles for refined text"""
     DEFAULT = "default"  # Clean prose
@@ -75,6 +99,8 @@ class TextRefiner:
         "actually", "honestly", "so yeah", "right", "okay so",
         "kind of", "sort of", "I guess", "I think like"
     ]
+    _FILLER_RULES = _filler_rules(FILLER_WORDS)
+    _QUICK_FILLER_RULES = _filler_rules(FILLER_WORDS[:8])  # Just the most common
     
     SYSTEM_PROMPT = """You are an expert text editor specializing in refining voice transcripts into form field answers.
 
@@ -234,47 +260,38 @@ Extract and refine the answer. Output ONLY the cleaned answer:"""
         refined = text
         
         # Remove filler words (case insensitive)
-        for filler in self.FILLER_WORDS:
-            pattern = r'\b' + re.escape(filler) + r'\b'
-            refined = re.sub(pattern, '', refined, flags=re.IGNORECASE)
+        refined = self._FILLER_RULES.sub(refined, '')
         
         # Clean up extra spaces
-        refined = re.sub(r'\s+', ' ', refined).strip()
+        refined = _WHITESPACE.sub(' ', refined).strip()
         
         # Apply type-specific formatting
         if field_type.lower() in ['email', 'e-mail']:
             # Extract email pattern
-            email_pattern = r'[\w\.-]+\s*(?:at|@)\s*[\w\.-]+\s*(?:dot|\.)\s*\w+'
-            match = re.search(email_pattern, refined, re.IGNORECASE)
+            match = _SPOKEN_EMAIL.search(refined)
             if match:
                 email = match.group()
-                email = re.sub(r'\s*at\s*', '@', email, flags=re.IGNORECASE)
-                email = re.sub(r'\s*dot\s*', '.', email, flags=re.IGNORECASE)
+                email = _SPOKEN_AT.sub('@', email)
+                email = _SPOKEN_DOT.sub('.', email)
                 email = email.replace(' ', '').lower()
                 return email
         
         elif field_type.lower() in ['phone', 'telephone', 'mobile']:
             # Extract digits
-            digits = re.sub(r'[^\d]', '', refined)
+            digits = _NON_DIGITS.sub('', refined)
             if len(digits) >= 10:
                 return digits
         
         elif field_type.lower() in ['number', 'age', 'years', 'experience']:
             # Convert word numbers to digits
-            word_to_num = {
-                'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-                'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
-                'ten': '10', 'eleven': '11', 'twelve': '12'
-            }
-            for word, num in word_to_num.items():
-                refined = re.sub(r'\b' + word + r'\b', num, refined, flags=re.IGNORECASE)
+            refined = replace_words(refined, _NUMBER_WORDS, _WORD_TO_NUM)
         
         # Fix multiple punctuation
-        refined = re.sub(r'([.!?])\1+', r'\1', refined)
+        refined = _REPEATED_PUNCTUATION.sub(r'\1', refined)
         
         # Capitalize first letter of sentences (only for prose)
         if field_type.lower() not in ['email', 'phone']:
-            refined = re.sub(r'(^|[.!?]\s+)([a-z])', lambda m: m.group(1) + m.group(2).upper(), refined)
+            refined = _SENTENCE_START.sub(lambda m: m.group(1) + m.group(2).upper(), refined)
         
         # Ensure ends with punctuation (only for prose fields)
         if field_type.lower() not in ['email', 'phone', 'number', 'age']:
@@ -313,11 +330,8 @@ Extract and refine the answer. Output ONLY the cleaned answer:"""
         Synchronous quick clean - just removes obvious fillers.
         Use for real-time display before full refinement.
         """
-        cleaned = text
-        for filler in self.FILLER_WORDS[:8]:  # Just the most common
-            pattern = r'\b' + re.escape(filler) + r'\b'
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
-        return re.sub(r'\s+', ' ', cleaned).strip()
+        cleaned = self._QUICK_FILLER_RULES.sub(text, '')
+        return _WHITESPACE.sub(' ', cleaned).strip()
 
 
 # Singleton instance
@@ -0,0 +1,202 @@
+"""
+Text Rule Tables
+
+Precompiled regex rule tables for the per-utterance text pipeline
+(normalizers, intent recognition, correction detection, rule-based refining).
+
+Most rules in those modules are short patterns built around a keyword
+("actually", "skip", "my email is") and are applied in sequence to every
+utterance. A RuleTable compiles each pattern once and records the literal
+text any match must contain; rules whose literal does not occur in the
+utterance are skipped with a substring check instead of a regex scan.
+Results are identical to running every pattern in order.
+
+Usage:
+    from services.ai.text_rules import RuleTable, compile_prefix_chain
+
+    table = RuleTable([(r'\\bskip\\b', 'skip'), (r'\\bhelp\\b', 'help')])
+    rule, match = table.search("can you help me")   # rule.value == 'help'
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+
+RuleSpec = Union[str, Tuple[str, Any]]
+
+
+# =============================================================================
+# Literal Extraction
+# =============================================================================
+
+def required_literal(pattern: str, flags: int = 0) -> Tuple[str, bool]:
+    """
+    Longest literal run every match of a pattern must contain.
+
+    Only top-level literals are considered (nothing inside groups,
+    alternations or repeats), so the result is always safe to use as a
+    prefilter. Returns ('', False) when there is no usable literal.
+
+    Returns:
+        Tuple of (literal, ignorecase) - the literal is lowercased when
+        the pattern is case-insensitive
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+        ignorecase = bool(parsed.state.flags & re.IGNORECASE)
+    except Exception:
+        return '', False
+
+    best = current = ''
+    for op, arg in parsed:
+        if op is _sre_parse.LITERAL:
+            current += chr(arg)
+            continue
+        if len(current) > len(best):
+            best = current
+        current = ''
+    if len(current) > len(best):
+        best = current
+
+    # Unicode case folding does not line up with str.lower()
+    if not best.isascii():
+        return '', False
+    return (best.lower() if ignorecase else best), ignorecase
+
+
+# =============================================================================
+# Rule Tables
+# =============================================================================
+
+class Rule:
+    """A compiled pattern with its prefilter literal and an arbitrary payload."""
+
+    __slots__ = ('pattern', 'regex', 'literal', 'ignorecase', 'value')
+
+    def __init__(self, pattern: str, value: Any = None, flags: int = re.IGNORECASE):
+        self.pattern = pattern
+        self.regex: Pattern = re.compile(pattern, flags)
+        self.literal, self.ignorecase = required_literal(pattern, flags)
+        self.value = value
+
+    @property
+    def anchored(self) -> bool:
+        """True for start-of-string rules ('^...')."""
+        return self.pattern.startswith('^')
+
+    def __repr__(self) -> str:
+        return f"Rule({self.pattern!r}, {self.value!r})"
+
+
+class RuleTable:
+    """
+    Ordered list of compiled rules with literal prefiltering.
+
+    Semantics match looping over the original pattern strings with
+    re.search / re.sub - only the rules that cannot possibly match
+    are skipped.
+    """
+
+    def __init__(self, rules: Iterable[RuleSpec], flags: int = re.IGNORECASE):
+        """
+        Args:
+            rules: Pattern strings or (pattern, value) pairs, in priority order
+            flags: Regex flags applied to every pattern
+        """
+        self.rules: List[Rule] = []
+        for spec in rules:
+            pattern, value = (spec, None) if isinstance(spec, str) else spec
+            self.rules.append(Rule(pattern, value, flags))
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @staticmethod
+    def _haystacks(text: str) -> Tuple[str, Optional[str]]:
+        """Text as-is and lowercased (None when non-ASCII: no prefilter)."""
+        return text, (text.lower() if text.isascii() else None)
+
+    @staticmethod
+    def _may_match(rule: Rule, text: str, lowered: Optional[str]) -> bool:
+        if not rule.literal:
+            return True
+        if rule.ignorecase:
+            return lowered is None or rule.literal in lowered
+        return rule.literal in text
+
+    def candidates(self, text: str) -> Iterator[Rule]:
+        """Rules (in order) whose literal occurs in the text."""
+        text, lowered = self._haystacks(text)
+        for rule in self.rules:
+            if self._may_match(rule, text, lowered):
+                yield rule
+
+    def search(self, text: str) -> Optional[Tuple[Rule, re.Match]]:
+        """First rule (in order) that matches anywhere in the text."""
+        for rule in self.candidates(text):
+            match = rule.regex.search(text)
+            if match:
+                return rule, match
+        return None
+
+    def matches(self, text: str) -> bool:
+        return self.search(text) is not None
+
+    def sub(self, text: str, repl: Any = None) -> str:
+        """
+        Apply every rule's substitution in order, each to the previous result.
+
+        Args:
+            text: Input text
+            repl: Replacement for all rules (default: each rule's value, or '')
+        """
+        text, lowered = self._haystacks(text)
+        for rule in self.rules:
+            if not self._may_match(rule, text, lowered):
+                continue
+            replacement = repl if repl is not None else (rule.value if rule.value is not None else '')
+            result = rule.regex.sub(replacement, text)
+            if result != text:
+                text, lowered = self._haystacks(result)
+        return text
+
+
+# =============================================================================
+# Single-Pass Patterns
+# =============================================================================
+
+def compile_prefix_chain(patterns: Iterable[str], flags: int = re.IGNORECASE) -> Pattern:
+    """
+    Fold a sequence of '^...' prefix-stripping patterns into one regex.
+
+    `for p in patterns: text = re.sub(p, '', text)` becomes
+    `chain.sub('', text, count=1)`: each step becomes an optional group
+    tried at the position where the previous step stopped. Optional
+    groups never force backtracking, so every step takes the same match
+    it would have taken on its own.
+    """
+    steps = []
+    for pattern in patterns:
+        if not pattern.startswith('^'):
+            raise ValueError(f"prefix pattern must be anchored: {pattern!r}")
+        steps.append(f"(?:{pattern[1:]})?")
+    return re.compile('^' + ''.join(steps), flags)
+
+
+def compile_word_table(words: Iterable[str], flags: int = re.IGNORECASE) -> Pattern:
+    """Whole-word alternation over literal words, longest first."""
+    alternatives = sorted({re.escape(w) for w in words}, key=len, reverse=True)
+    return re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b', flags)
+
+
+def replace_words(text: str, table: Pattern, mapping: Dict[str, str]) -> str:
+    """Single-pass whole-word replacement using a compile_word_table() pattern."""
+    return table.sub(lambda m: mapping[m.group(0).casefold()], text)
@@ -17,10 +17,13 @@ from enum import Enum
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
+from services.ai.text_rules import RuleTable
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+_LEADING_SEPARATORS = re.compile(r'^[,\s]+')
+
 
 class CorrectionType(str, Enum):
     """Types of corrections detected."""
@@ -157,14 +160,14 @@ class CorrectionDetector:
     def _compile_patterns(self):
         """Pre-compile all regex patterns for performance."""
         self._compiled = {
-            'explicit_strong': [(re.compile(p, re.IGNORECASE), name) for p, name in self.EXPLICIT_STRONG_PATTERNS],
-            'explicit_medium': [(re.compile(p, re.IGNORECASE), name) for p, name in self.EXPLICIT_MEDIUM_PATTERNS],
-            'negation': [(re.compile(p, re.IGNORECASE), name) for p, name in self.NEGATION_PATTERNS],
-            'restart': [(re.compile(p, re.IGNORECASE), name) for p, name in self.RESTART_PATTERNS],
-            'email_partial': [(re.compile(p, re.IGNORECASE), name) for p, name in self.PARTIAL_EMAIL_PATTERNS],
-            'phone_partial': [(re.compile(p, re.IGNORECASE), name) for p, name in self.PARTIAL_PHONE_PATTERNS],
+            'explicit_strong': RuleTable(self.EXPLICIT_STRONG_PATTERNS),
+            'explicit_medium': RuleTable(self.EXPLICIT_MEDIUM_PATTERNS),
+            'negation': RuleTable(self.NEGATION_PATTERNS),
+            'restart': RuleTable(self.RESTART_PATTERNS),
+            'email_partial': RuleTable(self.PARTIAL_EMAIL_PATTERNS),
+            'phone_partial': RuleTable(self.PARTIAL_PHONE_PATTERNS),
         }
-        self._false_positive_guards = [re.compile(p, re.IGNORECASE) for p in self.FALSE_POSITIVE_GUARDS]
+        self._false_positive_guards = RuleTable(self.FALSE_POSITIVE_GUARDS)
     
     def detect(self, text: str, field_context: Optional[FieldContext] = None) -> CorrectionResult:
         """
@@ -224,53 +227,54 @@ class CorrectionDetector:
         scope: CorrectionScope = CorrectionScope.FULL_VALUE
     ) -> Optional[CorrectionResult]:
         """Generic pattern checker for all pattern groups."""
-        for pattern, name in self._compiled[group_name]:
-            match = pattern.search(text)
-            if match:
-                # Handle regex groups differently based on pattern complexity
-                if group_name == 'restart':
-                    # Restarts have (abandoned, kept)
-                    original = match.group(1)
-                    corrected = match.group(2).strip()
-                    ctype = CorrectionType.RESTART
-                elif name == 'not_its':
-                    # "not X, it's Y" has two groups: (X, Y)
-                    original = match.group(1)  # X (the wrong value)
-                    corrected = match.group(2).strip()  # Y (the correct value)
-                    ctype = CorrectionType.FULL
-                elif group_name in ['email_partial', 'phone_partial']:
-                    # Partial corrections have (old_part, new_part)
-                    original = match.group(1)
-                    corrected = match.group(2).strip()
-                    ctype = CorrectionType.PARTIAL
-                else:
-                    # Standard: Group 1 is the corrected value
-                    corrected = match.group(1).strip()
-                    original = text[:match.start()].strip()
-                    ctype = CorrectionType.FULL
-                
-                # Confidence based on pattern type
-                confidence = 0.95 if group_name == 'explicit_strong' else 0.90
-                
-                return CorrectionResult(
-                    has_correction=True,
-                    correction_type=ctype,
-                    original_segment=original,
-                    corrected_value=corrected,
-                    final_value=corrected,
-                    correction_marker=name,
-                    confidence=confidence,
-                    scope=scope,
-                    pattern_matched=name
-                )
-        return None
+        found = self._compiled[group_name].search(text)
+        if not found:
+            return None
+        match = found[1]
+        name = found[0].value
+        
+        # Handle regex groups differently based on pattern complexity
+        if group_name == 'restart':
+            # Restarts have (abandoned, kept)
+            original = match.group(1)
+            corrected = match.group(2).strip()
+            ctype = CorrectionType.RESTART
+        elif name == 'not_its':
+            # "not X, it's Y" has two groups: (X, Y)
+            original = match.group(1)  # X (the wrong value)
+            corrected = match.group(2).strip()  # Y (the correct value)
+            ctype = CorrectionType.FULL
+        elif group_name in ['email_partial', 'phone_partial']:
+            # Partial corrections have (old_part, new_part)
+            original = match.group(1)
+            corrected = match.group(2).strip()
+            ctype = CorrectionType.PARTIAL
+        else:
+            # Standard: Group 1 is the corrected value
+            corrected = match.group(1).strip()
+            original = text[:match.start()].strip()
+            ctype = CorrectionType.FULL
+        
+        # Confidence based on pattern type
+        confidence = 0.95 if group_name == 'explicit_strong' else 0.90
+        
+        return CorrectionResult(
+            has_correction=True,
+            correction_type=ctype,
+            original_segment=original,
+            corrected_value=corrected,
+            final_value=corrected,
+            correction_marker=name,
+            confidence=confidence,
+            scope=scope,
+            pattern_matched=name
+        )
     
     def _is_false_positive(self, text: str) -> bool:
         """Check if text matches false positive patterns."""
-        for guard in self._false_positive_guards:
-            if guard.search(text):
-                logger.debug(f"False positive guard matched: {text}")
-                return True
+        if self._false_positive_guards.matches(text):
+            logger.debug(f"False positive guard matched: {text}")
+            return True
         return False
     
     def _check_nested_corrections(self, text: str) -> Optional[CorrectionResult]:
@@ -295,7 +299,7 @@ class CorrectionDetector:
             # Heuristic: If marker is very early, it might not be a nested correction chain
             if pos > 5:
                 corrected = text[pos + len(marker):].strip()
-                corrected = re.sub(r'^[,\s]+', '', corrected)
+                corrected = _LEADING_SEPARATORS.sub('', corrected)
                 if corrected:
                     return CorrectionResult(
                         has_correction=True,
@@ -8,6 +8,6 @@ Provides multi-strategy CAPTCHA handling:
 4. Cloudflare Turnstile auto-wait
 """
 
-from .solver import CaptchaSolverService, CaptchaSolveResult
+from .solver import CaptchaSolverService, CaptchaSolveResult, CaptchaPresolve
 
-__all__ = ['CaptchaSolverService', 'CaptchaSolveResult']
+__all__ = ['CaptchaSolverService', 'CaptchaSolveResult', 'CaptchaPresolve']
@@ -6,10 +6,15 @@ Implements multi-strategy CAPTCHA solving:
 2. Turnstile auto-wait - Cloudflare invisible challenges auto-solve
 3. Manual fallback - pause and notify user
 4. 2Captcha/AntiCaptcha API - automated paid solving
+
+API solves can also be started as soon as the page loads
+(start_presolve) and collected just before submit (finish_presolve),
+so the 20-60 s solve overlaps with field filling.
 """
 
 import asyncio
 import os
+import time
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
 from enum import Enum
@@ -58,6 +63,16 @@ class CaptchaSolveResult:
         }
 
 
+@dataclass
+class CaptchaPresolve:
+    """An API solve started before the form was filled."""
+    captcha_info: Dict[str, Any]
+    captcha_type: CaptchaType
+    page_url: str
+    task: "asyncio.Task[CaptchaSolveResult]"
+    started_at: float = field(default_factory=time.time)
+
+
 class CaptchaSolverService:
     """
     Multi-strategy CAPTCHA solving orchestrator.
@@ -152,7 +167,6 @@ class CaptchaSolverService:
         Returns:
             CaptchaSolveResult with success status and any token
         """
-        import time
         start_time = time.time()
         
         # Check if CAPTCHA actually present
@@ -177,29 +191,19 @@ class CaptchaSolverService:
         
         # Strategy 2: API solving (if key available)
         if self.has_api_key:
-            if captcha_type == CaptchaType.GENERIC:
-                image_base64 = await self._extract_captcha_image(page, captcha_info)
-                if image_base64:
-                    result = await self._solve_with_api(
-                        captcha_type, None, page_url, image_base64
-                    )
-                    if result.success:
-                        await self._inject_token(page, captcha_type, result.token)
-                        result.solve_time_seconds = time.time() - start_time
-                        return result
-            else:
-                sitekey = await self._extract_sitekey(page, captcha_type)
-                if sitekey:
-                    result = await self._solve_with_api(
-                        captcha_type, sitekey, page_url
-                    )
-                    if result.success:
-                        # Inject token into page
-                        await self._inject_token(page, captcha_type, result.token)
-                        result.solve_time_seconds = time.time() - start_time
-                        return result
+            api_solve = await self._prepare_api_solve(page, captcha_type, captcha_info, page_url)
+            if api_solve:
+                result = await api_solve
+                if result.success:
+                    # Inject token into page
+                    await self._inject_token(page, captcha_type, result.token)
+                    result.solve_time_seconds = time.time() - start_time
+                    return result
         
         # Strategy 3: Manual fallback
+        return self._manual_fallback(captcha_type, start_time)
+    
+    def _manual_fallback(self, captcha_type: CaptchaType, start_time: float) -> CaptchaSolveResult:
         return CaptchaSolveResult(
             success=False,
             strategy_used=SolveStrategy.MANUAL_FALLBACK,
@@ -209,6 +213,97 @@ class CaptchaSolverService:
             solve_time_seconds=time.time() - start_time
         )
     
+    async def _prepare_api_solve(
+        self,
+        page,
+        captcha_type: CaptchaType,
+        captcha_info: Dict[str, Any],
+        page_url: str
+    ):
+        """
+        Read what the API needs from the page (sitekey or image).
+        
+        Returns:
+            Un-awaited _solve_with_api coroutine, or None if the page
+            has nothing the API can solve
+        """
+        if captcha_type == CaptchaType.GENERIC:
+            image_base64 = await self._extract_captcha_image(page, captcha_info)
+            if image_base64:
+                return self._solve_with_api(captcha_type, None, page_url, image_base64)
+        else:
+            sitekey = await self._extract_sitekey(page, captcha_type)
+            if sitekey:
+                return self._solve_with_api(captcha_type, sitekey, page_url)
+        return None
+    
+    # =========================================================================
+    # Pre-solving
+    # =========================================================================
+    
+    # reCAPTCHA / hCaptcha tokens are only accepted for about two minutes
+    TOKEN_MAX_AGE_SECONDS = 110
+    
+    async def start_presolve(
+        self,
+        page,
+        captcha_info: Dict[str, Any],
+        page_url: Optional[str] = None
+    ) -> Optional[CaptchaPresolve]:
+        """
+        Start an API solve in the background right after page load.
+        
+        Only the sitekey / image is read from the page here; the API
+        round trips run in a background task while fields are filled.
+        
+        Returns:
+            CaptchaPresolve to pass to finish_presolve(), or None when
+            there is nothing to pre-solve (no CAPTCHA, no API key, or a
+            Turnstile challenge that usually solves itself)
+        """
+        if not captcha_info.get("hasCaptcha") or not self.has_api_key:
+            return None
+        
+        captcha_type = self._parse_captcha_type(captcha_info)
+        if captcha_type == CaptchaType.CLOUDFLARE_TURNSTILE:
+            return None
+        
+        page_url = page_url or page.url
+        api_solve = await self._prepare_api_solve(page, captcha_type, captcha_info, page_url)
+        if api_solve is None:
+            return None
+        
+        print(f"🔐 Pre-solving {captcha_type.value} while the form is filled")
+        return CaptchaPresolve(
+            captcha_info=captcha_info,
+            captcha_type=captcha_type,
+            page_url=page_url,
+            task=asyncio.create_task(api_solve)
+        )
+    
+    async def finish_presolve(self, page, presolve: CaptchaPresolve) -> CaptchaSolveResult:
+        """
+        Wait for a pre-solve (usually already done) and inject its token.
+        
+        A token that has been waiting longer than TOKEN_MAX_AGE_SECONDS is
+        solved again; a failed pre-solve falls back to manual solving.
+        """
+        result = await presolve.task
+        
+        if result.success and presolve.captcha_type != CaptchaType.GENERIC:
+            token_age = time.time() - presolve.started_at - result.solve_time_seconds
+            if token_age > self.TOKEN_MAX_AGE_SECONDS:
+                print("⏳ Pre-solved CAPTCHA token expired, solving again")
+                return await self.solve(page, presolve.captcha_info, presolve.page_url)
+        
+        if not result.success:
+            print(f"⚠️ CAPTCHA pre-solve failed: {result.error}")
+            return self._manual_fallback(presolve.captcha_type, presolve.started_at)
+        
+        await self._inject_token(page, presolve.captcha_type, result.token)
+        result.solve_time_seconds = time.time() - presolve.started_at
+        return result
+    
     async def _wait_for_turnstile(self, page, timeout: int = None) -> CaptchaSolveResult:
         """
         Wait for Cloudflare Turnstile to auto-solve.
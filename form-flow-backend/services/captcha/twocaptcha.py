@@ -3,11 +3,17 @@
 
 Implements solving via 2captcha.com service.
 Supports reCAPTCHA v2/v3, hCaptcha, and Cloudflare Turnstile.
+
+Tasks are submitted to in.php one by one, but results are polled in
+batches: a single res.php request (action=get with a comma-separated
+`ids` list) checks every task still pending on this client, so N
+concurrent solves cost one poll per interval instead of N.
 """
 
 import asyncio
+import time
 import aiohttp
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 
 
@@ -21,36 +27,162 @@ class TwoCaptchaResult:
     solve_time_seconds: float = 0.0
 
 
+NOT_READY = "CAPCHA_NOT_READY"
+
+
 class TwoCaptchaClient:
     """
     Async client for 2Captcha API.
-    
+
     Usage:
         client = TwoCaptchaClient(api_key="YOUR_KEY")
         result = await client.solve_recaptcha(sitekey, page_url)
         if result.success:
             # Use result.token
     """
-    
+
     BASE_URL = "http://2captcha.com"
-    
-    def __init__(self, api_key: str, timeout: int = 120):
+    POLL_INTERVAL = 5  # seconds
+    MAX_IDS_PER_POLL = 100  # res.php accepts up to 100 ids per request
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 120,
+        base_url: Optional[str] = None,
+        poll_interval: float = POLL_INTERVAL
+    ):
         self.api_key = api_key
         self.timeout = timeout
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.poll_interval = poll_interval
         self._session: Optional[aiohttp.ClientSession] = None
-    
+
+        # Batched result polling: task id -> future resolved with (token, error)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self.poll_requests = 0
+
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
             self._session = aiohttp.ClientSession()
         return self._session
-    
+
     async def close(self):
+        if self._poller and not self._poller.done():
+            self._poller.cancel()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result((None, "Client closed"))
+        self._pending.clear()
         if self._session and not self._session.closed:
             await self._session.close()
-    
+
+    # =========================================================================
+    # Submit & Poll
+    # =========================================================================
+
+    async def _solve(self, params: Dict[str, Any], cost: float, label: str) -> TwoCaptchaResult:
+        """Submit a task to in.php and wait for its result from the shared poller."""
+        start_time = time.time()
+
+        try:
+            session = await self._get_session()
+
+            async with session.post(
+                f"{self.base_url}/in.php",
+                data={"key": self.api_key, "json": 1, **params}
+            ) as resp:
+                result = await resp.json(content_type=None)
+
+            if result.get("status") != 1:
+                return TwoCaptchaResult(
+                    success=False,
+                    error=result.get("request", "Unknown error")
+                )
+
+            task_id = str(result["request"])
+            print(f"🔄 2Captcha {label} task submitted: {task_id}")
+
+            future = asyncio.get_running_loop().create_future()
+            self._pending[task_id] = future
+            self._ensure_poller()
+            try:
+                token, error = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                return TwoCaptchaResult(success=False, error="Timeout waiting for solution")
+            finally:
+                self._pending.pop(task_id, None)
+
+            if error:
+                return TwoCaptchaResult(success=False, error=error)
+
+            solve_time = time.time() - start_time
+            print(f"✅ 2Captcha {label} solved in {solve_time:.1f}s")
+            return TwoCaptchaResult(
+                success=True,
+                token=token,
+                solve_time_seconds=solve_time,
+                cost=cost
+            )
+
+        except Exception as e:
+            return TwoCaptchaResult(success=False, error=str(e))
+
+    def _ensure_poller(self) -> None:
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self) -> None:
+        """Poll res.php for every pending task until none are left."""
+        while self._pending:
+            await asyncio.sleep(self.poll_interval)
+            task_ids = [tid for tid, f in self._pending.items() if not f.done()]
+            for i in range(0, len(task_ids), self.MAX_IDS_PER_POLL):
+                await self._poll_batch(task_ids[i:i + self.MAX_IDS_PER_POLL])
+
+    async def _poll_batch(self, task_ids: List[str]) -> None:
+        """
+        One res.php request for several tasks.
+
+        The response's `request` holds one answer per id, in order,
+        separated by '|' (CAPCHA_NOT_READY, a token, or an ERROR_* code).
+        """
+        if not task_ids:
+            return
+
+        try:
+            session = await self._get_session()
+            self.poll_requests += 1
+            params = {"key": self.api_key, "action": "get", "ids": ",".join(task_ids), "json": 1}
+            async with session.get(f"{self.base_url}/res.php", params=params) as resp:
+                result = await resp.json(content_type=None)
+        except Exception as e:
+            # Transient - pending tasks are retried on the next poll until they time out
+            print(f"⚠️ 2Captcha poll failed: {e}")
+            return
+
+        answers = str(result.get("request", "")).split("|")
+        if len(answers) != len(task_ids):
+            # Account-level error (e.g. ERROR_WRONG_USER_KEY) applies to every task
+            answers = [answers[0]] * len(task_ids)
+
+        for task_id, answer in zip(task_ids, answers):
+            future = self._pending.get(task_id)
+            if future is None or future.done() or answer == NOT_READY:
+                continue
+            if answer.startswith("ERROR") or answer.startswith("CAPCHA_"):
+                future.set_result((None, answer))
+            else:
+                future.set_result((answer, None))
+
+    # =========================================================================
+    # Task Types
+    # =========================================================================
+
     async def solve_recaptcha(
-        self, 
-        sitekey: str, 
+        self,
+        sitekey: str,
         page_url: str,
         version: str = "v2",
         invisible: bool = False,
@@ -59,7 +191,7 @@ class TwoCaptchaClient:
     ) -> TwoCaptchaResult:
         """
         Solve reCAPTCHA v2 or v3.
-        
+
         Args:
             sitekey: The data-sitekey from the reCAPTCHA element
             page_url: The full URL of the page with CAPTCHA
@@ -68,183 +200,38 @@ class TwoCaptchaClient:
             action: Action name for v3 (e.g., "submit")
             min_score: Minimum score for v3 (0.1-0.9)
         """
-        import time
-        start_time = time.time()
-        
-        try:
-            session = await self._get_session()
-            
-            # Step 1: Submit task
-            params = {
-                "key": self.api_key,
-                "method": "userrecaptcha",
-                "googlekey": sitekey,
-                "pageurl": page_url,
-                "json": 1
-            }
-            
-            if version == "v3":
-                params["version"] = "v3"
-                if action:
-                    params["action"] = action
-                params["min_score"] = min_score
-            elif invisible:
-                params["invisible"] = 1
-            
-            async with session.post(f"{self.BASE_URL}/in.php", data=params) as resp:
-                result = await resp.json()
-            
-            if result.get("status") != 1:
-                return TwoCaptchaResult(
-                    success=False, 
-                    error=result.get("request", "Unknown error")
-                )
-            
-            task_id = result["request"]
-            print(f"🔄 2Captcha task submitted: {task_id}")
-            
-            # Step 2: Poll for result
-            poll_url = f"{self.BASE_URL}/res.php"
-            poll_params = {
-                "key": self.api_key,
-                "action": "get",
-                "id": task_id,
-                "json": 1
-            }
-            
-            elapsed = 0
-            poll_interval = 5  # seconds
-            
-            while elapsed < self.timeout:
-                await asyncio.sleep(poll_interval)
-                elapsed += poll_interval
-                
-                async with session.get(poll_url, params=poll_params) as resp:
-                    result = await resp.json()
-                
-                if result.get("status") == 1:
-                    # Success!
-                    solve_time = time.time() - start_time
-                    print(f"✅ 2Captcha solved in {solve_time:.1f}s")
-                    return TwoCaptchaResult(
-                        success=True,
-                        token=result["request"],
-                        solve_time_seconds=solve_time,
-                        cost=0.003  # Approximate cost per solve
-                    )
-                elif result.get("request") == "CAPCHA_NOT_READY":
-                    print(f"⏳ 2Captcha: Still solving... ({elapsed}s)")
-                    continue
-                else:
-                    # Error
-                    return TwoCaptchaResult(
-                        success=False,
-                        error=result.get("request", "Unknown error")
-                    )
-            
-            return TwoCaptchaResult(success=False, error="Timeout waiting for solution")
-            
-        except Exception as e:
-            return TwoCaptchaResult(success=False, error=str(e))
-    
+        params = {
+            "method": "userrecaptcha",
+            "googlekey": sitekey,
+            "pageurl": page_url,
+        }
+
+        if version == "v3":
+            params["version"] = "v3"
+            if action:
+                params["action"] = action
+            params["min_score"] = min_score
+        elif invisible:
+            params["invisible"] = 1
+
+        return await self._solve(params, cost=0.003, label="reCAPTCHA")  # Approximate cost per solve
+
     async def solve_hcaptcha(self, sitekey: str, page_url: str) -> TwoCaptchaResult:
         """Solve hCaptcha."""
-        import time
-        start_time = time.time()
-        
-        try:
-            session = await self._get_session()
-            
-            params = {
-                "key": self.api_key,
-                "method": "hcaptcha",
-                "sitekey": sitekey,
-                "pageurl": page_url,
-                "json": 1
-            }
-            
-            async with session.post(f"{self.BASE_URL}/in.php", data=params) as resp:
-                result = await resp.json()
-            
-            if result.get("status") != 1:
-                return TwoCaptchaResult(success=False, error=result.get("request"))
-            
-            task_id = result["request"]
-            
-            # Poll for result
-            poll_params = {"key": self.api_key, "action": "get", "id": task_id, "json": 1}
-            elapsed = 0
-            
-            while elapsed < self.timeout:
-                await asyncio.sleep(5)
-                elapsed += 5
-                
-                async with session.get(f"{self.BASE_URL}/res.php", params=poll_params) as resp:
-                    result = await resp.json()
-                
-                if result.get("status") == 1:
-                    return TwoCaptchaResult(
-                        success=True,
-                        token=result["request"],
-                        solve_time_seconds=time.time() - start_time
-                    )
-                elif result.get("request") != "CAPCHA_NOT_READY":
-                    return TwoCaptchaResult(success=False, error=result.get("request"))
-            
-            return TwoCaptchaResult(success=False, error="Timeout")
-            
-        except Exception as e:
-            return TwoCaptchaResult(success=False, error=str(e))
-    
+        return await self._solve(
+            {"method": "hcaptcha", "sitekey": sitekey, "pageurl": page_url},
+            cost=0.0, label="hCaptcha"
+        )
+
     async def solve_turnstile(self, sitekey: str, page_url: str) -> TwoCaptchaResult:
         """Solve Cloudflare Turnstile."""
-        import time
-        start_time = time.time()
-        
-        try:
-            session = await self._get_session()
-            
-            params = {
-                "key": self.api_key,
-                "method": "turnstile",
-                "sitekey": sitekey,
-                "pageurl": page_url,
-                "json": 1
-            }
-            
-            async with session.post(f"{self.BASE_URL}/in.php", data=params) as resp:
-                result = await resp.json()
-            
-            if result.get("status") != 1:
-                return TwoCaptchaResult(success=False, error=result.get("request"))
-            
-            task_id = result["request"]
-            poll_params = {"key": self.api_key, "action": "get", "id": task_id, "json": 1}
-            elapsed = 0
-            
-            while elapsed < self.timeout:
-                await asyncio.sleep(5)
-                elapsed += 5
-                
-                async with session.get(f"{self.BASE_URL}/res.php", params=poll_params) as resp:
-                    result = await resp.json()
-                
-                if result.get("status") == 1:
-                    return TwoCaptchaResult(
-                        success=True,
-                        token=result["request"],
-                        solve_time_seconds=time.time() - start_time
-                    )
-                elif result.get("request") != "CAPCHA_NOT_READY":
-                    return TwoCaptchaResult(success=False, error=result.get("request"))
-            
-            return TwoCaptchaResult(success=False, error="Timeout")
-            
-        except Exception as e:
-            return TwoCaptchaResult(success=False, error=str(e))
-    
+        return await self._solve(
+            {"method": "turnstile", "sitekey": sitekey, "pageurl": page_url},
+            cost=0.0, label="Turnstile"
+        )
+
     async def solve_normal(
-        self, 
+        self,
         image_base64: str,
         numeric: int = 0,
         min_len: int = 0,
@@ -256,7 +243,7 @@ class TwoCaptchaClient:
     ) -> TwoCaptchaResult:
         """
         Solve normal image CAPTCHA (base64).
-        
+
         Args:
             image_base64: Base64 encoded image content (without data:image/ type prefix)
             numeric: 0=any, 1=numeric only, 2=alpha only, 3=any
@@ -267,75 +254,29 @@ class TwoCaptchaClient:
             calc: 0=no, 1=math question
             lang: Language code
         """
-        import time
-        start_time = time.time()
-        
-        try:
-            session = await self._get_session()
-            
-            # Step 1: Submit task
-            params = {
-                "key": self.api_key,
-                "method": "base64",
-                "body": image_base64,
-                "json": 1,
-                "numeric": numeric,
-                "min_len": min_len,
-                "max_len": max_len,
-                "phrase": phrase,
-                "regsense": case_sensitive,
-                "calc": calc
-            }
-            if lang:
-                params["lang"] = lang
-            
-            async with session.post(f"{self.BASE_URL}/in.php", data=params) as resp:
-                result = await resp.json()
-            
-            if result.get("status") != 1:
-                return TwoCaptchaResult(
-                    success=False, 
-                    error=result.get("request", "Unknown error")
-                )
-            
-            task_id = result["request"]
-            print(f"🔄 2Captcha normal task submitted: {task_id}")
-            
-            # Step 2: Poll for result
-            poll_params = {"key": self.api_key, "action": "get", "id": task_id, "json": 1}
-            elapsed = 0
-            
-            while elapsed < self.timeout:
-                await asyncio.sleep(5)
-                elapsed += 5
-                
-                async with session.get(f"{self.BASE_URL}/res.php", params=poll_params) as resp:
-                    result = await resp.json()
-                
-                if result.get("status") == 1:
-                    solve_time = time.time() - start_time
-                    print(f"✅ 2Captcha normal solved in {solve_time:.1f}s")
-                    return TwoCaptchaResult(
-                        success=True,
-                        token=result["request"],  # For normal captcha, this is the text answer
-                        solve_time_seconds=solve_time,
-                        cost=0.001  # Normal captchas are cheaper
-                    )
-                elif result.get("request") != "CAPCHA_NOT_READY":
-                    return TwoCaptchaResult(success=False, error=result.get("request"))
-            
-            return TwoCaptchaResult(success=False, error="Timeout")
-            
-        except Exception as e:
-            return TwoCaptchaResult(success=False, error=str(e))
+        params = {
+            "method": "base64",
+            "body": image_base64,
+            "numeric": numeric,
+            "min_len": min_len,
+            "max_len": max_len,
+            "phrase": phrase,
+            "regsense": case_sensitive,
+            "calc": calc
+        }
+        if lang:
+            params["lang"] = lang
+
+        # For normal captcha the token is the text answer; they are cheaper
+        return await self._solve(params, cost=0.001, label="normal")
 
     async def get_balance(self) -> float:
         """Get account balance."""
         try:
             session = await self._get_session()
             params = {"key": self.api_key, "action": "getbalance", "json": 1}
-            async with session.get(f"{self.BASE_URL}/res.php", params=params) as resp:
-                result = await resp.json()
+            async with session.get(f"{self.base_url}/res.php", params=params) as resp:
+                result = await resp.json(content_type=None)
             return float(result.get("request", 0))
         except:
             return 0.0
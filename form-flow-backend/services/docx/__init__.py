@@ -1,2 +1,3 @@
 # Docx Service Module
 from .docx_parser import DocxParser, parse_docx_fields
+from .docx_filler import DocxTemplate, fill_docx_template, fill_docx_batch
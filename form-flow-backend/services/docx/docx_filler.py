@@ -1,57 +1,180 @@
 """
 Word Document Filler service.
+
+Fills [Placeholder] fields using a PlaceholderIndex, so values are applied
+in a single sweep over the indexed locations (body, tables, headers and
+footers, including placeholders split across runs).
+
+Only the XML parts that contain placeholders are copied and rewritten per
+document; every other part of the .docx package is passed through as-is.
+That makes batch generation from one template cheap.
 """
+import copy
 import io
-import re
-from typing import Dict, Any, Tuple
+import zipfile
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
 from docx import Document
+from lxml import etree
 
+from services.docx.placeholder_index import (
+    PlaceholderIndex,
+    PlaceholderSpan,
+    iter_content_parts,
+    normalize_key,
+    paragraph_text_nodes,
+)
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-def fill_docx_template(content: bytes, data: Dict[str, str]) -> Tuple[bytes, int]:
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+
+class DocxTemplate:
+    """
+    A parsed Word template that can be filled many times.
+
+    Usage:
+        template = DocxTemplate(content)
+        filled_bytes, count = template.fill({"name": "John"})
+        for filled_bytes, count in template.fill_many(rows): ...
+    """
+
+    def __init__(self, content: bytes, index: Optional[PlaceholderIndex] = None):
+        self._content = content
+        doc = Document(io.BytesIO(content))
+        self.index = index if index is not None else PlaceholderIndex.build(doc)
+
+        # Template roots of the parts that hold placeholders
+        wanted = set(self.index.parts())
+        self._roots = {
+            part_name: root
+            for part_name, root in iter_content_parts(doc)
+            if part_name in wanted
+        }
+
+    def fill(self, data: Dict[str, str]) -> Tuple[bytes, int]:
+        """
+        Fill the template with one set of values.
+
+        Returns:
+            Tuple of (filled_content_bytes, count_of_filled_placeholders)
+        """
+        # Collect spans per (part, paragraph) for all provided fields
+        edits: Dict[str, Dict[int, List[Tuple[PlaceholderSpan, str]]]] = {}
+        seen = set()
+        for field_name, value in data.items():
+            key = normalize_key(field_name)
+            if value is None or key in seen:
+                continue
+            seen.add(key)
+            for span in self.index.lookup(field_name):
+                edits.setdefault(span.part, {}).setdefault(span.paragraph, []).append(
+                    (span, str(value))
+                )
+
+        if not edits:
+            return self._content, 0
+
+        filled_count = 0
+        rewritten: Dict[str, bytes] = {}
+
+        for part_name, by_paragraph in edits.items():
+            root = copy.deepcopy(self._roots[part_name])
+            for para_idx, nodes in enumerate(paragraph_text_nodes(root)):
+                paragraph_edits = by_paragraph.get(para_idx)
+                if not paragraph_edits:
+                    continue
+                # Right to left so earlier offsets stay valid
+                paragraph_edits.sort(
+                    key=lambda e: (e[0].start_node, e[0].start_offset), reverse=True
+                )
+                for span, value in paragraph_edits:
+                    _replace_span(nodes, span, value)
+                    filled_count += 1
+            rewritten[part_name.lstrip('/')] = etree.tostring(
+                root, xml_declaration=True, encoding='UTF-8', standalone=True
+            )
+
+        return self._repack(rewritten), filled_count
+
+    def fill_many(self, rows: Iterable[Dict[str, str]]) -> Iterator[Tuple[bytes, int]]:
+        """Fill the template once per row (batch generation)."""
+        for row in rows:
+            yield self.fill(row)
+
+    def _repack(self, rewritten: Dict[str, bytes]) -> bytes:
+        """Copy the template package, swapping in the rewritten parts."""
+        output = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(self._content)) as source, \
+                zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                data = rewritten.get(info.filename)
+                if data is None:
+                    data = source.read(info.filename)
+                target.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED)
+        return output.getvalue()
+
+
+def _replace_span(nodes: List[Any], span: PlaceholderSpan, value: str) -> None:
+    """Replace a (possibly multi-run) placeholder span with ``value``."""
+    first = nodes[span.start_node]
+    last = nodes[span.end_node]
+    first_text = first.text or ""
+
+    if span.start_node == span.end_node:
+        _set_text(first, first_text[:span.start_offset] + value + first_text[span.end_offset:])
+        return
+
+    _set_text(first, first_text[:span.start_offset] + value)
+    for node in nodes[span.start_node + 1:span.end_node]:
+        _set_text(node, "")
+    _set_text(last, (last.text or "")[span.end_offset:])
+
+
+def _set_text(node: Any, text: str) -> None:
+    node.text = text
+    if text != text.strip():
+        node.set(XML_SPACE, 'preserve')
+
+
+def fill_docx_template(
+    content: bytes,
+    data: Dict[str, str],
+    index: Optional[PlaceholderIndex] = None
+) -> Tuple[bytes, int]:
     """
     Fill a Word document template with data.
-    
+
     Args:
         content: Raw bytes of the docx file
         data: Dictionary of field_name -> value
-        
+        index: Placeholder index built at upload time (built here if omitted)
+
     Returns:
         Tuple of (filled_content_bytes, count_of_filled_fields)
     """
     try:
-        doc = Document(io.BytesIO(content))
-        filled_count = 0
-        
-        # Replace placeholders in paragraphs
-        for paragraph in doc.paragraphs:
-            for field_name, value in data.items():
-                # Replace bracket placeholders: [Name] or [name]
-                pattern = re.compile(rf'\[{re.escape(field_name)}\]', re.IGNORECASE)
-                if pattern.search(paragraph.text):
-                    for run in paragraph.runs:
-                        if pattern.search(run.text):
-                            run.text = pattern.sub(value, run.text)
-                            filled_count += 1
-                        
-                # Also try display name variations (underscores as spaces)
-                display_name = field_name.replace("_", " ")
-                display_pattern = re.compile(rf'\[{re.escape(display_name)}\]', re.IGNORECASE)
-                if display_pattern.search(paragraph.text):
-                    for run in paragraph.runs:
-                        if display_pattern.search(run.text):
-                            run.text = display_pattern.sub(value, run.text)
-                            filled_count += 1
-        
-        # Save filled document
-        output = io.BytesIO()
-        doc.save(output)
-        output.seek(0)
-        
-        return output.getvalue(), filled_count
-        
+        return DocxTemplate(content, index).fill(data)
     except Exception as e:
         logger.error(f"Error filling document in service: {e}", exc_info=True)
         raise e
+
+
+def fill_docx_batch(
+    content: bytes,
+    rows: Iterable[Dict[str, str]],
+    index: Optional[PlaceholderIndex] = None
+) -> List[Tuple[bytes, int]]:
+    """
+    Generate one filled document per row from a single template.
+
+    The template is parsed and indexed once; each row only copies and
+    rewrites the parts that contain placeholders.
+    """
+    try:
+        return list(DocxTemplate(content, index).fill_many(rows))
+    except Exception as e:
+        logger.error(f"Error batch filling document in service: {e}", exc_info=True)
+        raise e
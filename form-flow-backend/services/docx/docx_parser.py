@@ -4,8 +4,12 @@ Word Document Parser
 Extracts fillable placeholders from .docx files.
 Supports:
 - Bracket placeholders: [Name], [Email], [Phone]
+  (body, tables, headers and footers; also when split across runs)
 - Underscore placeholders: ____, _________
 - Content Controls (SDT) from modern Word forms
+
+Parsing also builds a PlaceholderIndex that the filler reuses, so the
+document is tokenized once per upload.
 """
 
 import re
@@ -18,6 +22,7 @@ from dataclasses import dataclass, field
 from docx import Document
 from docx.oxml.ns import qn
 
+from services.docx.placeholder_index import PlaceholderIndex
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -85,6 +90,7 @@ class DocxParser:
             
         self.fields: List[DocxField] = []
         self.field_locations: Dict[str, Tuple[int, int]] = {}  # name -> (para_idx, run_idx)
+        self.placeholder_index: Optional[PlaceholderIndex] = None
         
     def parse(self) -> List[DocxField]:
         """Parse document and extract all placeholders."""
@@ -151,35 +157,32 @@ class DocxParser:
                 continue
     
     def _extract_bracket_placeholders(self):
-        """Extract [Placeholder] style fields from paragraphs."""
+        """Extract [Placeholder] style fields from the whole document."""
         seen_names = {f.name for f in self.fields}
         
-        for para_idx, paragraph in enumerate(self.doc.paragraphs):
-            text = paragraph.text
+        self.placeholder_index = PlaceholderIndex.build(self.doc)
+        
+        for spans in self.placeholder_index.spans.values():
+            span = spans[0]
+            name = span.display_name
+            sanitized = self._sanitize_name(name)
             
-            for match in self.BRACKET_PATTERN.finditer(text):
-                name = match.group(1).strip()
-                sanitized = self._sanitize_name(name)
-                
-                if sanitized in seen_names:
-                    continue
-                    
-                # Find which run contains this placeholder
-                run_idx = self._find_run_index(paragraph, match.start())
-                
-                field = DocxField(
-                    name=sanitized,
-                    display_name=name,
-                    field_type=self._infer_field_type(name),
-                    placeholder_text=match.group(0),
-                    paragraph_index=para_idx,
-                    run_index=run_idx,
-                    original_text=match.group(0)
-                )
-                self.fields.append(field)
-                self.field_locations[sanitized] = (para_idx, run_idx)
-                seen_names.add(sanitized)
-                logger.debug(f"Found bracket placeholder: {name}")
+            if sanitized in seen_names:
+                continue
+            
+            field = DocxField(
+                name=sanitized,
+                display_name=name,
+                field_type=self._infer_field_type(name),
+                placeholder_text=f"[{name}]",
+                paragraph_index=span.paragraph,
+                run_index=span.start_node,
+                original_text=f"[{name}]"
+            )
+            self.fields.append(field)
+            self.field_locations[sanitized] = (span.paragraph, span.start_node)
+            seen_names.add(sanitized)
+            logger.debug(f"Found bracket placeholder: {name}")
     
     def _extract_underscore_placeholders(self):
         """Extract ____ style fields (last resort)."""
@@ -222,16 +225,6 @@ class DocxParser:
                     )
                     self.fields.append(field)
     
-    def _find_run_index(self, paragraph, char_offset: int) -> int:
-        """Find which run contains a given character offset."""
-        current_pos = 0
-        for idx, run in enumerate(paragraph.runs):
-            run_len = len(run.text)
-            if current_pos <= char_offset < current_pos + run_len:
-                return idx
-            current_pos += run_len
-        return 0
-    
     def _sanitize_name(self, name: str) -> str:
         """Convert display name to valid field name."""
         # Replace spaces with underscores, remove special chars
@@ -0,0 +1,147 @@
+"""
+Placeholder Index
+
+One-pass tokenizer that locates every [Placeholder] in a Word document
+and records where it lives at the XML text-node level.
+
+Covers body paragraphs, tables (including nested tables), text boxes,
+headers and footers. Placeholders that Word split across several runs
+(common after spell-check or partial formatting) are indexed as a span
+from (text node, offset) to (text node, offset).
+
+The index is built once at upload time and reused for every fill, so
+filling never rescans the document.
+"""
+
+import re
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Iterator, Tuple
+
+from docx.oxml.ns import qn
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+W_P = qn('w:p')
+W_T = qn('w:t')
+
+# Same placeholder grammar as DocxParser.BRACKET_PATTERN
+BRACKET_PATTERN = re.compile(r'\[([A-Za-z][A-Za-z0-9_\s]{1,50})\]')
+
+
+def normalize_key(name: str) -> str:
+    """Lookup key for a placeholder or field name ("First_Name" == "first name")."""
+    return re.sub(r'[\s_]+', ' ', name.strip().lower())
+
+
+@dataclass(frozen=True)
+class PlaceholderSpan:
+    """Location of one placeholder occurrence."""
+    part: str            # Package part name, e.g. "/word/header1.xml"
+    paragraph: int       # Paragraph index within the part (document order)
+    start_node: int      # Index of the first w:t node within the paragraph
+    start_offset: int    # Offset of "[" within that node
+    end_node: int        # Index of the w:t node holding "]"
+    end_offset: int      # Offset just past "]" within that node
+    display_name: str    # Text between the brackets
+
+
+def iter_content_parts(doc) -> Iterator[Tuple[str, Any]]:
+    """Yield (part name, root element) for the body, headers and footers."""
+    yield str(doc.part.partname), doc.element
+
+    related = []
+    for rel in doc.part.rels.values():
+        if rel.is_external or rel.reltype not in (RT.HEADER, RT.FOOTER):
+            continue
+        related.append((str(rel.target_part.partname), rel.target_part.element))
+    yield from sorted(related, key=lambda item: item[0])
+
+
+def paragraph_text_nodes(root) -> Iterator[List[Any]]:
+    """
+    Yield the w:t nodes of every paragraph under ``root``, in document order.
+
+    Text nodes belong to their nearest enclosing paragraph, so paragraphs
+    inside text boxes are not double counted by their host paragraph.
+    """
+    for paragraph in root.iter(W_P):
+        nodes = []
+        for node in paragraph.iter(W_T):
+            parent = node.getparent()
+            while parent is not None and parent.tag != W_P:
+                parent = parent.getparent()
+            if parent is paragraph:
+                nodes.append(node)
+        yield nodes
+
+
+class PlaceholderIndex:
+    """Placeholder key -> list of spans."""
+
+    def __init__(self, spans: Dict[str, List[PlaceholderSpan]] = None):
+        self.spans: Dict[str, List[PlaceholderSpan]] = spans or {}
+
+    @classmethod
+    def build(cls, doc) -> "PlaceholderIndex":
+        """Tokenize the whole document once."""
+        index = cls()
+        for part_name, root in iter_content_parts(doc):
+            for para_idx, nodes in enumerate(paragraph_text_nodes(root)):
+                if not nodes:
+                    continue
+                texts = [node.text or "" for node in nodes]
+                joined = "".join(texts)
+                if '[' not in joined:
+                    continue
+
+                # Character offset where each text node starts
+                starts = []
+                position = 0
+                for text in texts:
+                    starts.append(position)
+                    position += len(text)
+
+                for match in BRACKET_PATTERN.finditer(joined):
+                    start_node, start_offset = cls._locate(starts, texts, match.start())
+                    end_node, end_offset = cls._locate(starts, texts, match.end() - 1)
+                    index.spans.setdefault(normalize_key(match.group(1)), []).append(
+                        PlaceholderSpan(
+                            part=part_name,
+                            paragraph=para_idx,
+                            start_node=start_node,
+                            start_offset=start_offset,
+                            end_node=end_node,
+                            end_offset=end_offset + 1,
+                            display_name=match.group(1).strip(),
+                        )
+                    )
+        return index
+
+    @staticmethod
+    def _locate(starts: List[int], texts: List[str], char_index: int) -> Tuple[int, int]:
+        """Map an offset in the joined paragraph text to (node, offset)."""
+        for node_idx in range(len(starts) - 1, -1, -1):
+            if starts[node_idx] <= char_index and texts[node_idx]:
+                return node_idx, char_index - starts[node_idx]
+        return 0, char_index
+
+    def __len__(self) -> int:
+        return sum(len(spans) for spans in self.spans.values())
+
+    def keys(self) -> List[str]:
+        return list(self.spans)
+
+    def parts(self) -> List[str]:
+        return sorted({span.part for spans in self.spans.values() for span in spans})
+
+    def lookup(self, field_name: str) -> List[PlaceholderSpan]:
+        return self.spans.get(normalize_key(field_name), [])
+
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {key: [asdict(span) for span in spans] for key, spans in self.spans.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[Dict[str, Any]]]) -> "PlaceholderIndex":
+        return cls({
+            key: [PlaceholderSpan(**span) for span in spans]
+            for key, spans in data.items()
+        })
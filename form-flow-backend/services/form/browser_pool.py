@@ -22,11 +22,17 @@ For parser/submitter with custom options:
     ) as context:
         page = await context.new_page()
         ...
+
+Resource blocking is done inside Chromium: each page gets a CDP
+Network.setBlockedURLs list (resource-type URL patterns plus an
+analytics/ads blocklist), so requests never round-trip into Python.
 """
 
 import asyncio
 import os
-from typing import Optional, Dict, List
+import weakref
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple
 from contextlib import asynccontextmanager
 
 from utils.logging import get_logger
@@ -93,6 +99,158 @@ BROWSER_ARGS = [
 ]
 
 
+# =============================================================================
+# Request Blocking
+# =============================================================================
+
+# File extensions per Playwright resource type, turned into CDP URL patterns
+RESOURCE_EXTENSIONS: Dict[str, Tuple[str, ...]] = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mp3", "ogg", "wav", "m4a", "mov", "m3u8"),
+    "stylesheet": ("css",),
+}
+
+# Analytics, tag managers and ad networks: never needed to read or fill a form
+BLOCKED_URL_PATTERNS: Tuple[str, ...] = (
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*googletagservices.com/*",
+    "*googlesyndication.com/*",
+    "*googleadservices.com/*",
+    "*doubleclick.net/*",
+    "*connect.facebook.net/*",
+    "*facebook.com/tr*",
+    "*hotjar.com/*",
+    "*clarity.ms/*",
+    "*segment.io/*",
+    "*cdn.segment.com/*",
+    "*mixpanel.com/*",
+    "*amplitude.com/*",
+    "*fullstory.com/*",
+    "*bat.bing.com/*",
+    "*ads-twitter.com/*",
+    "*analytics.tiktok.com/*",
+    "*snap.licdn.com/*",
+    "*scorecardresearch.com/*",
+    "*quantserve.com/*",
+    "*criteo.com/*",
+    "*criteo.net/*",
+    "*taboola.com/*",
+    "*outbrain.com/*",
+    "*adnxs.com/*",
+) + tuple(p.strip() for p in os.getenv("BROWSER_POOL_BLOCKLIST", "").split(",") if p.strip())
+
+
+@lru_cache(maxsize=32)
+def blocked_url_patterns(block_resources: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    CDP Network.setBlockedURLs patterns for the given resource types.
+    
+    Patterns match the extension at the end of the path, with or without
+    a query string, plus the tracker blocklist. Chromium treats '?' as a
+    wildcard too, so the query separator is escaped.
+    """
+    patterns = []
+    for resource_type in block_resources:
+        for ext in RESOURCE_EXTENSIONS.get(resource_type, ()):
+            patterns.append(f"*.{ext}")
+            patterns.append(f"*.{ext}\\?*")
+    return tuple(patterns) + BLOCKED_URL_PATTERNS
+
+
+def _supports_cdp(context) -> bool:
+    browser = context.browser
+    return browser is not None and browser.browser_type.name == "chromium"
+
+
+async def _install_request_blocking(context, block_resources: List[str]) -> None:
+    """
+    Block requests natively on every page of an async context.
+    
+    context.new_page() is wrapped so the blocklist is in place before the
+    caller navigates; pages the site opens itself (popups) are covered by
+    the "page" listener. Falls back to a route handler when CDP is not
+    available (non-Chromium browsers).
+    
+    The "page" event for a page we open fires before new_page() returns,
+    so both paths share one setup task per page and each waits for it.
+    """
+    patterns = list(blocked_url_patterns(tuple(sorted(block_resources))))
+    setups = weakref.WeakKeyDictionary()
+    
+    async def setup(page) -> None:
+        cdp = await context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+        await cdp.send("Network.setBlockedURLs", {"urls": patterns})
+    
+    async def block_page(page) -> None:
+        task = setups.get(page)
+        if task is None:
+            task = setups[page] = asyncio.ensure_future(setup(page))
+        await task
+    
+    if not _supports_cdp(context):
+        blocked = frozenset(block_resources)
+        await context.route(
+            "**/*",
+            lambda route: route.abort() if route.request.resource_type in blocked else route.continue_()
+        )
+        return
+    
+    original_new_page = context.new_page
+    
+    async def new_page(*args, **kwargs):
+        page = await original_new_page(*args, **kwargs)
+        await block_page(page)
+        return page
+    
+    async def on_page(page) -> None:
+        try:
+            await block_page(page)
+        except Exception:
+            pass
+    
+    context.new_page = new_page
+    context.on("page", on_page)
+
+
+def _install_request_blocking_sync(context, block_resources: List[str]) -> None:
+    """Sync-API counterpart of _install_request_blocking."""
+    patterns = list(blocked_url_patterns(tuple(sorted(block_resources))))
+    blocked_pages = weakref.WeakSet()
+    
+    def block_page(page) -> None:
+        if page in blocked_pages:
+            return
+        cdp = context.new_cdp_session(page)
+        cdp.send("Network.enable")
+        cdp.send("Network.setBlockedURLs", {"urls": patterns})
+        # Only once it worked, so new_page() retries after a failed event
+        blocked_pages.add(page)
+    
+    if not _supports_cdp(context):
+        blocked = frozenset(block_resources)
+        context.route("**/*", lambda r: r.abort() if r.request.resource_type in blocked else r.continue_())
+        return
+    
+    original_new_page = context.new_page
+    
+    def new_page(*args, **kwargs):
+        page = original_new_page(*args, **kwargs)
+        block_page(page)
+        return page
+    
+    def on_page(page) -> None:
+        try:
+            block_page(page)
+        except Exception:
+            pass
+    
+    context.new_page = new_page
+    context.on("page", on_page)
+
+
 async def _get_browser(headless: bool = True):
     """
     Get or create the shared browser instance.
@@ -181,12 +339,9 @@ async def get_browser_context(
                 if stealth_script:
                     await context.add_init_script(stealth_script)
                 
-                # Set up resource blocking at context level
+                # Set up resource blocking once for the context
                 if block_resources:
-                    await context.route(
-                        "**/*", 
-                        lambda route: route.abort() if route.request.resource_type in set(block_resources) else route.continue_()
-                    )
+                    await _install_request_blocking(context, block_resources)
                 
                 # Success - break out of retry loop
                 break
@@ -372,8 +527,7 @@ def get_sync_browser_context(
         context.add_init_script(stealth_script)
     
     if block_resources:
-        blocked = set(block_resources)
-        context.route("**/*", lambda r: r.abort() if r.request.resource_type in blocked else r.continue_())
+        _install_request_blocking_sync(context, block_resources)
     
     try:
         yield context
@@ -184,6 +184,11 @@ GOOGLE_FORMS_JS = r'''
                 if (cleanLabel && cleanLabel.length > 5) label = cleanLabel;
             }
             
+            // entry.<id> used by the formResponse POST (first [[id, ...]] in data-params)
+            const paramEl = q.querySelector('[data-params]');
+            const entryMatch = paramEl ? (paramEl.getAttribute('data-params') || '').match(/\[\[(\d+),/) : null;
+            if (entryMatch) field.entry_id = entryMatch[1];
+            
             field.label = label;
             field.display_name = label;
             field.required = required;
@@ -0,0 +1,465 @@
+"""
+Google Forms Direct Submission
+
+Submits Google Forms without a browser. A viewform page embeds its
+question list in `FB_PUBLIC_LOAD_DATA_`, and Google accepts a plain
+urlencoded POST of `entry.<id>` values to the matching `formResponse`
+URL, so a submission is one GET and one POST over a pooled httpx client.
+
+Handled here:
+    - Text, paragraph, radio, dropdown, checkbox, linear scale, grid,
+      date and time questions
+    - Checkbox answers as repeated `entry.<id>` values
+    - "Other" choices (`__other_option__` + `entry.<id>.other_option_response`)
+    - Multi-page forms (`pageHistory` listing every section)
+
+Anything this path can't answer faithfully - file uploads, sign-in
+walls, section branching, unmatched answers - is detected before the
+POST and returns a `fallback_reason`, so the caller can use the
+Playwright submitter instead. Failures after the POST never do: Google
+may have recorded the response already.
+
+Usage:
+    from services.form.google_forms_direct import get_google_forms_direct_submitter
+
+    result = await get_google_forms_direct_submitter().submit(url, form_data, form_schema)
+    if not result["success"] and "fallback_reason" in result:
+        ...  # use the browser
+"""
+
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from utils.logging import get_logger
+from utils.telemetry import metrics
+
+logger = get_logger(__name__)
+
+
+# Question type codes used in FB_PUBLIC_LOAD_DATA_
+TEXT, PARAGRAPH, RADIO, DROPDOWN, CHECKBOX, SCALE = 0, 1, 2, 3, 4, 5
+GRID, SECTION, DATE, TIME, FILE_UPLOAD = 7, 8, 9, 10, 13
+
+CHOICE_TYPES = {RADIO, DROPDOWN, CHECKBOX, SCALE}
+OTHER_OPTION = "__other_option__"
+
+# Present on the viewform page, and on a formResponse reply that re-renders
+# the form because answers were rejected; absent from confirmation pages
+# (whose wording is owner-defined and localized)
+FORM_PAGE_MARKER = "FB_PUBLIC_LOAD_DATA_"
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/121.0.0.0 Safari/537.36"
+
+_LOAD_DATA_RE = re.compile(FORM_PAGE_MARKER + r"\s*=\s*(.*?);\s*</script>", re.DOTALL)
+_FBZX_RE = re.compile(r'name="fbzx"\s+value="([^"]+)"')
+
+
+class DirectSubmitError(Exception):
+    """The form can't be submitted without a browser."""
+
+
+@dataclass
+class GoogleQuestion:
+    """One answerable entry of a Google Form."""
+    entry_id: str
+    label: str
+    type: int
+    options: List[str] = field(default_factory=list)
+    has_other: bool = False
+    required: bool = False
+    page: int = 0
+    include_year: bool = True
+    include_time: bool = False
+
+
+@dataclass
+class GoogleFormPage:
+    """The parts of a viewform page needed to build a formResponse POST."""
+    questions: List[GoogleQuestion]
+    page_count: int = 1
+    fbzx: Optional[str] = None
+    has_branching: bool = False
+    has_file_upload: bool = False
+
+
+def _normalize(text: Any) -> str:
+    return re.sub(r"[^a-z0-9]+", "", str(text).lower())
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+def parse_form_page(html: str) -> GoogleFormPage:
+    """Parse the question list out of a viewform page's FB_PUBLIC_LOAD_DATA_."""
+    match = _LOAD_DATA_RE.search(html)
+    if not match:
+        raise DirectSubmitError("FB_PUBLIC_LOAD_DATA_ not found")
+    try:
+        data = json.loads(match.group(1))
+        items = data[1][1] or []
+    except (ValueError, IndexError, TypeError) as e:
+        raise DirectSubmitError(f"Unreadable FB_PUBLIC_LOAD_DATA_: {e}")
+
+    form = GoogleFormPage(questions=[])
+    fbzx = _FBZX_RE.search(html)
+    form.fbzx = fbzx.group(1) if fbzx else None
+
+    page = 0
+    for item in items:
+        item_type = item[3] if len(item) > 3 else None
+        if item_type == SECTION:
+            page += 1
+            continue
+        if item_type == FILE_UPLOAD:
+            form.has_file_upload = True
+            continue
+        if len(item) < 5 or not item[4]:
+            continue  # title/description, image or video
+
+        title = item[1] or ""
+        for entry in item[4]:
+            choices = (entry[1] if len(entry) > 1 else None) or []
+            if any(len(c) > 2 and c[2] is not None for c in choices):
+                form.has_branching = True  # "go to section based on answer"
+
+            question = GoogleQuestion(
+                entry_id=str(entry[0]),
+                label=title,
+                type=item_type,
+                options=[c[0] for c in choices if c and c[0]],
+                has_other=any(len(c) > 4 and c[4] for c in choices),
+                required=bool(entry[2]) if len(entry) > 2 else False,
+                page=page,
+            )
+            if item_type == GRID and len(entry) > 3 and entry[3]:
+                question.label = entry[3][0]  # one entry per grid row
+            if item_type == DATE and len(entry) > 7 and entry[7]:
+                question.include_time = bool(entry[7][0])
+                question.include_year = bool(entry[7][1]) if len(entry[7]) > 1 else True
+            form.questions.append(question)
+
+    form.page_count = page + 1
+    return form
+
+
+def form_response_url(url: str) -> str:
+    """The formResponse endpoint for a viewform URL."""
+    parts = urlsplit(url)
+    path = re.sub(r"/(viewform|formResponse)/?$", "", parts.path.rstrip("/"))
+    return urlunsplit((parts.scheme, parts.netloc, f"{path}/formResponse", "", ""))
+
+
+# =============================================================================
+# Payload
+# =============================================================================
+
+def _match_option(value: Any, options: List[str], exact: bool = False) -> Optional[str]:
+    """Exact (normalized) option match, else a unique substring match."""
+    wanted = _normalize(value)
+    if not wanted:
+        return None
+    for option in options:
+        if _normalize(option) == wanted:
+            return option
+    if exact:
+        return None
+    partial = [o for o in options if wanted in _normalize(o) or _normalize(o) in wanted]
+    return partial[0] if len(partial) == 1 else None
+
+
+def _split_choices(value: Any, options: List[str]) -> List[Any]:
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    if _match_option(value, options) or "," not in str(value):
+        return [value]
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def _parse_date(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise DirectSubmitError(f"Unrecognized date: {value!r}")
+
+
+def _answer_fields(question: GoogleQuestion, value: Any) -> List[Tuple[str, str]]:
+    """Form fields for one answer, as (name, value) pairs."""
+    key = f"entry.{question.entry_id}"
+
+    if question.type in CHOICE_TYPES or question.type == GRID:
+        values = _split_choices(value, question.options) if question.type == CHECKBOX else [value]
+        pairs, other = [], None
+        for item in values:
+            # Scale labels are bare numbers, where "11" contains "1"
+            option = _match_option(item, question.options, exact=question.type == SCALE)
+            if option is not None:
+                pairs.append((key, option))
+            elif question.has_other and other is None:
+                other = str(item)
+            else:
+                raise DirectSubmitError(f"{question.label!r} has no option {item!r}")
+        if other is not None:
+            pairs += [(key, OTHER_OPTION), (f"{key}.other_option_response", other)]
+        return pairs
+
+    if question.type == DATE:
+        when = _parse_date(value)
+        pairs = [(f"{key}_month", str(when.month)), (f"{key}_day", str(when.day))]
+        if question.include_year:
+            pairs.insert(0, (f"{key}_year", str(when.year)))
+        if question.include_time:
+            pairs += [(f"{key}_hour", f"{when.hour:02d}"), (f"{key}_minute", f"{when.minute:02d}")]
+        return pairs
+
+    if question.type == TIME:
+        parts = str(value).strip().split(":")
+        if len(parts) < 2 or not all(p.isdigit() for p in parts):
+            raise DirectSubmitError(f"Unrecognized time: {value!r}")
+        pairs = [(f"{key}_hour", parts[0].zfill(2)), (f"{key}_minute", parts[1].zfill(2))]
+        if len(parts) > 2:
+            pairs.append((f"{key}_second", parts[2].zfill(2)))
+        return pairs
+
+    return [(key, str(value))]
+
+
+def _find_question(
+    name: str,
+    schema_field: Dict[str, Any],
+    by_entry: Dict[str, GoogleQuestion],
+    by_label: Dict[str, List[GoogleQuestion]],
+) -> Optional[GoogleQuestion]:
+    """Resolve a form_data key: schema entry_id, then `entry.<id>` keys, then label."""
+    entry_id = schema_field.get("entry_id")
+    if entry_id and str(entry_id) in by_entry:
+        return by_entry[str(entry_id)]
+
+    if name.startswith("entry."):
+        return by_entry.get(name[len("entry."):])
+
+    for label in (schema_field.get("label"), schema_field.get("display_name"), name):
+        matches = by_label.get(_normalize(label or ""), [])
+        if len(matches) == 1:
+            return matches[0]
+    return None
+
+
+def build_payload(
+    form: GoogleFormPage,
+    form_data: Dict[str, Any],
+    form_schema: Optional[List[Dict]] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Build the urlencoded formResponse body for `form_data`.
+
+    Raises DirectSubmitError when an answer can't be mapped to an entry
+    or a required question is left unanswered, since Google would
+    reject or silently drop it.
+    """
+    if form.has_file_upload:
+        raise DirectSubmitError("File upload questions require sign-in")
+    if form.has_branching:
+        raise DirectSubmitError("Section branching depends on answers")
+
+    field_map = {f.get("name", ""): f for schema_form in (form_schema or []) for f in schema_form.get("fields", [])}
+    by_entry = {q.entry_id: q for q in form.questions}
+    by_label: Dict[str, List[GoogleQuestion]] = {}
+    for question in form.questions:
+        by_label.setdefault(_normalize(question.label), []).append(question)
+
+    pairs: List[Tuple[str, str]] = []
+    answered = set()
+    for name, value in form_data.items():
+        if value is None or value == "" or value == []:
+            continue
+        schema_field = field_map.get(name, {})
+        question = _find_question(name, schema_field, by_entry, by_label)
+
+        if question is None and isinstance(value, dict):
+            # Grid answers arrive as {row label: column}
+            rows = [by_label.get(_normalize(row), []) for row in value]
+            if all(len(r) == 1 and r[0].type == GRID for r in rows):
+                for (row, column), (row_question,) in zip(value.items(), rows):
+                    pairs += _answer_fields(row_question, column)
+                    answered.add(row_question.entry_id)
+                continue
+        if question is None:
+            raise DirectSubmitError(f"No Google Forms entry for {name!r}")
+
+        pairs += _answer_fields(question, value)
+        answered.add(question.entry_id)
+
+    missing = [q.label for q in form.questions if q.required and q.entry_id not in answered]
+    if missing:
+        raise DirectSubmitError(f"Required questions unanswered: {missing}")
+
+    pairs.append(("fvv", "1"))
+    pairs.append(("pageHistory", ",".join(str(p) for p in range(form.page_count))))
+    if form.fbzx:
+        pairs.append(("fbzx", form.fbzx))
+        pairs.append(("partialResponse", json.dumps([None, None, form.fbzx])))
+    return pairs
+
+
+# =============================================================================
+# Submitter
+# =============================================================================
+
+class GoogleFormsDirectSubmitter:
+    """
+    Browserless Google Forms submitter over a shared httpx client.
+
+    submit() never raises; failures come back as {"success": False, ...},
+    with a `fallback_reason` only when retrying with Playwright is safe.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, timeout: float = 20.0):
+        self._client = client
+        self._owns_client = client is None
+        self.timeout = timeout
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def submit(
+        self,
+        url: str,
+        form_data: Dict[str, Any],
+        form_schema: Optional[List[Dict]] = None,
+    ) -> Dict[str, Any]:
+        """
+        GET the viewform page, POST the answers to formResponse.
+
+        Only failures before the POST goes out carry `fallback_reason`.
+        After that Google may already have recorded the response, so a
+        browser retry could submit it twice: HTTP 200 counts as success
+        unless the form was re-rendered (answers rejected), and anything
+        else - other statuses, timeouts, dropped connections - is a hard
+        failure.
+        """
+        started = time.perf_counter()
+
+        # Phase 1: nothing sent yet, the browser can take over
+        try:
+            client = self._get_client()
+
+            page = await client.get(url)
+            if "accounts.google.com" in page.url.host:
+                raise DirectSubmitError("Form requires sign-in")
+            if page.status_code != 200:
+                raise DirectSubmitError(f"viewform returned HTTP {page.status_code}")
+
+            form = parse_form_page(page.text)
+            payload = build_payload(form, form_data, form_schema)
+        except Exception as e:  # DirectSubmitError, httpx errors, unexpected page data
+            return self._fallback(str(e) or type(e).__name__)
+
+        # Phase 2: the answers may have reached Google
+        try:
+            response = await client.post(
+                form_response_url(str(page.url)),
+                content=urlencode(payload),  # repeated keys for checkboxes
+                headers={"Content-Type": "application/x-www-form-urlencoded", "Referer": str(page.url)},
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # No connection was made, so the POST never left
+            return self._fallback(f"formResponse unreachable: {str(e) or type(e).__name__}")
+        except Exception as e:
+            return self._failed(f"formResponse request failed: {str(e) or type(e).__name__}")
+
+        if response.status_code != 200:
+            return self._failed(f"formResponse returned HTTP {response.status_code}")
+        if FORM_PAGE_MARKER in response.text:
+            return self._failed("Google re-rendered the form instead of recording the response")
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.increment("form.google_direct", tags={"result": "success"})
+        metrics.timing("form.google_direct.latency", elapsed_ms)
+        logger.info(f"✅ Google Form submitted directly in {elapsed_ms:.0f} ms ({len(form.questions)} entries)")
+
+        answered = [name for name, value in form_data.items() if value not in (None, "", [])]
+        return {
+            "success": True,
+            "method": "direct",
+            "captcha_detected": False,
+            "message": "Form submitted successfully",
+            "submission_result": {
+                "filled_fields": answered,
+                "errors": [],
+                "total_fields": len(form.questions),
+                "successful_fields": len(answered),
+            },
+            "validation_result": {
+                "likely_success": True,
+                "google_form_success": True,
+                "current_url": str(response.url),
+            },
+        }
+
+    def _fallback(self, reason: str) -> Dict[str, Any]:
+        """Failure before anything was sent: safe to retry in the browser."""
+        logger.info(f"Direct Google Forms submit not possible: {reason}")
+        metrics.increment("form.google_direct", tags={"result": "fallback"})
+        return {
+            "success": False,
+            "method": "direct",
+            "message": f"Direct submission failed: {reason}",
+            "fallback_reason": reason,
+        }
+
+    def _failed(self, reason: str) -> Dict[str, Any]:
+        """Failure after the POST went out: must not be retried."""
+        logger.warning(f"Direct Google Forms submit failed after posting: {reason}")
+        metrics.increment("form.google_direct", tags={"result": "failed"})
+        return {
+            "success": False,
+            "method": "direct",
+            "captcha_detected": False,
+            "message": f"Form submission failed: {reason}",
+            "error": reason,
+        }
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_direct_submitter: Optional[GoogleFormsDirectSubmitter] = None
+
+
+def get_google_forms_direct_submitter() -> GoogleFormsDirectSubmitter:
+    """Get singleton direct submitter (shares one connection pool)."""
+    global _direct_submitter
+    if _direct_submitter is None:
+        _direct_submitter = GoogleFormsDirectSubmitter()
+    return _direct_submitter
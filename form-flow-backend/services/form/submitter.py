@@ -12,7 +12,9 @@ from .browser_pool import get_browser_context
 # Import CAPTCHA detection and solving
 from .detectors.captcha import detect_captcha
 from .utils.constants import CAPTCHA_SELECTORS
+from .google_forms_direct import get_google_forms_direct_submitter
 from services.captcha.solver import CaptchaSolverService, get_captcha_solver
+from config.settings import settings
 from utils.logging import get_logger
 from utils.human_form_submitter import HumanFormSubmitter, SyncHumanFormSubmitter
 from utils.stealth_browser import (
@@ -1136,9 +1138,17 @@ class FormSubmitter:
         
         Flow:
             1. If human_like=True: Use async path with human emulation (Force Async)
-            2. Else (Windows): Use sync Playwright via thread
-            3. Else (Linux/Mac): Use async Playwright
+            2. Google Forms: POST to formResponse without a browser, falling
+               through to Playwright only if nothing was posted
+            3. Else (Windows): Use sync Playwright via thread
+            4. Else (Linux/Mac): Use async Playwright
         """
+        if not human_like and not use_cdp and 'docs.google.com/forms' in url and settings.GOOGLE_FORMS_DIRECT_SUBMIT:
+            result = await get_google_forms_direct_submitter().submit(url, form_data, form_schema)
+            if "fallback_reason" not in result:
+                return result  # submitted, or failed after posting (don't submit twice)
+            print(f"↩️ Falling back to browser submission: {result['fallback_reason']}")
+
         if human_like:
             if sys.platform == 'win32':
                 return await asyncio.to_thread(self._sync_submit_with_human_behavior, url, form_data, form_schema)
@@ -1446,24 +1456,37 @@ class FormSubmitter:
                 await asyncio.sleep(1)
             
             initial_url = page.url
+            solver = get_captcha_solver()
+            presolve = None
             
             try:
                 # ================================================================
-                # STEP 1: FILL FORM FIELDS
+                # STEP 1: DETECT CAPTCHA AND START API SOLVE IN THE BACKGROUND
+                # ================================================================
+                captcha_info = await detect_captcha(page)
+                if captcha_info.get('hasCaptcha'):
+                    presolve = await solver.start_presolve(page, captcha_info, initial_url)
+                
+                # ================================================================
+                # STEP 2: FILL FORM FIELDS (overlaps with the pre-solve)
                 # ================================================================
                 fill_result = await self._fill_form_only(page, form_data, form_schema, is_google)
                 
                 # ================================================================
-                # STEP 2: CHECK FOR CAPTCHA AND ATTEMPT AUTO-SOLVE
+                # STEP 3: INJECT PRE-SOLVED TOKEN, OR CHECK FOR CAPTCHA AND SOLVE
                 # ================================================================
-                captcha_info = await detect_captcha(page)
+                if not presolve:
+                    # Some CAPTCHAs only appear once fields are filled
+                    captcha_info = await detect_captcha(page)
                 
-                if captcha_info.get('hasCaptcha'):
+                if presolve or captcha_info.get('hasCaptcha'):
                     print(f"🔐 CAPTCHA detected: {captcha_info.get('type')}")
                     
                     # Attempt to solve using CaptchaSolverService
-                    solver = get_captcha_solver()
-                    solve_result = await solver.solve(page, captcha_info, initial_url)
+                    if presolve:
+                        solve_result = await solver.finish_presolve(page, presolve)
+                    else:
+                        solve_result = await solver.solve(page, captcha_info, initial_url)
                     
                     if solve_result.success:
                         print(f"✅ CAPTCHA solved via {solve_result.strategy_used.value}")
@@ -1497,7 +1520,7 @@ class FormSubmitter:
                         }
                 
                 # ================================================================
-                # STEP 3: NO CAPTCHA - SUBMIT NORMALLY
+                # STEP 4: SUBMIT
                 # ================================================================
                 submit_ok = await (self._submit_google_form if is_google else self._submit_form)(page, form_schema)
                 await asyncio.sleep(2)
@@ -1505,6 +1528,10 @@ class FormSubmitter:
                 validation = await self.validate_form_submission(page, initial_url)
                 
             finally:
+                # Don't keep paying for a solve nobody will use
+                if presolve and not presolve.task.done():
+                    presolve.task.cancel()
+                
                 # Clean up browser after submission (unless we returned early for manual CAPTCHA)
                 try:
                     await context.close()
@@ -0,0 +1,331 @@
+"""
+API Key Cache Module
+
+In-process cache for plugin API-key authentication.
+
+Every SDK request authenticates with an API key. Resolving a key from the
+database means loading key -> plugin -> tables -> fields, so the result is
+cached by key hash for a short TTL as an immutable snapshot:
+
+- APIKeySnapshot / PluginSnapshot / TableSnapshot / FieldSnapshot are frozen
+  and detached from any DB session, so they are safe to share across requests
+- Entries are invalidated explicitly on revoke/rotate (per key) and on plugin
+  update/delete (per plugin); the TTL bounds staleness in other processes
+- last_used_at is write-behind: validation only records a timestamp in
+  memory, and flush_last_used() writes all pending keys in one UPDATE
+
+Usage:
+    cache = get_api_key_cache()
+    entry = cache.get(key_hash)
+    cache.put(key_hash, key_snapshot, plugin_snapshot)
+    cache.touch(key_id)
+    await cache.flush_last_used(db)
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.plugin_models import PluginAPIKey
+from utils.logging import get_logger
+from utils.telemetry import metrics
+
+logger = get_logger(__name__)
+
+
+# =============================================================================
+# Snapshots
+# =============================================================================
+
+@dataclass(frozen=True)
+class FieldSnapshot:
+    """Read-only copy of a PluginField."""
+    id: int
+    column_name: str
+    column_type: str
+    is_required: bool
+    default_value: Optional[str]
+    question_text: str
+    question_group: str
+    display_order: int
+    validation_rules: Optional[Mapping[str, Any]]
+    is_pii: bool
+
+    @classmethod
+    def from_model(cls, field) -> "FieldSnapshot":
+        rules = field.validation_rules
+        return cls(
+            id=field.id,
+            column_name=field.column_name,
+            column_type=field.column_type,
+            is_required=field.is_required,
+            default_value=field.default_value,
+            question_text=field.question_text,
+            question_group=field.question_group,
+            display_order=field.display_order,
+            validation_rules=MappingProxyType(dict(rules)) if isinstance(rules, dict) else None,
+            is_pii=field.is_pii,
+        )
+
+
+@dataclass(frozen=True)
+class TableSnapshot:
+    """Read-only copy of a PluginTable and its fields."""
+    id: int
+    table_name: str
+    description: Optional[str]
+    fields: Tuple[FieldSnapshot, ...]
+
+    @classmethod
+    def from_model(cls, table) -> "TableSnapshot":
+        return cls(
+            id=table.id,
+            table_name=table.table_name,
+            description=table.description,
+            fields=tuple(FieldSnapshot.from_model(f) for f in table.fields),
+        )
+
+
+@dataclass(frozen=True)
+class PluginSnapshot:
+    """
+    Read-only copy of a Plugin with its schema.
+
+    Exposes the attributes the SDK endpoints and PluginConnector use,
+    so it can be passed wherever a loaded Plugin was used before.
+    """
+    id: int
+    user_id: int
+    name: str
+    database_type: str
+    connection_config_encrypted: str
+    max_concurrent_sessions: int
+    llm_call_limit_per_day: int
+    db_pool_size: int
+    session_timeout_seconds: int
+    voice_retention_days: int
+    gdpr_compliant: bool
+    webhook_url: Optional[str]
+    webhook_secret: Optional[str]
+    schema_version: str
+    is_active: bool
+    tables: Tuple[TableSnapshot, ...]
+
+    @classmethod
+    def from_model(cls, plugin) -> "PluginSnapshot":
+        return cls(
+            id=plugin.id,
+            user_id=plugin.user_id,
+            name=plugin.name,
+            database_type=plugin.database_type,
+            connection_config_encrypted=plugin.connection_config_encrypted,
+            max_concurrent_sessions=plugin.max_concurrent_sessions,
+            llm_call_limit_per_day=plugin.llm_call_limit_per_day,
+            db_pool_size=plugin.db_pool_size,
+            session_timeout_seconds=plugin.session_timeout_seconds,
+            voice_retention_days=plugin.voice_retention_days,
+            gdpr_compliant=plugin.gdpr_compliant,
+            webhook_url=plugin.webhook_url,
+            webhook_secret=plugin.webhook_secret,
+            schema_version=plugin.schema_version,
+            is_active=plugin.is_active,
+            tables=tuple(TableSnapshot.from_model(t) for t in plugin.tables),
+        )
+
+    @property
+    def field_count(self) -> int:
+        """Total fields across all tables."""
+        return sum(len(t.fields) for t in self.tables)
+
+
+@dataclass(frozen=True)
+class APIKeySnapshot:
+    """Read-only copy of a PluginAPIKey (without the hash)."""
+    id: int
+    plugin_id: int
+    key_prefix: str
+    name: str
+    rate_limit: int
+    is_active: bool
+    expires_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, key) -> "APIKeySnapshot":
+        return cls(
+            id=key.id,
+            plugin_id=key.plugin_id,
+            key_prefix=key.key_prefix,
+            name=key.name,
+            rate_limit=key.rate_limit,
+            is_active=key.is_active,
+            expires_at=key.expires_at,
+        )
+
+    @property
+    def is_expired(self) -> bool:
+        """Check if key has expired (same rule as PluginAPIKey)."""
+        if self.expires_at is None:
+            return False
+        return datetime.utcnow() > self.expires_at
+
+    @property
+    def is_valid(self) -> bool:
+        return self.is_active and not self.is_expired
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class APIKeyCache:
+    """
+    TTL + LRU cache of key_hash -> (APIKeySnapshot, PluginSnapshot),
+    plus the pending last_used_at writes.
+    """
+
+    TTL_SECONDS = 30
+    MAX_ENTRIES = 10_000
+    FLUSH_INTERVAL_SECONDS = 15
+
+    def __init__(self, ttl_seconds: float = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[APIKeySnapshot, PluginSnapshot, float]]" = OrderedDict()
+        self._pending_last_used: Dict[int, datetime] = {}
+        self._hits = 0
+        self._misses = 0
+
+    # -------------------------------------------------------------------------
+    # Lookup
+    # -------------------------------------------------------------------------
+
+    def get(self, key_hash: str) -> Optional[Tuple[APIKeySnapshot, PluginSnapshot]]:
+        """Return the cached (key, plugin) pair, or None if missing/expired."""
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is not None and entry[2] > time.monotonic():
+                self._entries.move_to_end(key_hash)
+                self._hits += 1
+                metrics.increment("plugin.api_key_cache.hit")
+                return entry[0], entry[1]
+            if entry is not None:
+                del self._entries[key_hash]
+            self._misses += 1
+        metrics.increment("plugin.api_key_cache.miss")
+        return None
+
+    def put(self, key_hash: str, key: APIKeySnapshot, plugin: PluginSnapshot) -> None:
+        with self._lock:
+            self._entries[key_hash] = (key, plugin, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # -------------------------------------------------------------------------
+    # Invalidation
+    # -------------------------------------------------------------------------
+
+    def invalidate_key(self, key_hash: str) -> None:
+        """Drop one key (revoke / rotate)."""
+        with self._lock:
+            self._entries.pop(key_hash, None)
+
+    def invalidate_plugin(self, plugin_id: int) -> int:
+        """Drop every key of a plugin (plugin update / delete / schema change)."""
+        with self._lock:
+            stale = [h for h, (_, plugin, _) in self._entries.items() if plugin.id == plugin_id]
+            for key_hash in stale:
+                del self._entries[key_hash]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else 0.0,
+                "pending_last_used": len(self._pending_last_used),
+            }
+
+    # -------------------------------------------------------------------------
+    # Write-behind last_used_at
+    # -------------------------------------------------------------------------
+
+    def touch(self, key_id: int, when: Optional[datetime] = None) -> None:
+        """Record a key use; written on the next flush_last_used()."""
+        with self._lock:
+            self._pending_last_used[key_id] = when or datetime.utcnow()
+
+    async def flush_last_used(self, db: AsyncSession) -> int:
+        """
+        Write pending last_used_at values in one batched UPDATE.
+
+        Returns:
+            Number of keys updated
+        """
+        with self._lock:
+            pending, self._pending_last_used = self._pending_last_used, {}
+
+        if not pending:
+            return 0
+
+        table = PluginAPIKey.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(last_used_at=bindparam("b_last_used"))
+        )
+        params = [{"b_id": key_id, "b_last_used": when} for key_id, when in pending.items()]
+
+        try:
+            await db.execute(stmt, params)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            # Re-queue, keeping any newer timestamp recorded meanwhile
+            with self._lock:
+                for key_id, when in pending.items():
+                    current = self._pending_last_used.get(key_id)
+                    if current is None or current < when:
+                        self._pending_last_used[key_id] = when
+            logger.warning(f"API key last_used flush failed: {e}")
+            return 0
+
+        return len(params)
+
+    async def run_last_used_flusher(self, session_factory) -> None:
+        """Periodically flush last_used_at (run as a background task)."""
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL_SECONDS)
+            try:
+                async with session_factory() as db:
+                    await self.flush_last_used(db)
+            except Exception as e:
+                logger.warning(f"API key last_used flusher error: {e}")
+
+
+# Singleton instance
+_api_key_cache: Optional[APIKeyCache] = None
+
+
+def get_api_key_cache() -> APIKeyCache:
+    """Get singleton API key cache."""
+    global _api_key_cache
+    if _api_key_cache is None:
+        _api_key_cache = APIKeyCache()
+    return _api_key_cache
@@ -5,8 +5,10 @@ Abstract base class and factory for external database connections.
 Supports PostgreSQL and MySQL with:
 - Connection pooling
 - Circuit breaker protection
-- Schema introspection
+- Schema introspection (cached per table with TTL)
 - Parameterized query execution (SQL injection safe)
+- INSERT statements built once per (table, column set), so drivers can
+  reuse their prepared statements
 
 DRY Design:
 - Single base class with template methods
@@ -20,6 +22,7 @@ from dataclasses import dataclass
 from enum import Enum
 from contextlib import asynccontextmanager
 import asyncio
+import time
 
 from utils.circuit_breaker import ResilientService, get_circuit_breaker
 from utils.logging import get_logger
@@ -120,6 +123,9 @@ class DatabaseConnector(ABC, ResilientService):
     - _introspect_table(): Get table schema
     """
     
+    SCHEMA_CACHE_TTL_SECONDS = 300
+    MAX_CACHED_STATEMENTS = 256
+    
     def __init__(self, plugin_id: int, config: ConnectionConfig):
         """
         Initialize connector.
@@ -133,6 +139,10 @@ class DatabaseConnector(ABC, ResilientService):
         self.config = config
         self._pool = None
         self._pool_lock = asyncio.Lock()
+        # table -> (TableInfo, expires_at monotonic)
+        self._schema_cache: Dict[str, Tuple[TableInfo, float]] = {}
+        # (table, columns) -> INSERT SQL
+        self._insert_statements: Dict[Tuple[str, Tuple[str, ...]], str] = {}
     
     @property
     def db_type(self) -> DatabaseType:
@@ -218,18 +228,74 @@ class DatabaseConnector(ABC, ResilientService):
             logger.error(f"Connection test failed for plugin {self.plugin_id}: {e}")
             return False
     
-    async def get_table_schema(self, table_name: str) -> Optional[TableInfo]:
+    async def get_table_schema(
+        self,
+        table_name: str,
+        refresh: bool = False
+    ) -> Optional[TableInfo]:
         """
         Get table schema with circuit breaker protection.
         
+        Results are cached per table for SCHEMA_CACHE_TTL_SECONDS.
+        Missing tables are not cached, so a newly created table is
+        picked up on the next call.
+        
         Returns TableInfo or None if table doesn't exist.
         """
+        if not refresh:
+            cached = self._schema_cache.get(table_name)
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+        
         await self.connect()
-        return await self.call_with_retry(
+        table_info = await self.call_with_retry(
             self._introspect_table,
             table_name,
             max_retries=2
         )
+        
+        if table_info is None:
+            self._schema_cache.pop(table_name, None)
+        else:
+            self._schema_cache[table_name] = (
+                table_info, time.monotonic() + self.SCHEMA_CACHE_TTL_SECONDS
+            )
+        return table_info
+    
+    def invalidate_schema(self, table_name: Optional[str] = None) -> None:
+        """
+        Drop cached schema and statements for a table (or all tables).
+        
+        Called after failed writes, since the remote schema may have changed.
+        """
+        if table_name is None:
+            self._schema_cache.clear()
+            self._insert_statements.clear()
+            return
+        
+        self._schema_cache.pop(table_name, None)
+        for key in [k for k in self._insert_statements if k[0] == table_name]:
+            del self._insert_statements[key]
+    
+    def _insert_sql(self, table: str, columns: Tuple[str, ...]) -> str:
+        """
+        INSERT statement for (table, columns), built once and reused.
+        
+        Identical SQL text lets asyncpg reuse its per-connection prepared
+        statement instead of re-parsing on every insert.
+        """
+        key = (table, columns)
+        query = self._insert_statements.get(key)
+        if query is None:
+            if len(self._insert_statements) >= self.MAX_CACHED_STATEMENTS:
+                self._insert_statements.clear()
+            quoted_columns = ", ".join(self._quote_identifier(c) for c in columns)
+            query = (
+                f"INSERT INTO {self._quote_identifier(table)} ({quoted_columns}) "
+                f"VALUES ({self._get_placeholders(list(columns))})"
+            )
+            self._insert_statements[key] = query
+        return query
     
     async def validate_schema(
         self,
@@ -273,17 +339,18 @@ class DatabaseConnector(ABC, ResilientService):
         """
         await self.connect()
         
-        columns = list(data.keys())
-        placeholders = self._get_placeholders(columns)
+        query = self._insert_sql(table, tuple(data.keys()))
         
-        query = f"INSERT INTO {self._quote_identifier(table)} ({', '.join(self._quote_identifier(c) for c in columns)}) VALUES ({placeholders})"
-        
-        return await self.call_with_retry(
-            self._execute_insert,
-            query,
-            data,
-            max_retries=2
-        )
+        try:
+            return await self.call_with_retry(
+                self._execute_insert,
+                query,
+                data,
+                max_retries=2
+            )
+        except Exception:
+            self.invalidate_schema(table)
+            raise
     
     @abstractmethod
     async def _execute_insert(
@@ -312,6 +379,10 @@ class DatabaseConnector(ABC, ResilientService):
         """
         Insert multiple rows in a batch.
         
+        Rows are grouped by column set, so a row that omits a column
+        keeps the database default instead of getting NULL. Each group
+        is one batched statement.
+        
         Returns count of inserted rows.
         """
         if not rows:
@@ -319,16 +390,24 @@ class DatabaseConnector(ABC, ResilientService):
         
         await self.connect()
         
-        # Use first row to determine columns
-        columns = list(rows[0].keys())
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(row)
         
-        return await self.call_with_retry(
-            self._execute_insert_many,
-            table,
-            columns,
-            rows,
-            max_retries=2
-        )
+        inserted = 0
+        try:
+            for columns, group in groups.items():
+                inserted += await self.call_with_retry(
+                    self._execute_insert_many,
+                    table,
+                    list(columns),
+                    group,
+                    max_retries=2
+                )
+        except Exception:
+            self.invalidate_schema(table)
+            raise
+        return inserted
     
     @abstractmethod
     async def _execute_insert_many(
@@ -340,6 +419,56 @@ class DatabaseConnector(ABC, ResilientService):
         """Execute batch insert. Implemented by subclasses."""
         pass
     
+    async def bulk_load(
+        self,
+        table: str,
+        columns: List[str],
+        rows: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Bulk load one chunk of rows sharing the same columns.
+        
+        The chunk is written atomically (its own transaction), using the
+        fastest path of the driver: COPY on PostgreSQL, a multi-row
+        VALUES statement on MySQL. No retries: callers split failed
+        chunks to isolate bad rows.
+        
+        Only connectivity errors count against the circuit breaker;
+        rejected data means the database is healthy. An open circuit
+        raises ConnectionError without touching the database.
+        
+        Returns count of inserted rows.
+        """
+        if not rows:
+            return 0
+        
+        circuit = get_circuit_breaker(self.service_name)
+        if not circuit.can_execute():
+            raise ConnectionError(f"Circuit breaker {self.service_name} is open")
+        
+        try:
+            await self.connect()
+            count = await self._execute_bulk_load(table, columns, rows)
+        except (ConnectionError, OSError, asyncio.TimeoutError):
+            circuit.record_failure()
+            raise
+        except Exception:
+            self.invalidate_schema(table)
+            raise
+        
+        circuit.record_success()
+        return count
+    
+    @abstractmethod
+    async def _execute_bulk_load(
+        self,
+        table: str,
+        columns: List[str],
+        rows: List[Dict[str, Any]]
+    ) -> int:
+        """Load one chunk in a single transaction. Implemented by subclasses."""
+        pass
+    
     @asynccontextmanager
     async def transaction(self):
         """
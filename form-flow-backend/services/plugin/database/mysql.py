@@ -8,6 +8,7 @@ Features:
 - Schema introspection
 - Parameterized queries (SQL injection safe)
 - LAST_INSERT_ID for insert IDs
+- Multi-row VALUES statements for bulk loads
 """
 
 from typing import Dict, Any, List, Optional
@@ -161,10 +162,13 @@ class MySQLConnector(DatabaseConnector):
         columns: List[str],
         rows: List[Dict[str, Any]]
     ) -> int:
-        """Batch insert using executemany."""
-        placeholders = self._get_placeholders(columns)
-        quoted_columns = ", ".join(self._quote_identifier(c) for c in columns)
-        query = f"INSERT INTO {self._quote_identifier(table)} ({quoted_columns}) VALUES ({placeholders})"
+        """
+        Batch insert using executemany.
+        
+        aiomysql rewrites INSERT ... VALUES executemany calls into
+        multi-row VALUES statements.
+        """
+        query = self._insert_sql(table, tuple(columns))
         
         # Convert rows to list of tuples
         values = [tuple(row.get(c) for c in columns) for row in rows]
@@ -174,6 +178,39 @@ class MySQLConnector(DatabaseConnector):
                 await cur.executemany(query, values)
                 return cur.rowcount
     
+    async def _execute_bulk_load(
+        self,
+        table: str,
+        columns: List[str],
+        rows: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Load a chunk as one multi-row INSERT ... VALUES (...), (...)
+        inside one transaction.
+        
+        Chunk size must keep the statement under max_allowed_packet.
+        """
+        quoted_columns = ", ".join(self._quote_identifier(c) for c in columns)
+        row_placeholder = f"({self._get_placeholders(columns)})"
+        query = (
+            f"INSERT INTO {self._quote_identifier(table)} ({quoted_columns}) VALUES "
+            + ", ".join([row_placeholder] * len(rows))
+        )
+        params = [row.get(c) for row in rows for c in columns]
+        
+        async with self._pool.acquire() as conn:
+            await conn.begin()
+            try:
+                async with conn.cursor() as cur:
+                    await cur.execute(query, params)
+                    count = cur.rowcount
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+        
+        return count
+    
     @asynccontextmanager
     async def _get_transaction_context(self):
         """MySQL transaction context."""
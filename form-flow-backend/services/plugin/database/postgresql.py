@@ -8,6 +8,9 @@ Features:
 - Schema introspection
 - Parameterized queries (SQL injection safe)
 - RETURNING clause for insert IDs
+- Stable INSERT text per (table, columns), served from asyncpg's
+  per-connection prepared statement cache
+- COPY (copy_records_to_table) for bulk loads
 """
 
 from typing import Dict, Any, List, Optional
@@ -170,9 +173,7 @@ class PostgreSQLConnector(DatabaseConnector):
         rows: List[Dict[str, Any]]
     ) -> int:
         """Batch insert using executemany."""
-        placeholders = self._get_placeholders(columns)
-        quoted_columns = ", ".join(self._quote_identifier(c) for c in columns)
-        query = f"INSERT INTO {self._quote_identifier(table)} ({quoted_columns}) VALUES ({placeholders})"
+        query = self._insert_sql(table, tuple(columns))
         
         # Convert rows to list of tuples
         values = [tuple(row.get(c) for c in columns) for row in rows]
@@ -180,14 +181,24 @@ class PostgreSQLConnector(DatabaseConnector):
         async with self._pool.acquire() as conn:
             result = await conn.executemany(query, values)
         
-        # executemany returns status string like 'INSERT 0 5'
-        # Parse to get row count
-        try:
-            count = int(result.split()[-1])
-        except (ValueError, IndexError):
-            count = len(rows)  # Fallback
+        return _status_count(result, len(rows))
+    
+    async def _execute_bulk_load(
+        self,
+        table: str,
+        columns: List[str],
+        rows: List[Dict[str, Any]]
+    ) -> int:
+        """Load a chunk with COPY (binary protocol) inside one transaction."""
+        records = [tuple(row.get(c) for c in columns) for row in rows]
+        
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                result = await conn.copy_records_to_table(
+                    table, records=records, columns=columns
+                )
         
-        return count
+        return _status_count(result, len(rows))
     
     @asynccontextmanager
     async def _get_transaction_context(self):
@@ -203,6 +214,18 @@ class PostgreSQLConnector(DatabaseConnector):
                     self._pool = original_pool
 
 
+def _status_count(status: Optional[str], default: int) -> int:
+    """
+    Row count from a command status such as 'INSERT 0 5' or 'COPY 5'.
+    
+    executemany returns None on newer asyncpg; fall back to ``default``.
+    """
+    try:
+        return int(status.split()[-1])
+    except (AttributeError, ValueError, IndexError):
+        return default
+
+
 class _SingleConnectionPool:
     """
     Wrapper to use a single connection as a 'pool'.
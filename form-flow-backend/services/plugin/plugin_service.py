@@ -29,6 +29,9 @@ from services.plugin.exceptions import (
     PluginNotFoundError, APIKeyInvalidError
 )
 from services.plugin.security.encryption import get_encryption_service
+from services.plugin.api_key_cache import (
+    get_api_key_cache, APIKeySnapshot, PluginSnapshot
+)
 from config.settings import settings
 from utils.logging import get_logger
 
@@ -209,6 +212,7 @@ class PluginService:
         
         await self.db.commit()
         await self.db.refresh(plugin)
+        get_api_key_cache().invalidate_plugin(plugin_id)
         
         logger.info(f"Updated plugin {plugin_id}")
         return plugin
@@ -218,6 +222,7 @@ class PluginService:
         plugin = await self.get_plugin(plugin_id, user_id, include_inactive=True)
         plugin.is_active = False
         await self.db.commit()
+        get_api_key_cache().invalidate_plugin(plugin_id)
         
         logger.info(f"Soft deleted plugin {plugin_id}")
         return True
@@ -267,19 +272,31 @@ class PluginService:
         logger.info(f"Created API key {key_prefix} for plugin {plugin_id}")
         return api_key, plain_key
     
-    async def validate_api_key(self, api_key: str) -> Tuple[PluginAPIKey, Plugin]:
+    async def validate_api_key(self, api_key: str) -> Tuple[APIKeySnapshot, PluginSnapshot]:
         """
-        Validate an API key and return key + plugin.
+        Validate an API key and return key + plugin snapshots.
         
-        Single optimized query joining key -> plugin.
-        Updates last_used_at timestamp.
+        Served from the API key cache when possible; on a miss, a single
+        eager-loading query (key -> plugin -> tables -> fields) fills it.
+        last_used_at is recorded write-behind (see APIKeyCache.touch).
         """
         if not api_key or not api_key.startswith("ffp_"):
             raise APIKeyInvalidError("Invalid API key format")
         
         key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        cache = get_api_key_cache()
+        
+        cached = cache.get(key_hash)
+        if cached is not None:
+            key_snapshot, plugin_snapshot = cached
+            if not key_snapshot.is_valid:
+                # Expired while cached
+                cache.invalidate_key(key_hash)
+                raise APIKeyInvalidError("API key has expired")
+            cache.touch(key_snapshot.id)
+            return key_snapshot, plugin_snapshot
         
-        logger.info(f"Validating Key: {api_key[:12]}... Hash: {key_hash}")
+        logger.debug(f"Validating key {api_key[:12]}... (cache miss)")
         
         query = (
             select(PluginAPIKey)
@@ -306,11 +323,12 @@ class PluginService:
         if not key_record.plugin.is_active:
             raise APIKeyInvalidError("Plugin is inactive")
         
-        # Update last used (fire and forget)
-        key_record.last_used_at = datetime.utcnow()
-        await self.db.commit()
+        key_snapshot = APIKeySnapshot.from_model(key_record)
+        plugin_snapshot = PluginSnapshot.from_model(key_record.plugin)
+        cache.put(key_hash, key_snapshot, plugin_snapshot)
+        cache.touch(key_snapshot.id)
         
-        return key_record, key_record.plugin
+        return key_snapshot, plugin_snapshot
     
     async def list_api_keys(
         self,
@@ -351,6 +369,7 @@ class PluginService:
         
         api_key.is_active = False
         await self.db.commit()
+        get_api_key_cache().invalidate_key(api_key.key_hash)
         
         logger.info(f"Revoked API key {api_key.key_prefix}")
         return True
@@ -403,6 +422,7 @@ class PluginService:
         self.db.add(new_key)
         await self.db.commit()
         await self.db.refresh(new_key)
+        get_api_key_cache().invalidate_key(old_key.key_hash)
         
         logger.info(f"Rotated API key {old_prefix} -> {key_prefix} for plugin {plugin_id}")
         return new_key, plain_key
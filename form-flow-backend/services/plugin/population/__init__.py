@@ -4,7 +4,9 @@ Plugin Database Population Package
 Provides database population for plugins:
 - PopulationService: Transaction management and batch inserts
 - DeadLetterQueue: Failed insert retry with backoff
+- DLQRetryWorker: Concurrent background draining of the DLQ
 - WebhookService: Event notifications with HMAC signatures
+- WebhookDispatcher: Persistent outbox with per-host concurrency limits
 
 All components follow DRY principles and reuse existing infrastructure.
 """
@@ -23,6 +25,10 @@ from services.plugin.population.dead_letter import (
     DLQStatus,
     get_dead_letter_queue,
 )
+from services.plugin.population.retry_worker import (
+    DLQRetryWorker,
+    get_dlq_retry_worker,
+)
 from services.plugin.population.webhooks import (
     WebhookService,
     WebhookConfig,
@@ -30,6 +36,12 @@ from services.plugin.population.webhooks import (
     WebhookEvent,
     get_webhook_service,
 )
+from services.plugin.population.webhook_dispatcher import (
+    WebhookDispatcher,
+    WebhookOutboxEntry,
+    OutboxStatus,
+    get_webhook_dispatcher,
+)
 
 __all__ = [
     # Population Service
@@ -44,10 +56,16 @@ __all__ = [
     "DLQEntry",
     "DLQStatus",
     "get_dead_letter_queue",
+    "DLQRetryWorker",
+    "get_dlq_retry_worker",
     # Webhooks
     "WebhookService",
     "WebhookConfig",
     "WebhookDelivery",
     "WebhookEvent",
     "get_webhook_service",
+    "WebhookDispatcher",
+    "WebhookOutboxEntry",
+    "OutboxStatus",
+    "get_webhook_dispatcher",
 ]
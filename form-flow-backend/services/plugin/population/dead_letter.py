@@ -7,16 +7,22 @@ Features:
 - Automatic retry with backoff
 - Manual reprocessing support
 - Cleanup of old entries
+- Bulk enqueue and set-based status updates / deletes
+- Leasing with FOR UPDATE SKIP LOCKED for concurrent retry workers
+  (see retry_worker.py)
 
 Lightweight implementation using SQLAlchemy model.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, select, func
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, JSON, Index,
+    select, insert, update, delete, func, bindparam
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import Base, get_db
@@ -107,6 +113,13 @@ class DeadLetterQueue:
     # Backoff multiplier (seconds: 5, 25, 125, ...)
     BACKOFF_BASE = 5
     BACKOFF_MULTIPLIER = 5
+    MAX_BACKOFF_SECONDS = 3600
+    
+    # How long a worker owns leased entries before they become due again
+    LEASE_SECONDS = 300
+    
+    # Rows / ids per statement for bulk writes
+    WRITE_BATCH_SIZE = 1000
     
     def __init__(self, db: AsyncSession = None):
         """Initialize with database session."""
@@ -154,6 +167,53 @@ class DeadLetterQueue:
         logger.info(f"Added DLQ entry {entry.id} for plugin {plugin_id}, table {table_name}")
         return entry.id
     
+    async def enqueue_many(
+        self,
+        plugin_id: int,
+        session_id: str,
+        table_name: str,
+        failures: List[Tuple[Dict[str, Any], Optional[str]]],
+        max_retries: int = 3
+    ) -> int:
+        """
+        Add many failed inserts in one multi-row INSERT and one commit.
+        
+        Args:
+            failures: (row data, error) pairs
+            
+        Returns:
+            Number of entries created
+        """
+        if not failures:
+            return 0
+        
+        db = await self._get_db()
+        next_retry_at = datetime.now() + timedelta(seconds=self.BACKOFF_BASE)
+        rows = [
+            {
+                "plugin_id": plugin_id,
+                "session_id": session_id,
+                "table_name": table_name,
+                "data": data,
+                "error": error,
+                "status": DLQStatus.PENDING.value,
+                "retry_count": 0,
+                "max_retries": max_retries,
+                "next_retry_at": next_retry_at,
+            }
+            for data, error in failures
+        ]
+        
+        for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+            await db.execute(
+                insert(DeadLetterEntry.__table__),
+                rows[start:start + self.WRITE_BATCH_SIZE]
+            )
+        await db.commit()
+        
+        logger.info(f"Added {len(rows)} DLQ entries for plugin {plugin_id}, table {table_name}")
+        return len(rows)
+    
     async def get_pending_entries(
         self,
         plugin_id: Optional[int] = None,
@@ -170,39 +230,77 @@ class DeadLetterQueue:
             List of DLQEntry ready for retry
         """
         db = await self._get_db()
-        now = datetime.now()
+        result = await db.execute(self._due_query(plugin_id, limit))
+        return [DLQEntry.from_model(r) for r in result.scalars()]
+    
+    async def lease_entries(
+        self,
+        limit: int = 500,
+        lease_seconds: int = LEASE_SECONDS,
+        plugin_id: Optional[int] = None
+    ) -> List[DLQEntry]:
+        """
+        Claim due entries for a retry worker.
+        
+        Rows are selected with FOR UPDATE SKIP LOCKED (so concurrent workers
+        never block on or share a row) and pushed lease_seconds into the
+        future before commit; a worker that dies mid-retry simply lets the
+        lease run out and the entries become due again.
+        
+        Returns:
+            Leased entries (status RETRYING)
+        """
+        db = await self._get_db()
+        query = self._due_query(plugin_id, limit).with_for_update(skip_locked=True)
+        
+        try:
+            result = await db.execute(query)
+            models = result.scalars().all()
+            if not models:
+                await db.commit()
+                return []
+            
+            lease_until = datetime.now() + timedelta(seconds=lease_seconds)
+            await db.execute(
+                update(DeadLetterEntry)
+                .where(DeadLetterEntry.id.in_([m.id for m in models]))
+                .values(status=DLQStatus.RETRYING.value, next_retry_at=lease_until)
+                .execution_options(synchronize_session=False)
+            )
+            entries = [DLQEntry.from_model(m) for m in models]
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
         
+        for entry in entries:
+            entry.status = DLQStatus.RETRYING
+            entry.next_retry_at = lease_until
+        return entries
+    
+    def _due_query(self, plugin_id: Optional[int], limit: int):
         query = (
             select(DeadLetterEntry)
             .where(
                 DeadLetterEntry.status.in_([DLQStatus.PENDING.value, DLQStatus.RETRYING.value]),
-                DeadLetterEntry.next_retry_at <= now
+                DeadLetterEntry.next_retry_at <= datetime.now()
             )
             .order_by(DeadLetterEntry.next_retry_at)
             .limit(limit)
         )
-        
         if plugin_id:
             query = query.where(DeadLetterEntry.plugin_id == plugin_id)
-        
-        result = await db.execute(query)
-        return [DLQEntry.from_model(r) for r in result.scalars()]
+        return query
     
     async def mark_success(self, entry_id: int) -> None:
         """Mark entry as successfully processed."""
-        db = await self._get_db()
-        
-        result = await db.execute(
-            select(DeadLetterEntry).where(DeadLetterEntry.id == entry_id)
-        )
-        entry = result.scalar_one_or_none()
-        
-        if entry:
-            entry.status = DLQStatus.SUCCEEDED.value
-            entry.updated_at = datetime.now()
-            await db.commit()
+        if await self.mark_success_many([entry_id]):
             logger.info(f"DLQ entry {entry_id} succeeded")
     
+    async def mark_success_many(self, entry_ids: List[int]) -> int:
+        """Mark entries as succeeded with one UPDATE per WRITE_BATCH_SIZE ids."""
+        return await self._set_status(entry_ids, DLQStatus.SUCCEEDED)
+    
     async def mark_failed(
         self,
         entry_id: int,
@@ -220,43 +318,117 @@ class DeadLetterQueue:
         db = await self._get_db()
         
         result = await db.execute(
-            select(DeadLetterEntry).where(DeadLetterEntry.id == entry_id)
+            select(DeadLetterEntry.retry_count, DeadLetterEntry.max_retries)
+            .where(DeadLetterEntry.id == entry_id)
         )
-        entry = result.scalar_one_or_none()
-        
-        if not entry:
+        row = result.one_or_none()
+        if row is None:
             return
         
-        entry.retry_count += 1
-        if error:
-            entry.error = error
-        
-        if permanent or entry.retry_count >= entry.max_retries:
-            entry.status = DLQStatus.FAILED.value
-            logger.warning(f"DLQ entry {entry_id} permanently failed after {entry.retry_count} retries")
-        else:
-            entry.status = DLQStatus.RETRYING.value
-            # Exponential backoff
-            backoff = self.BACKOFF_BASE * (self.BACKOFF_MULTIPLIER ** entry.retry_count)
-            entry.next_retry_at = datetime.now() + timedelta(seconds=backoff)
-            logger.info(f"DLQ entry {entry_id} scheduled for retry in {backoff}s")
-        
-        entry.updated_at = datetime.now()
-        await db.commit()
+        await self.mark_failed_many([(entry_id, row.retry_count, row.max_retries, error)], permanent)
     
-    async def skip_entry(self, entry_id: int) -> None:
-        """Manually skip an entry (won't retry)."""
+    async def mark_failed_many(
+        self,
+        failures: List[Tuple[int, int, int, Optional[str]]],
+        permanent: bool = False
+    ) -> int:
+        """
+        Record failed retries in one executemany UPDATE.
+        
+        Each entry's retry_count is incremented; entries at max_retries (or
+        all of them when permanent) become FAILED, the rest are rescheduled
+        with exponential backoff.
+        
+        Args:
+            failures: (entry_id, retry_count, max_retries, error) as leased
+            permanent: If True, mark all as permanently failed
+            
+        Returns:
+            Number of entries updated
+        """
+        if not failures:
+            return 0
+        
         db = await self._get_db()
+        now = datetime.now()
+        params = []
+        exhausted = 0
         
-        result = await db.execute(
-            select(DeadLetterEntry).where(DeadLetterEntry.id == entry_id)
+        for entry_id, retry_count, max_retries, error in failures:
+            retry_count += 1
+            if permanent or retry_count >= max_retries:
+                status = DLQStatus.FAILED.value
+                next_retry_at = None
+                exhausted += 1
+            else:
+                status = DLQStatus.RETRYING.value
+                next_retry_at = now + timedelta(seconds=self.backoff_seconds(retry_count))
+            params.append({
+                "b_id": entry_id,
+                "b_status": status,
+                "b_retry_count": retry_count,
+                "b_error": error,
+                "b_next_retry_at": next_retry_at,
+                "b_updated_at": now,
+            })
+        
+        table = DeadLetterEntry.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                status=bindparam("b_status"),
+                retry_count=bindparam("b_retry_count"),
+                error=func.coalesce(bindparam("b_error"), table.c.error),
+                next_retry_at=bindparam("b_next_retry_at"),
+                updated_at=bindparam("b_updated_at"),
+            )
         )
-        entry = result.scalar_one_or_none()
         
-        if entry:
-            entry.status = DLQStatus.SKIPPED.value
-            entry.updated_at = datetime.now()
+        try:
+            await db.execute(stmt, params)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        
+        if exhausted:
+            logger.warning(f"{exhausted} DLQ entries permanently failed")
+        return len(params)
+    
+    @classmethod
+    def backoff_seconds(cls, retry_count: int) -> int:
+        """Delay before the next attempt after retry_count failures."""
+        return min(cls.BACKOFF_BASE * (cls.BACKOFF_MULTIPLIER ** retry_count), cls.MAX_BACKOFF_SECONDS)
+    
+    async def skip_entry(self, entry_id: int) -> None:
+        """Manually skip an entry (won't retry)."""
+        await self._set_status([entry_id], DLQStatus.SKIPPED)
+    
+    async def _set_status(self, entry_ids: List[int], status: DLQStatus) -> int:
+        """Set-based status change for a list of ids."""
+        if not entry_ids:
+            return 0
+        
+        db = await self._get_db()
+        now = datetime.now()
+        updated = 0
+        
+        try:
+            for start in range(0, len(entry_ids), self.WRITE_BATCH_SIZE):
+                result = await db.execute(
+                    update(DeadLetterEntry)
+                    .where(DeadLetterEntry.id.in_(entry_ids[start:start + self.WRITE_BATCH_SIZE]))
+                    .values(status=status.value, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                updated += result.rowcount or 0
             await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        
+        return updated
     
     async def get_stats(self, plugin_id: Optional[int] = None) -> Dict[str, int]:
         """Get queue statistics."""
@@ -299,26 +471,21 @@ class DeadLetterQueue:
         
         statuses = statuses or [DLQStatus.SUCCEEDED, DLQStatus.SKIPPED]
         
-        query = (
-            select(DeadLetterEntry)
+        result = await db.execute(
+            delete(DeadLetterEntry)
             .where(
                 DeadLetterEntry.created_at < cutoff,
                 DeadLetterEntry.status.in_([s.value for s in statuses])
             )
+            .execution_options(synchronize_session=False)
         )
-        
-        result = await db.execute(query)
-        entries = result.scalars().all()
-        
-        for entry in entries:
-            await db.delete(entry)
-        
         await db.commit()
         
-        if entries:
-            logger.info(f"Cleaned up {len(entries)} old DLQ entries")
+        deleted = result.rowcount or 0
+        if deleted:
+            logger.info(f"Cleaned up {deleted} old DLQ entries")
         
-        return len(entries)
+        return deleted
 
 
 # Singleton instance
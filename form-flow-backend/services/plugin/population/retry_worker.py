@@ -0,0 +1,239 @@
+"""
+Dead Letter Retry Worker Module
+
+Background worker that drains the dead letter queue.
+
+Each pass:
+- Leases a batch of due entries (FOR UPDATE SKIP LOCKED, so several
+  workers - tasks or processes - never pick the same row)
+- Groups them by (plugin, table) and reinserts each group with one
+  PopulationService.populate_batch() call, groups running concurrently
+- Marks all successes in one UPDATE and all failures in one executemany
+  UPDATE (retry_count + exponential backoff, FAILED at max_retries)
+
+Passes run back to back while there is a backlog and fall back to polling
+once the queue is drained.
+
+Usage:
+    worker = get_dlq_retry_worker()
+    worker.start(SessionLocal)
+    ...
+    await worker.stop()
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from core.plugin_models import Plugin
+from services.plugin.database import DatabaseType
+from services.plugin.population.dead_letter import DeadLetterQueue, DLQEntry
+from services.plugin.population.service import PopulationService
+from utils.logging import get_logger
+from utils.telemetry import metrics
+
+logger = get_logger(__name__)
+
+
+class DLQRetryWorker:
+    """
+    Concurrent, lease-based retry worker for the dead letter queue.
+    """
+
+    BATCH_SIZE = 500
+    WORKERS = 4
+    GROUP_CONCURRENCY = 8
+    POLL_INTERVAL_SECONDS = 5.0
+
+    def __init__(
+        self,
+        population_service: Optional[PopulationService] = None,
+        batch_size: int = BATCH_SIZE,
+        workers: int = WORKERS,
+        group_concurrency: int = GROUP_CONCURRENCY,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+        lease_seconds: int = DeadLetterQueue.LEASE_SECONDS
+    ):
+        # No DLQ on this service: failures are rescheduled, not re-enqueued
+        self._population = population_service or PopulationService()
+        self.batch_size = batch_size
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._group_slots = asyncio.Semaphore(group_concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._succeeded = 0
+        self._failed = 0
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    def start(self, session_factory) -> None:
+        """Start the worker loops on the running event loop."""
+        if self.is_running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run(session_factory))
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the worker loops; leased entries become due when the lease ends."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _run(self, session_factory) -> None:
+        while True:
+            try:
+                processed = await self.run_once(session_factory)
+            except Exception as e:
+                logger.warning(f"DLQ retry pass failed: {e}")
+                processed = 0
+            # Keep going while there is a backlog
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    # =========================================================================
+    # Processing
+    # =========================================================================
+
+    async def run_once(self, session_factory) -> int:
+        """
+        Lease one batch, retry it and record the outcome.
+
+        Returns:
+            Number of entries processed
+        """
+        started = time.perf_counter()
+
+        async with session_factory() as db:
+            dlq = DeadLetterQueue(db)
+            entries = await dlq.lease_entries(self.batch_size, self.lease_seconds)
+            if not entries:
+                return 0
+            plugins = await self._load_plugins(db, {e.plugin_id for e in entries})
+
+        groups: Dict[Tuple[int, str], List[DLQEntry]] = defaultdict(list)
+        for entry in entries:
+            groups[(entry.plugin_id, entry.table_name)].append(entry)
+
+        outcomes = await asyncio.gather(*(
+            self._retry_group(plugins.get(plugin_id), table_name, group)
+            for (plugin_id, table_name), group in groups.items()
+        ))
+
+        succeeded: List[int] = []
+        failed: List[Tuple[int, int, int, Optional[str]]] = []
+        unrecoverable: List[Tuple[int, int, int, Optional[str]]] = []
+        for ok, retry, permanent in outcomes:
+            succeeded.extend(ok)
+            failed.extend(retry)
+            unrecoverable.extend(permanent)
+
+        async with session_factory() as db:
+            dlq = DeadLetterQueue(db)
+            await dlq.mark_success_many(succeeded)
+            await dlq.mark_failed_many(failed)
+            await dlq.mark_failed_many(unrecoverable, permanent=True)
+
+        self._succeeded += len(succeeded)
+        self._failed += len(failed) + len(unrecoverable)
+        metrics.increment("dlq.retry.succeeded", len(succeeded))
+        metrics.increment("dlq.retry.failed", len(failed) + len(unrecoverable))
+        metrics.timing("dlq.retry.batch", (time.perf_counter() - started) * 1000)
+
+        logger.info(
+            f"DLQ retry: {len(entries)} entries in {len(groups)} groups, "
+            f"{len(succeeded)} succeeded, {len(failed) + len(unrecoverable)} failed"
+        )
+        return len(entries)
+
+    async def _load_plugins(self, db, plugin_ids) -> Dict[int, Any]:
+        result = await db.execute(
+            select(Plugin.id, Plugin.database_type, Plugin.connection_config_encrypted)
+            .where(Plugin.id.in_(plugin_ids), Plugin.is_active == True)  # noqa: E712
+        )
+        return {row.id: row for row in result}
+
+    async def _retry_group(
+        self,
+        plugin,
+        table_name: str,
+        entries: List[DLQEntry]
+    ) -> Tuple[List[int], List[Tuple], List[Tuple]]:
+        """
+        Reinsert one (plugin, table) group with a single bulk load.
+
+        Returns:
+            (succeeded_ids, retryable_failures, permanent_failures)
+        """
+        if plugin is None:
+            error = "Plugin not found or inactive"
+            return [], [], [(e.id, e.retry_count, e.max_retries, error) for e in entries]
+
+        # populate_batch skips empty rows without reporting them, so they
+        # would otherwise look inserted; no retry can ever fix them
+        empty = [(e.id, e.retry_count, e.max_retries, "Entry has no row data") for e in entries if not e.data]
+        entries = [e for e in entries if e.data]
+        if not entries:
+            return [], [], empty
+
+        # Rows are matched back to entries by identity
+        by_row = {id(e.data): e for e in entries}
+
+        async with self._group_slots:
+            try:
+                _, failed_rows = await self._population.populate_batch(
+                    plugin_id=plugin.id,
+                    session_id="dlq-retry",
+                    connection_config_encrypted=plugin.connection_config_encrypted,
+                    db_type=DatabaseType(plugin.database_type),
+                    table_name=table_name,
+                    rows=[e.data for e in entries],
+                )
+            except Exception as e:
+                # Connector could not be created (bad config, DB down)
+                return [], [(x.id, x.retry_count, x.max_retries, str(e)) for x in entries], empty
+
+        errors = {id(r.data): r.error for r in failed_rows}
+        succeeded = [e.id for e in entries if id(e.data) not in errors]
+        failed = [
+            (by_row[key].id, by_row[key].retry_count, by_row[key].max_retries, error)
+            for key, error in errors.items()
+            if key in by_row
+        ]
+        return succeeded, failed, empty
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "workers": len(self._tasks),
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+        }
+
+
+# Singleton instance
+_dlq_retry_worker: Optional[DLQRetryWorker] = None
+
+
+def get_dlq_retry_worker() -> DLQRetryWorker:
+    """Get singleton DLQ retry worker."""
+    global _dlq_retry_worker
+    if _dlq_retry_worker is None:
+        _dlq_retry_worker = DLQRetryWorker()
+    return _dlq_retry_worker
@@ -7,11 +7,17 @@ Features:
 - Partial success tracking
 - Dead letter queue for failures
 - Batched inserts for efficiency
+- Streaming bulk loads (COPY / multi-row VALUES) with per-chunk
+  transactions and bisection of failed chunks
 
 Reuses database connectors from services.plugin.database.
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+import time
+from typing import (
+    Dict, List, Any, Optional, Tuple, Union, Iterable, AsyncIterable, AsyncIterator
+)
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -23,6 +29,7 @@ from services.plugin.database import (
 from services.plugin.security.encryption import get_encryption_service
 from services.plugin.population.dead_letter import DeadLetterQueue
 from utils.logging import get_logger
+from utils.telemetry import metrics
 
 logger = get_logger(__name__)
 
@@ -107,6 +114,8 @@ class PopulationService:
         )
     """
     
+    BULK_CHUNK_SIZE = 1000
+    
     def __init__(self, dead_letter_queue: Optional[DeadLetterQueue] = None):
         """
         Initialize population service.
@@ -160,28 +169,30 @@ class PopulationService:
         
         # Process each table
         for table_config in table_configs:
-            table_result = await self._populate_table(
+            table_results = await self._populate_table(
                 connector=connector,
                 table_config=table_config,
                 extracted_values=extracted_values,
                 use_transaction=use_transaction
             )
             
-            if table_result.status == InsertStatus.SUCCESS:
-                result.inserted_rows.append(table_result)
+            failed = [r for r in table_results if r.status != InsertStatus.SUCCESS]
+            if not failed:
+                result.inserted_rows.extend(table_results)
                 result.successful_tables += 1
-            else:
-                result.failed_rows.append(table_result)
-                
-                # Add to DLQ if available
-                if self._dlq:
-                    await self._dlq.enqueue(
-                        plugin_id=plugin_id,
-                        session_id=session_id,
-                        table_name=table_result.table_name,
-                        data=table_result.data,
-                        error=table_result.error
-                    )
+                continue
+            
+            result.inserted_rows.extend(r for r in table_results if r.status == InsertStatus.SUCCESS)
+            result.failed_rows.extend(failed)
+            
+            # Add to DLQ if available
+            if self._dlq and failed:
+                await self._dlq.enqueue_many(
+                    plugin_id=plugin_id,
+                    session_id=session_id,
+                    table_name=failed[0].table_name,
+                    failures=[(r.data, r.error) for r in failed]
+                )
         
         # Determine overall status
         result.end_time = datetime.now()
@@ -201,16 +212,51 @@ class PopulationService:
         
         return result
     
+    def _build_rows(
+        self,
+        table_config: Dict[str, Any],
+        extracted_values: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Map extracted values to row dicts for one table.
+        
+        Normally a session yields one row per table from the flat values.
+        A repeating group (e.g. several line items) is passed as
+        extracted_values[table_name] = [{column: value, ...}, ...] and
+        yields one row per entry.
+        """
+        fields = table_config.get("fields", [])
+        repeated = extracted_values.get(table_config.get("table_name", ""))
+        sources = repeated if isinstance(repeated, list) else [extracted_values]
+        
+        rows = []
+        for source in sources:
+            if not isinstance(source, dict):
+                continue
+            row_data = {}
+            for field_config in fields:
+                column_name = field_config.get("column_name", "")
+                if column_name in source:
+                    row_data[column_name] = source[column_name]
+                elif field_config.get("default_value") is not None:
+                    row_data[column_name] = field_config["default_value"]
+            if row_data:
+                rows.append(row_data)
+        return rows
+    
     async def _populate_table(
         self,
         connector: DatabaseConnector,
         table_config: Dict[str, Any],
         extracted_values: Dict[str, Any],
         use_transaction: bool
-    ) -> InsertResult:
+    ) -> List[InsertResult]:
         """
         Populate a single table.
         
+        One row uses insert() (returns the row ID); several rows go
+        through insert_many() as one batch.
+        
         Args:
             connector: Database connector
             table_config: Table configuration with fields
@@ -218,52 +264,58 @@ class PopulationService:
             use_transaction: Use transaction
             
         Returns:
-            InsertResult for this table
+            InsertResult per row for this table
         """
         table_name = table_config.get("table_name", "")
-        fields = table_config.get("fields", [])
+        rows = self._build_rows(table_config, extracted_values)
         
-        # Build row data from field mappings
-        row_data = {}
-        for field_config in fields:
-            column_name = field_config.get("column_name", "")
-            if column_name in extracted_values:
-                row_data[column_name] = extracted_values[column_name]
-            elif field_config.get("default_value") is not None:
-                row_data[column_name] = field_config["default_value"]
-        
-        if not row_data:
-            return InsertResult(
+        if not rows:
+            return [InsertResult(
                 table_name=table_name,
                 status=InsertStatus.FAILED,
-                data=row_data,
+                data={},
                 error="No data to insert"
-            )
+            )]
         
         try:
+            if len(rows) == 1:
+                if use_transaction:
+                    async with connector.transaction():
+                        row_id = await connector.insert(table_name, rows[0])
+                else:
+                    row_id = await connector.insert(table_name, rows[0])
+                
+                logger.debug(f"Inserted row {row_id} into {table_name}")
+                return [InsertResult(
+                    table_name=table_name,
+                    status=InsertStatus.SUCCESS,
+                    row_id=row_id,
+                    data=rows[0]
+                )]
+            
             if use_transaction:
                 async with connector.transaction():
-                    row_id = await connector.insert(table_name, row_data)
+                    await connector.insert_many(table_name, rows)
             else:
-                row_id = await connector.insert(table_name, row_data)
-            
-            logger.debug(f"Inserted row {row_id} into {table_name}")
+                await connector.insert_many(table_name, rows)
             
-            return InsertResult(
-                table_name=table_name,
-                status=InsertStatus.SUCCESS,
-                row_id=row_id,
-                data=row_data
-            )
+            logger.debug(f"Batch inserted {len(rows)} rows into {table_name}")
+            return [
+                InsertResult(table_name=table_name, status=InsertStatus.SUCCESS, data=row)
+                for row in rows
+            ]
         
         except Exception as e:
             logger.error(f"Failed to insert into {table_name}: {e}")
-            return InsertResult(
-                table_name=table_name,
-                status=InsertStatus.FAILED,
-                data=row_data,
-                error=str(e)
-            )
+            return [
+                InsertResult(
+                    table_name=table_name,
+                    status=InsertStatus.FAILED,
+                    data=row,
+                    error=str(e)
+                )
+                for row in rows
+            ]
     
     async def populate_batch(
         self,
@@ -272,10 +324,17 @@ class PopulationService:
         connection_config_encrypted: str,
         db_type: DatabaseType,
         table_name: str,
-        rows: List[Dict[str, Any]]
+        rows: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        chunk_size: Optional[int] = None
     ) -> Tuple[int, List[InsertResult]]:
         """
-        Batch insert multiple rows into a single table.
+        Bulk load many rows into a single table.
+        
+        Rows are streamed (a list, generator or async iterator) into chunks
+        of rows sharing the same columns; each chunk is loaded atomically
+        with connector.bulk_load() (COPY on PostgreSQL, multi-row VALUES
+        on MySQL). A failed chunk is bisected until the bad rows are
+        isolated, so only those go to the dead letter queue.
         
         Args:
             plugin_id: Plugin ID
@@ -283,13 +342,13 @@ class PopulationService:
             connection_config_encrypted: Encrypted connection config
             db_type: Database type
             table_name: Target table
-            rows: List of row data dicts
+            rows: Row data dicts
+            chunk_size: Rows per chunk (default BULK_CHUNK_SIZE)
             
         Returns:
             (insert_count, failed_results)
         """
-        if not rows:
-            return 0, []
+        chunk_size = max(1, chunk_size or self.BULK_CHUNK_SIZE)
         
         # Decrypt and get connector
         config_dict = self._encryption.decrypt(connection_config_encrypted)
@@ -298,25 +357,152 @@ class PopulationService:
         factory = await get_connector_factory()
         connector = await factory.get_connector(plugin_id, db_type, config)
         
-        try:
-            count = await connector.insert_many(table_name, rows)
-            logger.info(f"Batch inserted {count} rows into {table_name}")
-            return count, []
+        started = time.perf_counter()
+        inserted = 0
+        chunks = 0
+        failed: List[InsertResult] = []
         
-        except Exception as e:
-            logger.error(f"Batch insert failed for {table_name}: {e}")
+        async for columns, chunk in _iter_chunks(rows, chunk_size):
+            chunks += 1
+            chunk_started = time.perf_counter()
+            count, bad_rows = await self._load_chunk(connector, table_name, columns, chunk)
+            metrics.timing("plugin.bulk_load.chunk", (time.perf_counter() - chunk_started) * 1000)
             
-            # Return all rows as failed
-            failed = [
-                InsertResult(
+            inserted += count
+            for row, error in bad_rows:
+                failed.append(InsertResult(
                     table_name=table_name,
                     status=InsertStatus.FAILED,
                     data=row,
-                    error=str(e)
-                )
-                for row in rows
-            ]
-            return 0, failed
+                    error=error
+                ))
+        
+        elapsed = time.perf_counter() - started
+        rows_per_second = inserted / elapsed if elapsed > 0 else 0.0
+        metrics.increment("plugin.bulk_load.rows_inserted", inserted)
+        metrics.increment("plugin.bulk_load.rows_failed", len(failed))
+        metrics.gauge("plugin.bulk_load.rows_per_second", rows_per_second, {"db": db_type.value})
+        
+        if failed and self._dlq:
+            await self._dlq.enqueue_many(
+                plugin_id=plugin_id,
+                session_id=session_id,
+                table_name=table_name,
+                failures=[(r.data, r.error) for r in failed]
+            )
+        
+        logger.info(
+            f"Bulk loaded {inserted} rows into {table_name} in {chunks} chunks "
+            f"({rows_per_second:.0f} rows/s), {len(failed)} failed"
+        )
+        return inserted, failed
+    
+    async def _load_chunk(
+        self,
+        connector: DatabaseConnector,
+        table_name: str,
+        columns: List[str],
+        rows: List[Dict[str, Any]]
+    ) -> Tuple[int, List[Tuple[Dict[str, Any], str]]]:
+        """
+        Load a chunk; on failure split it in half and retry each half.
+        
+        Returns:
+            (inserted_count, [(bad_row, error), ...])
+        """
+        try:
+            return await connector.bulk_load(table_name, columns, rows), []
+        except _UNSPLITTABLE_ERRORS as e:
+            # Connectivity problem, not bad data: splitting won't help
+            return 0, [(row, str(e)) for row in rows]
+        except Exception as e:
+            if len(rows) == 1 or _is_unsplittable_error(e):
+                # A single bad row, or an error every row would hit alike
+                # (missing table/column, no permission, lost connection):
+                # don't split
+                return 0, [(row, str(e)) for row in rows]
+            
+            middle = len(rows) // 2
+            left_count, left_bad = await self._load_chunk(connector, table_name, columns, rows[:middle])
+            right_count, right_bad = await self._load_chunk(connector, table_name, columns, rows[middle:])
+            return left_count + right_count, left_bad + right_bad
+
+
+# Errors that mean the database is unreachable rather than a row being bad
+_UNSPLITTABLE_ERRORS = (ConnectionError, OSError, asyncio.TimeoutError)
+
+# SQLSTATE classes that aren't about row data: 42 syntax error or access
+# rule violation (undefined table/column, insufficient privilege), 28
+# invalid authorization, 08 connection exception
+_UNSPLITTABLE_SQLSTATE_CLASSES = ("42", "28", "08")
+
+# Full SQLSTATEs from otherwise row-relevant classes: the server shutting
+# down (57P01 admin, 57P02 crash) or refusing connections (57P03)
+_UNSPLITTABLE_SQLSTATES = {"57P01", "57P02", "57P03"}
+
+# MySQL equivalents: access denied (1044, 1045, 1142, 1143), unknown
+# database (1049), unknown column (1054), syntax error (1064), column
+# count mismatch (1136), missing table (1146), server gone away (2006),
+# lost connection during query (2013)
+_UNSPLITTABLE_MYSQL_CODES = {1044, 1045, 1049, 1054, 1064, 1136, 1142, 1143, 1146, 2006, 2013}
+
+
+def _is_unsplittable_error(error: BaseException) -> bool:
+    """
+    True for driver errors that fail a statement regardless of its rows.
+    
+    Covers schema and permission problems as well as a connection lost
+    mid-statement. Duck-typed so no driver import is needed: asyncpg
+    exposes ``sqlstate``, psycopg ``pgcode``, and PyMySQL/aiomysql put
+    the numeric error code in ``args[0]``. SQLAlchemy wrappers are
+    unwrapped through ``orig``.
+    """
+    for exc in (error, getattr(error, "orig", None)):
+        if exc is None:
+            continue
+        sqlstate = getattr(exc, "sqlstate", None) or getattr(exc, "pgcode", None)
+        if isinstance(sqlstate, str):
+            return (
+                sqlstate[:2] in _UNSPLITTABLE_SQLSTATE_CLASSES
+                or sqlstate in _UNSPLITTABLE_SQLSTATES
+            )
+        code = exc.args[0] if exc.args else None
+        if isinstance(code, int) and code in _UNSPLITTABLE_MYSQL_CODES:
+            return True
+    return False
+
+
+async def _iter_chunks(
+    rows: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+    chunk_size: int
+) -> AsyncIterator[Tuple[List[str], List[Dict[str, Any]]]]:
+    """
+    Group streamed rows by column set and yield (columns, rows) chunks.
+    
+    Only one partial chunk per column set is held in memory.
+    """
+    pending: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    
+    async def _rows():
+        if hasattr(rows, "__aiter__"):
+            async for row in rows:
+                yield row
+        else:
+            for row in rows:
+                yield row
+    
+    async for row in _rows():
+        if not row:
+            continue
+        columns = tuple(row.keys())
+        bucket = pending.setdefault(columns, [])
+        bucket.append(row)
+        if len(bucket) >= chunk_size:
+            del pending[columns]
+            yield list(columns), bucket
+    
+    for columns, bucket in pending.items():
+        yield list(columns), bucket
 
 
 # Singleton instance
@@ -0,0 +1,464 @@
+"""
+Webhook Dispatcher Module
+
+Durable, bounded webhook delivery.
+
+Events are written to a webhook_outbox table and delivered by a background
+task, so nothing is lost when the process restarts and a burst of events
+never turns into a burst of unbounded tasks:
+- Due entries are leased with FOR UPDATE SKIP LOCKED (several processes
+  can dispatch from one outbox)
+- Requests go through WebhookService.post(): one keep-alive client and
+  one concurrency limit per destination host
+- Endpoints configured with coalesce=True receive their queued events as
+  one signed "batch" payload (up to MAX_COALESCED_EVENTS)
+- Failures are retried with jittered exponential backoff; 4xx responses
+  other than 408/429 fail permanently
+- While a plugin's circuit breaker is open its entries are pushed back by
+  the breaker's recovery timeout without using up an attempt
+- Delivery latency (enqueue -> 2xx) and request latency are reported
+  through utils.telemetry metrics
+
+Usage:
+    dispatcher = get_webhook_dispatcher()
+    dispatcher.start(SessionLocal)
+    await dispatcher.enqueue(config, WebhookEvent.POPULATION_SUCCESS, payload, plugin_id)
+    ...
+    await dispatcher.stop()
+"""
+
+import asyncio
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, JSON, Boolean, Index,
+    select, insert, update, delete, bindparam
+)
+
+from core.database import Base
+from services.plugin.population.webhooks import (
+    WebhookService, WebhookConfig, WebhookEvent, HostClientPool, get_webhook_service
+)
+from utils.circuit_breaker import get_circuit_breaker
+from utils.logging import get_logger
+from utils.telemetry import metrics
+
+logger = get_logger(__name__)
+
+
+class OutboxStatus(str, Enum):
+    """Webhook outbox entry status."""
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"     # Permanently failed (max retries or rejected)
+
+
+class WebhookOutboxEntry(Base):
+    """SQLAlchemy model for queued webhook events."""
+
+    __tablename__ = "webhook_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    plugin_id = Column(Integer, nullable=False, index=True)
+    url = Column(String(2048), nullable=False)
+    secret = Column(String(64), nullable=False)
+    event = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    coalesce = Column(Boolean, nullable=False, default=False)
+    timeout_seconds = Column(Integer, nullable=False, default=10)
+    max_retries = Column(Integer, nullable=False, default=3)
+    status = Column(String(20), nullable=False, default=OutboxStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=False)
+    delivered_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_webhook_outbox_status_next', 'status', 'next_attempt_at'),
+    )
+
+
+class WebhookDispatcher:
+    """
+    Background dispatcher for the webhook outbox.
+    """
+
+    BATCH_SIZE = 200
+    MAX_COALESCED_EVENTS = 50
+    POLL_INTERVAL_SECONDS = 1.0
+    LEASE_SECONDS = 60
+
+    # Retry delay: RETRY_BASE * RETRY_MULTIPLIER^n, scaled by a random 0.5-1.0
+    RETRY_BASE = WebhookService.RETRY_BASE
+    RETRY_MULTIPLIER = WebhookService.RETRY_MULTIPLIER
+    MAX_RETRY_DELAY_SECONDS = 600
+
+    def __init__(
+        self,
+        webhook_service: Optional[WebhookService] = None,
+        batch_size: int = BATCH_SIZE,
+        poll_interval: float = POLL_INTERVAL_SECONDS
+    ):
+        self._webhook_service = webhook_service
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._session_factory = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._delivered = 0
+        self._failed = 0
+        self._retried = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def webhook_service(self) -> WebhookService:
+        if self._webhook_service is None:
+            self._webhook_service = get_webhook_service()
+        return self._webhook_service
+
+    # =========================================================================
+    # Producer side
+    # =========================================================================
+
+    async def enqueue(
+        self,
+        config: WebhookConfig,
+        event: WebhookEvent,
+        payload: Dict[str, Any],
+        plugin_id: int = 0
+    ) -> int:
+        """
+        Persist one event to the outbox and wake the dispatcher.
+
+        Returns:
+            Outbox entry ID
+        """
+        now = datetime.utcnow()
+        async with self._session_factory() as db:
+            result = await db.execute(
+                insert(WebhookOutboxEntry).values(
+                    plugin_id=plugin_id,
+                    url=config.url,
+                    secret=config.secret,
+                    event=event.value,
+                    payload=payload,
+                    coalesce=config.coalesce,
+                    timeout_seconds=config.timeout_seconds,
+                    max_retries=config.max_retries,
+                    status=OutboxStatus.PENDING.value,
+                    attempts=0,
+                    created_at=now,
+                    next_attempt_at=now,
+                )
+            )
+            await db.commit()
+
+        metrics.increment("webhook.enqueued")
+        if self._wake is not None:
+            self._wake.set()
+        return result.inserted_primary_key[0]
+
+    # =========================================================================
+    # Background task
+    # =========================================================================
+
+    def start(self, session_factory) -> None:
+        """Start the background dispatch task on the running loop."""
+        if self.is_running:
+            return
+        self._session_factory = session_factory
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background task.
+
+        Undelivered events stay in the outbox; entries leased by an
+        interrupted pass are picked up again once the lease expires.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except Exception as e:
+                logger.warning(f"Webhook dispatch error: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    # =========================================================================
+    # Dispatch
+    # =========================================================================
+
+    async def dispatch_once(self, session_factory=None) -> int:
+        """
+        Lease due outbox entries, deliver them and record the outcome.
+
+        Returns:
+            Number of entries processed
+        """
+        session_factory = session_factory or self._session_factory
+        entries = await self._lease(session_factory)
+        if not entries:
+            return 0
+
+        groups = self._group(entries)
+        outcomes = await asyncio.gather(*(self._deliver(group) for group in groups))
+
+        delivered: List[WebhookOutboxEntry] = []
+        failures: List[Tuple[WebhookOutboxEntry, bool, str, Optional[float]]] = []
+        for group, (ok, retryable, error, retry_after) in zip(groups, outcomes):
+            if ok:
+                delivered.extend(group)
+            else:
+                failures.extend((entry, retryable, error, retry_after) for entry in group)
+
+        await self._record(session_factory, delivered, failures)
+        return len(entries)
+
+    async def _lease(self, session_factory) -> List[WebhookOutboxEntry]:
+        now = datetime.utcnow()
+        async with session_factory() as db:
+            result = await db.execute(
+                select(WebhookOutboxEntry)
+                .where(
+                    WebhookOutboxEntry.status == OutboxStatus.PENDING.value,
+                    WebhookOutboxEntry.next_attempt_at <= now
+                )
+                .order_by(WebhookOutboxEntry.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            entries = result.scalars().all()
+            if entries:
+                await db.execute(
+                    update(WebhookOutboxEntry)
+                    .where(WebhookOutboxEntry.id.in_([e.id for e in entries]))
+                    .values(next_attempt_at=now + timedelta(seconds=self.LEASE_SECONDS))
+                    .execution_options(synchronize_session=False)
+                )
+                db.expunge_all()
+            await db.commit()
+        return entries
+
+    def _group(self, entries: List[WebhookOutboxEntry]) -> List[List[WebhookOutboxEntry]]:
+        """One group per entry, except coalescing endpoints share batches."""
+        groups: List[List[WebhookOutboxEntry]] = []
+        coalesced: Dict[Tuple[str, str], List[WebhookOutboxEntry]] = defaultdict(list)
+
+        for entry in entries:
+            if entry.coalesce:
+                coalesced[(entry.url, entry.secret)].append(entry)
+            else:
+                groups.append([entry])
+
+        for batch in coalesced.values():
+            for start in range(0, len(batch), self.MAX_COALESCED_EVENTS):
+                groups.append(batch[start:start + self.MAX_COALESCED_EVENTS])
+        return groups
+
+    async def _deliver(
+        self,
+        entries: List[WebhookOutboxEntry]
+    ) -> Tuple[bool, bool, Optional[str], Optional[float]]:
+        """
+        POST one entry, or a coalesced batch, once.
+
+        Returns:
+            (delivered, retryable, error, retry_after). retry_after is set
+            when nothing was sent: the entries are rescheduled that many
+            seconds out and the attempt is not counted.
+        """
+        first = entries[0]
+        circuit = get_circuit_breaker(f"webhook_{first.plugin_id}")
+        if not circuit.can_execute():
+            return False, True, "circuit open", float(circuit.recovery_timeout)
+
+        service = self.webhook_service
+        config = WebhookConfig(url=first.url, secret=first.secret, timeout_seconds=first.timeout_seconds)
+        timestamp = datetime.utcnow().isoformat()
+
+        if len(entries) == 1:
+            event_name = first.event
+            body = {"event": first.event, "timestamp": timestamp, "data": first.payload}
+        else:
+            event_name = "batch"
+            body = {
+                "event": event_name,
+                "timestamp": timestamp,
+                "events": [
+                    {"event": e.event, "timestamp": e.created_at.isoformat(), "data": e.payload}
+                    for e in entries
+                ],
+            }
+            metrics.increment("webhook.coalesced_events", len(entries))
+
+        payload_json, headers = service.build_request(config, body, event_name, timestamp)
+
+        started = time.perf_counter()
+        try:
+            response = await service.post(first.url, payload_json, headers, first.timeout_seconds)
+        except Exception as e:
+            circuit.record_failure()
+            return False, True, str(e) or type(e).__name__, None
+        finally:
+            metrics.timing(
+                "webhook.request_latency",
+                (time.perf_counter() - started) * 1000,
+                {"host": HostClientPool.host_of(first.url)}
+            )
+
+        if 200 <= response.status_code < 300:
+            circuit.record_success()
+            return True, False, None, None
+
+        retryable = response.status_code in (408, 429) or response.status_code >= 500
+        if retryable:
+            circuit.record_failure()
+        return False, retryable, f"HTTP {response.status_code}", None
+
+    def retry_delay(self, attempts: int) -> float:
+        """Jittered backoff before the next attempt after `attempts` tries."""
+        delay = min(
+            self.RETRY_BASE * (self.RETRY_MULTIPLIER ** (attempts - 1)),
+            self.MAX_RETRY_DELAY_SECONDS
+        )
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _record(
+        self,
+        session_factory,
+        delivered: List[WebhookOutboxEntry],
+        failures: List[Tuple[WebhookOutboxEntry, bool, str, Optional[float]]]
+    ) -> None:
+        """Write all outcomes of a pass in two statements."""
+        now = datetime.utcnow()
+        table = WebhookOutboxEntry.__table__
+        params = []
+
+        for entry in delivered:
+            params.append({
+                "b_id": entry.id,
+                "b_status": OutboxStatus.DELIVERED.value,
+                "b_attempts": entry.attempts + 1,
+                "b_error": None,
+                "b_next": entry.next_attempt_at,
+                "b_delivered": now,
+            })
+            metrics.timing("webhook.delivery_latency", (now - entry.created_at).total_seconds() * 1000)
+
+        deferred = 0
+        for entry, retryable, error, retry_after in failures:
+            if retry_after is not None:
+                # Never sent: keep the attempt count, come back later
+                deferred += 1
+                params.append({
+                    "b_id": entry.id,
+                    "b_status": OutboxStatus.PENDING.value,
+                    "b_attempts": entry.attempts,
+                    "b_error": error,
+                    "b_next": now + timedelta(seconds=retry_after),
+                    "b_delivered": None,
+                })
+                continue
+
+            attempts = entry.attempts + 1
+            exhausted = not retryable or attempts > entry.max_retries
+            params.append({
+                "b_id": entry.id,
+                "b_status": OutboxStatus.FAILED.value if exhausted else OutboxStatus.PENDING.value,
+                "b_attempts": attempts,
+                "b_error": error,
+                "b_next": now if exhausted else now + timedelta(seconds=self.retry_delay(attempts)),
+                "b_delivered": None,
+            })
+            if exhausted:
+                self._failed += 1
+                logger.warning(f"Webhook {entry.event} to {entry.url} failed permanently: {error}")
+            else:
+                self._retried += 1
+
+        if not params:
+            return
+
+        async with session_factory() as db:
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    status=bindparam("b_status"),
+                    attempts=bindparam("b_attempts"),
+                    last_error=bindparam("b_error"),
+                    next_attempt_at=bindparam("b_next"),
+                    delivered_at=bindparam("b_delivered"),
+                ),
+                params
+            )
+            await db.commit()
+
+        self._delivered += len(delivered)
+        metrics.increment("webhook.delivered", len(delivered))
+        metrics.increment("webhook.failed", len(failures) - deferred)
+        metrics.increment("webhook.deferred", deferred)
+
+    # =========================================================================
+    # Maintenance
+    # =========================================================================
+
+    async def cleanup_delivered(self, days: int = 7, session_factory=None) -> int:
+        """Delete delivered entries older than `days` in one statement."""
+        session_factory = session_factory or self._session_factory
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        async with session_factory() as db:
+            result = await db.execute(
+                delete(WebhookOutboxEntry)
+                .where(
+                    WebhookOutboxEntry.status == OutboxStatus.DELIVERED.value,
+                    WebhookOutboxEntry.delivered_at < cutoff
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        return result.rowcount or 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "delivered": self._delivered,
+            "retried": self._retried,
+            "failed": self._failed,
+        }
+
+
+# Singleton instance
+_webhook_dispatcher: Optional[WebhookDispatcher] = None
+
+
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    """Get singleton webhook dispatcher."""
+    global _webhook_dispatcher
+    if _webhook_dispatcher is None:
+        _webhook_dispatcher = WebhookDispatcher()
+    return _webhook_dispatcher
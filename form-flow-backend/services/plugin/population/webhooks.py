@@ -5,8 +5,11 @@ Notifies external systems about population events.
 Features:
 - HMAC signature for security
 - Retry with exponential backoff
-- Async fire-and-forget delivery
+- Async fire-and-forget delivery (through the persistent outbox in
+  webhook_dispatcher.py when the dispatcher is running)
 - Event types (success, failure, partial)
+- One keep-alive client (HTTP/2 when h2 is installed) and a concurrency
+  limit per destination host
 
 Uses circuit breaker for resilient delivery.
 """
@@ -15,13 +18,20 @@ import hmac
 import hashlib
 import json
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from urllib.parse import urlsplit
 
 import httpx
 
+try:
+    import h2  # noqa: F401 - enables httpx HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 from utils.circuit_breaker import resilient_call, get_circuit_breaker
 from utils.logging import get_logger
 
@@ -47,6 +57,8 @@ class WebhookConfig:
     timeout_seconds: int = 10
     max_retries: int = 3
     enabled: bool = True
+    # Deliver queued events for this endpoint together as one "batch" payload
+    coalesce: bool = False
 
 
 @dataclass
@@ -62,6 +74,64 @@ class WebhookDelivery:
     duration_ms: int = 0
 
 
+class HostClientPool:
+    """
+    Per-host HTTP clients and concurrency limits.
+    
+    Each destination host gets one long-lived AsyncClient (connections are
+    kept alive between deliveries) and a semaphore bounding in-flight
+    requests, so a slow endpoint cannot absorb every connection.
+    """
+    
+    PER_HOST_CONCURRENCY = 8
+    KEEPALIVE_EXPIRY_SECONDS = 60
+    
+    def __init__(self, per_host_concurrency: int = PER_HOST_CONCURRENCY):
+        self.per_host_concurrency = per_host_concurrency
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+    
+    @staticmethod
+    def host_of(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+    
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        host = self.host_of(url)
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(30.0),
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.per_host_concurrency,
+                    max_keepalive_connections=self.per_host_concurrency,
+                    keepalive_expiry=self.KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+            self._clients[host] = client
+        return client
+    
+    def slot_for(self, url: str) -> asyncio.Semaphore:
+        host = self.host_of(url)
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return slot
+    
+    def in_flight(self) -> Dict[str, int]:
+        return {
+            host: self.per_host_concurrency - slot._value
+            for host, slot in self._slots.items()
+        }
+    
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
 class WebhookService:
     """
     Webhook delivery service.
@@ -88,24 +158,28 @@ class WebhookService:
     RETRY_BASE = 1
     RETRY_MULTIPLIER = 4
     
-    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        host_pool: Optional[HostClientPool] = None
+    ):
         """
         Initialize webhook service.
         
         Args:
-            http_client: Optional pre-configured HTTP client
+            http_client: Optional pre-configured HTTP client (used for every host)
+            host_pool: Optional per-host client pool
         """
         self._client = http_client
+        self._hosts = host_pool or HostClientPool()
         self._pending_deliveries: List[WebhookDelivery] = []
+        self._background: Set[asyncio.Task] = set()
     
-    async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client."""
-        if self._client is None:
-            self._client = httpx.AsyncClient(
-                timeout=httpx.Timeout(30.0),
-                follow_redirects=True
-            )
-        return self._client
+    async def _get_client(self, url: str = "") -> httpx.AsyncClient:
+        """Get the HTTP client for a destination."""
+        if self._client is not None:
+            return self._client
+        return self._hosts.client_for(url)
     
     def _sign_payload(self, payload: str, secret: str, timestamp: str) -> str:
         """
@@ -121,6 +195,35 @@ class WebhookService:
         ).hexdigest()
         return f"sha256={signature}"
     
+    def build_request(
+        self,
+        config: WebhookConfig,
+        body: Dict[str, Any],
+        event_name: str,
+        timestamp: str
+    ) -> Tuple[str, Dict[str, str]]:
+        """Serialize a payload and compute its headers: (json, headers)."""
+        payload_json = json.dumps(body, default=str)
+        headers = {
+            "Content-Type": "application/json",
+            self.SIGNATURE_HEADER: self._sign_payload(payload_json, config.secret, timestamp),
+            self.TIMESTAMP_HEADER: timestamp,
+            self.EVENT_HEADER: event_name,
+        }
+        return payload_json, headers
+    
+    async def post(
+        self,
+        url: str,
+        payload_json: str,
+        headers: Dict[str, str],
+        timeout: float
+    ) -> httpx.Response:
+        """One POST through the destination host's client and concurrency limit."""
+        async with self._hosts.slot_for(url):
+            client = await self._get_client(url)
+            return await client.post(url, content=payload_json, headers=headers, timeout=timeout)
+    
     def _should_send(self, config: WebhookConfig, event: WebhookEvent) -> bool:
         """Check if event should be sent based on config."""
         if not config.enabled:
@@ -164,29 +267,14 @@ class WebhookService:
             "data": payload
         }
         
-        payload_json = json.dumps(full_payload, default=str)
-        signature = self._sign_payload(payload_json, config.secret, timestamp)
-        
-        headers = {
-            "Content-Type": "application/json",
-            self.SIGNATURE_HEADER: signature,
-            self.TIMESTAMP_HEADER: timestamp,
-            self.EVENT_HEADER: event.value,
-        }
+        payload_json, headers = self.build_request(config, full_payload, event.value, timestamp)
         
         # Send with retry
         start_time = datetime.now()
         
         try:
             async def do_send():
-                client = await self._get_client()
-                response = await client.post(
-                    config.url,
-                    content=payload_json,
-                    headers=headers,
-                    timeout=config.timeout_seconds
-                )
-                return response
+                return await self.post(config.url, payload_json, headers, config.timeout_seconds)
             
             response = await resilient_call(
                 do_send,
@@ -222,11 +310,28 @@ class WebhookService:
         Send webhook without waiting for result.
         
         Used for non-critical notifications where we don't want
-        to block the main flow.
+        to block the main flow. When the webhook dispatcher is running the
+        event is written to its outbox (bounded, retried, survives restarts);
+        otherwise it is sent from a background task.
         """
-        asyncio.create_task(
+        from services.plugin.population.webhook_dispatcher import get_webhook_dispatcher
+        
+        dispatcher = get_webhook_dispatcher()
+        if dispatcher.is_running:
+            if self._should_send(config, event):
+                try:
+                    await dispatcher.enqueue(config, event, payload, plugin_id)
+                except Exception as e:
+                    # Callers don't wait on notifications; don't fail them
+                    logger.error(f"Failed to queue webhook {event.value} for plugin {plugin_id}: {e}")
+            return
+        
+        task = asyncio.create_task(
             self._send_with_logging(config, event, payload, plugin_id)
         )
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
     
     async def _send_with_logging(
         self,
@@ -253,7 +358,8 @@ class WebhookService:
         """
         Send to multiple webhook endpoints concurrently.
         
-        Used when a plugin has multiple webhook URLs configured.
+        Used when a plugin has multiple webhook URLs configured. Requests
+        to the same host share that host's concurrency limit.
         """
         tasks = [
             self.send(config, event, payload, plugin_id)
@@ -283,10 +389,11 @@ class WebhookService:
         return hmac.compare_digest(signature, expected)
     
     async def close(self) -> None:
-        """Close HTTP client."""
+        """Close HTTP clients."""
         if self._client:
             await self._client.aclose()
             self._client = None
+        await self._hosts.close()
 
 
 # Singleton instance
@@ -23,6 +23,8 @@ from services.plugin.question.consolidator import (
 from services.plugin.question.cost_tracker import (
     CostTracker,
     LLMUsageLog,
+    LLMUsageDaily,
+    LLMUsageDailyOperation,
     UsageSummary,
     BudgetAlert,
     get_cost_tracker,
@@ -40,6 +42,8 @@ __all__ = [
     # Cost Tracking
     "CostTracker",
     "LLMUsageLog",
+    "LLMUsageDaily",
+    "LLMUsageDailyOperation",
     "UsageSummary",
     "BudgetAlert",
     "get_cost_tracker",
@@ -7,17 +7,24 @@ Features:
 - Aggregation by plugin, day, operation type
 - Batch writes for efficiency
 - Budget alerts (optional)
+- Daily / per-operation rollup tables maintained on flush, so reports
+  read O(days) rows instead of scanning llm_usage_logs
+- In-memory running totals per plugin for budget checks
 
 Uses existing AuditLog infrastructure where appropriate.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, date
 from collections import defaultdict
 import asyncio
+import time
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Index, select, func
+from sqlalchemy import (
+    Column, Integer, String, Float, DateTime, Date, Index, UniqueConstraint,
+    select, insert, update, func, tuple_
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import declarative_base
 
@@ -48,6 +55,41 @@ class LLMUsageLog(Base):
     )
 
 
+class LLMUsageDaily(Base):
+    """Rollup: usage per plugin per day."""
+    
+    __tablename__ = "llm_usage_daily"
+    
+    id = Column(Integer, primary_key=True)
+    plugin_id = Column(Integer, nullable=False)
+    usage_date = Column(Date, nullable=False)
+    calls = Column(Integer, nullable=False, default=0)
+    tokens = Column(Integer, nullable=False, default=0)
+    estimated_cost = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        UniqueConstraint('plugin_id', 'usage_date', name='uq_llm_usage_daily'),
+    )
+
+
+class LLMUsageDailyOperation(Base):
+    """Rollup: usage per plugin per day per operation."""
+    
+    __tablename__ = "llm_usage_daily_operation"
+    
+    id = Column(Integer, primary_key=True)
+    plugin_id = Column(Integer, nullable=False)
+    usage_date = Column(Date, nullable=False)
+    operation = Column(String(50), nullable=False)
+    calls = Column(Integer, nullable=False, default=0)
+    tokens = Column(Integer, nullable=False, default=0)
+    estimated_cost = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        UniqueConstraint('plugin_id', 'usage_date', 'operation', name='uq_llm_usage_daily_op'),
+    )
+
+
 @dataclass
 class UsageSummary:
     """Summary of LLM usage for a period."""
@@ -80,12 +122,18 @@ class CostTracker:
         summary = await tracker.get_usage_summary(plugin_id=1)
     """
     
+    # Running totals are re-read from the rollups after this long, to pick
+    # up usage recorded by other processes
+    RUNNING_TOTAL_TTL_SECONDS = 60
+    
     def __init__(self, db: AsyncSession = None):
         """Initialize tracker with optional db session."""
         self._db = db
         self._buffer: List[Dict[str, Any]] = []
         self._buffer_lock = asyncio.Lock()
         self._buffer_size = 10  # Flush after 10 entries
+        # plugin_id -> {"day", "daily_cost", "month_start", "monthly_cost", "loaded_at"}
+        self._running: Dict[int, Dict[str, Any]] = {}
     
     async def _get_db(self) -> AsyncSession:
         """Get database session."""
@@ -120,26 +168,49 @@ class CostTracker:
         
         async with self._buffer_lock:
             self._buffer.append(entry)
+            self._add_to_running_total(plugin_id, entry["usage_date"], estimated_cost)
             
             if len(self._buffer) >= self._buffer_size:
                 await self._flush_buffer()
     
     async def _flush_buffer(self) -> None:
-        """Flush buffer to database."""
+        """
+        Flush buffer to database.
+        
+        Raw rows and the rollup increments are written in one transaction,
+        so the rollups always match llm_usage_logs.
+        """
         if not self._buffer:
             return
         
+        daily: Dict[Tuple[int, date], List[float]] = defaultdict(lambda: [0, 0, 0.0])
+        by_operation: Dict[Tuple[int, date, str], List[float]] = defaultdict(lambda: [0, 0, 0.0])
+        for entry in self._buffer:
+            for totals in (
+                daily[(entry["plugin_id"], entry["usage_date"])],
+                by_operation[(entry["plugin_id"], entry["usage_date"], entry["operation"])],
+            ):
+                totals[0] += 1
+                totals[1] += entry["tokens"]
+                totals[2] += entry["estimated_cost"]
+        
+        db = None
         try:
             db = await self._get_db()
             
             # Batch insert
-            logs = [LLMUsageLog(**entry) for entry in self._buffer]
-            db.add_all(logs)
+            await db.execute(insert(LLMUsageLog), self._buffer)
+            await _add_to_rollup(db, LLMUsageDaily, ("plugin_id", "usage_date"), daily)
+            await _add_to_rollup(
+                db, LLMUsageDailyOperation, ("plugin_id", "usage_date", "operation"), by_operation
+            )
             await db.commit()
             
             logger.debug(f"Flushed {len(self._buffer)} LLM usage entries")
             self._buffer.clear()
         except Exception as e:
+            if db is not None:
+                await db.rollback()
             logger.warning(f"Failed to flush LLM usage buffer: {e}")
     
     async def flush(self) -> None:
@@ -166,58 +237,45 @@ class CostTracker:
         """
         db = await self._get_db()
         
-        # Build query
-        query = select(
-            func.sum(LLMUsageLog.tokens).label("total_tokens"),
-            func.sum(LLMUsageLog.estimated_cost).label("total_cost"),
-        ).where(LLMUsageLog.plugin_id == plugin_id)
-        
+        # Totals and daily breakdown from the per-day rollup
+        daily_query = (
+            select(
+                LLMUsageDaily.usage_date,
+                LLMUsageDaily.tokens,
+                LLMUsageDaily.estimated_cost
+            )
+            .where(LLMUsageDaily.plugin_id == plugin_id)
+            .order_by(LLMUsageDaily.usage_date.desc())
+        )
         if start_date:
-            query = query.where(LLMUsageLog.usage_date >= start_date)
+            daily_query = daily_query.where(LLMUsageDaily.usage_date >= start_date)
         if end_date:
-            query = query.where(LLMUsageLog.usage_date <= end_date)
+            daily_query = daily_query.where(LLMUsageDaily.usage_date <= end_date)
         
-        result = await db.execute(query)
-        row = result.one()
-        
-        total_tokens = row.total_tokens or 0
-        total_cost = row.total_cost or 0.0
+        days = (await db.execute(daily_query)).all()
+        total_tokens = sum(row.tokens for row in days)
+        total_cost = sum(row.estimated_cost for row in days)
+        daily_breakdown = {
+            str(row.usage_date): row.estimated_cost for row in days[:30]  # Last 30 days
+        }
         
-        # Get operation breakdown
+        # Operation breakdown from the per-operation rollup
         op_query = (
             select(
-                LLMUsageLog.operation,
-                func.sum(LLMUsageLog.estimated_cost).label("cost")
+                LLMUsageDailyOperation.operation,
+                func.sum(LLMUsageDailyOperation.estimated_cost).label("cost")
             )
-            .where(LLMUsageLog.plugin_id == plugin_id)
-            .group_by(LLMUsageLog.operation)
+            .where(LLMUsageDailyOperation.plugin_id == plugin_id)
+            .group_by(LLMUsageDailyOperation.operation)
         )
-        
         if start_date:
-            op_query = op_query.where(LLMUsageLog.usage_date >= start_date)
+            op_query = op_query.where(LLMUsageDailyOperation.usage_date >= start_date)
         if end_date:
-            op_query = op_query.where(LLMUsageLog.usage_date <= end_date)
+            op_query = op_query.where(LLMUsageDailyOperation.usage_date <= end_date)
         
         op_result = await db.execute(op_query)
         operation_breakdown = {row.operation: row.cost for row in op_result}
         
-        # Get daily breakdown
-        daily_query = (
-            select(
-                LLMUsageLog.usage_date,
-                func.sum(LLMUsageLog.estimated_cost).label("cost")
-            )
-            .where(LLMUsageLog.plugin_id == plugin_id)
-            .group_by(LLMUsageLog.usage_date)
-            .order_by(LLMUsageLog.usage_date.desc())
-            .limit(30)  # Last 30 days
-        )
-        
-        daily_result = await db.execute(daily_query)
-        daily_breakdown = {
-            str(row.usage_date): row.cost for row in daily_result
-        }
-        
         return UsageSummary(
             total_tokens=total_tokens,
             total_cost=total_cost,
@@ -240,15 +298,15 @@ class CostTracker:
         
         db = await self._get_db()
         
-        # Single query with grouping
+        # Single query with grouping over the daily rollup
         query = (
             select(
-                LLMUsageLog.plugin_id,
-                func.sum(LLMUsageLog.tokens).label("tokens"),
-                func.sum(LLMUsageLog.estimated_cost).label("cost")
+                LLMUsageDaily.plugin_id,
+                func.sum(LLMUsageDaily.tokens).label("tokens"),
+                func.sum(LLMUsageDaily.estimated_cost).label("cost")
             )
-            .where(LLMUsageLog.plugin_id.in_(plugin_ids))
-            .group_by(LLMUsageLog.plugin_id)
+            .where(LLMUsageDaily.plugin_id.in_(plugin_ids))
+            .group_by(LLMUsageDaily.plugin_id)
         )
         
         result = await db.execute(query)
@@ -279,37 +337,18 @@ class CostTracker:
         """
         Check if plugin is within budget limits.
         
+        Served from the in-memory running total (including usage not yet
+        flushed); the rollup is only read when the total is missing or
+        older than RUNNING_TOTAL_TTL_SECONDS.
+        
         Returns budget status and alerts.
         """
         budget = budget or BudgetAlert()
         today = date.today()
         
-        # Get today's usage
-        db = await self._get_db()
-        
-        daily_query = (
-            select(func.sum(LLMUsageLog.estimated_cost).label("cost"))
-            .where(
-                LLMUsageLog.plugin_id == plugin_id,
-                LLMUsageLog.usage_date == today
-            )
-        )
-        
-        result = await db.execute(daily_query)
-        daily_cost = result.scalar() or 0.0
-        
-        # Calculate month-to-date
-        month_start = today.replace(day=1)
-        monthly_query = (
-            select(func.sum(LLMUsageLog.estimated_cost).label("cost"))
-            .where(
-                LLMUsageLog.plugin_id == plugin_id,
-                LLMUsageLog.usage_date >= month_start
-            )
-        )
-        
-        result = await db.execute(monthly_query)
-        monthly_cost = result.scalar() or 0.0
+        totals = await self._get_running_total(plugin_id, today)
+        daily_cost = totals["daily_cost"]
+        monthly_cost = totals["monthly_cost"]
         
         alerts = []
         
@@ -334,6 +373,194 @@ class CostTracker:
             "within_budget": len([a for a in alerts if "exceeded" in a]) == 0
         }
 
+    
+    # =========================================================================
+    # Running totals
+    # =========================================================================
+    
+    def _add_to_running_total(self, plugin_id: int, usage_date: date, cost: float) -> None:
+        totals = self._running.get(plugin_id)
+        if totals is None or totals["day"] != usage_date:
+            # Reloaded (with the rollover) on the next budget check
+            self._running.pop(plugin_id, None)
+            return
+        totals["daily_cost"] += cost
+        totals["monthly_cost"] += cost
+    
+    async def _get_running_total(self, plugin_id: int, today: date) -> Dict[str, Any]:
+        totals = self._running.get(plugin_id)
+        if (
+            totals is not None
+            and totals["day"] == today
+            and time.monotonic() - totals["loaded_at"] < self.RUNNING_TOTAL_TTL_SECONDS
+        ):
+            return totals
+        
+        month_start = today.replace(day=1)
+        db = await self._get_db()
+        result = await db.execute(
+            select(LLMUsageDaily.usage_date, LLMUsageDaily.estimated_cost)
+            .where(
+                LLMUsageDaily.plugin_id == plugin_id,
+                LLMUsageDaily.usage_date >= month_start,
+                LLMUsageDaily.usage_date <= today
+            )
+        )
+        daily_cost = 0.0
+        monthly_cost = 0.0
+        for row in result:
+            monthly_cost += row.estimated_cost
+            if row.usage_date == today:
+                daily_cost += row.estimated_cost
+        
+        # Usage still in the buffer is not in the rollup yet
+        for entry in self._buffer:
+            if entry["plugin_id"] == plugin_id and month_start <= entry["usage_date"] <= today:
+                monthly_cost += entry["estimated_cost"]
+                if entry["usage_date"] == today:
+                    daily_cost += entry["estimated_cost"]
+        
+        totals = {
+            "day": today,
+            "daily_cost": daily_cost,
+            "monthly_cost": monthly_cost,
+            "loaded_at": time.monotonic(),
+        }
+        self._running[plugin_id] = totals
+        return totals
+    
+    async def backfill_rollups_if_empty(self) -> bool:
+        """
+        Build the rollups from llm_usage_logs if they have never been built.
+        
+        Called on startup: a deployment upgraded from before the rollup
+        tables has usage rows but empty rollups, which would make reports
+        and budget checks read zero spend. No-op once any rollup row
+        exists, so it is safe to run on every start and in every worker.
+        
+        Returns:
+            True if the rollups were rebuilt
+        """
+        db = await self._get_db()
+        if await db.scalar(select(LLMUsageDaily.id).limit(1)) is not None:
+            return False
+        if await db.scalar(select(LLMUsageLog.id).limit(1)) is None:
+            return False
+        
+        await self.rebuild_rollups()
+        logger.info("Backfilled LLM usage rollups from llm_usage_logs")
+        return True
+    
+    async def rebuild_rollups(self) -> None:
+        """
+        Recompute both rollup tables from llm_usage_logs.
+        
+        For backfilling rollups after upgrading an existing deployment
+        (see backfill_rollups_if_empty) or repairing them by hand.
+        """
+        db = await self._get_db()
+        
+        await db.execute(LLMUsageDaily.__table__.delete())
+        await db.execute(LLMUsageDailyOperation.__table__.delete())
+        await db.execute(
+            insert(LLMUsageDaily).from_select(
+                ["plugin_id", "usage_date", "calls", "tokens", "estimated_cost"],
+                select(
+                    LLMUsageLog.plugin_id,
+                    LLMUsageLog.usage_date,
+                    func.count(LLMUsageLog.id),
+                    func.sum(LLMUsageLog.tokens),
+                    func.sum(LLMUsageLog.estimated_cost),
+                ).group_by(LLMUsageLog.plugin_id, LLMUsageLog.usage_date)
+            )
+        )
+        await db.execute(
+            insert(LLMUsageDailyOperation).from_select(
+                ["plugin_id", "usage_date", "operation", "calls", "tokens", "estimated_cost"],
+                select(
+                    LLMUsageLog.plugin_id,
+                    LLMUsageLog.usage_date,
+                    LLMUsageLog.operation,
+                    func.count(LLMUsageLog.id),
+                    func.sum(LLMUsageLog.tokens),
+                    func.sum(LLMUsageLog.estimated_cost),
+                ).group_by(LLMUsageLog.plugin_id, LLMUsageLog.usage_date, LLMUsageLog.operation)
+            )
+        )
+        await db.commit()
+        self._running.clear()
+
+
+async def _add_to_rollup(
+    db: AsyncSession,
+    model,
+    key_columns: Tuple[str, ...],
+    increments: Dict[tuple, List[float]]
+) -> None:
+    """
+    Add (calls, tokens, cost) increments to rollup rows, creating missing ones.
+    
+    Uses a native upsert where the dialect has one (PostgreSQL / SQLite:
+    ON CONFLICT, MySQL: ON DUPLICATE KEY), otherwise update-then-insert.
+    """
+    if not increments:
+        return
+    
+    table = model.__table__
+    rows = [
+        {**dict(zip(key_columns, key)), "calls": calls, "tokens": tokens, "estimated_cost": cost}
+        for key, (calls, tokens, cost) in increments.items()
+    ]
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={
+                column: table.c[column] + stmt.excluded[column]
+                for column in ("calls", "tokens", "estimated_cost")
+            }
+        )
+        await db.execute(stmt, rows)
+        return
+    
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as upsert
+        stmt = upsert(table)
+        stmt = stmt.on_duplicate_key_update({
+            column: table.c[column] + stmt.inserted[column]
+            for column in ("calls", "tokens", "estimated_cost")
+        })
+        await db.execute(stmt, rows)
+        return
+    
+    # Generic fallback: find which keys exist, update those, insert the rest
+    key_cols = [table.c[c] for c in key_columns]
+    existing = {
+        tuple(row) for row in await db.execute(
+            select(*key_cols).where(tuple_(*key_cols).in_(list(increments)))
+        )
+    }
+    for key, (calls, tokens, cost) in increments.items():
+        if key in existing:
+            await db.execute(
+                update(table)
+                .where(*(col == value for col, value in zip(key_cols, key)))
+                .values(
+                    calls=table.c.calls + calls,
+                    tokens=table.c.tokens + tokens,
+                    estimated_cost=table.c.estimated_cost + cost,
+                )
+            )
+    new_rows = [row for key, row in zip(increments, rows) if key not in existing]
+    if new_rows:
+        await db.execute(insert(table), new_rows)
+
 
 # Singleton instance
 _cost_tracker: Optional[CostTracker] = None
@@ -14,7 +14,7 @@ Zero redundancy design:
 """
 
 from services.plugin.security.encryption import EncryptionService, get_encryption_service
-from services.plugin.security.audit import AuditService
+from services.plugin.security.audit import AuditService, AuditSink, get_audit_sink
 from services.plugin.security.gdpr import GDPRService
 from services.plugin.security.rate_limiter import MultiLevelRateLimiter, get_rate_limiter
 
@@ -22,6 +22,8 @@ __all__ = [
     "EncryptionService",
     "get_encryption_service",
     "AuditService",
+    "AuditSink",
+    "get_audit_sink",
     "GDPRService",
     "MultiLevelRateLimiter",
     "get_rate_limiter",
@@ -11,19 +11,383 @@ Features:
 - All security operations logged
 - IP address and user agent capture
 - JSON details for flexible payload
+
+Write path:
+- AuditService.log() only enqueues into the process-wide AuditSink
+- The sink's background task inserts rows in multi-row batches, every
+  FLUSH_INTERVAL_SECONDS or as soon as BATCH_SIZE events are queued
+- Batches that cannot be written (DB down, queue full) go to a local
+  JSON-lines spill file, which is drained first on the next flush
+- A batch the database rejects for its data (integrity or data errors)
+  is split in half until the bad rows are isolated; those are moved to
+  a .rejected.jsonl file next to the spill file instead of being retried
+- Spill file I/O (including fsync) runs in a worker thread
 """
 
-from typing import Optional, Dict, Any, List
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, String
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.audit_models import AuditLog, AuditAction
 from utils.logging import get_logger
+from utils.telemetry import metrics
 
 logger = get_logger(__name__)
 
 
+class AuditSink:
+    """
+    Background batch writer for audit rows.
+    
+    Usage:
+        sink = get_audit_sink()
+        sink.start(SessionLocal)       # app startup
+        sink.enqueue(row)              # request path (in-memory only)
+        await sink.stop()              # app shutdown (final flush)
+    """
+    
+    MAX_QUEUE_SIZE = 10_000
+    BATCH_SIZE = 200
+    FLUSH_INTERVAL_SECONDS = 0.5
+    SPILL_PATH = Path("storage") / "audit" / "spill.jsonl"
+    
+    def __init__(
+        self,
+        spill_path: Optional[Path] = None,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS
+    ):
+        self.spill_path = Path(spill_path or self.SPILL_PATH)
+        self.rejected_path = self.spill_path.with_suffix(".rejected.jsonl")
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        
+        self._queue: deque = deque()
+        self._lock = Lock()
+        self._spill_lock = Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._session_factory = None
+        self._overflow_spills: set = set()
+        
+        self._written = 0
+        self._spilled = 0
+        self._rejected = 0
+        self._last_flush_ms = 0.0
+    
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def queue_depth(self) -> int:
+        return len(self._queue)
+    
+    # =========================================================================
+    # Producer side
+    # =========================================================================
+    
+    def enqueue(self, row: Dict[str, Any]) -> None:
+        """Queue one audit row. Never blocks on the database."""
+        with self._lock:
+            overflow = len(self._queue) >= self.max_queue_size
+            if not overflow:
+                self._queue.append(row)
+            depth = len(self._queue)
+        
+        if overflow:
+            metrics.increment("audit.queue_overflow")
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._spill_sync([row])
+            else:
+                future = loop.run_in_executor(None, self._spill_sync, [row])
+                self._overflow_spills.add(future)
+                future.add_done_callback(self._overflow_spills.discard)
+            return
+        
+        metrics.gauge("audit.queue_depth", depth)
+        if depth >= self.batch_size and self._wake is not None:
+            self._wake.set()
+    
+    # =========================================================================
+    # Consumer side
+    # =========================================================================
+    
+    def start(self, session_factory) -> None:
+        """Start the background flush task on the running loop."""
+        if self.is_running:
+            return
+        self._session_factory = session_factory
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the background task and flush everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session_factory is not None:
+            await self.flush(self._session_factory)
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush(self._session_factory)
+            except Exception as e:
+                logger.warning(f"Audit flush error: {e}")
+    
+    async def flush(self, session_factory) -> int:
+        """
+        Write spilled rows, then queued rows, in batches.
+        
+        When the DB is unavailable the unwritten rows and the rest of the
+        queue are spilled, so memory stays bounded during an outage.
+        
+        Returns:
+            Number of rows written
+        """
+        # Overflow rows still being appended belong to this drain
+        if self._overflow_spills:
+            await asyncio.gather(*self._overflow_spills)
+        
+        written = await self._drain_spill(session_factory)
+        if written < 0:
+            # DB still unavailable; leave queued rows for the next tick
+            return 0
+        
+        while True:
+            with self._lock:
+                count = min(self.batch_size, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(count)]
+            if not batch:
+                break
+            
+            count, pending = await self._write(session_factory, batch)
+            written += count
+            if pending:
+                with self._lock:
+                    rest = list(self._queue)
+                    self._queue.clear()
+                await self._spill(pending + rest)
+                break
+        
+        metrics.gauge("audit.queue_depth", len(self._queue))
+        return written
+    
+    async def _write(
+        self,
+        session_factory,
+        rows: List[Dict[str, Any]]
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Insert rows, splitting the batch when the database rejects its data.
+        
+        Returns:
+            (rows_written, rows_not_written_because_the_db_is_unavailable)
+        """
+        error = await self._insert(session_factory, rows)
+        if error is None:
+            return len(rows), []
+        
+        if not _is_data_error(error):
+            logger.warning(f"Audit batch write failed ({len(rows)} rows): {error}")
+            metrics.increment("audit.flush_failed")
+            return 0, rows
+        
+        if len(rows) == 1:
+            await self._reject(rows[0], error)
+            return 0, []
+        
+        middle = len(rows) // 2
+        left_count, left_pending = await self._write(session_factory, rows[:middle])
+        if left_pending:
+            return left_count, left_pending + rows[middle:]
+        right_count, right_pending = await self._write(session_factory, rows[middle:])
+        return left_count + right_count, right_pending
+    
+    async def _insert(self, session_factory, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+        """Insert rows with one multi-row INSERT; returns the error, if any."""
+        started = time.perf_counter()
+        try:
+            async with session_factory() as db:
+                await db.execute(insert(AuditLog.__table__), rows)
+                await db.commit()
+        except Exception as e:
+            return e
+        
+        self._last_flush_ms = (time.perf_counter() - started) * 1000
+        self._written += len(rows)
+        metrics.timing("audit.flush_latency", self._last_flush_ms)
+        metrics.increment("audit.rows_written", len(rows))
+        return None
+    
+    async def _reject(self, row: Dict[str, Any], error: Exception) -> None:
+        """Set aside a row the database will never accept."""
+        logger.error(f"Audit row rejected ({row.get('action')}): {error}")
+        metrics.increment("audit.rows_rejected")
+        self._rejected += 1
+        await asyncio.to_thread(self._append, self.rejected_path, [row])
+    
+    # =========================================================================
+    # Spill file
+    # =========================================================================
+    
+    async def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        """Append rows to the local spill file without blocking the loop."""
+        if rows:
+            await asyncio.to_thread(self._spill_sync, rows)
+    
+    def _spill_sync(self, rows: List[Dict[str, Any]]) -> None:
+        if self._append(self.spill_path, rows):
+            self._spilled += len(rows)
+            metrics.increment("audit.rows_spilled", len(rows))
+    
+    def _append(self, path: Path, rows: List[Dict[str, Any]]) -> bool:
+        """Append rows to a JSON-lines file and fsync it (blocking)."""
+        try:
+            with self._spill_lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, default=_json_default) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError as e:
+            logger.error(f"Failed to write {len(rows)} audit rows to {path}: {e}")
+            return False
+        return True
+    
+    async def _drain_spill(self, session_factory) -> int:
+        """
+        Replay the spill file into the DB.
+        
+        Returns:
+            Rows written, or -1 if the DB is still unavailable
+        """
+        draining = self.spill_path.with_suffix(".draining")
+        rows = await asyncio.to_thread(self._take_spill, draining)
+        if rows is None:
+            return 0
+        
+        written = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            count, pending = await self._write(session_factory, batch)
+            written += count
+            if pending:
+                await self._spill(pending + rows[start + self.batch_size:])
+                draining.unlink()
+                return -1
+        
+        draining.unlink()
+        if written:
+            logger.info(f"Replayed {written} spilled audit rows")
+        return written
+    
+    def _take_spill(self, draining: Path) -> Optional[List[Dict[str, Any]]]:
+        """Move the spill file aside and read it (blocking)."""
+        with self._spill_lock:
+            if not draining.exists():
+                if not self.spill_path.exists():
+                    return None
+                os.replace(self.spill_path, draining)
+        
+        rows = []
+        with open(draining, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    rows.append(_row_from_json(line))
+        return rows
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "queue_depth": len(self._queue),
+            "rows_written": self._written,
+            "rows_spilled": self._spilled,
+            "rows_rejected": self._rejected,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "spill_pending": self.spill_path.exists(),
+        }
+
+
+def _is_data_error(error: Exception) -> bool:
+    """
+    True when the database refused the rows themselves.
+    
+    Integrity and data errors, and parameters that could not be bound
+    (a StatementError that never reached the driver), are row problems
+    worth bisecting. Anything else - connection loss, timeouts, a missing
+    table - would fail every row, so the batch is kept for later.
+    """
+    if isinstance(error, (sa_exc.IntegrityError, sa_exc.DataError)):
+        return True
+    return isinstance(error, sa_exc.StatementError) and not isinstance(error, sa_exc.DBAPIError)
+
+
+# Max lengths of the String columns; values are cut to fit before queuing
+_COLUMN_LENGTHS = {
+    column.name: column.type.length
+    for column in AuditLog.__table__.columns
+    if isinstance(column.type, String) and column.type.length
+}
+
+
+def _fit_to_columns(row: Dict[str, Any]) -> Dict[str, Any]:
+    for name, length in _COLUMN_LENGTHS.items():
+        value = row.get(name)
+        if isinstance(value, str) and len(value) > length:
+            row[name] = value[:length]
+    return row
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _row_from_json(line: str) -> Dict[str, Any]:
+    row = json.loads(line)
+    if row.get("created_at"):
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+# Singleton instance
+_audit_sink: Optional[AuditSink] = None
+
+
+def get_audit_sink() -> AuditSink:
+    """Get singleton audit sink."""
+    global _audit_sink
+    if _audit_sink is None:
+        _audit_sink = AuditSink()
+    return _audit_sink
+
+
 class AuditService:
     """
     Audit logging service for security operations.
@@ -31,6 +395,9 @@ class AuditService:
     All methods are async and optimized for minimal latency.
     Logging failures are caught and logged but don't propagate.
     
+    When the AuditSink is running, log() only enqueues; otherwise
+    (scripts, tests) it writes the row on the given session.
+    
     Usage:
         audit = AuditService(db)
         await audit.log_api_key_created(user_id, plugin_id, key_prefix, ip)
@@ -57,20 +424,27 @@ class AuditService:
         
         Fire-and-forget: exceptions are caught and logged.
         """
+        row = _fit_to_columns({
+            "action": action,
+            "user_id": user_id,
+            "api_key_prefix": api_key_prefix,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "details": details,
+            "success": "success" if success else "failure",
+            "error_message": error_message,
+            "created_at": datetime.utcnow(),
+        })
+        
+        sink = get_audit_sink()
+        if sink.is_running:
+            sink.enqueue(row)
+            return
+        
         try:
-            log_entry = AuditLog(
-                action=action,
-                user_id=user_id,
-                api_key_prefix=api_key_prefix,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                details=details,
-                success="success" if success else "failure",
-                error_message=error_message,
-            )
-            self.db.add(log_entry)
+            self.db.add(AuditLog(**row))
             await self.db.commit()
         except Exception as e:
             logger.warning(f"Failed to write audit log: {e}")
@@ -8,15 +8,22 @@ Production-grade rate limiting at multiple levels:
 - IP: Per-IP limits (prevent distributed attacks)
 
 Uses Redis for distributed rate limiting (falls back to in-memory).
-Sliding window algorithm for accurate limiting.
+
+All levels of a request are checked and incremented atomically in a single
+Redis round trip (one Lua script call). Each level uses a sliding-window
+counter: two integer counters per key (current and previous fixed window),
+with the previous window weighted by how much of it still overlaps the
+sliding window. Memory is O(1) per key instead of one ZSET member per hit.
 """
 
-from typing import Dict, Optional, Tuple
+import math
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 from functools import lru_cache
-import asyncio
 import time
 
 from config.settings import settings
@@ -76,17 +83,139 @@ class RateLimitResult:
         return headers
 
 
+class _Counter:
+    """Sliding-window counter state for one key (same algorithm as the Lua script)."""
+    
+    __slots__ = ("window_seconds", "index", "curr", "prev", "last_seen")
+    
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self.index = 0
+        self.curr = 0
+        self.prev = 0
+        self.last_seen = 0.0
+    
+    def advance(self, now: float) -> float:
+        """Roll the fixed windows forward to ``now``; returns fraction elapsed."""
+        index = math.floor(now / self.window_seconds)
+        if index != self.index:
+            self.prev = self.curr if index == self.index + 1 else 0
+            self.curr = 0
+            self.index = index
+        return (now - index * self.window_seconds) / self.window_seconds
+    
+    def estimate(self, fraction: float) -> float:
+        return self.prev * (1 - fraction) + self.curr
+    
+    def retry_after(self, fraction: float, limit: int) -> float:
+        """Seconds until one more request fits under ``limit``."""
+        if self.prev > 0 and self.curr + 1 <= limit:
+            needed = 1 - (limit - 1 - self.curr) / self.prev
+            return max(0.001, (needed - fraction) * self.window_seconds)
+        return (1 - fraction) * self.window_seconds
+
+
 class InMemoryRateLimiter:
     """
-    Simple in-memory rate limiter for development/single-instance.
+    In-memory rate limiter for development/single-instance, and the
+    fallback when Redis is down.
+    
+    - Sliding-window counter per key: two integers, O(1) per update
+    - Keys are spread over shards, each an LRU (OrderedDict) with its own
+      thread lock; no asyncio.Lock, nothing awaits while a lock is held
+    - Idle keys (no hits for two windows, so their count is zero) are
+      evicted incrementally from the LRU head on every call
+    - Memory ceiling: at most max_keys counters; past it, the least
+      recently used key of the shard is dropped
     
-    Uses sliding window algorithm with per-key tracking.
     Not suitable for multi-instance deployments.
     """
     
-    def __init__(self):
-        self._windows: Dict[str, Dict[float, int]] = {}
-        self._lock = asyncio.Lock()
+    SHARDS = 16
+    MAX_KEYS = 200_000
+    EVICT_PER_CALL = 4
+    
+    def __init__(self, shards: int = SHARDS, max_keys: int = MAX_KEYS):
+        self._shards: List["OrderedDict[str, _Counter]"] = [OrderedDict() for _ in range(shards)]
+        self._locks = [Lock() for _ in range(shards)]
+        self._max_per_shard = max(1, max_keys // shards)
+        self.evicted = 0
+    
+    def _shard_of(self, key: str) -> int:
+        return hash(key) % len(self._shards)
+    
+    def _counter(self, shard: int, key: str, window_seconds: int, now: float) -> _Counter:
+        """Get or create a key's counter and mark it most recently used. Caller holds lock."""
+        entries = self._shards[shard]
+        counter = entries.get(key)
+        if counter is None:
+            counter = _Counter(window_seconds)
+            entries[key] = counter
+            if len(entries) > self._max_per_shard:
+                entries.popitem(last=False)
+                self.evicted += 1
+        else:
+            entries.move_to_end(key)
+        counter.last_seen = now
+        return counter
+    
+    def _evict_idle(self, shard: int, now: float) -> None:
+        """Drop a few idle keys from the LRU head. Caller holds lock."""
+        entries = self._shards[shard]
+        for _ in range(self.EVICT_PER_CALL):
+            if not entries:
+                return
+            key = next(iter(entries))
+            counter = entries[key]
+            if now - counter.last_seen < 2 * counter.window_seconds:
+                return
+            del entries[key]
+            self.evicted += 1
+    
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._shards)
+    
+    async def check_levels(
+        self,
+        checks: List[Tuple[str, int, int]]
+    ) -> Tuple[int, int, datetime]:
+        """
+        Check several (key, limit, window_seconds) levels as one unit.
+        
+        Nothing is incremented unless every level allows the request.
+        
+        Returns: (denied_index or -1, current_count, reset_time)
+        """
+        now = time.time()
+        if not checks:
+            return -1, 0, datetime.fromtimestamp(now)
+        
+        shards = sorted({self._shard_of(key) for key, _, _ in checks})
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            counters = []
+            for index, (key, limit, window_seconds) in enumerate(checks):
+                counter = self._counter(self._shard_of(key), key, window_seconds, now)
+                fraction = counter.advance(now)
+                estimate = counter.estimate(fraction)
+                if estimate + 1 > limit:
+                    reset_at = datetime.fromtimestamp(now + counter.retry_after(fraction, limit))
+                    return index, int(estimate), reset_at
+                counters.append((counter, fraction, estimate))
+            
+            for counter, _, _ in counters:
+                counter.curr += 1
+            
+            for shard in shards:
+                self._evict_idle(shard, now)
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+        
+        counter, fraction, estimate = counters[-1]
+        reset_at = datetime.fromtimestamp(now + (1 - fraction) * counter.window_seconds)
+        return -1, int(estimate + 1), reset_at
     
     async def check_and_increment(
         self,
@@ -99,58 +228,89 @@ class InMemoryRateLimiter:
         
         Returns: (allowed, current_count, reset_time)
         """
-        async with self._lock:
-            now = time.time()
-            window_start = now - window_seconds
-            
-            # Initialize or get window
-            if key not in self._windows:
-                self._windows[key] = {}
-            
-            window = self._windows[key]
-            
-            # Clean old entries
-            window = {ts: count for ts, count in window.items() if ts > window_start}
-            self._windows[key] = window
-            
-            # Count current requests
-            current_count = sum(window.values())
-            
-            # Check limit
-            if current_count >= limit:
-                reset_at = datetime.fromtimestamp(min(window.keys()) + window_seconds)
-                return False, current_count, reset_at
-            
-            # Increment
-            window[now] = window.get(now, 0) + 1
-            reset_at = datetime.fromtimestamp(now + window_seconds)
-            
-            return True, current_count + 1, reset_at
+        denied, count, reset_at = await self.check_levels([(key, limit, window_seconds)])
+        return denied < 0, count, reset_at
     
     async def get_count(self, key: str, window_seconds: int) -> int:
-        """Get current count without incrementing."""
-        async with self._lock:
-            now = time.time()
-            window_start = now - window_seconds
-            
-            if key not in self._windows:
+        """Get current (weighted) count without incrementing."""
+        shard = self._shard_of(key)
+        with self._locks[shard]:
+            counter = self._shards[shard].get(key)
+            if counter is None:
                 return 0
-            
-            window = self._windows[key]
-            return sum(count for ts, count in window.items() if ts > window_start)
+            fraction = counter.advance(time.time())
+            return int(counter.estimate(fraction))
+
+
+# Sliding-window counter check for N levels, all-or-nothing.
+#
+# KEYS: for each level, its current-window and previous-window counter keys
+# ARGV: for each level: limit, window_ms, fraction of the current window
+#       elapsed (0..1), ms until the current window ends
+#
+# Returns {denied_level (0 = allowed, else 1-based), count, retry/reset ms}
+MULTI_LEVEL_LUA = """
+local levels = #KEYS / 2
+local estimates = {}
+
+for i = 1, levels do
+    local base = 4 * (i - 1)
+    local limit = tonumber(ARGV[base + 1])
+    local window_ms = tonumber(ARGV[base + 2])
+    local fraction = tonumber(ARGV[base + 3])
+    local curr = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local prev = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    local estimate = prev * (1 - fraction) + curr
+    if estimate + 1 > limit then
+        local retry_ms = tonumber(ARGV[base + 4])
+        if prev > 0 and curr + 1 <= limit then
+            local needed = 1 - (limit - 1 - curr) / prev
+            retry_ms = math.max(1, math.ceil((needed - fraction) * window_ms))
+        end
+        return {i, math.floor(estimate), retry_ms}
+    end
+    estimates[i] = estimate
+end
+
+for i = 1, levels do
+    local window_ms = tonumber(ARGV[4 * (i - 1) + 2])
+    redis.call('INCR', KEYS[2 * i - 1])
+    redis.call('PEXPIRE', KEYS[2 * i - 1], window_ms * 2)
+end
+
+return {0, math.floor(estimates[levels] + 1), tonumber(ARGV[4 * levels])}
+"""
+
+
+def window_keys(key: str, window_seconds: int, now: float) -> Tuple[str, str, float, float]:
+    """
+    Counter keys and position for the fixed window containing ``now``.
+    
+    Returns: (current_key, previous_key, fraction_elapsed, seconds_until_window_end)
+    """
+    index = math.floor(now / window_seconds)
+    elapsed = now - index * window_seconds
+    return (
+        f"{key}:{index}",
+        f"{key}:{index - 1}",
+        elapsed / window_seconds,
+        window_seconds - elapsed,
+    )
 
 
 class RedisRateLimiter:
     """
     Redis-based rate limiter for production/multi-instance.
     
-    Uses sliding window log algorithm with sorted sets.
+    Uses a sliding-window counter evaluated by a Lua script, so any number
+    of levels is checked and incremented atomically in one round trip.
     Falls back to in-memory if Redis unavailable.
     """
     
     def __init__(self, redis_url: Optional[str] = None):
         self._redis_url = redis_url or settings.REDIS_URL
         self._redis = None
+        self._script = None
         self._fallback = InMemoryRateLimiter()
     
     async def _get_redis(self):
@@ -160,68 +320,79 @@ class RedisRateLimiter:
                 import redis.asyncio as redis
                 self._redis = redis.from_url(self._redis_url)
                 await self._redis.ping()
+                # EVALSHA with automatic EVAL on NOSCRIPT
+                self._script = self._redis.register_script(MULTI_LEVEL_LUA)
                 logger.info("Multi-level rate limiter using Redis")
             except Exception as e:
                 logger.warning(f"Redis unavailable, using in-memory: {e}")
                 self._redis = False  # Mark as unavailable
         return self._redis if self._redis else None
     
+    async def check_levels(
+        self,
+        checks: List[Tuple[str, int, int]]
+    ) -> Tuple[int, int, datetime]:
+        """
+        Check and increment several (key, limit, window_seconds) levels
+        in one atomic script call.
+        
+        Returns: (denied_index or -1, current_count, reset_time)
+        """
+        if not checks:
+            return -1, 0, datetime.now()
+        
+        redis = await self._get_redis()
+        if not redis:
+            return await self._fallback.check_levels(checks)
+        
+        now = time.time()
+        keys: List[str] = []
+        args: List[object] = []
+        for key, limit, window_seconds in checks:
+            current_key, previous_key, fraction, remaining = window_keys(key, window_seconds, now)
+            keys += [current_key, previous_key]
+            args += [limit, window_seconds * 1000, repr(fraction), math.ceil(remaining * 1000)]
+        
+        try:
+            denied, count, wait_ms = await self._script(keys=keys, args=args)
+        except Exception as e:
+            logger.warning(f"Redis error, falling back: {e}")
+            return await self._fallback.check_levels(checks)
+        
+        reset_at = datetime.fromtimestamp(now + int(wait_ms) / 1000)
+        return int(denied) - 1, int(count), reset_at
+    
     async def check_and_increment(
         self,
         key: str,
         limit: int,
         window_seconds: int
     ) -> Tuple[bool, int, datetime]:
-        """Check and increment using Redis sorted set."""
+        """Check and increment a single key."""
+        denied, count, reset_at = await self.check_levels([(key, limit, window_seconds)])
+        return denied < 0, count, reset_at
+    
+    async def get_count(self, key: str, window_seconds: int) -> int:
+        """Current (weighted) count without incrementing."""
         redis = await self._get_redis()
-        
         if not redis:
-            return await self._fallback.check_and_increment(key, limit, window_seconds)
+            return await self._fallback.get_count(key, window_seconds)
         
+        current_key, previous_key, fraction, _ = window_keys(key, window_seconds, time.time())
         try:
-            now = time.time()
-            window_start = now - window_seconds
-            
-            pipe = redis.pipeline()
-            
-            # Remove old entries
-            pipe.zremrangebyscore(key, 0, window_start)
-            
-            # Count current
-            pipe.zcard(key)
-            
-            # Add new entry
-            pipe.zadd(key, {str(now): now})
-            
-            # Set expiry
-            pipe.expire(key, window_seconds + 1)
-            
-            results = await pipe.execute()
-            current_count = results[1]
-            
-            if current_count >= limit:
-                # Get oldest timestamp for reset time
-                oldest = await redis.zrange(key, 0, 0, withscores=True)
-                if oldest:
-                    reset_at = datetime.fromtimestamp(oldest[0][1] + window_seconds)
-                else:
-                    reset_at = datetime.fromtimestamp(now + window_seconds)
-                return False, current_count, reset_at
-            
-            reset_at = datetime.fromtimestamp(now + window_seconds)
-            return True, current_count + 1, reset_at
-            
+            curr, prev = await redis.mget(current_key, previous_key)
         except Exception as e:
             logger.warning(f"Redis error, falling back: {e}")
-            return await self._fallback.check_and_increment(key, limit, window_seconds)
+            return await self._fallback.get_count(key, window_seconds)
+        return int(int(prev or 0) * (1 - fraction) + int(curr or 0))
 
 
 class MultiLevelRateLimiter:
     """
     Multi-level rate limiter checking all configured levels.
     
-    Checks in order: IP -> User -> Plugin -> API Key
-    Stops at first failure.
+    Checks in order: IP -> User -> Plugin -> API Key, atomically in a
+    single backend call.
     
     Usage:
         limiter = get_rate_limiter()
@@ -254,8 +425,9 @@ class MultiLevelRateLimiter:
         """
         Check all rate limits.
         
-        Checks in order: IP -> User -> Plugin -> API Key
-        Returns on first failure or success if all pass.
+        Levels are evaluated in order IP -> User -> Plugin -> API Key; the
+        first level over its limit is reported. Counters are only
+        incremented when every level allows the request.
         """
         checks = []
         
@@ -277,33 +449,35 @@ class MultiLevelRateLimiter:
             window = DEFAULT_LIMITS[RateLimitLevel.API_KEY].window_seconds
             checks.append((RateLimitLevel.API_KEY, str(api_key_id), limit, window))
         
-        # Check each level
-        for level, identifier, limit, window in checks:
-            key = self._make_key(level, identifier)
-            allowed, count, reset_at = await self._backend.check_and_increment(key, limit, window)
-            
-            if not allowed:
-                retry_after = int((reset_at - datetime.now()).total_seconds())
-                return RateLimitResult(
-                    allowed=False,
-                    level=level,
-                    current_count=count,
-                    limit=limit,
-                    reset_at=reset_at,
-                    retry_after_seconds=max(1, retry_after)
-                )
+        if not checks:
+            return RateLimitResult(allowed=True)
         
-        # All checks passed - return last check's info (most specific)
-        if checks:
-            _, _, limit, _ = checks[-1]
+        # All levels in one atomic call; nothing is counted if any level denies
+        denied, count, reset_at = await self._backend.check_levels([
+            (self._make_key(level, identifier), limit, window)
+            for level, identifier, limit, window in checks
+        ])
+        
+        if denied >= 0:
+            level, _, limit, _ = checks[denied]
+            retry_after = int((reset_at - datetime.now()).total_seconds())
             return RateLimitResult(
-                allowed=True,
-                current_count=count if 'count' in dir() else 0,
+                allowed=False,
+                level=level,
+                current_count=count,
                 limit=limit,
-                reset_at=reset_at if 'reset_at' in dir() else None
+                reset_at=reset_at,
+                retry_after_seconds=max(1, retry_after)
             )
         
-        return RateLimitResult(allowed=True)
+        # All checks passed - return last check's info (most specific)
+        _, _, limit, _ = checks[-1]
+        return RateLimitResult(
+            allowed=True,
+            current_count=count,
+            limit=limit,
+            reset_at=reset_at
+        )
     
     async def get_usage(
         self,
@@ -314,7 +488,7 @@ class MultiLevelRateLimiter:
         config = DEFAULT_LIMITS[level]
         key = self._make_key(level, identifier)
         
-        count = await self._backend._fallback.get_count(key, config.window_seconds)
+        count = await self._backend.get_count(key, config.window_seconds)
         
         return {
             "current": count,
@@ -0,0 +1,208 @@
+"""
+Correction Automaton
+
+Aho-Corasick multi-pattern matcher for vocabulary corrections.
+
+All correction rules are compiled into a single automaton, so applying them
+to a transcript is one pass over the text regardless of how many rules
+exist. Matching is case-insensitive, respects word boundaries and resolves
+overlaps leftmost-longest (e.g. "g mail account" wins over "g mail").
+
+Rules can be added and removed without rebuilding from scratch: the trie
+is extended in place and failure links are recomputed lazily, on the next
+match after a change.
+
+Usage:
+    automaton = CorrectionAutomaton()
+    automaton.add("karval", "Karwal")
+    text, counts = automaton.replace("My name is Karval")
+"""
+
+from collections import deque
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class CorrectionAutomaton:
+    """Aho-Corasick automaton mapping heard phrases to corrections."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Node arrays (index 0 is the root)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[Optional[str]] = [None]
+        self._dict_link: List[int] = [0]
+        self._replacements: Dict[str, str] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._replacements)
+
+    def __contains__(self, heard: str) -> bool:
+        return heard.lower() in self._replacements
+
+    # =========================================================================
+    # Mutation
+    # =========================================================================
+
+    def add(self, heard: str, correct: str) -> None:
+        """Add or update a rule."""
+        key = heard.lower()
+        if not key:
+            return
+
+        with self._lock:
+            if key not in self._replacements:
+                node = 0
+                for char in key:
+                    nxt = self._goto[node].get(char)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._terminal.append(None)
+                        self._dict_link.append(0)
+                        self._goto[node][char] = nxt
+                    node = nxt
+                self._terminal[node] = key
+                self._dirty = True
+            self._replacements[key] = correct
+
+    def remove(self, heard: str) -> bool:
+        """Remove a rule. Trie nodes are kept; only the output is cleared."""
+        key = heard.lower()
+
+        with self._lock:
+            if self._replacements.pop(key, None) is None:
+                return False
+
+            node = 0
+            for char in key:
+                node = self._goto[node][char]
+            self._terminal[node] = None
+            self._dirty = True
+            return True
+
+    def load(self, rules: Dict[str, str]) -> None:
+        """Replace all rules with ``rules`` (heard -> correct)."""
+        with self._lock:
+            self._reset()
+        for heard, correct in rules.items():
+            self.add(heard, correct)
+
+    def _build_links(self) -> None:
+        """Recompute failure and dictionary-suffix links (BFS). Caller holds lock."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._dict_link[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                if fail == child:
+                    fail = 0
+                self._fail[child] = fail
+                self._dict_link[child] = fail if self._terminal[fail] else self._dict_link[fail]
+                queue.append(child)
+
+        self._dirty = False
+
+    # =========================================================================
+    # Matching
+    # =========================================================================
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find non-overlapping rule matches in ``text``.
+
+        Returns:
+            List of (start, end, heard) spans, left to right
+        """
+        if not text:
+            return []
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Some characters expand when lowercased; keep offsets aligned
+            lowered = "".join(c.lower()[0] for c in text)
+
+        candidates: List[Tuple[int, int, str]] = []
+
+        with self._lock:
+            if not self._replacements:
+                return []
+            if self._dirty:
+                self._build_links()
+
+            goto, fail, terminal, dict_link = self._goto, self._fail, self._terminal, self._dict_link
+            node = 0
+            for index, char in enumerate(lowered):
+                while node and char not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(char, 0)
+
+                out = node if terminal[node] else dict_link[node]
+                while out:
+                    key = terminal[out]
+                    candidates.append((index + 1 - len(key), index + 1, key))
+                    out = dict_link[out]
+
+        # Word boundaries (only enforced where the phrase edge is a word char)
+        length = len(text)
+        bounded = [
+            (start, end, key) for start, end, key in candidates
+            if (start == 0 or not _is_word_char(key[0]) or not _is_word_char(text[start - 1]))
+            and (end == length or not _is_word_char(key[-1]) or not _is_word_char(text[end]))
+        ]
+
+        # Leftmost-longest, non-overlapping
+        bounded.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        selected = []
+        cursor = 0
+        for start, end, key in bounded:
+            if start >= cursor:
+                selected.append((start, end, key))
+                cursor = end
+        return selected
+
+    def replace(self, text: str) -> Tuple[str, Dict[str, int]]:
+        """
+        Apply all rules to ``text`` in a single pass.
+
+        Returns:
+            (corrected_text, {heard: count})
+        """
+        matches = self.find(text)
+        if not matches:
+            return text, {}
+
+        parts = []
+        counts: Dict[str, int] = {}
+        cursor = 0
+        for start, end, key in matches:
+            correct = self._replacements.get(key)
+            if correct is None:
+                continue
+            parts.append(text[cursor:start])
+            parts.append(correct)
+            cursor = end
+            counts[key] = counts.get(key, 0) + 1
+        parts.append(text[cursor:])
+        return "".join(parts), counts
+
+    def replacement_for(self, heard: str) -> Optional[str]:
+        return self._replacements.get(heard.lower())
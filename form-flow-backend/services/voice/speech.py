@@ -6,6 +6,7 @@ Provides text-to-speech functionality with:
 - Edge TTS fallback (free - Microsoft voices)
 - Audio caching (reduces API costs)
 - Automatic retry with exponential backoff
+- Async streaming (stream_speech) for low time-to-first-byte
 
 Usage:
     from services.voice.speech import SpeechService
@@ -17,11 +18,12 @@ Usage:
 import os
 import hashlib
 import asyncio
-from typing import Optional, Dict, Any, Generator
+from typing import Optional, Dict, Any, Generator, AsyncIterator
 from collections import OrderedDict
 from functools import lru_cache
 import time
 
+import httpx
 import requests
 
 from utils.logging import get_logger, log_api_call
@@ -140,6 +142,7 @@ class SpeechService:
         
         # Reusable HTTP session for connection pooling (saves TCP+TLS handshake per request)
         self._session = requests.Session()
+        self._async_client: Optional[httpx.AsyncClient] = None
         
         # Track ElevenLabs quota status
         self._elevenlabs_available = bool(self.api_key)
@@ -333,16 +336,123 @@ class SpeechService:
         
         return prompts.get(field_type, f"Please provide {label}")
 
+    # =========================================================================
+    # Async Streaming
+    # =========================================================================
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Pooled async client for streaming requests."""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0))
+        return self._async_client
+
+    async def stream_speech(
+        self,
+        text: str,
+        voice_id: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream speech audio chunks as the provider produces them.
+        
+        ElevenLabs streaming endpoint first, Edge TTS as fallback when
+        ElevenLabs returns nothing. Cached audio is yielded as a single
+        chunk; a completed stream is added to the cache.
+        
+        Raises:
+            Exception: If the provider fails after audio was already yielded
+                (the partial audio is not cached)
+        """
+        target_voice_id = voice_id or self.default_voice_id
+        
+        if self._cache:
+            cached = self._cache.get(text, target_voice_id)
+            if cached:
+                yield cached
+                return
+        
+        received = bytearray()
+        if self._elevenlabs_available:
+            async for chunk in self._elevenlabs_astream(text, target_voice_id):
+                received.extend(chunk)
+                yield chunk
+        
+        if not received and HAS_EDGE_TTS:
+            async for chunk in self._edge_tts_astream(text):
+                received.extend(chunk)
+                yield chunk
+        
+        if received and self._cache:
+            self._cache.set(text, target_voice_id, bytes(received))
+
+    async def _elevenlabs_astream(self, text: str, voice_id: str) -> AsyncIterator[bytes]:
+        """ElevenLabs /stream endpoint via httpx; yields nothing on upfront failure."""
+        url = f"{self.API_BASE}/text-to-speech/{voice_id}/stream"
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.api_key
+        }
+        data = {
+            "text": text,
+            "model_id": self.model,
+            "voice_settings": {
+                "stability": 0.5,
+                "similarity_boost": 0.75
+            }
+        }
+        
+        started = False
+        try:
+            async with self._get_async_client().stream("POST", url, json=data, headers=headers) as response:
+                if response.status_code != 200:
+                    body = (await response.aread())[:200]
+                    if response.status_code in (401, 429):
+                        # Invalid key or quota exceeded - same handling as _elevenlabs_tts
+                        logger.warning(f"ElevenLabs stream unavailable: status {response.status_code}")
+                        self._elevenlabs_available = False
+                    else:
+                        logger.error(f"ElevenLabs stream error {response.status_code}: {body!r}")
+                    log_api_call("ElevenLabs", "text-to-speech-stream", success=False,
+                                 error=f"status {response.status_code}")
+                    return
+                
+                async for chunk in response.aiter_bytes():
+                    if chunk:
+                        started = True
+                        yield chunk
+            log_api_call("ElevenLabs", "text-to-speech-stream", success=True)
+        except Exception as e:
+            log_api_call("ElevenLabs", "text-to-speech-stream", success=False, error=str(e))
+            if started:
+                raise
+            logger.error(f"ElevenLabs stream exception: {e}")
+
+    async def _edge_tts_astream(self, text: str) -> AsyncIterator[bytes]:
+        """Edge TTS audio chunks; yields nothing on upfront failure."""
+        started = False
+        try:
+            communicate = edge_tts.Communicate(text, self.EDGE_TTS_VOICE)
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio" and chunk["data"]:
+                    started = True
+                    yield chunk["data"]
+        except Exception as e:
+            log_api_call("EdgeTTS", "text-to-speech-stream", success=False, error=str(e))
+            if started:
+                raise
+            logger.error(f"Edge TTS stream error: {e}")
+
     def get_streaming_response(
         self,
         text: str,
         voice_id: Optional[str] = None
     ) -> Generator[bytes, None, None]:
         """
-        Get streaming audio response for longer texts.
+        Get streaming audio response for longer texts (blocking).
         
         Yields audio chunks as they are generated, reducing latency
-        for the first audio playback.
+        for the first audio playback. Async callers should use
+        stream_speech instead.
         """
         if not self.api_key:
             # Try Edge TTS for streaming fallback
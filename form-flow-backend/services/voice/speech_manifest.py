@@ -0,0 +1,401 @@
+"""
+Speech Manifest
+
+Bounded per-(form, field) store of pre-generated TTS prompts.
+
+Each scraped form is registered with its fields in conversation order
+(the order FieldClusterer batches them in). When the prompt for one field
+is requested, audio for the next few fields is generated in the
+background so later prompts play instantly. Uncached prompts are
+streamed from the provider; concurrent requests for the same prompt
+share one upstream stream, which is teed into the manifest. Forms and audio are evicted
+LRU, so memory stays within a fixed budget no matter how many forms are
+scraped.
+
+Usage:
+    from core.dependencies import get_speech_manifest
+
+    manifest = get_speech_manifest()
+    form_id = manifest.register_form(url, form_schema)
+    audio = await manifest.get_audio(form_id, "email", speech_service)
+
+    async for chunk in manifest.stream_audio(form_id, "email", speech_service):
+        ...
+"""
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.logging import get_logger
+from utils.telemetry import metrics
+
+logger = get_logger(__name__)
+
+
+def form_key(form_url: str) -> str:
+    """Stable manifest id for a form URL."""
+    return hashlib.sha1((form_url or '').encode('utf-8')).hexdigest()[:16]
+
+
+async def provider_stream(speech_service: Any, text: str) -> AsyncIterator[bytes]:
+    """
+    Audio chunks from a speech service.
+
+    Uses the async stream_speech when the service has one, otherwise runs
+    the blocking text_to_speech in a worker thread and yields one chunk.
+    """
+    stream_speech = getattr(speech_service, 'stream_speech', None)
+    if stream_speech is not None:
+        async for chunk in stream_speech(text):
+            yield chunk
+        return
+
+    audio = await asyncio.get_running_loop().run_in_executor(None, speech_service.text_to_speech, text)
+    if audio:
+        yield audio
+
+
+class SharedAudioStream:
+    """
+    One upstream audio stream fanned out to any number of readers.
+
+    A background task pumps the source into a chunk list; readers replay
+    what has arrived so far and then follow live. The upstream keeps
+    running if every reader disconnects, so the complete audio still
+    reaches on_done (and the cache).
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterator[bytes],
+        on_done: Optional[Callable[[Optional[bytes]], None]] = None,
+    ):
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._on_done = on_done
+        self._changed = asyncio.Event()
+        self.task = asyncio.create_task(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[bytes]) -> Optional[bytes]:
+        try:
+            async for chunk in source:
+                if chunk:
+                    self.chunks.append(chunk)
+                    self._notify()
+        except Exception as e:
+            logger.warning(f"Speech stream failed after {len(self.chunks)} chunks: {e}")
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+        audio = b''.join(self.chunks) if self.chunks and self.error is None else None
+        if self._on_done:
+            self._on_done(audio)
+        return audio
+
+    def _notify(self) -> None:
+        event, self._changed = self._changed, asyncio.Event()
+        event.set()
+
+    async def read(self) -> AsyncIterator[bytes]:
+        """Every chunk from the start of the stream; ends when the upstream does."""
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                return
+            await self._changed.wait()
+
+    async def result(self) -> Optional[bytes]:
+        """Complete audio, or None if the upstream failed or produced nothing."""
+        return await asyncio.shield(self.task)
+
+
+@dataclass
+class FormSpeech:
+    """Speech metadata for one registered form."""
+    form_id: str
+    fields: Dict[str, Dict[str, Any]]
+    order: List[str]
+    position: Dict[str, int] = field(default_factory=dict)
+    cached: Set[str] = field(default_factory=set)
+
+    def __post_init__(self):
+        self.position = {name: i for i, name in enumerate(self.order)}
+
+
+class SpeechManifest:
+    """
+    LRU-bounded speech audio keyed by (form_id, field_name).
+
+    Two bounds apply: the number of registered forms and the total bytes
+    of cached audio. Evicting a form drops all of its audio.
+    """
+
+    def __init__(
+        self,
+        max_forms: int = 64,
+        max_bytes: int = 32 * 1024 * 1024,
+        prefetch_ahead: int = 3,
+        max_concurrent_prefetch: int = 2,
+    ):
+        """
+        Args:
+            max_forms: Registered forms kept before the least recent is dropped
+            max_bytes: Budget for cached audio across all forms
+            prefetch_ahead: Fields generated ahead of the one being asked
+            max_concurrent_prefetch: TTS calls allowed in flight for prefetch
+        """
+        self.max_forms = max_forms
+        self.max_bytes = max_bytes
+        self.prefetch_ahead = prefetch_ahead
+        self.max_concurrent_prefetch = max_concurrent_prefetch
+
+        self._forms: "OrderedDict[str, FormSpeech]" = OrderedDict()
+        self._audio: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[Tuple[str, str], SharedAudioStream] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # =========================================================================
+    # Forms
+    # =========================================================================
+
+    def register_form(self, form_url: str, form_schema: List[Dict[str, Any]]) -> str:
+        """
+        Register (or refresh) a form and compute its conversation order.
+
+        Returns:
+            The form's manifest id
+        """
+        from services.ai.extraction.form_plan import FormPlan
+
+        form_id = form_key(form_url)
+        plan = FormPlan(form_schema)
+        order = [f.get('name') for batch in plan.create_batches(plan.fields) for f in batch if f.get('name')]
+
+        previous = self._forms.pop(form_id, None)
+        entry = FormSpeech(form_id=form_id, fields=dict(plan.by_name), order=order)
+        if previous:
+            # Keep audio for prompts that did not change
+            for name in previous.cached:
+                if name in entry.fields and entry.fields[name] == previous.fields.get(name):
+                    entry.cached.add(name)
+                else:
+                    self._drop_audio(form_id, name)
+        self._forms[form_id] = entry
+
+        while len(self._forms) > self.max_forms:
+            evicted_id, evicted = self._forms.popitem(last=False)
+            for name in list(evicted.cached):
+                self._drop_audio(evicted_id, name)
+            metrics.increment("speech_manifest.evicted", tags={"kind": "form"})
+
+        return form_id
+
+    def get_form(self, form_id: Optional[str]) -> Optional[FormSpeech]:
+        entry = self._forms.get(form_id) if form_id else None
+        if entry:
+            self._forms.move_to_end(form_id)
+        return entry
+
+    def find_form(self, field_name: str) -> Optional[str]:
+        """Most recently used form containing a field (for clients that send no form)."""
+        for form_id in reversed(self._forms):
+            if field_name in self._forms[form_id].fields:
+                return form_id
+        return None
+
+    def next_fields(self, form_id: str, field_name: Optional[str], count: int) -> List[str]:
+        """The `count` fields after `field_name` in conversation order (first ones if None)."""
+        entry = self._forms.get(form_id)
+        if not entry or count <= 0:
+            return []
+        start = 0 if field_name is None else entry.position.get(field_name, -1) + 1
+        if field_name is not None and start == 0:
+            return []
+        return entry.order[start:start + count]
+
+    # =========================================================================
+    # Audio
+    # =========================================================================
+
+    def cached_audio(self, form_id: str, field_name: str) -> Optional[bytes]:
+        audio = self._audio.get((form_id, field_name))
+        if audio is not None:
+            self._audio.move_to_end((form_id, field_name))
+        return audio
+
+    def store_audio(self, form_id: str, field_name: str, audio: bytes) -> bool:
+        """Cache audio for a registered form's field, evicting LRU audio to fit."""
+        entry = self._forms.get(form_id)
+        if not entry or not audio or len(audio) > self.max_bytes:
+            return False
+
+        self._drop_audio(form_id, field_name)
+        while self._bytes + len(audio) > self.max_bytes and self._audio:
+            (old_form, old_field), _ = next(iter(self._audio.items()))
+            self._drop_audio(old_form, old_field)
+            metrics.increment("speech_manifest.evicted", tags={"kind": "audio"})
+
+        self._audio[(form_id, field_name)] = audio
+        self._bytes += len(audio)
+        entry.cached.add(field_name)
+        metrics.gauge("speech_manifest.bytes", self._bytes)
+        return True
+
+    def _drop_audio(self, form_id: str, field_name: str) -> None:
+        audio = self._audio.pop((form_id, field_name), None)
+        if audio is not None:
+            self._bytes -= len(audio)
+        entry = self._forms.get(form_id)
+        if entry:
+            entry.cached.discard(field_name)
+
+    async def get_audio(
+        self,
+        form_id: Optional[str],
+        field_name: str,
+        speech_service: Any,
+        prefetch: bool = True,
+    ) -> Optional[bytes]:
+        """
+        Complete audio for a field's prompt: cached, shared with an in-flight
+        stream, or generated now. Prefetches the following fields.
+        """
+        audio = self._lookup(form_id, field_name)
+        if audio is None:
+            stream = self.open_stream(form_id, field_name, speech_service)
+            if prefetch and form_id:
+                self.prefetch(form_id, field_name, speech_service)
+            return await stream.result()
+
+        if prefetch and form_id:
+            self.prefetch(form_id, field_name, speech_service)
+        return audio
+
+    async def stream_audio(
+        self,
+        form_id: Optional[str],
+        field_name: str,
+        speech_service: Any,
+        prefetch: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """
+        Audio chunks for a field's prompt as soon as the provider sends them.
+
+        Cached audio is yielded in one chunk. Otherwise the caller reads
+        from the shared upstream stream for this (form, field), which is
+        stored in the manifest once complete.
+        """
+        audio = self._lookup(form_id, field_name)
+        stream = None if audio is not None else self.open_stream(form_id, field_name, speech_service)
+        if prefetch and form_id:
+            self.prefetch(form_id, field_name, speech_service)
+
+        if audio is not None:
+            yield audio
+            return
+        async for chunk in stream.read():
+            yield chunk
+
+    def _lookup(self, form_id: Optional[str], field_name: str) -> Optional[bytes]:
+        audio = self.cached_audio(form_id, field_name) if self.get_form(form_id) else None
+        metrics.increment("speech_manifest.lookup", tags={"result": "hit" if audio else "miss"})
+        return audio
+
+    def prefetch(
+        self,
+        form_id: str,
+        after_field: Optional[str],
+        speech_service: Any,
+        count: Optional[int] = None,
+    ) -> List[asyncio.Task]:
+        """Generate audio for the next fields in the background."""
+        tasks = []
+        for name in self.next_fields(form_id, after_field, self.prefetch_ahead if count is None else count):
+            key = (form_id, name)
+            if key in self._audio or key in self._inflight:
+                continue
+            task = self.open_stream(form_id, name, speech_service, background=True).task
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            tasks.append(task)
+        if tasks:
+            metrics.increment("speech_manifest.prefetch", value=len(tasks))
+        return tasks
+
+    def open_stream(
+        self,
+        form_id: Optional[str],
+        field_name: str,
+        speech_service: Any,
+        background: bool = False,
+    ) -> 'SharedAudioStream':
+        """The in-flight upstream stream for a field, starting one if needed."""
+        key = (form_id, field_name)
+        stream = self._inflight.get(key)
+        if stream is not None:
+            metrics.increment("speech_manifest.shared_stream")
+            return stream
+
+        entry = self._forms.get(form_id) if form_id else None
+        field_info = (entry.fields.get(field_name) if entry else None) or {
+            'name': field_name, 'type': 'text', 'label': field_name
+        }
+
+        def on_done(audio: Optional[bytes]) -> None:
+            self._inflight.pop(key, None)
+            if audio and form_id:
+                self.store_audio(form_id, field_name, audio)
+
+        stream = SharedAudioStream(self._synthesize(field_info, speech_service, background), on_done)
+        self._inflight[key] = stream
+        return stream
+
+    async def _synthesize(
+        self,
+        field_info: Dict[str, Any],
+        speech_service: Any,
+        background: bool,
+    ) -> AsyncIterator[bytes]:
+        """Provider audio stream for a field prompt (prefetches share a concurrency limit)."""
+        prompt = speech_service._create_field_prompt(field_info)
+        if not prompt:
+            return
+        if not background:
+            async for chunk in provider_stream(speech_service, prompt):
+                yield chunk
+            return
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_prefetch)
+        async with self._semaphore:
+            async for chunk in provider_stream(speech_service, prompt):
+                yield chunk
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def clear(self) -> None:
+        self._forms.clear()
+        self._audio.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "forms": len(self._forms),
+            "cached_prompts": len(self._audio),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "inflight": len(self._inflight),
+        }
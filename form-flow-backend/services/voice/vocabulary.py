@@ -3,16 +3,22 @@ Vocabulary Correction Service
 
 Handles logic for managing and applying vocabulary corrections.
 Supports Async DB operations for management and Sync caching for high-performance application.
+
+Corrections are compiled into a single Aho-Corasick automaton (see
+correction_automaton.py), kept in sync incrementally on add/delete.
+Usage counts are accumulated in memory and written back in batches.
 """
 
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete
-import re
+from sqlalchemy import select, func, delete, update, bindparam
+from collections import Counter
 from datetime import datetime
 from threading import Lock
+import asyncio
 
 from core.vocabulary_model import VocabularyCorrection
+from services.voice.correction_automaton import CorrectionAutomaton
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -20,11 +26,16 @@ logger = get_logger(__name__)
 class VocabularyService:
     """Service for managing vocabulary corrections."""
     
+    USAGE_FLUSH_INTERVAL_SECONDS = 30
+    
     def __init__(self):
-        # Cache is a list of dicts: {'pattern': regex_obj, 'correct': str, 'heard': str}
-        self._cache = []
-        self._cache_lock = Lock()
+        # All correction rules compiled into one multi-pattern automaton
+        self._automaton = CorrectionAutomaton()
         self._initialized = False
+        
+        # Pending usage counts (heard -> uses) awaiting a batched DB write
+        self._pending_usage: Counter = Counter()
+        self._usage_lock = Lock()
     
     async def initialize(self, db: AsyncSession):
         """Load corrections into cache on startup."""
@@ -34,26 +45,14 @@ class VocabularyService:
         logger.info("Initializing Vocabulary Service Cache...")
         await self._refresh_cache(db)
         self._initialized = True
-        logger.info(f"Vocabulary Service Cache Initialized with {len(self._cache)} rules.")
+        logger.info(f"Vocabulary Service Cache Initialized with {len(self._automaton)} rules.")
 
     async def _refresh_cache(self, db: AsyncSession):
         """Reload cache from DB."""
-        result = await db.execute(select(VocabularyCorrection))
-        corrections = result.scalars().all()
-        
-        new_cache = []
-        for c in corrections:
-            try:
-                new_cache.append({
-                    "heard": c.heard,
-                    "correct": c.correct,
-                    "pattern": re.compile(re.escape(c.heard), re.IGNORECASE)
-                })
-            except Exception as e:
-                logger.error(f"Failed to compile regex for correction {c.heard}: {e}")
-                
-        with self._cache_lock:
-            self._cache = new_cache
+        result = await db.execute(
+            select(VocabularyCorrection.heard, VocabularyCorrection.correct)
+        )
+        self._automaton.load({heard: correct for heard, correct in result.all()})
 
     async def get_corrections(self, db: AsyncSession, limit: int = 100) -> List[VocabularyCorrection]:
         """Get all vocabulary corrections, ordered by usage."""
@@ -97,8 +96,8 @@ class VocabularyService:
             logger.info(f"Added correction: '{heard}' -> '{correct}'")
             correction = new_correction
             
-        # Refresh cache
-        await self._refresh_cache(db)
+        # Update cache in place
+        self._automaton.add(correction.heard, correction.correct)
         return correction
     
     async def delete_correction(self, db: AsyncSession, correction_id: int) -> bool:
@@ -111,43 +110,41 @@ class VocabularyService:
         if not correction:
             return False
             
+        heard = correction.heard
         await db.delete(correction)
         await db.commit()
         
-        # Refresh cache
-        await self._refresh_cache(db)
+        # Update cache in place
+        self._automaton.remove(heard)
+        with self._usage_lock:
+            self._pending_usage.pop(heard, None)
         return True
 
     def apply_corrections(self, text: str) -> Dict[str, Any]:
         """
         Apply all corrections to the given text using IN-MEMORY CACHE.
         Synchronous method safe for high-performance loops.
+        
+        Single pass over the text: whole-word, case-insensitive,
+        leftmost-longest matching. Usage counts are queued for flush_usage().
         """
         if not text:
             return {"original": "", "corrected": "", "applied": []}
             
-        corrected_text = text
-        applied_corrections = []
-        
-        # Thread-safe read
-        with self._cache_lock:
-            current_cache = list(self._cache)
-        
-        for item in current_cache:
-            pattern = item['pattern']
-            if pattern.search(corrected_text):
-                count = len(pattern.findall(corrected_text))
-                corrected_text = pattern.sub(item['correct'], corrected_text)
-                
-                applied_corrections.append({
-                    "heard": item['heard'],
-                    "correct": item['correct'],
-                    "count": count
-                })
-        
-        # Note: We are NOT updating usage_count in DB here to avoid async requirements in this sync method.
-        # Usage stats can be approximated or handled via a background queue if strict accuracy is needed.
-        # For now, we prioritize performance and interface compatibility.
+        corrected_text, counts = self._automaton.replace(text)
+        
+        applied_corrections = [
+            {
+                "heard": heard,
+                "correct": self._automaton.replacement_for(heard),
+                "count": count
+            }
+            for heard, count in counts.items()
+        ]
+        
+        if counts:
+            with self._usage_lock:
+                self._pending_usage.update(counts)
             
         return {
             "original": text,
@@ -155,6 +152,56 @@ class VocabularyService:
             "applied": applied_corrections
         }
 
+    async def flush_usage(self, db: AsyncSession) -> int:
+        """
+        Write pending usage counts back to the DB in one batched UPDATE.
+        
+        Returns:
+            Number of corrections updated
+        """
+        with self._usage_lock:
+            pending, self._pending_usage = self._pending_usage, Counter()
+        
+        if not pending:
+            return 0
+        
+        stmt = (
+            update(VocabularyCorrection.__table__)
+            .where(VocabularyCorrection.__table__.c.heard == bindparam("b_heard"))
+            .values(
+                usage_count=func.coalesce(VocabularyCorrection.__table__.c.usage_count, 0) + bindparam("b_count"),
+                last_used=bindparam("b_last_used"),
+            )
+        )
+        now = datetime.now()
+        params = [
+            {"b_heard": heard, "b_count": count, "b_last_used": now}
+            for heard, count in pending.items()
+        ]
+        
+        try:
+            await db.execute(stmt, params)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            # Put the counts back so they are retried on the next flush
+            with self._usage_lock:
+                self._pending_usage.update(pending)
+            logger.warning(f"Vocabulary usage flush failed: {e}")
+            return 0
+        
+        return len(params)
+    
+    async def run_usage_flusher(self, session_factory) -> None:
+        """Periodically flush usage counts (run as a background task)."""
+        while True:
+            await asyncio.sleep(self.USAGE_FLUSH_INTERVAL_SECONDS)
+            try:
+                async with session_factory() as db:
+                    await self.flush_usage(db)
+            except Exception as e:
+                logger.warning(f"Vocabulary usage flusher error: {e}")
+
     async def get_analytics(self, db: AsyncSession) -> Dict[str, Any]:
         """Get usage analytics."""
         total_corrections = await db.scalar(select(func.count(VocabularyCorrection.id)))
@@ -71,6 +71,15 @@ async def client() -> AsyncGenerator[AsyncClient, None]:
         yield ac
 
 
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    """Test databases are recreated per test, so cached users must not leak between tests."""
+    yield
+    import auth
+    if auth._principal_cache is not None:
+        auth._principal_cache.clear()
+
+
 @pytest.fixture
 def sample_user_data():
     """Sample user data for tests."""
@@ -0,0 +1,249 @@
+"""
+API Key Cache Tests
+
+Tests for cached API-key validation, invalidation and the
+write-behind last_used_at flush.
+
+Run: pytest tests/plugin/test_api_key_cache.py -v
+"""
+
+import dataclasses
+import hashlib
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.plugin.api_key_cache import (
+    APIKeyCache, APIKeySnapshot, PluginSnapshot, get_api_key_cache
+)
+
+
+PLAIN_KEY = "ffp_" + "k" * 32
+KEY_HASH = hashlib.sha256(PLAIN_KEY.encode()).hexdigest()
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture(autouse=True)
+def clear_api_key_cache():
+    get_api_key_cache().clear()
+    yield
+    get_api_key_cache().clear()
+
+
+@pytest.fixture
+def mock_field():
+    field = MagicMock()
+    field.id = 10
+    field.column_name = "email"
+    field.column_type = "email"
+    field.is_required = True
+    field.default_value = None
+    field.question_text = "What is your email?"
+    field.question_group = "contact"
+    field.display_order = 1
+    field.validation_rules = {"max_length": 100}
+    field.is_pii = True
+    return field
+
+
+@pytest.fixture
+def mock_plugin(mock_field):
+    table = MagicMock()
+    table.id = 5
+    table.table_name = "customers"
+    table.description = None
+    table.fields = [mock_field]
+
+    plugin = MagicMock()
+    plugin.id = 1
+    plugin.user_id = 1
+    plugin.name = "Test Plugin"
+    plugin.database_type = "postgresql"
+    plugin.connection_config_encrypted = "encrypted"
+    plugin.is_active = True
+    plugin.tables = [table]
+    return plugin
+
+
+@pytest.fixture
+def mock_api_key(mock_plugin):
+    key = MagicMock()
+    key.id = 7
+    key.plugin_id = mock_plugin.id
+    key.key_hash = KEY_HASH
+    key.key_prefix = PLAIN_KEY[:12]
+    key.name = "Production"
+    key.rate_limit = 100
+    key.is_active = True
+    key.is_valid = True
+    key.is_expired = False
+    key.expires_at = None
+    key.plugin = mock_plugin
+    return key
+
+
+@pytest.fixture
+def mock_db(mock_api_key):
+    db = AsyncMock()
+    result = MagicMock()
+    result.scalar_one_or_none = MagicMock(return_value=mock_api_key)
+    db.execute = AsyncMock(return_value=result)
+    db.commit = AsyncMock()
+    db.refresh = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+@pytest.fixture
+def plugin_service(mock_db):
+    with patch('services.plugin.plugin_service.get_encryption_service', return_value=MagicMock()):
+        from services.plugin.plugin_service import PluginService
+        return PluginService(mock_db)
+
+
+# ============================================================================
+# Validation
+# ============================================================================
+
+class TestCachedValidation:
+    """validate_api_key served from the cache."""
+
+    @pytest.mark.asyncio
+    async def test_second_validation_skips_database(self, plugin_service, mock_db):
+        first = await plugin_service.validate_api_key(PLAIN_KEY)
+        second = await plugin_service.validate_api_key(PLAIN_KEY)
+
+        assert mock_db.execute.await_count == 1
+        assert first == second
+        mock_db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_holds_schema(self, plugin_service):
+        key, plugin = await plugin_service.validate_api_key(PLAIN_KEY)
+
+        assert key.id == 7
+        assert plugin.tables[0].table_name == "customers"
+        field = plugin.tables[0].fields[0]
+        assert field.column_name == "email"
+        assert field.validation_rules["max_length"] == 100
+        assert plugin.field_count == 1
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_immutable(self, plugin_service):
+        _, plugin = await plugin_service.validate_api_key(PLAIN_KEY)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            plugin.is_active = False
+        with pytest.raises(TypeError):
+            plugin.tables[0].fields[0].validation_rules["max_length"] = 1
+
+    @pytest.mark.asyncio
+    async def test_key_expiring_while_cached_is_rejected(self, plugin_service):
+        from services.plugin.exceptions import APIKeyInvalidError
+
+        key, plugin = await plugin_service.validate_api_key(PLAIN_KEY)
+        expired = dataclasses.replace(key, expires_at=datetime.utcnow() - timedelta(seconds=1))
+        get_api_key_cache().put(KEY_HASH, expired, plugin)
+
+        with pytest.raises(APIKeyInvalidError, match="expired"):
+            await plugin_service.validate_api_key(PLAIN_KEY)
+
+    @pytest.mark.asyncio
+    async def test_revoke_invalidates_cached_key(self, plugin_service, mock_db, mock_api_key):
+        from services.plugin.exceptions import APIKeyInvalidError
+
+        await plugin_service.validate_api_key(PLAIN_KEY)
+        await plugin_service.revoke_api_key(1, mock_api_key.id, 1)
+
+        assert get_api_key_cache().get(KEY_HASH) is None
+
+        # Next validation reloads and sees the revoked key
+        mock_api_key.is_valid = False
+        with pytest.raises(APIKeyInvalidError, match="revoked"):
+            await plugin_service.validate_api_key(PLAIN_KEY)
+
+    @pytest.mark.asyncio
+    async def test_plugin_update_invalidates_its_keys(self, plugin_service):
+        from core.plugin_schemas import PluginUpdate
+
+        await plugin_service.validate_api_key(PLAIN_KEY)
+        await plugin_service.update_plugin(1, 1, PluginUpdate(name="Renamed"))
+
+        assert get_api_key_cache().get(KEY_HASH) is None
+
+
+# ============================================================================
+# Cache internals
+# ============================================================================
+
+class TestAPIKeyCache:
+
+    def _entry(self, plugin_id=1, key_id=1):
+        key = APIKeySnapshot(
+            id=key_id, plugin_id=plugin_id, key_prefix="ffp_x", name="k",
+            rate_limit=100, is_active=True, expires_at=None,
+        )
+        plugin = MagicMock(spec=PluginSnapshot)
+        plugin.id = plugin_id
+        return key, plugin
+
+    def test_entries_expire_after_ttl(self):
+        cache = APIKeyCache(ttl_seconds=0)
+        cache.put("h", *self._entry())
+
+        assert cache.get("h") is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_lru_bound(self):
+        cache = APIKeyCache(max_entries=2)
+        for i in range(3):
+            cache.put(f"h{i}", *self._entry(key_id=i))
+
+        assert cache.get("h0") is None
+        assert cache.get("h2") is not None
+
+    def test_invalidate_plugin_only_drops_its_keys(self):
+        cache = APIKeyCache()
+        cache.put("a", *self._entry(plugin_id=1))
+        cache.put("b", *self._entry(plugin_id=2))
+
+        assert cache.invalidate_plugin(1) == 1
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+
+
+class TestLastUsedFlush:
+
+    @pytest.mark.asyncio
+    async def test_touches_are_coalesced_into_one_update(self):
+        cache = APIKeyCache()
+        db = AsyncMock()
+        for _ in range(100):
+            cache.touch(1)
+        cache.touch(2)
+
+        updated = await cache.flush_last_used(db)
+
+        assert updated == 2
+        assert db.execute.await_count == 1
+        params = db.execute.await_args.args[1]
+        assert sorted(p["b_id"] for p in params) == [1, 2]
+        db.commit.assert_awaited_once()
+        assert await cache.flush_last_used(db) == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self):
+        cache = APIKeyCache()
+        db = AsyncMock()
+        db.execute.side_effect = RuntimeError("db down")
+        cache.touch(1)
+
+        assert await cache.flush_last_used(db) == 0
+        db.rollback.assert_awaited_once()
+
+        db.execute.side_effect = None
+        assert await cache.flush_last_used(db) == 1
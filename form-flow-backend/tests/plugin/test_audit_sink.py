@@ -0,0 +1,227 @@
+"""
+Audit Sink Tests
+
+Tests for the batched background audit writer and its spill file.
+
+Run: pytest tests/plugin/test_audit_sink.py -v
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+from core.audit_models import AuditLog, AuditAction
+from services.plugin.security import audit as audit_module
+from services.plugin.security.audit import AuditService, AuditSink
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'audit.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def sink(tmp_path):
+    return AuditSink(spill_path=tmp_path / "spill.jsonl", batch_size=10, flush_interval=0.05)
+
+
+def failing_factory():
+    """Session factory whose sessions fail on execute (DB down)."""
+    db = AsyncMock()
+    db.execute.side_effect = ConnectionError("db down")
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=db)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+def make_row(i: int = 0):
+    return {
+        "action": AuditAction.API_KEY_USED,
+        "user_id": None,
+        "api_key_prefix": "ffp_test",
+        "ip_address": "127.0.0.1",
+        "user_agent": None,
+        "entity_type": "plugin",
+        "entity_id": i,
+        "details": {"n": i},
+        "success": "success",
+        "error_message": None,
+        "created_at": datetime.utcnow(),
+    }
+
+
+async def count_rows(session_factory) -> int:
+    async with session_factory() as db:
+        return await db.scalar(select(func.count(AuditLog.id)))
+
+
+# ============================================================================
+# Tests
+# ============================================================================
+
+class TestAuditSink:
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_in_batches(self, sink, session_factory):
+        for i in range(25):
+            sink.enqueue(make_row(i))
+
+        written = await sink.flush(session_factory)
+
+        assert written == 25
+        assert sink.queue_depth() == 0
+        assert await count_rows(session_factory) == 25
+
+    @pytest.mark.asyncio
+    async def test_db_outage_spills_and_replays(self, sink, session_factory):
+        for i in range(15):
+            sink.enqueue(make_row(i))
+
+        assert await sink.flush(failing_factory()) == 0
+        assert sink.queue_depth() == 0
+        assert sink.spill_path.exists()
+
+        # Recovery: spilled rows are written first
+        sink.enqueue(make_row(99))
+        assert await sink.flush(session_factory) == 16
+        assert not sink.spill_path.exists()
+
+        async with session_factory() as db:
+            details = (await db.execute(select(AuditLog.details))).scalars().all()
+        assert sorted(d["n"] for d in details) == list(range(15)) + [99]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_spills_overflow(self, tmp_path, session_factory):
+        sink = AuditSink(spill_path=tmp_path / "spill.jsonl", max_queue_size=5)
+        for i in range(8):
+            sink.enqueue(make_row(i))
+
+        assert sink.queue_depth() == 5
+
+        assert await sink.flush(session_factory) == 8
+        assert sink.get_stats()["rows_spilled"] == 3
+
+    @pytest.mark.asyncio
+    async def test_background_task_and_final_flush(self, sink, session_factory):
+        sink.start(session_factory)
+        for i in range(10):
+            sink.enqueue(make_row(i))
+        await asyncio.sleep(0.2)
+        assert await count_rows(session_factory) == 10
+
+        sink.enqueue(make_row(10))
+        await sink.stop()
+
+        assert not sink.is_running
+        assert await count_rows(session_factory) == 11
+
+
+    @pytest.mark.asyncio
+    async def test_bad_rows_are_rejected_without_wedging_the_sink(self, sink, session_factory):
+        rows = [make_row(i) for i in range(25)]
+        rows[7]["action"] = None           # NOT NULL violation
+        rows[13]["details"] = {"x": object()}  # cannot be bound as JSON
+        for row in rows:
+            sink.enqueue(row)
+
+        assert await sink.flush(session_factory) == 23
+
+        assert await count_rows(session_factory) == 23
+        assert not sink.spill_path.exists()
+        assert len(sink.rejected_path.read_text().splitlines()) == 2
+        assert sink.get_stats()["rows_rejected"] == 2
+
+        # Nothing left to retry
+        sink.enqueue(make_row(99))
+        assert await sink.flush(session_factory) == 1
+
+    @pytest.mark.asyncio
+    async def test_db_outage_is_not_bisected(self, sink):
+        factory = failing_factory()
+        for i in range(10):
+            sink.enqueue(make_row(i))
+
+        await sink.flush(factory)
+
+        db = factory.return_value.__aenter__.return_value
+        assert db.execute.await_count == 1
+        assert not sink.rejected_path.exists()
+        assert len(sink.spill_path.read_text().splitlines()) == 10
+
+    @pytest.mark.asyncio
+    async def test_spill_fsync_runs_off_the_event_loop(self, sink, monkeypatch):
+        threads = []
+        real_fsync = audit_module.os.fsync
+
+        def recording_fsync(fd):
+            threads.append(threading.get_ident())
+            real_fsync(fd)
+
+        monkeypatch.setattr(audit_module.os, "fsync", recording_fsync)
+        sink.enqueue(make_row())
+
+        await sink.flush(failing_factory())
+
+        assert threads and threading.get_ident() not in threads
+
+
+class TestAuditServiceWithSink:
+
+    @pytest.mark.asyncio
+    async def test_log_only_enqueues_when_sink_running(self, sink, session_factory, monkeypatch):
+        monkeypatch.setattr(audit_module, "_audit_sink", sink)
+        sink.start(session_factory)
+        db = AsyncMock()
+        db.add = MagicMock()
+
+        await AuditService(db).log_api_key_used("ffp_test", plugin_id=1)
+
+        db.add.assert_not_called()
+        db.commit.assert_not_called()
+        assert sink.queue_depth() == 1
+
+        await sink.stop()
+        assert await count_rows(session_factory) == 1
+
+    @pytest.mark.asyncio
+    async def test_log_writes_directly_without_sink(self, sink, monkeypatch):
+        monkeypatch.setattr(audit_module, "_audit_sink", sink)
+        db = AsyncMock()
+        db.add = MagicMock()
+
+        await AuditService(db).log_auth_failed("expired", key_prefix="ffp_test")
+
+        db.add.assert_called_once()
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_long_values_are_cut_to_column_size(self, sink, session_factory, monkeypatch):
+        monkeypatch.setattr(audit_module, "_audit_sink", sink)
+        sink.start(session_factory)
+
+        await AuditService(AsyncMock()).log(
+            AuditAction.API_KEY_USED, api_key_prefix="ffp_" + "k" * 40, user_agent="Mozilla/5.0 " * 100
+        )
+        await sink.stop()
+
+        async with session_factory() as db:
+            row = (await db.execute(select(AuditLog))).scalar_one()
+        assert len(row.user_agent) == 500
+        assert len(row.api_key_prefix) == 12
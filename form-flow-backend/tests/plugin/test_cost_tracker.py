@@ -0,0 +1,167 @@
+"""
+Cost Tracker Tests
+
+Tests for the usage rollup tables and the in-memory budget totals.
+
+Run: pytest tests/plugin/test_cost_tracker.py -v
+"""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+from services.plugin.question.cost_tracker import (
+    CostTracker, LLMUsageLog, LLMUsageDaily, LLMUsageDailyOperation, BudgetAlert
+)
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'usage.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+    await engine.dispose()
+
+
+async def track(tracker, n, plugin_id=1, operation="consolidation", cost=0.01):
+    for _ in range(n):
+        await tracker.track_usage(plugin_id, operation, tokens=100, estimated_cost=cost)
+
+
+# ============================================================================
+# Rollups
+# ============================================================================
+
+class TestRollups:
+
+    @pytest.mark.asyncio
+    async def test_flush_maintains_rollups(self, db):
+        tracker = CostTracker(db)
+        await track(tracker, 15, operation="consolidation")
+        await track(tracker, 5, operation="extraction", cost=0.02)
+        await track(tracker, 3, plugin_id=2)
+        await tracker.flush()
+
+        assert await db.scalar(select(func.count(LLMUsageLog.id))) == 23
+        daily = (await db.execute(select(LLMUsageDaily).order_by(LLMUsageDaily.plugin_id))).scalars().all()
+        assert [(d.plugin_id, d.calls, d.tokens) for d in daily] == [(1, 20, 2000), (2, 3, 300)]
+        assert daily[0].estimated_cost == pytest.approx(0.25)
+        assert await db.scalar(select(func.count(LLMUsageDailyOperation.id))) == 3
+
+    @pytest.mark.asyncio
+    async def test_plugin_usage_reads_rollups(self, db):
+        tracker = CostTracker(db)
+        await track(tracker, 10, operation="consolidation")
+        await track(tracker, 10, operation="extraction", cost=0.02)
+        await tracker.flush()
+
+        # The raw log is no longer consulted
+        await db.execute(LLMUsageLog.__table__.delete())
+        summary = await tracker.get_plugin_usage(1)
+
+        assert summary.total_tokens == 2000
+        assert summary.total_cost == pytest.approx(0.3)
+        assert summary.operation_breakdown == pytest.approx({"consolidation": 0.1, "extraction": 0.2})
+        assert list(summary.daily_breakdown) == [str(date.today())]
+
+        usage = await tracker.get_user_total_usage(1, [1])
+        assert usage["plugins"][1]["tokens"] == 2000
+
+    @pytest.mark.asyncio
+    async def test_rebuild_rollups_from_log(self, db):
+        yesterday = date.today() - timedelta(days=1)
+        await db.execute(LLMUsageLog.__table__.insert(), [
+            {"plugin_id": 1, "operation": "extraction", "model": "m", "tokens": 10,
+             "estimated_cost": 0.5, "usage_date": yesterday},
+            {"plugin_id": 1, "operation": "extraction", "model": "m", "tokens": 10,
+             "estimated_cost": 0.5, "usage_date": date.today()},
+        ])
+        await db.commit()
+        tracker = CostTracker(db)
+
+        await tracker.rebuild_rollups()
+
+        summary = await tracker.get_plugin_usage(1)
+        assert summary.total_cost == pytest.approx(1.0)
+        assert len(summary.daily_breakdown) == 2
+
+
+    @pytest.mark.asyncio
+    async def test_backfill_only_when_rollups_are_empty(self, db):
+        tracker = CostTracker(db)
+        assert await tracker.backfill_rollups_if_empty() is False  # nothing logged yet
+
+        # Usage logged before the rollup tables existed
+        await db.execute(LLMUsageLog.__table__.insert(), [
+            {"plugin_id": 1, "operation": "extraction", "model": "m", "tokens": 10,
+             "estimated_cost": 0.5, "usage_date": date.today()},
+        ])
+        await db.commit()
+
+        assert await tracker.backfill_rollups_if_empty() is True
+        assert (await tracker.get_plugin_usage(1)).total_cost == pytest.approx(0.5)
+        assert (await tracker.check_budget(1))["daily_cost"] == pytest.approx(0.5)
+
+        await track(tracker, 10)
+        await tracker.flush()
+        assert await tracker.backfill_rollups_if_empty() is False
+        assert (await tracker.get_plugin_usage(1)).total_cost == pytest.approx(0.6)
+
+
+# ============================================================================
+# Budget checks
+# ============================================================================
+
+class TestBudget:
+
+    @pytest.mark.asyncio
+    async def test_budget_includes_unflushed_usage(self, db):
+        tracker = CostTracker(db)
+        await track(tracker, 5, cost=0.1)  # Below the flush threshold
+
+        status = await tracker.check_budget(1, BudgetAlert(daily_limit=1.0))
+
+        assert status["daily_cost"] == pytest.approx(0.5)
+        assert status["alerts"] == []
+
+    @pytest.mark.asyncio
+    async def test_budget_served_from_running_total(self, db):
+        tracker = CostTracker(db)
+        await tracker.check_budget(1)
+        await track(tracker, 25, cost=0.05)
+
+        with patch.object(db, "execute", wraps=db.execute) as execute:
+            status = await tracker.check_budget(1, BudgetAlert(daily_limit=1.0))
+
+        assert execute.call_count == 0
+        assert status["daily_cost"] == pytest.approx(1.25)
+        assert "daily_limit_exceeded" in status["alerts"]
+        assert not status["within_budget"]
+
+    @pytest.mark.asyncio
+    async def test_running_total_reloads_after_ttl(self, db):
+        tracker = CostTracker(db)
+        tracker.RUNNING_TOTAL_TTL_SECONDS = 0
+        await track(tracker, 10, cost=0.1)
+        await tracker.flush()
+
+        # Usage recorded by another process
+        other = CostTracker(db)
+        await track(other, 10, cost=0.1)
+        await other.flush()
+
+        status = await tracker.check_budget(1)
+        assert status["monthly_cost"] == pytest.approx(2.0)
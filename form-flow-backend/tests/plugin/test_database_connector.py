@@ -0,0 +1,400 @@
+"""
+Database Connector Tests
+
+Tests for the connector schema cache, cached INSERT statements and
+multi-row population.
+
+Run: pytest tests/plugin/test_database_connector.py -v
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.plugin.database.base import (
+    DatabaseConnector, DatabaseType, ConnectionConfig, TableInfo, ColumnInfo
+)
+from services.plugin.population.service import PopulationService, InsertStatus
+from services.plugin.population import service as population_module
+
+
+# ============================================================================
+# Fake connector
+# ============================================================================
+
+class UndefinedColumnError(Exception):
+    """Shaped like asyncpg.exceptions.UndefinedColumnError."""
+    sqlstate = "42703"
+
+
+class MySQLProgrammingError(Exception):
+    """Shaped like pymysql.err.ProgrammingError: (code, message)."""
+
+
+class ConnectionDoesNotExistError(Exception):
+    """Shaped like asyncpg.exceptions.ConnectionDoesNotExistError."""
+    sqlstate = "08003"
+
+
+class FakeConnector(DatabaseConnector):
+    """In-memory connector recording the SQL it is asked to run."""
+
+    def __init__(self):
+        super().__init__(1, ConnectionConfig("h", 5432, "db", "u", "p"))
+        self.introspections = 0
+        self.queries: List[str] = []
+        self.batches: List[List[Dict[str, Any]]] = []
+        self.fail_inserts = False
+        self.bulk_calls = 0
+        self.unreachable = False
+        self.bulk_error: Optional[Exception] = None
+
+    @property
+    def db_type(self) -> DatabaseType:
+        return DatabaseType.POSTGRESQL
+
+    async def _create_pool(self):
+        return object()
+
+    async def _close_pool(self):
+        pass
+
+    async def _execute_query(self, query, params=None, fetch=False):
+        return None
+
+    async def _introspect_table(self, table_name: str) -> Optional[TableInfo]:
+        self.introspections += 1
+        if table_name == "missing":
+            return None
+        return TableInfo(name=table_name, columns=[ColumnInfo("id", "integer", False, True)])
+
+    async def _execute_insert(self, query, params):
+        if self.fail_inserts:
+            raise RuntimeError("column does not exist")
+        self.queries.append(query)
+        return len(self.queries)
+
+    def _get_placeholders(self, columns):
+        return ", ".join(f"${i + 1}" for i in range(len(columns)))
+
+    def _quote_identifier(self, name):
+        return f'"{name}"'
+
+    async def _execute_insert_many(self, table, columns, rows):
+        self.queries.append(self._insert_sql(table, tuple(columns)))
+        self.batches.append(rows)
+        return len(rows)
+
+    async def _execute_bulk_load(self, table, columns, rows):
+        self.bulk_calls += 1
+        if any(row.get("qty") == "bad" for row in rows):
+            raise ValueError("invalid input syntax for type integer")
+        if self.unreachable:
+            raise ConnectionRefusedError("connection refused")
+        if self.bulk_error:
+            raise self.bulk_error
+        self.batches.append(rows)
+        return len(rows)
+
+    @asynccontextmanager
+    async def _get_transaction_context(self):
+        yield
+
+
+@pytest.fixture
+def connector():
+    return FakeConnector()
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers(monkeypatch):
+    """Circuit breakers are process-wide; isolate each test."""
+    from utils import circuit_breaker
+    monkeypatch.setattr(circuit_breaker, "_circuit_breakers", {})
+
+
+# ============================================================================
+# Schema cache
+# ============================================================================
+
+class TestSchemaCache:
+
+    @pytest.mark.asyncio
+    async def test_schema_is_introspected_once(self, connector):
+        first = await connector.get_table_schema("customers")
+        second = await connector.get_table_schema("customers")
+
+        assert first is second
+        assert connector.introspections == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_and_ttl(self, connector):
+        await connector.get_table_schema("customers")
+        await connector.get_table_schema("customers", refresh=True)
+        assert connector.introspections == 2
+
+        connector.SCHEMA_CACHE_TTL_SECONDS = 0
+        await connector.get_table_schema("orders")
+        await connector.get_table_schema("orders")
+        assert connector.introspections == 4
+
+    @pytest.mark.asyncio
+    async def test_missing_tables_are_not_cached(self, connector):
+        assert await connector.get_table_schema("missing") is None
+        assert await connector.get_table_schema("missing") is None
+        assert connector.introspections == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_insert_invalidates_table(self, connector):
+        await connector.get_table_schema("customers")
+        connector.fail_inserts = True
+
+        with patch("utils.circuit_breaker.asyncio.sleep", AsyncMock()), \
+                pytest.raises(RuntimeError):
+            await connector.insert("customers", {"name": "A"})
+
+        await connector.get_table_schema("customers")
+        assert connector.introspections == 2
+
+
+# ============================================================================
+# Statements
+# ============================================================================
+
+class TestInsertStatements:
+
+    @pytest.mark.asyncio
+    async def test_statement_built_once_per_column_set(self, connector):
+        await connector.insert("customers", {"name": "A", "email": "a@x.com"})
+        await connector.insert("customers", {"name": "B", "email": "b@x.com"})
+        await connector.insert("customers", {"name": "C"})
+
+        assert connector.queries[0] is connector.queries[1]
+        assert connector.queries[0] == 'INSERT INTO "customers" ("name", "email") VALUES ($1, $2)'
+        assert len(connector._insert_statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_insert_many_groups_by_column_set(self, connector):
+        count = await connector.insert_many("items", [
+            {"sku": "a", "qty": 1},
+            {"sku": "b"},
+            {"sku": "c", "qty": 3},
+        ])
+
+        assert count == 3
+        assert [len(batch) for batch in connector.batches] == [2, 1]
+
+
+# ============================================================================
+# Population
+# ============================================================================
+
+class TestPopulation:
+
+    async def _populate(self, connector, extracted_values, tables):
+        factory = MagicMock()
+        factory.get_connector = AsyncMock(return_value=connector)
+        encryption = MagicMock()
+        encryption.decrypt.return_value = {"host": "localhost"}
+
+        with patch("services.plugin.population.service.get_encryption_service", return_value=encryption), \
+                patch("services.plugin.population.service.get_connector_factory", AsyncMock(return_value=factory)):
+            service = PopulationService()
+            return await service.populate(
+                plugin_id=1,
+                session_id="s1",
+                connection_config_encrypted="enc",
+                db_type=DatabaseType.POSTGRESQL,
+                table_configs=tables,
+                extracted_values=extracted_values,
+            )
+
+    @pytest.mark.asyncio
+    async def test_single_row_uses_insert(self):
+        connector = FakeConnector()
+        connector.insert_many = AsyncMock()
+        tables = [{"table_name": "customers", "fields": [{"column_name": "name"}]}]
+
+        result = await self._populate(connector, {"name": "John"}, tables)
+
+        assert result.overall_status == InsertStatus.SUCCESS
+        assert result.inserted_rows[0].row_id == 1
+        connector.insert_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_repeating_group_uses_insert_many(self):
+        connector = FakeConnector()
+        tables = [
+            {"table_name": "orders", "fields": [{"column_name": "customer"}]},
+            {"table_name": "items", "fields": [
+                {"column_name": "sku"},
+                {"column_name": "qty", "default_value": 1},
+            ]},
+        ]
+        values = {
+            "customer": "John",
+            "items": [{"sku": "a", "qty": 2}, {"sku": "b"}, {"sku": "c"}],
+        }
+
+        result = await self._populate(connector, values, tables)
+
+        assert result.overall_status == InsertStatus.SUCCESS
+        assert result.successful_tables == 2
+        assert len(result.inserted_rows) == 4
+        assert connector.batches == [[
+            {"sku": "a", "qty": 2}, {"sku": "b", "qty": 1}, {"sku": "c", "qty": 1}
+        ]]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_reports_every_row(self):
+        connector = FakeConnector()
+        connector.insert_many = AsyncMock(side_effect=RuntimeError("db down"))
+        tables = [{"table_name": "items", "fields": [{"column_name": "sku"}]}]
+
+        result = await self._populate(connector, {"items": [{"sku": "a"}, {"sku": "b"}]}, tables)
+
+        assert result.overall_status == InsertStatus.FAILED
+        assert [r.data for r in result.failed_rows] == [{"sku": "a"}, {"sku": "b"}]
+
+
+# ============================================================================
+# Bulk load
+# ============================================================================
+
+class TestBulkLoad:
+
+    async def _load(self, connector, rows, chunk_size=100, dlq=None):
+        factory = MagicMock()
+        factory.get_connector = AsyncMock(return_value=connector)
+        encryption = MagicMock()
+        encryption.decrypt.return_value = {"host": "localhost"}
+
+        with patch.object(population_module, "get_encryption_service", return_value=encryption), \
+                patch.object(population_module, "get_connector_factory", AsyncMock(return_value=factory)):
+            service = PopulationService(dead_letter_queue=dlq)
+            return await service.populate_batch(
+                plugin_id=1,
+                session_id="import",
+                connection_config_encrypted="enc",
+                db_type=DatabaseType.POSTGRESQL,
+                table_name="items",
+                rows=rows,
+                chunk_size=chunk_size,
+            )
+
+    @pytest.mark.asyncio
+    async def test_rows_are_loaded_in_chunks(self):
+        connector = FakeConnector()
+        rows = ({"sku": str(i), "qty": i} for i in range(250))
+
+        inserted, failed = await self._load(connector, rows, chunk_size=100)
+
+        assert inserted == 250
+        assert failed == []
+        assert [len(b) for b in connector.batches] == [100, 100, 50]
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_uniform_by_columns(self):
+        connector = FakeConnector()
+        rows = [{"sku": "a", "qty": 1}, {"sku": "b"}, {"sku": "c", "qty": 2}]
+
+        inserted, _ = await self._load(connector, rows)
+
+        assert inserted == 3
+        assert sorted(len(b) for b in connector.batches) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_async_iterable_source(self):
+        connector = FakeConnector()
+
+        async def rows():
+            for i in range(10):
+                yield {"sku": str(i)}
+
+        inserted, _ = await self._load(connector, rows(), chunk_size=4)
+
+        assert inserted == 10
+
+    @pytest.mark.asyncio
+    async def test_bisection_sends_only_bad_rows_to_dlq(self):
+        connector = FakeConnector()
+        dlq = MagicMock()
+        dlq.enqueue_many = AsyncMock()
+        rows = [{"sku": str(i), "qty": "bad" if i in (13, 77) else i} for i in range(100)]
+
+        inserted, failed = await self._load(connector, rows, chunk_size=100, dlq=dlq)
+
+        assert inserted == 98
+        assert [r.data["sku"] for r in failed] == ["13", "77"]
+        assert "integer" in failed[0].error
+        dlq.enqueue_many.assert_awaited_once()
+        assert len(dlq.enqueue_many.await_args.kwargs["failures"]) == 2
+        # Bisection cost stays logarithmic per bad row
+        assert connector.bulk_calls < 30
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_are_not_bisected(self):
+        connector = FakeConnector()
+        connector.unreachable = True
+        rows = [{"sku": str(i)} for i in range(64)]
+
+        inserted, failed = await self._load(connector, rows, chunk_size=64)
+
+        assert inserted == 0
+        assert len(failed) == 64
+        assert connector.bulk_calls == 1
+
+
+    @pytest.mark.asyncio
+    async def test_schema_errors_fail_the_chunk_at_once(self):
+        connector = FakeConnector()
+        connector.bulk_error = UndefinedColumnError('column "qty" of relation "items" does not exist')
+        rows = [{"sku": str(i), "qty": i} for i in range(64)]
+
+        inserted, failed = await self._load(connector, rows, chunk_size=64)
+
+        assert inserted == 0
+        assert len(failed) == 64
+        assert "does not exist" in failed[0].error
+        assert connector.bulk_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_mysql_missing_table_is_not_bisected(self):
+        connector = FakeConnector()
+        connector.bulk_error = MySQLProgrammingError(1146, "Table 'db.items' doesn't exist")
+
+        _, failed = await self._load(connector, [{"sku": str(i)} for i in range(32)], chunk_size=32)
+
+        assert len(failed) == 32
+        assert connector.bulk_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_lost_connection_is_not_bisected(self):
+        connector = FakeConnector()
+        connector.bulk_error = ConnectionDoesNotExistError("connection was closed in the middle of operation")
+
+        _, failed = await self._load(connector, [{"sku": str(i)} for i in range(32)], chunk_size=32)
+
+        assert len(failed) == 32
+        assert connector.bulk_calls == 1
+
+    def test_server_shutdown_is_not_bisected(self):
+        class AdminShutdownError(Exception):
+            sqlstate = "57P01"
+
+        class QueryCanceledError(Exception):
+            sqlstate = "57014"
+
+        assert population_module._is_unsplittable_error(AdminShutdownError())
+        assert not population_module._is_unsplittable_error(QueryCanceledError())
+        assert population_module._is_unsplittable_error(MySQLProgrammingError(2013, "Lost connection"))
+
+    def test_row_level_errors_are_still_split(self):
+        class CheckViolationError(Exception):
+            sqlstate = "23514"
+
+        assert not population_module._is_unsplittable_error(CheckViolationError())
+        assert not population_module._is_unsplittable_error(MySQLProgrammingError(1062, "Duplicate entry"))
+        assert population_module._is_unsplittable_error(MySQLProgrammingError(1054, "Unknown column"))
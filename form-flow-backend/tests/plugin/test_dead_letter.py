@@ -0,0 +1,265 @@
+"""
+Dead Letter Queue Tests
+
+Tests for bulk enqueue, set-based updates, leasing and the
+concurrent retry worker.
+
+Run: pytest tests/plugin/test_dead_letter.py -v
+"""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core import models  # noqa: F401 - registers users table for the plugins FK
+from core.database import Base
+from core.plugin_models import Plugin
+from services.plugin.population.dead_letter import DeadLetterQueue, DeadLetterEntry, DLQStatus
+from services.plugin.population.retry_worker import DLQRetryWorker
+from services.plugin.population.service import InsertResult, InsertStatus
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dlq.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def add_plugin(session_factory, plugin_id: int, is_active: bool = True):
+    async with session_factory() as db:
+        db.add(Plugin(
+            id=plugin_id, user_id=1, name=f"p{plugin_id}", database_type="postgresql",
+            connection_config_encrypted="enc", is_active=is_active,
+        ))
+        await db.commit()
+
+
+async def make_due(session_factory):
+    """Pretend the initial backoff has elapsed."""
+    async with session_factory() as db:
+        await db.execute(
+            update(DeadLetterEntry).values(next_retry_at=datetime.now() - timedelta(seconds=1))
+        )
+        await db.commit()
+
+
+async def statuses(session_factory):
+    async with session_factory() as db:
+        result = await db.execute(select(DeadLetterEntry.status, DeadLetterEntry.retry_count))
+        return sorted((row.status, row.retry_count) for row in result)
+
+
+def rows(n: int, bad=()):
+    return [({"sku": str(i), "qty": "bad" if i in bad else i}, "boom") for i in range(n)]
+
+
+# ============================================================================
+# Queue operations
+# ============================================================================
+
+class TestDeadLetterQueue:
+
+    @pytest.mark.asyncio
+    async def test_enqueue_many_is_one_commit(self, session_factory):
+        async with session_factory() as db:
+            db.commit = AsyncMock(wraps=db.commit)
+            count = await DeadLetterQueue(db).enqueue_many(1, "s", "items", rows(2500))
+
+            assert count == 2500
+            db.commit.assert_awaited_once()
+            stats = await DeadLetterQueue(db).get_stats()
+        assert stats["pending"] == 2500
+
+    @pytest.mark.asyncio
+    async def test_lease_claims_each_entry_once(self, session_factory):
+        async with session_factory() as db:
+            await DeadLetterQueue(db).enqueue_many(1, "s", "items", rows(10))
+        await make_due(session_factory)
+
+        async with session_factory() as db:
+            first = await DeadLetterQueue(db).lease_entries(limit=6)
+            second = await DeadLetterQueue(db).lease_entries(limit=6)
+            third = await DeadLetterQueue(db).lease_entries(limit=6)
+
+        assert len(first) == 6
+        assert len(second) == 4
+        assert third == []
+        assert {e.status for e in first} == {DLQStatus.RETRYING}
+
+    @pytest.mark.asyncio
+    async def test_mark_failed_many_backs_off_then_fails(self, session_factory):
+        async with session_factory() as db:
+            dlq = DeadLetterQueue(db)
+            await dlq.enqueue_many(1, "s", "items", rows(2))
+            await make_due(session_factory)
+            a, b = await dlq.lease_entries()
+
+            await dlq.mark_failed_many([
+                (a.id, a.retry_count, a.max_retries, "still bad"),
+                (b.id, b.max_retries - 1, b.max_retries, None),
+            ])
+
+            entries = {e.id: e for e in (await db.execute(select(DeadLetterEntry))).scalars()}
+
+        assert entries[a.id].status == DLQStatus.RETRYING.value
+        assert entries[a.id].retry_count == 1
+        assert entries[a.id].error == "still bad"
+        delay = (entries[a.id].next_retry_at - datetime.now()).total_seconds()
+        assert DeadLetterQueue.backoff_seconds(1) - 5 < delay <= DeadLetterQueue.backoff_seconds(1)
+        # No new error keeps the previous one
+        assert entries[b.id].status == DLQStatus.FAILED.value
+        assert entries[b.id].error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_single_entry_api(self, session_factory):
+        async with session_factory() as db:
+            dlq = DeadLetterQueue(db)
+            entry_id = await dlq.enqueue(1, "s", "items", {"sku": "a"}, error="x")
+            await dlq.mark_failed(entry_id, error="y")
+            await dlq.mark_success(entry_id)
+
+        assert await statuses(session_factory) == [(DLQStatus.SUCCEEDED.value, 1)]
+
+    @pytest.mark.asyncio
+    async def test_cleanup_is_a_single_delete(self, session_factory):
+        async with session_factory() as db:
+            dlq = DeadLetterQueue(db)
+            await dlq.enqueue_many(1, "s", "items", rows(3))
+            ids = [e.id for e in (await db.execute(select(DeadLetterEntry))).scalars()]
+            await dlq.mark_success_many(ids[:2])
+
+            deleted = await dlq.cleanup_old_entries(days=-1)
+
+        assert deleted == 2
+        assert await statuses(session_factory) == [(DLQStatus.PENDING.value, 0)]
+
+
+# ============================================================================
+# Retry worker
+# ============================================================================
+
+def fake_population():
+    """populate_batch stand-in that rejects rows with qty == 'bad'."""
+    service = MagicMock()
+    service.calls = []
+
+    async def populate_batch(**kwargs):
+        service.calls.append((kwargs["plugin_id"], kwargs["table_name"], len(kwargs["rows"])))
+        failed = [
+            InsertResult(table_name=kwargs["table_name"], status=InsertStatus.FAILED,
+                         data=row, error="invalid integer")
+            for row in kwargs["rows"] if row.get("qty") == "bad"
+        ]
+        return len(kwargs["rows"]) - len(failed), failed
+
+    service.populate_batch = populate_batch
+    return service
+
+
+class TestRetryWorker:
+
+    @pytest.mark.asyncio
+    async def test_groups_by_plugin_and_table(self, session_factory):
+        await add_plugin(session_factory, 1)
+        await add_plugin(session_factory, 2)
+        async with session_factory() as db:
+            dlq = DeadLetterQueue(db)
+            await dlq.enqueue_many(1, "s", "items", rows(30, bad={3}))
+            await dlq.enqueue_many(1, "s", "orders", rows(20))
+            await dlq.enqueue_many(2, "s", "items", rows(10))
+        await make_due(session_factory)
+
+        population = fake_population()
+        worker = DLQRetryWorker(population_service=population)
+        processed = await worker.run_once(session_factory)
+
+        assert processed == 60
+        assert sorted(population.calls) == [(1, "items", 30), (1, "orders", 20), (2, "items", 10)]
+        result = await statuses(session_factory)
+        assert result.count((DLQStatus.SUCCEEDED.value, 0)) == 59
+        assert (DLQStatus.RETRYING.value, 1) in result
+
+    @pytest.mark.asyncio
+    async def test_inactive_plugin_fails_permanently(self, session_factory):
+        await add_plugin(session_factory, 1, is_active=False)
+        async with session_factory() as db:
+            await DeadLetterQueue(db).enqueue_many(1, "s", "items", rows(3))
+        await make_due(session_factory)
+
+        population = fake_population()
+        await DLQRetryWorker(population_service=population).run_once(session_factory)
+
+        assert population.calls == []
+        assert await statuses(session_factory) == [(DLQStatus.FAILED.value, 1)] * 3
+
+    @pytest.mark.asyncio
+    async def test_empty_row_data_fails_permanently(self, session_factory):
+        await add_plugin(session_factory, 1)
+        async with session_factory() as db:
+            await DeadLetterQueue(db).enqueue_many(1, "s", "items", rows(2) + [({}, "boom")])
+        await make_due(session_factory)
+
+        population = fake_population()
+        await DLQRetryWorker(population_service=population).run_once(session_factory)
+
+        assert population.calls == [(1, "items", 2)]
+        assert await statuses(session_factory) == [
+            (DLQStatus.FAILED.value, 1), (DLQStatus.SUCCEEDED.value, 0), (DLQStatus.SUCCEEDED.value, 0),
+        ]
+        async with session_factory() as db:
+            errors = (await db.execute(
+                select(DeadLetterEntry.error).where(DeadLetterEntry.status == DLQStatus.FAILED.value)
+            )).scalars().all()
+        assert errors == ["Entry has no row data"]
+
+    @pytest.mark.asyncio
+    async def test_connector_error_reschedules_group(self, session_factory):
+        await add_plugin(session_factory, 1)
+        async with session_factory() as db:
+            await DeadLetterQueue(db).enqueue_many(1, "s", "items", rows(4))
+        await make_due(session_factory)
+
+        population = MagicMock()
+        population.populate_batch = AsyncMock(side_effect=ConnectionRefusedError("down"))
+        await DLQRetryWorker(population_service=population).run_once(session_factory)
+
+        assert await statuses(session_factory) == [(DLQStatus.RETRYING.value, 1)] * 4
+        # Backed off: nothing due right now
+        assert await DLQRetryWorker(population_service=population).run_once(session_factory) == 0
+
+
+@pytest.mark.asyncio
+async def test_benchmark_drain_backlog(session_factory):
+    """Entries drained per second with batched leases and status updates."""
+    backlog = 20_000
+    await add_plugin(session_factory, 1)
+    async with session_factory() as db:
+        dlq = DeadLetterQueue(db)
+        for plugin_table in ("items", "orders"):
+            await dlq.enqueue_many(1, "s", plugin_table, rows(backlog // 2))
+    await make_due(session_factory)
+
+    worker = DLQRetryWorker(population_service=fake_population(), batch_size=1000)
+    started = time.perf_counter()
+    drained = 0
+    while (processed := await worker.run_once(session_factory)):
+        drained += processed
+    elapsed = time.perf_counter() - started
+
+    print(f"\nDLQ drain: {drained} entries in {elapsed:.2f}s ({drained / elapsed:,.0f}/s, SQLite)")
+
+    assert drained == backlog
+    assert worker.get_stats()["succeeded"] == backlog
@@ -18,6 +18,15 @@ import hashlib
 # Fixtures
 # ============================================================================
 
+@pytest.fixture(autouse=True)
+def clear_api_key_cache():
+    """API key cache is process-wide; start each test empty."""
+    from services.plugin.api_key_cache import get_api_key_cache
+    get_api_key_cache().clear()
+    yield
+    get_api_key_cache().clear()
+
+
 @pytest.fixture
 def mock_db():
     """Mock async database session."""
@@ -240,8 +249,9 @@ class TestAPIKeyManagement:
         
         key_record, plugin = await plugin_service.validate_api_key(plain_key)
         
-        assert key_record == mock_api_key
-        assert plugin == mock_plugin
+        assert key_record.id == mock_api_key.id
+        assert plugin.id == mock_plugin.id
+        assert plugin.name == mock_plugin.name
     
     @pytest.mark.asyncio
     async def test_validate_api_key_invalid_format(self, plugin_service, mock_db):
@@ -0,0 +1,276 @@
+"""
+Multi-Level Rate Limiter Tests
+
+Tests for the atomic multi-level check (Lua sliding-window counter)
+and the in-memory fallback.
+
+The Lua tests use fakeredis (with lupa) when installed. The benchmark
+needs a real Redis:
+    REDIS_URL=redis://localhost:6379/0 pytest tests/plugin/test_rate_limiter.py -v -s -k benchmark
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from services.plugin.security import rate_limiter as rl
+from services.plugin.security.rate_limiter import (
+    InMemoryRateLimiter, MultiLevelRateLimiter, RateLimitLevel, MULTI_LEVEL_LUA
+)
+
+
+def redis_limiter(client) -> MultiLevelRateLimiter:
+    """MultiLevelRateLimiter wired to the given redis.asyncio client."""
+    limiter = MultiLevelRateLimiter(redis_url=None)
+    limiter._backend._redis = client
+    limiter._backend._script = client.register_script(MULTI_LEVEL_LUA)
+    return limiter
+
+
+@pytest.fixture
+def fake_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.aioredis.FakeRedis()
+
+
+@pytest.fixture
+def memory_limiter():
+    limiter = MultiLevelRateLimiter(redis_url=None)
+    limiter._backend._redis = False
+    return limiter
+
+
+# ============================================================================
+# In-memory fallback
+# ============================================================================
+
+class TestInMemoryFallback:
+
+    @pytest.mark.asyncio
+    async def test_denied_request_is_not_counted_on_other_levels(self, memory_limiter):
+        for _ in range(3):
+            assert (await memory_limiter.check(api_key_id=1, api_key_limit=3, ip_address="1.2.3.4")).allowed
+
+        result = await memory_limiter.check(api_key_id=1, api_key_limit=3, ip_address="1.2.3.4")
+
+        assert not result.allowed
+        assert result.level == RateLimitLevel.API_KEY
+        usage = await memory_limiter.get_usage(RateLimitLevel.IP, "1.2.3.4")
+        assert usage["current"] == 3
+
+    @pytest.mark.asyncio
+    async def test_single_key_api_still_works(self):
+        backend = InMemoryRateLimiter()
+        assert (await backend.check_and_increment("k", 1, 60))[0]
+        assert not (await backend.check_and_increment("k", 1, 60))[0]
+
+    @pytest.mark.asyncio
+    async def test_previous_window_is_weighted(self, monkeypatch):
+        backend = InMemoryRateLimiter()
+        window_start = (int(time.time()) // 60 + 1) * 60
+
+        monkeypatch.setattr(rl.time, "time", lambda: window_start + 1)
+        for _ in range(10):
+            assert (await backend.check_and_increment("k", 10, 60))[0]
+
+        monkeypatch.setattr(rl.time, "time", lambda: window_start + 90)
+        allowed = 0
+        while (await backend.check_and_increment("k", 10, 60))[0]:
+            allowed += 1
+        assert allowed == 5
+
+    @pytest.mark.asyncio
+    async def test_idle_keys_are_evicted(self, monkeypatch):
+        backend = InMemoryRateLimiter(shards=1)
+        now = 1_000_000.0
+        monkeypatch.setattr(rl.time, "time", lambda: now)
+        for i in range(3):
+            await backend.check_and_increment(f"ip:{i}", 10, 60)
+
+        # Two windows later the old keys hold no count and are dropped
+        now += 121
+        await backend.check_and_increment("ip:new", 10, 60)
+
+        assert len(backend) == 1
+        assert backend.evicted == 3
+
+    @pytest.mark.asyncio
+    async def test_memory_ceiling(self):
+        backend = InMemoryRateLimiter(shards=4, max_keys=100)
+        for i in range(1000):
+            await backend.check_and_increment(f"ip:{i}", 10, 60)
+
+        assert len(backend) <= 100
+        assert backend.evicted >= 900
+
+
+@pytest.mark.asyncio
+async def test_benchmark_in_memory_fallback():
+    """Single instance absorbing full traffic with Redis down."""
+    backend = InMemoryRateLimiter(max_keys=20_000)
+    limiter = MultiLevelRateLimiter(redis_url=None)
+    limiter._backend._redis = False
+    limiter._backend._fallback = backend
+
+    iterations = 50_000
+    started = time.perf_counter()
+    for i in range(iterations):
+        await limiter.check(
+            api_key_id=i % 200, plugin_id=i % 20, ip_address=f"10.0.{i % 256}.{i % 199}"
+        )
+    elapsed = time.perf_counter() - started
+
+    print(f"\nIn-memory fallback: {iterations / elapsed:,.0f} checks/s "
+          f"(3 levels), {len(backend)} keys held, {backend.evicted} evicted")
+
+    assert len(backend) <= 20_000
+    assert iterations / elapsed > 5_000
+
+
+# ============================================================================
+# Lua script
+# ============================================================================
+
+class TestLuaMultiLevel:
+
+    @pytest.mark.asyncio
+    async def test_one_script_call_per_check(self, fake_redis):
+        limiter = redis_limiter(fake_redis)
+        calls = []
+        script = limiter._backend._script
+
+        async def counting_script(**kwargs):
+            calls.append(kwargs)
+            return await script(**kwargs)
+
+        limiter._backend._script = counting_script
+
+        result = await limiter.check(
+            api_key_id=1, api_key_limit=10, plugin_id=2, user_id=3, ip_address="1.2.3.4"
+        )
+
+        assert result.allowed
+        assert len(calls) == 1
+        assert len(calls[0]["keys"]) == 8  # current + previous counter per level
+
+    @pytest.mark.asyncio
+    async def test_denies_at_limit_and_reports_level(self, fake_redis):
+        limiter = redis_limiter(fake_redis)
+
+        results = [
+            await limiter.check(api_key_id=1, api_key_limit=5, plugin_id=2)
+            for _ in range(7)
+        ]
+
+        assert [r.allowed for r in results] == [True] * 5 + [False] * 2
+        assert results[-1].level == RateLimitLevel.API_KEY
+        assert results[-1].retry_after_seconds >= 1
+        # Denied requests did not consume plugin quota
+        usage = await limiter.get_usage(RateLimitLevel.PLUGIN, "2")
+        assert usage["current"] == 5
+
+    @pytest.mark.asyncio
+    async def test_previous_window_is_weighted(self, fake_redis, monkeypatch):
+        limiter = redis_limiter(fake_redis)
+        window_start = (int(time.time()) // 60 + 1) * 60
+
+        monkeypatch.setattr(rl.time, "time", lambda: window_start + 1)
+        for _ in range(10):
+            assert (await limiter.check(api_key_id=1, api_key_limit=10)).allowed
+
+        # Halfway through the next window, half of the previous 10 still count
+        monkeypatch.setattr(rl.time, "time", lambda: window_start + 60 + 30)
+        allowed = 0
+        while (await limiter.check(api_key_id=1, api_key_limit=10)).allowed:
+            allowed += 1
+        assert allowed == 5
+
+    @pytest.mark.asyncio
+    async def test_counter_keys_expire(self, fake_redis):
+        limiter = redis_limiter(fake_redis)
+        await limiter.check(ip_address="1.2.3.4")
+
+        keys = await fake_redis.keys("ratelimit:ip:*")
+        assert len(keys) == 1
+        assert 0 < await fake_redis.pttl(keys[0]) <= 120_000
+
+
+# ============================================================================
+# Benchmark (real Redis)
+# ============================================================================
+
+async def _legacy_check(client, levels):
+    """Previous approach: per-level ZSET pipeline + zrange on denial."""
+    for key, limit, window in levels:
+        now = time.time()
+        pipe = client.pipeline()
+        pipe.zremrangebyscore(key, 0, now - window)
+        pipe.zcard(key)
+        pipe.zadd(key, {str(now): now})
+        pipe.expire(key, window + 1)
+        count = (await pipe.execute())[1]
+        if count >= limit:
+            await client.zrange(key, 0, 0, withscores=True)
+            return False
+    return True
+
+
+@pytest.mark.asyncio
+async def test_benchmark_multi_level_redis():
+    """Requests/sec: four levels via one Lua call vs. four pipelines."""
+    redis_url = os.environ.get("REDIS_URL")
+    if not redis_url:
+        pytest.skip("REDIS_URL not set")
+    import redis.asyncio as redis
+
+    client = redis.from_url(redis_url)
+    try:
+        await client.ping()
+    except Exception:
+        pytest.skip("Redis not reachable")
+
+    iterations = 2000
+    concurrency = 50
+    prefix = f"ratelimit-bench:{time.time_ns()}"
+
+    async def run(check) -> float:
+        queue = iter(range(iterations))
+
+        async def worker():
+            for i in queue:
+                await check(i)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return iterations / (time.perf_counter() - started)
+
+    limiter = redis_limiter(client)
+    levels = lambda i: [
+        (f"{prefix}:legacy:ip:{i % 100}", 10**9, 60),
+        (f"{prefix}:legacy:user:{i % 50}", 10**9, 3600),
+        (f"{prefix}:legacy:plugin:{i % 10}", 10**9, 3600),
+        (f"{prefix}:legacy:key:{i % 20}", 10**9, 60),
+    ]
+
+    legacy_rps = await run(lambda i: _legacy_check(client, levels(i)))
+    lua_rps = await run(lambda i: limiter._backend.check_levels([
+        (f"{prefix}:lua:ip:{i % 100}", 10**9, 60),
+        (f"{prefix}:lua:user:{i % 50}", 10**9, 3600),
+        (f"{prefix}:lua:plugin:{i % 10}", 10**9, 3600),
+        (f"{prefix}:lua:key:{i % 20}", 10**9, 60),
+    ]))
+
+    legacy_members = sum([await client.zcard(k) for k in await client.keys(f"{prefix}:legacy:*")])
+    lua_keys = len(await client.keys(f"{prefix}:lua:*"))
+
+    print(f"\nMulti-level rate limit ({iterations} requests, 4 levels, {concurrency} concurrent):")
+    print(f"  Pipelines + ZSET: {legacy_rps:,.0f} req/s, {legacy_members} sorted-set members")
+    print(f"  Lua script:       {lua_rps:,.0f} req/s, {lua_keys} counter keys")
+
+    await client.delete(*await client.keys(f"{prefix}:*"))
+    await client.aclose()
+
+    assert lua_rps > legacy_rps
@@ -0,0 +1,273 @@
+"""
+Webhook Dispatcher Tests
+
+Tests for the persistent webhook outbox, per-host concurrency limits,
+coalescing and retries.
+
+Run: pytest tests/plugin/test_webhook_dispatcher.py -v
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+from services.plugin.population.webhooks import (
+    WebhookService, WebhookConfig, WebhookEvent, HostClientPool
+)
+from services.plugin.population.webhook_dispatcher import (
+    WebhookDispatcher, WebhookOutboxEntry, OutboxStatus
+)
+from services.plugin.population import webhook_dispatcher as dispatcher_module
+from utils.circuit_breaker import get_circuit_breaker
+from utils.telemetry import metrics
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers(monkeypatch):
+    from utils import circuit_breaker
+    monkeypatch.setattr(circuit_breaker, "_circuit_breakers", {})
+
+
+class FakeEndpoint:
+    """Records requests per host and answers with queued status codes."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+        self.statuses = defaultdict(list)
+        self.in_flight = defaultdict(int)
+        self.max_in_flight = defaultdict(int)
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.in_flight[host] += 1
+        self.max_in_flight[host] = max(self.max_in_flight[host], self.in_flight[host])
+        try:
+            await asyncio.sleep(self.delay)
+            self.requests.append(request)
+            queued = self.statuses[host]
+            return httpx.Response(queued.pop(0) if queued else 200)
+        finally:
+            self.in_flight[host] -= 1
+
+
+def make_dispatcher(endpoint, session_factory, per_host=8) -> WebhookDispatcher:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(endpoint))
+    service = WebhookService(http_client=client, host_pool=HostClientPool(per_host))
+    dispatcher = WebhookDispatcher(webhook_service=service)
+    dispatcher._session_factory = session_factory
+    return dispatcher
+
+
+def config(host="a.example.com", **kwargs) -> WebhookConfig:
+    return WebhookConfig(url=f"https://{host}/hook", secret="s3cret", **kwargs)
+
+
+async def make_due(session_factory):
+    async with session_factory() as db:
+        await db.execute(update(WebhookOutboxEntry).values(next_attempt_at=WebhookOutboxEntry.created_at))
+        await db.commit()
+
+
+async def outbox(session_factory):
+    async with session_factory() as db:
+        return (await db.execute(select(WebhookOutboxEntry).order_by(WebhookOutboxEntry.id))).scalars().all()
+
+
+# ============================================================================
+# Tests
+# ============================================================================
+
+class TestWebhookDispatcher:
+
+    @pytest.mark.asyncio
+    async def test_enqueued_events_survive_until_delivered(self, session_factory):
+        endpoint = FakeEndpoint()
+        dispatcher = make_dispatcher(endpoint, session_factory)
+
+        await dispatcher.enqueue(config(), WebhookEvent.POPULATION_SUCCESS, {"n": 1}, plugin_id=1)
+        assert [e.status for e in await outbox(session_factory)] == [OutboxStatus.PENDING.value]
+
+        assert await dispatcher.dispatch_once() == 1
+
+        [entry] = await outbox(session_factory)
+        assert entry.status == OutboxStatus.DELIVERED.value
+        assert entry.delivered_at is not None
+        request = endpoint.requests[0]
+        body = request.content.decode()
+        assert json.loads(body)["data"] == {"n": 1}
+        assert WebhookService.verify_signature(
+            body, "s3cret",
+            request.headers[WebhookService.TIMESTAMP_HEADER],
+            request.headers[WebhookService.SIGNATURE_HEADER],
+        )
+
+    @pytest.mark.asyncio
+    async def test_per_host_concurrency_limit(self, session_factory):
+        endpoint = FakeEndpoint(delay=0.02)
+        dispatcher = make_dispatcher(endpoint, session_factory, per_host=3)
+        for i in range(12):
+            await dispatcher.enqueue(config("slow.example.com"), WebhookEvent.SESSION_COMPLETED, {"n": i})
+            await dispatcher.enqueue(config("fast.example.com"), WebhookEvent.SESSION_COMPLETED, {"n": i})
+
+        assert await dispatcher.dispatch_once() == 24
+
+        assert len(endpoint.requests) == 24
+        assert endpoint.max_in_flight["slow.example.com"] == 3
+        assert endpoint.max_in_flight["fast.example.com"] == 3
+
+    @pytest.mark.asyncio
+    async def test_coalescing_endpoint_gets_one_batch(self, session_factory):
+        endpoint = FakeEndpoint()
+        dispatcher = make_dispatcher(endpoint, session_factory)
+        for i in range(5):
+            await dispatcher.enqueue(config(coalesce=True), WebhookEvent.POPULATION_SUCCESS, {"n": i})
+        await dispatcher.enqueue(config("other.example.com"), WebhookEvent.POPULATION_FAILED, {"n": 9})
+
+        await dispatcher.dispatch_once()
+
+        assert len(endpoint.requests) == 2
+        batch = next(r for r in endpoint.requests if r.url.host == "a.example.com")
+        assert batch.headers[WebhookService.EVENT_HEADER] == "batch"
+        assert [e["data"]["n"] for e in json.loads(batch.content)["events"]] == list(range(5))
+        assert {e.status for e in await outbox(session_factory)} == {OutboxStatus.DELIVERED.value}
+
+    @pytest.mark.asyncio
+    async def test_server_errors_retry_with_backoff(self, session_factory):
+        endpoint = FakeEndpoint()
+        endpoint.statuses["a.example.com"] = [503]
+        dispatcher = make_dispatcher(endpoint, session_factory)
+        await dispatcher.enqueue(config(), WebhookEvent.POPULATION_SUCCESS, {})
+
+        await dispatcher.dispatch_once()
+        [entry] = await outbox(session_factory)
+        assert entry.status == OutboxStatus.PENDING.value
+        assert entry.attempts == 1
+        assert entry.last_error == "HTTP 503"
+        # Backing off: not due yet
+        assert await dispatcher.dispatch_once() == 0
+
+        await make_due(session_factory)
+        await dispatcher.dispatch_once()
+        [entry] = await outbox(session_factory)
+        assert entry.status == OutboxStatus.DELIVERED.value
+        assert entry.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_and_exhausted_retries_fail(self, session_factory):
+        endpoint = FakeEndpoint()
+        endpoint.statuses["a.example.com"] = [400]
+        endpoint.statuses["b.example.com"] = [500, 500]
+        dispatcher = make_dispatcher(endpoint, session_factory)
+        await dispatcher.enqueue(config("a.example.com"), WebhookEvent.POPULATION_SUCCESS, {})
+        await dispatcher.enqueue(config("b.example.com", max_retries=1), WebhookEvent.POPULATION_SUCCESS, {})
+
+        await dispatcher.dispatch_once()
+        await make_due(session_factory)
+        await dispatcher.dispatch_once()
+
+        a, b = await outbox(session_factory)
+        assert (a.status, a.attempts) == (OutboxStatus.FAILED.value, 1)
+        assert (b.status, b.attempts) == (OutboxStatus.FAILED.value, 2)
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_defers_without_using_an_attempt(self, session_factory):
+        endpoint = FakeEndpoint()
+        dispatcher = make_dispatcher(endpoint, session_factory)
+        await dispatcher.enqueue(config(max_retries=1), WebhookEvent.POPULATION_SUCCESS, {}, plugin_id=7)
+        circuit = get_circuit_breaker("webhook_7")
+        for _ in range(circuit.failure_threshold):
+            circuit.record_failure()
+
+        for _ in range(3):
+            await make_due(session_factory)
+            before = datetime.utcnow()
+            await dispatcher.dispatch_once()
+
+        assert endpoint.requests == []
+        [entry] = await outbox(session_factory)
+        assert (entry.status, entry.attempts) == (OutboxStatus.PENDING.value, 0)
+        assert entry.last_error == "circuit open"
+        assert entry.next_attempt_at >= before + timedelta(seconds=circuit.recovery_timeout - 1)
+
+    def test_retry_delay_is_jittered_and_capped(self):
+        dispatcher = WebhookDispatcher()
+        delays = {round(dispatcher.retry_delay(3), 3) for _ in range(20)}
+
+        assert len(delays) > 1
+        assert all(8 <= d <= 16 for d in delays)
+        assert dispatcher.retry_delay(50) <= WebhookDispatcher.MAX_RETRY_DELAY_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_delivery_latency_metrics(self, session_factory):
+        metrics.reset()
+        dispatcher = make_dispatcher(FakeEndpoint(), session_factory)
+        await dispatcher.enqueue(config(), WebhookEvent.POPULATION_SUCCESS, {})
+
+        await dispatcher.dispatch_once()
+
+        assert metrics.get_timing_stats("webhook.delivery_latency")["count"] == 1
+        assert metrics.get_timing_stats(
+            "webhook.request_latency", {"host": "https://a.example.com"}
+        )["count"] == 1
+
+
+class TestFireAndForget:
+
+    @pytest.mark.asyncio
+    async def test_uses_outbox_when_dispatcher_running(self, session_factory, monkeypatch):
+        endpoint = FakeEndpoint()
+        dispatcher = make_dispatcher(endpoint, session_factory)
+        monkeypatch.setattr(dispatcher_module, "_webhook_dispatcher", dispatcher)
+        dispatcher.start(session_factory)
+
+        await dispatcher.webhook_service.send_fire_and_forget(
+            config(), WebhookEvent.SESSION_STARTED, {"session_id": "abc"}, plugin_id=1
+        )
+        for _ in range(50):
+            if endpoint.requests:
+                break
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+
+        assert len(endpoint.requests) == 1
+        assert [e.status for e in await outbox(session_factory)] == [OutboxStatus.DELIVERED.value]
+
+    @pytest.mark.asyncio
+    async def test_enqueue_errors_are_logged_not_raised(self, session_factory, monkeypatch):
+        dispatcher = make_dispatcher(FakeEndpoint(), session_factory)
+        monkeypatch.setattr(dispatcher_module, "_webhook_dispatcher", dispatcher)
+        dispatcher.start(session_factory)
+        monkeypatch.setattr(dispatcher, "enqueue", AsyncMock(side_effect=ConnectionError("db down")))
+
+        try:
+            await dispatcher.webhook_service.send_fire_and_forget(
+                config(), WebhookEvent.SESSION_STARTED, {"session_id": "abc"}, plugin_id=1
+            )
+        finally:
+            await dispatcher.stop()
+
+        dispatcher.enqueue.assert_awaited_once()
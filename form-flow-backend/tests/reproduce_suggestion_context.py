@@ -23,7 +23,7 @@ class TestContextAwareSuggestions(unittest.IsolatedAsyncioTestCase):
         }
         
         # Patch get_gemini_service to return our mock
-        with patch('services.ai.gemini.get_gemini_service', return_value=mock_gemini), \
+        with patch('services.ai.profile.suggestions.get_gemini_service', return_value=mock_gemini), \
              patch('services.ai.profile.suggestions.ChatPromptTemplate') as MockPrompt, \
              patch('services.ai.profile.suggestions.JsonOutputParser'):
             
@@ -0,0 +1,235 @@
+"""
+Unit Tests for Browser Pool Request Blocking
+
+Tests for the CDP blocklist and how it is installed on contexts, plus a
+page-load benchmark against the old per-request route handler (needs a
+Playwright Chromium: `playwright install chromium`).
+
+Run: pytest tests/test_browser_pool.py -v -s
+"""
+
+import asyncio
+import re
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from services.form import browser_pool
+from services.form.browser_pool import (
+    blocked_url_patterns, _install_request_blocking, BLOCKED_URL_PATTERNS
+)
+
+
+def is_blocked(url: str, patterns) -> bool:
+    """Chromium MatchPattern: '*' any run, '?' zero or one char, '\\' escapes."""
+    for pattern in patterns:
+        regex = "".join(
+            re.escape(token[1]) if token.startswith("\\") else
+            ".*" if token == "*" else
+            ".?" if token == "?" else
+            re.escape(token)
+            for token in re.findall(r"\\.|.", pattern)
+        )
+        if re.fullmatch(regex, url):
+            return True
+    return False
+
+
+# ============================================================================
+# Patterns
+# ============================================================================
+
+class TestBlockedURLPatterns:
+    """Tests for the URL patterns handed to Network.setBlockedURLs."""
+
+    def test_resource_types_match_by_extension(self):
+        patterns = blocked_url_patterns(("font", "image"))
+
+        assert is_blocked("https://fonts.gstatic.com/s/roboto/v30/a.woff2", patterns)
+        assert is_blocked("https://cdn.example.com/hero.jpg?w=1200", patterns)
+        assert not is_blocked("https://example.com/app.js", patterns)
+        assert not is_blocked("https://example.com/style.css", patterns)
+
+    def test_extension_must_end_the_path(self):
+        patterns = blocked_url_patterns(("image",))
+
+        # ".ico" inside a host or file name is not an icon
+        assert not is_blocked("https://cdn.iconify.design/iconify.min.js", patterns)
+        assert is_blocked("https://example.com/favicon.ico", patterns)
+
+    def test_trackers_are_always_blocked(self):
+        patterns = blocked_url_patterns(("media",))
+
+        assert is_blocked("https://www.google-analytics.com/g/collect?v=2", patterns)
+        assert is_blocked("https://www.googletagmanager.com/gtag/js?id=G-1", patterns)
+        assert not is_blocked("https://docs.google.com/forms/d/e/abc/viewform", patterns)
+
+    def test_patterns_are_built_once(self):
+        assert blocked_url_patterns(("font",)) is blocked_url_patterns(("font",))
+        assert set(BLOCKED_URL_PATTERNS) <= set(blocked_url_patterns(()))
+
+
+# ============================================================================
+# Installation
+# ============================================================================
+
+def fake_context(browser_name: str = "chromium"):
+    context = MagicMock()
+    context.browser.browser_type.name = browser_name
+    context.new_page = AsyncMock(side_effect=lambda *args, **kwargs: MagicMock())
+    context.route = AsyncMock()
+    cdp = MagicMock()
+    cdp.send = AsyncMock()
+    context.new_cdp_session = AsyncMock(return_value=cdp)
+    return context, cdp
+
+
+class TestInstallRequestBlocking:
+    """Tests for installing the blocklist on a context."""
+
+    @pytest.mark.asyncio
+    async def test_chromium_uses_cdp_and_no_route(self):
+        context, cdp = fake_context()
+
+        await _install_request_blocking(context, ["image", "font"])
+        page = await context.new_page()
+
+        context.route.assert_not_called()
+        context.new_cdp_session.assert_awaited_once_with(page)
+        method, params = cdp.send.await_args_list[-1].args
+        assert method == "Network.setBlockedURLs"
+        assert "*.woff2" in params["urls"]
+
+    @pytest.mark.asyncio
+    async def test_popup_pages_are_blocked_once(self):
+        context, cdp = fake_context()
+        original_new_page = context.new_page
+        listeners = []
+
+        async def slow_cdp_session(page):
+            await asyncio.sleep(0.01)
+            return cdp
+
+        async def opening_page(*args, **kwargs):
+            # Playwright emits "page" before new_page() returns and runs
+            # async listeners as tasks
+            page = MagicMock()
+            listeners.append(asyncio.ensure_future(on_page(page)))
+            await asyncio.sleep(0)
+            return page
+
+        context.new_cdp_session = AsyncMock(side_effect=slow_cdp_session)
+        original_new_page.side_effect = opening_page
+        await _install_request_blocking(context, ["image"])
+        on_page = context.on.call_args.args[1]
+
+        page = await context.new_page(viewport={"width": 800, "height": 600})
+        assert cdp.send.await_args_list[-1].args[0] == "Network.setBlockedURLs"
+        original_new_page.assert_awaited_once_with(viewport={"width": 800, "height": 600})
+
+        await on_page(MagicMock())   # popup opened by the site
+        await asyncio.gather(*listeners)
+
+        assert context.new_cdp_session.await_count == 2
+        assert context.new_cdp_session.await_args_list[0].args == (page,)
+
+    @pytest.mark.asyncio
+    async def test_other_browsers_fall_back_to_route(self):
+        context, _ = fake_context("firefox")
+
+        await _install_request_blocking(context, ["image"])
+
+        context.route.assert_awaited_once()
+        context.new_cdp_session.assert_not_called()
+
+
+# ============================================================================
+# Benchmark (real Chromium)
+# ============================================================================
+
+HEAVY_PAGE = """<!doctype html><html><head>
+<link rel="stylesheet" href="/style.css">
+{fonts}
+</head><body><form><input name="email"><button>Send</button></form>
+{images}
+</body></html>"""
+
+
+def _serve(directory):
+    handler = partial(_QuietHandler, directory=str(directory))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+async def _legacy_context(browser, block_resources):
+    context = await browser.new_context()
+    await context.route(
+        "**/*",
+        lambda route: route.abort() if route.request.resource_type in set(block_resources) else route.continue_()
+    )
+    return context
+
+
+async def _native_context(browser, block_resources):
+    context = await browser.new_context()
+    await _install_request_blocking(context, block_resources)
+    return context
+
+
+@pytest.mark.asyncio
+async def test_benchmark_request_blocking(tmp_path):
+    """Page-ready time and Python CPU: route handler vs. CDP blocklist."""
+    playwright_api = pytest.importorskip("playwright.async_api")
+    try:
+        pw = await playwright_api.async_playwright().start()
+        browser = await pw.chromium.launch(args=browser_pool.BROWSER_ARGS)
+    except Exception as e:
+        pytest.skip(f"Chromium not available: {e}")
+
+    (tmp_path / "style.css").write_text("body { margin: 0 }")
+    (tmp_path / "pixel.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\0" * 2048)
+    (tmp_path / "font.woff2").write_bytes(b"\0" * 4096)
+    (tmp_path / "index.html").write_text(HEAVY_PAGE.format(
+        fonts="\n".join(f'<link rel="preload" as="font" href="/font.woff2?{i}">' for i in range(40)),
+        images="\n".join(f'<img src="/pixel.png?{i}">' for i in range(300)),
+    ))
+    server = _serve(tmp_path)
+    url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+    block = ["image", "font", "media"]
+    runs = 5
+
+    async def measure(make_context):
+        wall = cpu = 0.0
+        for _ in range(runs):
+            context = await make_context(browser, block)
+            page = await context.new_page()
+            started, cpu_started = time.perf_counter(), time.process_time()
+            await page.goto(url, wait_until="load")
+            wall += time.perf_counter() - started
+            cpu += time.process_time() - cpu_started
+            await context.close()
+        return wall / runs * 1000, cpu / runs * 1000
+
+    try:
+        legacy_ms, legacy_cpu = await measure(_legacy_context)
+        native_ms, native_cpu = await measure(_native_context)
+    finally:
+        await browser.close()
+        await pw.stop()
+        server.shutdown()
+
+    print(f"\nPage with 300 images / 40 fonts, avg of {runs}:")
+    print(f"  route handler:  {legacy_ms:7.1f} ms ready, {legacy_cpu:6.1f} ms Python CPU")
+    print(f"  CDP blocklist:  {native_ms:7.1f} ms ready, {native_cpu:6.1f} ms Python CPU")
+
+    assert native_cpu < legacy_cpu
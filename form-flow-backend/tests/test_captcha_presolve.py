@@ -0,0 +1,243 @@
+"""
+Unit Tests for CAPTCHA Pre-solving and Batched 2Captcha Polling
+
+Runs TwoCaptchaClient against a local fake 2Captcha server (in.php /
+res.php) to test multi-id result polling, per-task errors and timeouts,
+and CaptchaSolverService pre-solving overlapped with form filling,
+plus a benchmark of submission tail latency.
+
+Run: pytest tests/test_captcha_presolve.py -v -s
+"""
+
+import asyncio
+import itertools
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from services.captcha.solver import CaptchaSolverService, CaptchaType, SolveStrategy
+from services.captcha.twocaptcha import TwoCaptchaClient
+
+
+POLL = 0.05
+
+
+class FakeTwoCaptcha:
+    """In-process 2Captcha: tasks become ready `solve_seconds` after submission."""
+
+    def __init__(self, solve_seconds=0.15):
+        self.solve_seconds = solve_seconds
+        self.tasks = {}
+        self.ids = itertools.count(1000)
+        self.res_requests = []
+        self.fail_sitekeys = set()
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/in.php", self.submit)
+        app.router.add_get("/res.php", self.result)
+        return app
+
+    async def submit(self, request):
+        data = await request.post()
+        if data.get("key") != "test-key":
+            return web.json_response({"status": 0, "request": "ERROR_WRONG_USER_KEY"})
+        task_id = str(next(self.ids))
+        sitekey = data.get("googlekey") or data.get("sitekey") or "image"
+        self.tasks[task_id] = (time.monotonic() + self.solve_seconds, sitekey)
+        return web.json_response({"status": 1, "request": task_id})
+
+    async def result(self, request):
+        ids = request.query["ids"].split(",")
+        self.res_requests.append(ids)
+        answers = []
+        for task_id in ids:
+            ready_at, sitekey = self.tasks[task_id]
+            if time.monotonic() < ready_at:
+                answers.append("CAPCHA_NOT_READY")
+            elif sitekey in self.fail_sitekeys:
+                answers.append("ERROR_CAPTCHA_UNSOLVABLE")
+            else:
+                answers.append(f"token-{sitekey}")
+        return web.json_response({"status": 1, "request": "|".join(answers)})
+
+
+@pytest_asyncio.fixture
+async def fake_2captcha():
+    fake = FakeTwoCaptcha()
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    fake.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    yield fake
+    await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def client(fake_2captcha):
+    client = TwoCaptchaClient("test-key", timeout=5, base_url=fake_2captcha.url, poll_interval=POLL)
+    yield client
+    await client.close()
+
+
+def captcha_page(sitekey="site-key"):
+    page = AsyncMock()
+    page.url = "https://example.com/form"
+    page.evaluate.return_value = sitekey
+    return page
+
+
+def solver_for(client):
+    solver = CaptchaSolverService(twocaptcha_key="test-key")
+    solver._twocaptcha_client = client
+    return solver
+
+
+RECAPTCHA = {"hasCaptcha": True, "type": "recaptcha"}
+
+
+# ============================================================================
+# Batched polling
+# ============================================================================
+
+class TestBatchedPolling:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_solves_share_result_polls(self, client, fake_2captcha):
+        results = await asyncio.gather(*(
+            client.solve_recaptcha(f"key-{i}", "https://example.com") for i in range(8)
+        ))
+
+        assert [r.token for r in results] == [f"token-key-{i}" for i in range(8)]
+        assert all(r.success and r.cost > 0 for r in results)
+        # One res.php request per interval covering every pending task
+        assert max(len(ids) for ids in fake_2captcha.res_requests) == 8
+        assert len(fake_2captcha.res_requests) <= 6
+
+    @pytest.mark.asyncio
+    async def test_errors_are_per_task(self, client, fake_2captcha):
+        fake_2captcha.fail_sitekeys.add("bad")
+
+        good, bad = await asyncio.gather(
+            client.solve_hcaptcha("good", "https://example.com"),
+            client.solve_turnstile("bad", "https://example.com"),
+        )
+
+        assert good.success and good.token == "token-good"
+        assert not bad.success and bad.error == "ERROR_CAPTCHA_UNSOLVABLE"
+
+    @pytest.mark.asyncio
+    async def test_submit_error(self, fake_2captcha):
+        client = TwoCaptchaClient("wrong-key", base_url=fake_2captcha.url, poll_interval=POLL)
+
+        result = await client.solve_normal("aW1hZ2U=")
+        await client.close()
+
+        assert not result.success
+        assert result.error == "ERROR_WRONG_USER_KEY"
+
+    @pytest.mark.asyncio
+    async def test_timeout_leaves_no_pending_tasks(self, fake_2captcha):
+        fake_2captcha.solve_seconds = 10
+        client = TwoCaptchaClient("test-key", timeout=0.2, base_url=fake_2captcha.url, poll_interval=POLL)
+
+        result = await client.solve_recaptcha("slow", "https://example.com")
+        await asyncio.sleep(POLL * 2)
+
+        assert result.error == "Timeout waiting for solution"
+        assert client._pending == {}
+        assert client._poller.done()
+        await client.close()
+
+
+# ============================================================================
+# Pre-solving
+# ============================================================================
+
+class TestPresolve:
+
+    @pytest.mark.asyncio
+    async def test_presolve_overlaps_filling_and_injects_token(self, client):
+        solver = solver_for(client)
+        page = captcha_page()
+
+        presolve = await solver.start_presolve(page, RECAPTCHA)
+        await asyncio.sleep(0.2)  # filling fields
+        assert presolve.task.done()
+
+        result = await solver.finish_presolve(page, presolve)
+
+        assert result.success
+        assert result.strategy_used == SolveStrategy.API_SOLVE
+        assert result.token == "token-site-key"
+        assert page.evaluate.await_args.args[1] == "token-site-key"
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_presolve(self, client):
+        solver = solver_for(client)
+
+        assert await solver.start_presolve(captcha_page(), {"hasCaptcha": False}) is None
+        assert await solver.start_presolve(captcha_page(), {"hasCaptcha": True, "type": "cloudflare-turnstile"}) is None
+        assert await solver.start_presolve(captcha_page(sitekey=None), RECAPTCHA) is None
+        assert await CaptchaSolverService().start_presolve(captcha_page(), RECAPTCHA) is None
+
+    @pytest.mark.asyncio
+    async def test_failed_presolve_falls_back_to_manual(self, client, fake_2captcha):
+        fake_2captcha.fail_sitekeys.add("site-key")
+        solver = solver_for(client)
+
+        presolve = await solver.start_presolve(captcha_page(), RECAPTCHA)
+        result = await solver.finish_presolve(captcha_page(), presolve)
+
+        assert result.requires_user_action
+        assert result.strategy_used == SolveStrategy.MANUAL_FALLBACK
+        assert result.captcha_type == CaptchaType.RECAPTCHA_V2
+
+    @pytest.mark.asyncio
+    async def test_expired_token_is_solved_again(self, client, fake_2captcha):
+        solver = solver_for(client)
+        page = captcha_page()
+
+        presolve = await solver.start_presolve(page, RECAPTCHA)
+        await presolve.task
+        presolve.started_at -= solver.TOKEN_MAX_AGE_SECONDS + 1
+
+        result = await solver.finish_presolve(page, presolve)
+
+        assert result.success
+        assert len(fake_2captcha.tasks) == 2
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_benchmark_submission_tail_latency(client, fake_2captcha):
+    """Load -> fill (200 ms) -> CAPTCHA -> submit, with a 300 ms API solve."""
+    fake_2captcha.solve_seconds = 0.3
+    fill_seconds = 0.2
+    solver = solver_for(client)
+    results = {}
+
+    for label in ("solve after fill", "pre-solve"):
+        page = captcha_page()
+        started = time.perf_counter()
+        if label == "pre-solve":
+            presolve = await solver.start_presolve(page, RECAPTCHA)
+            await asyncio.sleep(fill_seconds)
+            result = await solver.finish_presolve(page, presolve)
+        else:
+            await asyncio.sleep(fill_seconds)
+            result = await solver.solve(page, RECAPTCHA)
+        assert result.success
+
+        results[label] = (time.perf_counter() - started) * 1000
+        print(f"\n{label:>16}: ready to submit after {results[label]:6.1f} ms")
+
+    print(f"res.php requests: {len(fake_2captcha.res_requests)}")
+    assert results["pre-solve"] < results["solve after fill"] - fill_seconds * 1000 * 0.5
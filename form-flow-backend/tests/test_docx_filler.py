@@ -0,0 +1,133 @@
+"""
+Tests for the Word document placeholder index and filler.
+"""
+
+import io
+
+import pytest
+from docx import Document
+
+from services.docx.docx_parser import DocxParser
+from services.docx.docx_filler import DocxTemplate, fill_docx_template, fill_docx_batch
+from services.docx.placeholder_index import PlaceholderIndex
+
+
+@pytest.fixture
+def template_bytes():
+    """Template with placeholders in body, split runs, a table, header and footer."""
+    doc = Document()
+    doc.add_paragraph("Dear [Name], welcome aboard.")
+
+    # Placeholder split across three runs
+    split = doc.add_paragraph("Email: ")
+    split.add_run("[Em")
+    split.add_run("ail").bold = True
+    split.add_run("] and again [Name].")
+
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Phone"
+    table.cell(0, 1).text = "[Phone Number]"
+
+    section = doc.sections[0]
+    section.header.paragraphs[0].text = "Offer for [Name]"
+    section.footer.paragraphs[0].text = "Ref: [Reference_ID]"
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _all_text(content: bytes) -> str:
+    doc = Document(io.BytesIO(content))
+    parts = [p.text for p in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            parts.extend(cell.text for cell in row.cells)
+    section = doc.sections[0]
+    parts.extend(p.text for p in section.header.paragraphs)
+    parts.extend(p.text for p in section.footer.paragraphs)
+    return "\n".join(parts)
+
+
+class TestPlaceholderIndex:
+
+    def test_index_covers_tables_headers_and_split_runs(self, template_bytes):
+        index = PlaceholderIndex.build(Document(io.BytesIO(template_bytes)))
+
+        assert set(index.keys()) == {"name", "email", "phone number", "reference id"}
+        assert len(index.lookup("name")) == 3
+        split = index.lookup("Email")[0]
+        assert split.start_node != split.end_node
+
+    def test_parser_exposes_fields_and_index(self, template_bytes):
+        parser = DocxParser(template_bytes)
+        parser.parse()
+
+        names = {f.name for f in parser.fields}
+        assert names == {"name", "email", "phone_number", "reference_id"}
+        assert parser.placeholder_index is not None
+
+    def test_round_trip_serialization(self, template_bytes):
+        index = PlaceholderIndex.build(Document(io.BytesIO(template_bytes)))
+
+        restored = PlaceholderIndex.from_dict(index.to_dict())
+
+        assert restored.spans == index.spans
+
+
+class TestFiller:
+
+    def test_fill_everywhere_in_one_sweep(self, template_bytes):
+        data = {
+            "name": "Asha",
+            "email": "asha@example.com",
+            "phone_number": "98765 43210",
+            "reference_id": "R-7",
+        }
+
+        filled, count = fill_docx_template(template_bytes, data)
+        text = _all_text(filled)
+
+        assert count == 6
+        assert "[" not in text
+        assert "Dear Asha, welcome aboard." in text
+        assert "Email: asha@example.com and again Asha." in text
+        assert "98765 43210" in text
+        assert "Offer for Asha" in text
+        assert "Ref: R-7" in text
+
+    def test_unknown_fields_leave_document_untouched(self, template_bytes):
+        filled, count = fill_docx_template(template_bytes, {"unknown": "x"})
+
+        assert count == 0
+        assert filled == template_bytes
+
+    def test_reuses_upload_time_index(self, template_bytes):
+        parser = DocxParser(template_bytes)
+        parser.parse()
+
+        filled, count = fill_docx_template(
+            template_bytes, {"Name": "Ravi"}, index=parser.placeholder_index
+        )
+
+        assert count == 3
+        assert "Offer for Ravi" in _all_text(filled)
+
+    def test_batch_generates_independent_documents(self, template_bytes):
+        rows = [{"name": f"User {i}", "email": f"u{i}@x.com"} for i in range(5)]
+
+        results = fill_docx_batch(template_bytes, rows)
+
+        assert len(results) == 5
+        for i, (content, count) in enumerate(results):
+            assert count == 4
+            assert f"Dear User {i}," in _all_text(content)
+
+    def test_template_is_not_mutated_between_fills(self, template_bytes):
+        template = DocxTemplate(template_bytes)
+
+        first, _ = template.fill({"name": "A"})
+        second, _ = template.fill({"name": "B"})
+
+        assert "Dear A," in _all_text(first)
+        assert "Dear B," in _all_text(second)
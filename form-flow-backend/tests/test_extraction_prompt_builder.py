@@ -0,0 +1,238 @@
+"""
+Unit Tests for the Extraction Prompt Builder
+
+Tests for relevance pruning, the token budget and option truncation, plus
+an offline benchmark of full-schema vs. pruned prompts on a 150-field form.
+
+Run: pytest tests/test_extraction_prompt_builder.py -v -s
+"""
+
+import re
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.ai.conversation_agent import ConversationAgent, ConversationSession
+from services.ai.extraction.prompt_builder import (
+    ExtractionPromptBuilder, estimate_tokens, field_line
+)
+
+
+COUNTRIES = [
+    "Argentina", "Australia", "Austria", "Belgium", "Brazil", "Canada", "Chile", "China",
+    "Colombia", "Denmark", "Egypt", "Finland", "France", "Germany", "Greece", "India",
+    "Indonesia", "Ireland", "Italy", "Japan", "Kenya", "Mexico", "Netherlands", "Nigeria",
+    "Norway", "Peru", "Poland", "Portugal", "Singapore", "Spain", "Sweden", "Switzerland",
+    "Thailand", "Turkey", "Ukraine", "United Kingdom", "United States", "Vietnam",
+]
+
+
+def field(name, label, type_="text", options=None):
+    f = {"name": name, "label": label, "type": type_}
+    if options:
+        f["options"] = [{"label": o, "value": o.lower()} for o in options]
+    return f
+
+
+def large_form():
+    """150 fields: applicant, co-applicant and employer sections plus filler questions."""
+    fields = []
+    for prefix, section in (("", ""), ("co_", "Co-applicant "), ("emp_", "Employer ")):
+        fields += [
+            field(f"{prefix}first_name", f"{section}First Name"),
+            field(f"{prefix}last_name", f"{section}Last Name"),
+            field(f"{prefix}email", f"{section}Email Address", "email"),
+            field(f"{prefix}phone", f"{section}Phone Number", "tel"),
+            field(f"{prefix}street", f"{section}Street Address"),
+            field(f"{prefix}city", f"{section}City"),
+            field(f"{prefix}postal_code", f"{section}Postal Code"),
+            field(f"{prefix}country", f"{section}Country", "select", COUNTRIES),
+        ]
+    fields.append(field("date_of_birth", "Date of Birth", "date"))
+    fields.append(field("nationality", "Nationality", "select", COUNTRIES))
+    fields.append(field("linkedin", "LinkedIn Profile", "url"))
+    while len(fields) < 150:
+        i = len(fields)
+        fields.append(field(f"question_{i}", f"Supplementary question {i} details", "textarea"))
+    return fields
+
+
+# ============================================================================
+# Selection
+# ============================================================================
+
+class TestSelectFields:
+    """Tests for which fields end up in the prompt."""
+
+    def test_current_batch_always_included(self):
+        form = large_form()
+        batch = [form[0], form[1]]
+
+        selected = ExtractionPromptBuilder().select_fields("John Smith", batch, form)
+
+        assert [f["name"] for f in selected[:2]] == ["first_name", "last_name"]
+
+    def test_mentioned_fields_are_added(self):
+        form = large_form()
+
+        selected = ExtractionPromptBuilder().select_fields(
+            "and my city is Lyon, nationality French", [form[0]], form
+        )
+        names = [f["name"] for f in selected]
+
+        assert "city" in names
+        assert "nationality" in names
+        assert "question_100" not in names
+        assert len(names) <= 1 + ExtractionPromptBuilder.DEFAULT_TOP_K
+
+    def test_value_shapes_pull_in_typed_fields(self):
+        form = large_form()
+
+        selected = ExtractionPromptBuilder().select_fields(
+            "reach me at jo@example.com or +1 415 555 0100", [form[0]], form
+        )
+        names = {f["name"] for f in selected}
+
+        assert {"email", "phone"} <= names
+
+    def test_token_budget_is_enforced(self):
+        form = large_form()
+        builder = ExtractionPromptBuilder(top_k=50, token_budget=60)
+
+        selected = builder.select_fields(
+            "co-applicant first name last name email phone street city", [form[0]], form
+        )
+
+        assert sum(estimate_tokens(field_line(f)) for f in selected) <= 60
+        assert len(selected) > 1
+
+    def test_long_option_lists_are_truncated_keeping_mentions(self):
+        form = large_form()
+        country = next(f for f in form if f["name"] == "country")
+
+        pruned = ExtractionPromptBuilder(max_options=5).select_fields(
+            "I live in Vietnam", [country], form
+        )[0]
+
+        labels = [o["label"] for o in pruned["options"]]
+        assert len(labels) == 5
+        assert labels[0] == "Vietnam"
+        # The schema itself is not modified
+        assert len(country["options"]) == len(COUNTRIES)
+
+    def test_embeddings_used_when_available(self):
+        form = [field("employer", "Current Employer"), field("salary", "Annual Salary")]
+        rag = MagicMock()
+        rag._embed.side_effect = lambda texts: [
+            [1.0, 0.0] if ("Employer" in t or "work" in t) else [0.0, 1.0] for t in texts
+        ]
+
+        selected = ExtractionPromptBuilder(rag_service=rag).select_fields(
+            "I work at Acme", [], form
+        )
+
+        assert [f["name"] for f in selected] == ["employer"]
+
+
+class TestAgentUsesPrunedPrompt:
+
+    @pytest.mark.asyncio
+    async def test_extract_values_sends_pruned_fields(self):
+        agent = ConversationAgent(api_key=None)
+        agent.openrouter_llm = MagicMock()
+        agent.openrouter_llm.extract_all_fields.return_value = {
+            "extracted": {"first_name": "John"}, "confidence": {"first_name": 0.9}
+        }
+        form = large_form()
+        session = ConversationSession(id="s", form_schema=[{"fields": form}], form_url="")
+
+        extracted, _, _ = await agent._extract_values(session, "John", [form[0]], form, False)
+
+        sent = agent.openrouter_llm.extract_all_fields.call_args.args[1]
+        assert extracted == {"first_name": "John"}
+        assert [f["name"] for f in sent] == ["first_name"]
+
+
+# ============================================================================
+# Benchmark (offline, stub extractor)
+# ============================================================================
+
+TURNS = [
+    # (current batch, utterance, expected values)
+    (["first_name", "last_name"], "John Smith", {"first_name": "John Smith"}),
+    (["email"], "it's john.smith@example.com", {"email": "john.smith@example.com"}),
+    (["phone"], "my city is Denver and my postal code is 80202",
+     {"city": "Denver", "postal_code": "80202"}),
+    (["street"], "my co-applicant email address is ann@example.com",
+     {"co_email": "ann@example.com"}),
+    (["country"], "United States", {"country": "United States"}),
+    (["co_first_name"], "Ann", {"co_first_name": "Ann"}),
+    (["emp_city"], "my nationality is Canada", {"nationality": "Canada"}),
+    (["date_of_birth"], "my linkedin profile is https://linkedin.com/in/jsmith",
+     {"linkedin": "https://linkedin.com/in/jsmith"}),
+]
+
+
+def stub_extract(user_input, fields, batch_names):
+    """
+    Deterministic stand-in for the LLM.
+
+    Fills "<label> is <value>" phrases for fields present in the prompt, an
+    email address for the batch's email field, and otherwise answers the
+    first batch field.
+    """
+    by_label = sorted(fields, key=lambda f: -len(f["label"]))
+    extracted = {}
+    text = user_input.lower()
+    for f in by_label:
+        match = re.search(rf"{re.escape(f['label'].lower())} is ([^,]+?)(?: and |,|$)", text)
+        if match and f["name"] not in extracted:
+            start = match.start(1)
+            extracted[f["name"]] = user_input[start:start + len(match.group(1))]
+            text = text[:match.start()] + " " * (match.end() - match.start()) + text[match.end():]
+    if not extracted:
+        email = re.search(r"[\w.+-]+@[\w.-]+", user_input)
+        if email:
+            target = next((f for f in fields if f["type"] == "email" and f["name"] in batch_names), None)
+            if target:
+                extracted[target["name"]] = email.group()
+    target = next((f for f in fields if f["name"] in batch_names), None)
+    if not extracted and target:
+        value = re.sub(r"^(it's|i am|i'm)\s+", "", user_input, flags=re.IGNORECASE)
+        extracted[target["name"]] = value
+    return extracted
+
+
+def test_benchmark_pruned_prompts():
+    """Prompt tokens per turn, build latency and stub-extractor accuracy."""
+    form = large_form()
+    by_name = {f["name"]: f for f in form}
+    builder = ExtractionPromptBuilder()
+
+    def run(select):
+        tokens, build_ms, correct, total = 0, 0.0, 0, 0
+        for batch_names, utterance, expected in TURNS:
+            batch = [by_name[n] for n in batch_names]
+            started = time.perf_counter()
+            fields = select(utterance, batch)
+            build_ms += (time.perf_counter() - started) * 1000
+            tokens += estimate_tokens("\n".join(field_line(f) for f in fields))
+            extracted = stub_extract(utterance, fields, set(batch_names))
+            for name, value in expected.items():
+                total += 1
+                correct += extracted.get(name) == value
+        return tokens / len(TURNS), build_ms / len(TURNS), correct / total
+
+    full_tokens, full_ms, full_acc = run(lambda utterance, batch: form)
+    pruned_tokens, pruned_ms, pruned_acc = run(
+        lambda utterance, batch: builder.select_fields(utterance, batch, form)
+    )
+
+    print(f"\n150-field form, {len(TURNS)} turns:")
+    print(f"  full schema: {full_tokens:7.0f} tokens/turn, {full_ms:6.3f} ms build, accuracy {full_acc:.0%}")
+    print(f"  pruned:      {pruned_tokens:7.0f} tokens/turn, {pruned_ms:6.3f} ms build, accuracy {pruned_acc:.0%}")
+
+    assert pruned_tokens * 5 < full_tokens
+    assert pruned_tokens <= ExtractionPromptBuilder.DEFAULT_TOKEN_BUDGET
+    assert pruned_acc >= full_acc
@@ -0,0 +1,178 @@
+"""
+Unit Tests for Form Analytics
+
+Tests for batched ingestion, the append-only event log and
+rollup-based insights (local storage, no Redis).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.ai.analytics import FormAnalytics, EventType
+
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+@pytest.fixture
+def analytics():
+    """Create a FormAnalytics instance using local storage only."""
+    instance = FormAnalytics()
+    instance._use_redis = False
+    return instance
+
+
+def _event(etype, session_id, field_id=None, ts=None, **metadata):
+    return {
+        "type": etype,
+        "form_id": "contact",
+        "session_id": session_id,
+        "field_id": field_id,
+        "timestamp": ts,
+        "metadata": metadata,
+    }
+
+
+# =============================================================================
+# Ingestion
+# =============================================================================
+
+class TestIngestion:
+    """Tests for buffered, append-only ingestion."""
+
+    @pytest.mark.asyncio
+    async def test_events_are_buffered_until_flush(self, analytics):
+        await analytics.track_event(_event(EventType.FORM_START, "s1"))
+
+        assert len(analytics._buffer) == 1
+        assert analytics._local_log == {}
+
+        flushed = await analytics.flush()
+
+        assert flushed == 1
+        assert len(await analytics.get_recent_events("contact")) == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_size_triggers_flush(self, analytics):
+        analytics.BATCH_SIZE = 5
+
+        for i in range(5):
+            await analytics.track_event(_event(EventType.FIELD_CHANGE, f"s{i}", "name"))
+
+        assert analytics._buffer == []
+        assert len(analytics._local_log["contact"]) == 5
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writers_do_not_lose_events(self, analytics):
+        analytics.BATCH_SIZE = 7
+
+        await asyncio.gather(*[
+            analytics.track_event(_event(EventType.FIELD_CHANGE, f"s{i % 10}", "email"))
+            for i in range(200)
+        ])
+        await analytics.flush()
+
+        insights = await analytics.get_form_insights("contact")
+        assert insights["summary"]["total_sessions"] == 10
+        assert insights["summary"]["avg_fields_filled"] == 20.0
+
+    @pytest.mark.asyncio
+    async def test_event_log_is_capped(self, analytics):
+        analytics.MAX_EVENTS_PER_FORM = 10
+
+        for i in range(25):
+            await analytics.track_event(_event(EventType.FIELD_FOCUS, "s1", f"f{i}"))
+
+        events = await analytics.get_recent_events("contact", limit=100)
+        assert len(events) == 10
+        assert events[-1]["field_id"] == "f24"
+
+    @pytest.mark.asyncio
+    async def test_values_and_user_ids_are_not_stored(self, analytics):
+        event = _event(EventType.FIELD_CHANGE, "s1", "email", value="john@example.com")
+        event["user_id"] = "user-42"
+
+        await analytics.track_event(event)
+        stored = (await analytics.get_recent_events("contact"))[0]
+
+        assert "value" not in stored["metadata"]
+        assert stored["user_id"] != "user-42"
+
+
+# =============================================================================
+# Insights
+# =============================================================================
+
+class TestInsights:
+    """Tests for insights served from rollups."""
+
+    @pytest.mark.asyncio
+    async def test_summary_counts_sessions_not_events(self, analytics):
+        start = datetime.now().replace(microsecond=0)
+        end = start + timedelta(seconds=30)
+
+        for event in [
+            _event(EventType.FORM_START, "s1", ts=start.isoformat()),
+            _event(EventType.VOICE_START, "s1"),
+            _event(EventType.VOICE_END, "s1"),
+            _event(EventType.FORM_SUBMIT, "s1", ts=end.isoformat()),
+            _event(EventType.FORM_SUBMIT, "s1", ts=end.isoformat()),
+            _event(EventType.FORM_START, "s2"),
+            _event(EventType.FORM_ABANDON, "s2"),
+        ]:
+            await analytics.track_event(event)
+
+        summary = (await analytics.get_form_insights("contact"))["summary"]
+
+        assert summary["total_sessions"] == 2
+        assert summary["completion_rate"] == 0.5
+        assert summary["abandonment_rate"] == 0.5
+        assert summary["voice_usage_rate"] == 0.5
+        assert summary["avg_completion_time_seconds"] == 30.0
+
+    @pytest.mark.asyncio
+    async def test_bottlenecks_errors_and_dropouts(self, analytics):
+        for sid in ("s1", "s2"):
+            await analytics.track_event(_event(EventType.FIELD_FOCUS, sid, "address", duration=50000))
+            await analytics.track_event(
+                _event(EventType.FIELD_ERROR, sid, "address", error="Too short")
+            )
+            await analytics.track_event(_event(EventType.FORM_ABANDON, sid))
+
+        insights = await analytics.get_form_insights("contact")
+
+        assert insights["bottlenecks"][0] == {
+            "field": "address",
+            "avg_time_seconds": 50.0,
+            "sample_count": 2,
+            "severity": "high",
+        }
+        assert insights["error_hotspots"][0] == {
+            "field": "address", "error": "Too short", "count": 2
+        }
+        assert insights["dropout_points"][0] == {"field": "address", "dropout_count": 2}
+        assert {r["type"] for r in insights["recommendations"]} == {
+            "bottleneck", "validation", "dropout"
+        }
+
+    @pytest.mark.asyncio
+    async def test_rollups_are_bucketed_by_day(self, analytics):
+        old = (datetime.now() - timedelta(days=10)).isoformat()
+
+        await analytics.track_event(_event(EventType.FORM_START, "old", ts=old))
+        await analytics.track_event(_event(EventType.FORM_START, "new"))
+        await analytics.flush()
+
+        assert len([k for k in analytics._local_rollups if k.startswith("analytics:rollup:contact:")]) == 2
+        assert (await analytics.get_form_insights("contact", days=3))["summary"]["total_sessions"] == 1
+        assert (await analytics.get_form_insights("contact", days=30))["summary"]["total_sessions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_empty_form_returns_empty_insights(self, analytics):
+        insights = await analytics.get_form_insights("missing")
+
+        assert insights["summary"] == {}
+        assert insights["recommendations"] == []
@@ -0,0 +1,194 @@
+"""
+Unit Tests for the Compiled Form Plan
+
+Tests for the per-session FormPlan (cluster/complexity caches, fallback
+matchers, incremental fill state) and a per-turn CPU benchmark on a
+200-field form.
+
+Run: pytest tests/test_form_plan.py -v -s
+"""
+
+import cProfile
+import pstats
+import time
+from unittest.mock import patch
+
+from services.ai.conversation_agent import ConversationSession
+from services.ai.extraction.field_clusterer import FieldClusterer
+from services.ai.extraction.fallback_extractor import IntelligentFallbackExtractor
+from services.ai.extraction.form_plan import FormPlan
+
+
+BASE_FIELDS = [
+    ("first_name", "First Name", "text"), ("last_name", "Last Name", "text"),
+    ("email", "Email", "email"), ("phone", "Phone", "tel"),
+    ("company", "Company", "text"), ("job_title", "Job Title", "text"),
+    ("street", "Street Address", "text"), ("city", "City", "text"),
+    ("university", "University", "text"), ("degree", "Degree", "select"),
+    ("birth_date", "Date of Birth", "date"), ("github", "GitHub URL", "url"),
+    ("notes", "Additional Notes", "textarea"),
+]
+
+
+def make_schema(n_fields: int):
+    fields = []
+    for i in range(n_fields):
+        name, label, type_ = BASE_FIELDS[i % len(BASE_FIELDS)]
+        suffix = i // len(BASE_FIELDS)
+        field = {"name": f"{name}_{suffix}", "label": f"{label} {suffix}", "type": type_}
+        if type_ == "select":
+            field["options"] = [{"label": d, "value": d} for d in ("BSc", "MSc", "PhD")]
+        fields.append(field)
+    fields.append({"name": "submit", "type": "submit"})
+    fields.append({"name": "token", "type": "text", "hidden": True})
+    return [{"form_id": "big", "fields": fields}]
+
+
+def legacy_remaining(session):
+    """get_remaining_fields before the plan existed."""
+    remaining = []
+    filled = session.form_data_manager.get_filled_fields()
+    skipped = session.form_data_manager.get_skipped_field_names()
+    for form in session.form_schema:
+        for f in form.get("fields", []):
+            if f.get("type", "") in ["submit", "button", "hidden"] or f.get("hidden"):
+                continue
+            if f.get("name", "") in filled or f.get("name", "") in skipped:
+                continue
+            remaining.append(f)
+    return remaining
+
+
+def new_session(n_fields=40, **kwargs):
+    return ConversationSession.create(id="s", form_schema=make_schema(n_fields), form_url="", **kwargs)
+
+
+# ============================================================================
+# FormPlan
+# ============================================================================
+
+class TestFormPlan:
+    """Tests for the compiled plan and its fill state."""
+
+    def test_remaining_matches_legacy_computation(self):
+        session = new_session(extracted_fields={"email_0": "a@b.co"}, skipped_fields=["city_1"])
+
+        assert session.get_remaining_fields() == legacy_remaining(session)
+        assert "submit" not in session.get_form_plan().by_name
+
+    def test_batches_match_clusterer(self):
+        session = new_session()
+        remaining = session.get_remaining_fields()
+
+        plan_batches = session.get_form_plan().create_batches(remaining, max_fields=3)
+
+        assert plan_batches == FieldClusterer().create_batches(remaining, max_fields=3)
+
+    def test_schema_is_clustered_once(self):
+        session = new_session()
+        plan = session.get_form_plan()
+
+        with patch.object(FieldClusterer, "get_field_cluster") as cluster, \
+             patch.object(FieldClusterer, "get_field_complexity") as complexity:
+            for _ in range(5):
+                plan.create_batches(session.get_remaining_fields())
+                plan.create_batches(session.get_remaining_fields()[5:])
+
+        cluster.assert_not_called()
+        complexity.assert_not_called()
+
+    def test_fill_state_updates_incrementally(self):
+        session = new_session()
+        plan = session.get_form_plan()
+        before = plan.create_batches(session.get_remaining_fields())
+
+        session.form_data_manager.update_field(field_name="first_name_0", value="Ada", confidence=1.0, turn=1)
+
+        remaining = session.get_remaining_fields()
+        assert "first_name_0" not in {f["name"] for f in remaining}
+        after = plan.create_batches(remaining)
+        assert after is not before
+        assert after[0][0]["name"] == "last_name_0"
+        # Same state again: memoized
+        assert plan.create_batches(session.get_remaining_fields()) is after
+
+    def test_candidate_matchers_dedupe_by_name(self):
+        plan = FormPlan(make_schema(20))
+        batch = [plan.by_name["city_0"]]
+        remaining = list(plan.fields)
+
+        matchers = plan.candidate_matchers(batch, remaining)
+
+        assert [m["name"] for m in matchers][:2] == ["city_0", "first_name_0"]
+        assert len(matchers) == 20
+        assert matchers[0] is plan.matchers["city_0"]
+
+    def test_plan_is_not_persisted(self):
+        session = new_session()
+        session.get_form_plan()
+
+        data = session.to_dict()
+
+        assert not any("plan" in key for key in data)
+        assert ConversationSession.from_dict(data).get_remaining_fields() == session.get_remaining_fields()
+
+    def test_fallback_extraction_with_plan_matchers(self):
+        plan = FormPlan(make_schema(20))
+        batch = [plan.by_name["email_0"]]
+
+        extracted, _ = IntelligentFallbackExtractor.extract_with_intelligence(
+            "my email is ada@example.com and my city is London",
+            batch, plan.fields,
+            field_matchers=plan.candidate_matchers(batch, plan.fields),
+        )
+
+        assert extracted["email_0"] == "ada@example.com"
+        assert extracted == IntelligentFallbackExtractor.extract_with_intelligence(
+            "my email is ada@example.com and my city is London", batch, plan.fields
+        )[0]
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def legacy_turn(session, clusterer):
+    remaining = legacy_remaining(session)
+    batch = clusterer.create_batches(remaining)[0]
+    candidates = batch + [f for f in remaining if f not in batch]
+    IntelligentFallbackExtractor._create_field_matchers(candidates)
+    for f in batch[:2]:
+        session.form_data_manager.update_field(field_name=f["name"], value="x", confidence=1.0, turn=1)
+    clusterer.create_batches(legacy_remaining(session))
+
+
+def plan_turn(session, clusterer):
+    remaining = session.get_remaining_fields()
+    plan = session.get_form_plan()
+    batch = plan.create_batches(remaining)[0]
+    plan.candidate_matchers(batch, remaining)
+    for f in batch[:2]:
+        session.form_data_manager.update_field(field_name=f["name"], value="x", confidence=1.0, turn=1)
+    plan.create_batches(session.get_remaining_fields())
+
+
+def test_benchmark_turn_cpu_200_fields():
+    """Per-turn CPU for batching + matcher setup on a 200-field form."""
+    turns = 60
+    clusterer = FieldClusterer()
+    results = {}
+
+    for name, turn in (("legacy", legacy_turn), ("plan", plan_turn)):
+        session = new_session(200)
+        profiler = cProfile.Profile()
+        started = time.process_time()
+        profiler.enable()
+        for _ in range(turns):
+            turn(session, clusterer)
+        profiler.disable()
+        results[name] = (time.process_time() - started) / turns * 1000
+        stats = pstats.Stats(profiler)
+        calls = sum(count for count, *_ in stats.stats.values())
+        print(f"\n{name:>6}: {results[name]:6.2f} ms CPU/turn, {calls // turns:,} calls/turn")
+
+    assert results["plan"] * 3 < results["legacy"]
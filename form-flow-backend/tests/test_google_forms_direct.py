@@ -0,0 +1,441 @@
+"""
+Unit Tests for Direct Google Forms Submission
+
+Runs the browserless submitter against a local fake Google Form
+(viewform page with FB_PUBLIC_LOAD_DATA_ plus a formResponse endpoint
+that validates the POST) to test payload building for multi-page,
+checkbox and "other" answers, fallback to the browser only while
+nothing has been posted (no double submissions), and a benchmark of
+per-submission latency and memory against a Playwright submission of
+the same form.
+
+Run: pytest tests/test_google_forms_direct.py -v -s
+"""
+
+import json
+import time
+import tracemalloc
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from config.settings import settings
+from services.form import submitter as submitter_module
+from services.form.google_forms_direct import (
+    DirectSubmitError,
+    GoogleFormsDirectSubmitter,
+    build_payload,
+    form_response_url,
+    parse_form_page,
+)
+from services.form.submitter import FormSubmitter
+
+
+FBZX = "-4417263850123"
+OTHER = ["", None, None, None, 1]
+
+ITEMS = [
+    [101, "Full name", None, 0, [[1001, None, 1]]],
+    [102, "Favourite colour", None, 2, [[1002, [["Red"], ["Blue"], OTHER], 1]]],
+    [103, "About your order", None, 8],
+    [104, "Toppings", None, 4, [[1004, [["Cheese"], ["Olives"], ["Mushrooms"], OTHER], 0]]],
+    [105, "Delivery date", None, 9, [[1005, None, 0, None, None, None, None, [0, 1]]]],
+    [106, "Rating", None, 5, [[1006, [["1"], ["2"], ["3"], ["4"], ["5"]], 0]]],
+]
+
+PLAIN_FORM = """
+<form action="formResponse" method="POST">
+  <input name="entry.1001"><input name="entry.1002">
+  <input type="checkbox" name="entry.1004" value="Cheese">
+  <input type="checkbox" name="entry.1004" value="Olives">
+  <input name="pageHistory" type="hidden" value="0,1"><button type="submit">Submit</button>
+</form>
+"""
+
+
+def viewform_html(items=ITEMS):
+    data = [None, ["", items, None, None, None, None, None, None, "Pizza order"], "/forms", "Pizza order"]
+    return (
+        f'<html><body><input type="hidden" name="fbzx" value="{FBZX}">{PLAIN_FORM}'
+        f"<script>var FB_PUBLIC_LOAD_DATA_ = {json.dumps(data)};\n</script></body></html>"
+    )
+
+
+SCHEMA = [{"fields": [
+    {"name": "text_0", "type": "text", "label": "Full name"},
+    {"name": "radio_1", "type": "radio", "label": "Favourite colour"},
+    {"name": "checkbox_3", "type": "checkbox-group", "label": "Toppings"},
+    {"name": "date_4", "type": "date", "label": "When", "entry_id": "1005"},
+]}]
+
+ANSWERS = {
+    "text_0": "Ada Lovelace",
+    "radio_1": "Green",
+    "checkbox_3": ["cheese", "Olives", "Pineapple"],
+    "date_4": "2026-03-14",
+    "entry.1006": 4,
+}
+
+
+class FakeGoogleForm:
+    """Serves /forms/d/e/test/viewform and records what formResponse receives."""
+
+    def __init__(self):
+        self.items = ITEMS
+        self.responses = []
+        self.response_status = 200
+        self.rerender_form = False
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/forms/d/e/test/viewform", self.viewform)
+        app.router.add_post("/forms/d/e/test/formResponse", self.form_response)
+        return app
+
+    async def viewform(self, request):
+        return web.Response(text=viewform_html(self.items), content_type="text/html")
+
+    async def form_response(self, request):
+        data = await request.post()
+        self.responses.append(data)
+        if self.response_status != 200:
+            return web.Response(status=self.response_status, text="<html>Something went wrong</html>")
+        if self.rerender_form:
+            return web.Response(text=viewform_html(self.items), content_type="text/html")
+        if not (data.get("entry.1001") and data.get("entry.1002")) or data.get("fbzx") != FBZX:
+            return web.Response(status=400, text="<html>This is a required question</html>")
+        return web.Response(
+            text='<div class="freebirdFormviewerViewResponseConfirmationMessage">'
+                 "Your response has been recorded.</div>",
+            content_type="text/html",
+        )
+
+
+@pytest_asyncio.fixture
+async def fake_form():
+    fake = FakeGoogleForm()
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    fake.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/forms/d/e/test/viewform"
+    yield fake
+    await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def direct():
+    submitter = GoogleFormsDirectSubmitter(timeout=5)
+    yield submitter
+    await submitter.close()
+
+
+# ============================================================================
+# Parsing & Payload
+# ============================================================================
+
+class TestPayload:
+
+    def test_parse_pages_options_and_fbzx(self):
+        form = parse_form_page(viewform_html())
+
+        assert [q.entry_id for q in form.questions] == ["1001", "1002", "1004", "1005", "1006"]
+        assert form.page_count == 2
+        assert form.fbzx == FBZX
+        colour = form.questions[1]
+        assert (colour.options, colour.has_other, colour.required) == (["Red", "Blue"], True, True)
+        assert [q.page for q in form.questions] == [0, 0, 1, 1, 1]
+
+    def test_checkbox_other_date_and_page_history(self):
+        pairs = build_payload(parse_form_page(viewform_html()), ANSWERS, SCHEMA)
+
+        assert ("entry.1001", "Ada Lovelace") in pairs
+        assert [v for k, v in pairs if k == "entry.1002"] == ["__other_option__"]
+        assert ("entry.1002.other_option_response", "Green") in pairs
+        assert [v for k, v in pairs if k == "entry.1004"] == ["Cheese", "Olives", "__other_option__"]
+        assert ("entry.1004.other_option_response", "Pineapple") in pairs
+        assert [p for p in pairs if p[0].startswith("entry.1005")] == [
+            ("entry.1005_year", "2026"), ("entry.1005_month", "3"), ("entry.1005_day", "14")]
+        assert ("entry.1006", "4") in pairs
+        assert ("pageHistory", "0,1") in pairs
+        assert ("partialResponse", f'[null, null, "{FBZX}"]') in pairs
+
+    def test_comma_separated_checkbox_values(self):
+        form = parse_form_page(viewform_html())
+        answers = {"Full name": "Ada", "Favourite colour": "red", "Toppings": "Cheese, Mushrooms"}
+
+        pairs = build_payload(form, answers)
+
+        assert [v for k, v in pairs if k == "entry.1004"] == ["Cheese", "Mushrooms"]
+
+    def test_unanswerable_forms_are_rejected(self):
+        form = parse_form_page(viewform_html())
+        rating_only = {"Full name": "Ada", "Favourite colour": "Red"}
+
+        with pytest.raises(DirectSubmitError, match="no option"):
+            build_payload(form, {**rating_only, "Rating": "11"})
+        with pytest.raises(DirectSubmitError, match="No Google Forms entry"):
+            build_payload(form, {**rating_only, "Shoe size": "9"})
+        with pytest.raises(DirectSubmitError, match="Required"):
+            build_payload(form, {"Full name": "Ada"})
+
+        branching = [[102, "Colour", None, 2, [[1002, [["Red", None, 2], ["Blue", None, -3]], 1]]]]
+        with pytest.raises(DirectSubmitError, match="branching"):
+            build_payload(parse_form_page(viewform_html(branching)), {"Colour": "Red"})
+        upload = ITEMS + [[107, "CV", None, 13, [[1007, None, 0]]]]
+        with pytest.raises(DirectSubmitError, match="File upload"):
+            build_payload(parse_form_page(viewform_html(upload)), rating_only)
+
+    def test_form_response_url(self):
+        base = "https://docs.google.com/forms/d/e/1FAIpQL/"
+        assert form_response_url(base + "viewform?usp=sf_link") == base + "formResponse"
+        assert form_response_url(base + "viewform/") == base + "formResponse"
+
+
+# ============================================================================
+# Submission
+# ============================================================================
+
+class TestDirectSubmit:
+
+    @pytest.mark.asyncio
+    async def test_submits_to_form_response(self, direct, fake_form):
+        result = await direct.submit(fake_form.url, ANSWERS, SCHEMA)
+
+        assert result["success"] and result["method"] == "direct"
+        assert result["validation_result"]["google_form_success"]
+        posted = fake_form.responses[0]
+        assert posted.getall("entry.1004") == ["Cheese", "Olives", "__other_option__"]
+        assert posted["pageHistory"] == "0,1"
+
+    @pytest.mark.asyncio
+    async def test_failed_post_is_not_retried(self, direct, fake_form):
+        fake_form.response_status = 500
+
+        result = await direct.submit(fake_form.url, ANSWERS, SCHEMA)
+
+        assert not result["success"]
+        assert "HTTP 500" in result["error"]
+        assert "fallback_reason" not in result
+
+    @pytest.mark.asyncio
+    async def test_rerendered_form_is_a_failure(self, direct, fake_form):
+        fake_form.rerender_form = True
+
+        result = await direct.submit(fake_form.url, ANSWERS, SCHEMA)
+
+        assert not result["success"]
+        assert "fallback_reason" not in result
+
+    @pytest.mark.asyncio
+    async def test_missing_answer_never_posts(self, direct, fake_form):
+        result = await direct.submit(fake_form.url, {"text_0": "Ada"}, SCHEMA)
+
+        assert not result["success"]
+        assert fake_form.responses == []
+
+    @pytest.mark.asyncio
+    async def test_sign_in_redirect_falls_back(self):
+        def handler(request):
+            if request.url.host == "docs.google.com":
+                return httpx.Response(302, headers={"Location": "https://accounts.google.com/ServiceLogin"})
+            return httpx.Response(200, text="<html>Sign in</html>")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+        result = await GoogleFormsDirectSubmitter(client).submit(
+            "https://docs.google.com/forms/d/e/x/viewform", ANSWERS, SCHEMA)
+        await client.aclose()
+
+        assert result["fallback_reason"] == "Form requires sign-in"
+
+
+GOOGLE_URL = "https://docs.google.com/forms/d/e/x/viewform"
+
+
+async def submit_through(direct, url=GOOGLE_URL, **kwargs):
+    """FormSubmitter.submit_form_data with `direct` as the direct submitter and a mocked browser."""
+    submitter = FormSubmitter()
+    browser = AsyncMock(return_value={"success": True, "method": "browser"})
+    with patch.object(submitter_module, "get_google_forms_direct_submitter", return_value=direct), \
+         patch.object(submitter_module.sys, "platform", "linux"), \
+         patch.object(submitter, "_async_submit_form_data", browser), \
+         patch.object(submitter, "_async_submit_with_human_behavior", browser):
+        result = await submitter.submit_form_data(url, ANSWERS, SCHEMA, **kwargs)
+    return result, browser
+
+
+def google_transport(on_post):
+    """MockTransport serving the test form's viewform page; POSTs go to on_post."""
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, text=viewform_html())
+        return on_post(request)
+    return httpx.MockTransport(handler)
+
+
+class TestSubmitFormDataRouting:
+
+    async def route(self, direct_result, **kwargs):
+        direct = MagicMock()
+        direct.submit = AsyncMock(return_value=direct_result)
+        result, browser = await submit_through(direct, **kwargs)
+        return result, direct.submit, browser
+
+    @pytest.mark.asyncio
+    async def test_direct_success_skips_browser(self):
+        result, direct, browser = await self.route({"success": True, "method": "direct"})
+
+        assert result["method"] == "direct"
+        direct.assert_awaited_once()
+        browser.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_direct_failure_falls_back_to_browser(self):
+        result, _, browser = await self.route({"success": False, "fallback_reason": "No confirmation"})
+
+        assert result["method"] == "browser"
+        browser.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_browser_only_cases(self):
+        for kwargs in ({"human_like": True}, {"use_cdp": True}, {"url": "https://example.com/form"}):
+            _, direct, browser = await self.route({"success": True}, **kwargs)
+            direct.assert_not_awaited()
+            browser.assert_awaited_once()
+
+        with patch.object(settings, "GOOGLE_FORMS_DIRECT_SUBMIT", False):
+            _, direct, _ = await self.route({"success": True})
+        direct.assert_not_awaited()
+
+
+class TestNoDoubleSubmission:
+    """Once formResponse has been POSTed, the browser must not submit again."""
+
+    async def submit(self, on_post):
+        client = httpx.AsyncClient(transport=google_transport(on_post), follow_redirects=True)
+        try:
+            return await submit_through(GoogleFormsDirectSubmitter(client))
+        finally:
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_custom_confirmation_message_is_success(self):
+        posts = []
+
+        def on_post(request):
+            posts.append(request)
+            return httpx.Response(200, text="<html><div>Danke! Wir melden uns.</div></html>")
+
+        result, browser = await self.submit(on_post)
+
+        assert result["success"] and result["method"] == "direct"
+        assert len(posts) == 1
+        browser.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_post_timeout_is_not_retried_in_the_browser(self):
+        def on_post(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        result, browser = await self.submit(on_post)
+
+        assert not result["success"]
+        assert result["error"] == "formResponse request failed: timed out"
+        browser.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_form_response_still_falls_back(self):
+        def on_post(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        result, browser = await self.submit(on_post)
+
+        assert result["method"] == "browser"
+        browser.assert_awaited_once()
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+async def measure_direct(fake_form, runs):
+    submitter = GoogleFormsDirectSubmitter(timeout=5)
+    await submitter.submit(fake_form.url, ANSWERS, SCHEMA)  # warm the connection pool
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(runs):
+        assert (await submitter.submit(fake_form.url, ANSWERS, SCHEMA))["success"]
+    elapsed = (time.perf_counter() - started) / runs * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    await submitter.close()
+    return elapsed, peak
+
+
+@pytest.mark.asyncio
+async def test_benchmark_direct_submission(fake_form):
+    """Per-submission latency and Python heap peak for the direct path."""
+    runs = 50
+    latency_ms, peak = await measure_direct(fake_form, runs)
+
+    print(f"\ndirect: {latency_ms:6.2f} ms/submission, heap peak {peak / 1024:.0f} KB over {runs} runs")
+    assert len(fake_form.responses) == runs + 1
+    assert latency_ms < 100
+    assert peak < 5 * 1024 * 1024
+
+
+@pytest.mark.asyncio
+async def test_benchmark_direct_vs_playwright(fake_form):
+    """
+    Direct POST vs. a Playwright submission of the same form.
+
+    The browser run is a lower bound for FormSubmitter's Google path: a
+    fresh context on an already-running Chromium, goto, fill, submit and
+    wait for the confirmation - without the fixed settle sleeps.
+    """
+    psutil = pytest.importorskip("psutil")
+    playwright_api = pytest.importorskip("playwright.async_api")
+    try:
+        pw = await playwright_api.async_playwright().start()
+        browser = await pw.chromium.launch(args=["--no-sandbox", "--disable-dev-shm-usage"])
+    except Exception as e:
+        pytest.skip(f"Chromium not available: {e}")
+
+    runs = 5
+
+    def chromium_rss():
+        children = psutil.Process().children(recursive=True)
+        return sum(p.memory_info().rss for p in children if p.is_running())
+
+    try:
+        idle_rss = chromium_rss()
+        peak_rss = idle_rss
+        started = time.perf_counter()
+        for _ in range(runs):
+            context = await browser.new_context()
+            page = await context.new_page()
+            await page.goto(fake_form.url, wait_until="domcontentloaded")
+            await page.fill("[name='entry.1001']", "Ada Lovelace")
+            await page.fill("[name='entry.1002']", "Red")
+            await page.check("[value='Cheese']")
+            await page.click("button[type='submit']")
+            await page.wait_for_selector(".freebirdFormviewerViewResponseConfirmationMessage")
+            peak_rss = max(peak_rss, chromium_rss())
+            await context.close()
+        browser_ms = (time.perf_counter() - started) / runs * 1000
+    finally:
+        await browser.close()
+        await pw.stop()
+
+    direct_ms, direct_peak = await measure_direct(fake_form, runs)
+
+    print(f"\nPer submission, avg of {runs}:")
+    print(f"  playwright: {browser_ms:7.1f} ms, Chromium RSS {peak_rss / 2**20:6.1f} MB "
+          f"(+{(peak_rss - idle_rss) / 2**20:.1f} MB per context)")
+    print(f"  direct:     {direct_ms:7.1f} ms, Python heap peak {direct_peak / 2**20:6.2f} MB")
+
+    assert direct_ms * 5 < browser_ms
+    assert direct_peak * 10 < peak_rss
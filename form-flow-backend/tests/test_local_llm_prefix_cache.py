@@ -0,0 +1,152 @@
+"""
+Unit Tests for the Local LLM Prefix KV Cache
+
+Tests for the prefix LRU, plus generation/TTFT checks on a small randomly
+initialised Phi model (needs torch and transformers, no download).
+
+Run: pytest tests/test_local_llm_prefix_cache.py -v -s
+"""
+
+import time
+
+import pytest
+
+from services.ai.local_llm import LocalLLMService, PrefixKVCache
+
+
+# ============================================================================
+# PrefixKVCache
+# ============================================================================
+
+class TestPrefixKVCache:
+    """Tests for longest-prefix lookup and the memory bound."""
+
+    def test_exact_and_longest_prefix_lookup(self):
+        cache = PrefixKVCache(max_bytes=1000)
+        cache.store([1, 2, 3], "header", 10)
+        cache.store([1, 2, 3, 4, 5], "schema-a", 10)
+
+        assert cache.lookup([1, 2, 3, 4, 5]) == (5, "schema-a")
+        assert cache.lookup([1, 2, 3, 9, 9]) == (3, "header")
+        assert cache.lookup([7, 8]) == (0, None)
+        assert cache.get_stats() | {"bytes": 0} == {
+            "entries": 2, "bytes": 0, "hits": 1, "partial_hits": 1, "misses": 1
+        }
+
+    def test_evicts_least_recently_used_within_budget(self):
+        cache = PrefixKVCache(max_bytes=25)
+        cache.store([1], "a", 10)
+        cache.store([2], "b", 10)
+        cache.lookup([1])              # "a" is now most recent
+        cache.store([3], "c", 10)
+
+        assert cache.lookup([2]) == (0, None)
+        assert cache.lookup([1]) == (1, "a")
+        assert cache.total_bytes == 20
+
+    def test_oversized_entries_are_not_cached(self):
+        cache = PrefixKVCache(max_bytes=5)
+
+        assert cache.store([1], "big", 10) is False
+        assert cache.get_stats()["entries"] == 0
+
+    def test_restore_replaces_entry(self):
+        cache = PrefixKVCache(max_bytes=100)
+        cache.store([1, 2], "old", 30)
+        cache.store([1, 2], "new", 40)
+
+        assert cache.lookup([1, 2]) == (2, "new")
+        assert cache.total_bytes == 40
+
+
+# ============================================================================
+# Generation with a tiny model
+# ============================================================================
+
+class CharTokenizer:
+    """Character-level tokenizer, enough to drive generate()."""
+
+    eos_token_id = 0
+
+    def __call__(self, text, return_tensors="pt", add_special_tokens=True):
+        import torch
+
+        class Encoded:
+            input_ids = torch.tensor([[ord(c) % 500 + 1 for c in text]])
+        return Encoded()
+
+    def decode(self, ids, skip_special_tokens=True):
+        return "".join(chr(int(i) + 96) for i in ids if int(i))
+
+
+@pytest.fixture
+def tiny_service():
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    torch.manual_seed(0)
+    config = transformers.PhiConfig(
+        vocab_size=512, hidden_size=128, intermediate_size=256, num_hidden_layers=4,
+        num_attention_heads=4, max_position_embeddings=8192,
+    )
+    service = LocalLLMService()
+    service.model = transformers.AutoModelForCausalLM.from_config(config).eval()
+    service.tokenizer = CharTokenizer()
+    service._initialized = True
+    return service
+
+
+def schema_prompt(n_fields: int):
+    header = "Instruct: You are a smart form-filling assistant.\n\nFORM FIELDS:\n"
+    schema = "\n".join(f"- Field number {i} (Type: text)" for i in range(n_fields))
+    return header, schema + "\n\nUSER SPEECH:\n"
+
+
+def test_cached_generation_matches_uncached(tiny_service):
+    header, schema = schema_prompt(20)
+    suffix = '"my name is Ada"\n\nOutput:'
+
+    cached_first = tiny_service._generate([header, schema], suffix, max_new_tokens=8)
+    cached_again = tiny_service._generate([header, schema], suffix, max_new_tokens=8)
+    tiny_service.prefix_cache = None
+    uncached = tiny_service._generate([header, schema], suffix, max_new_tokens=8)
+
+    assert cached_first == cached_again == uncached
+
+
+def test_new_schema_reuses_header(tiny_service):
+    header, schema_a = schema_prompt(10)
+    _, schema_b = schema_prompt(12)
+
+    tiny_service._generate([header, schema_a], '"x"', max_new_tokens=1)
+    tiny_service._generate([header, schema_b], '"x"', max_new_tokens=1)
+
+    stats = tiny_service.prefix_cache.get_stats()
+    assert stats["misses"] == 1
+    assert stats["partial_hits"] == 1
+    assert stats["entries"] == 3
+
+
+def test_benchmark_time_to_first_token(tiny_service):
+    """TTFT for a 60-field schema prompt with and without the prefix cache."""
+    header, schema = schema_prompt(60)
+    utterances = [f'"my answer is number {i}"\n\nOutput:' for i in range(5)]
+
+    def ttft():
+        started = time.perf_counter()
+        for suffix in utterances:
+            tiny_service._generate([header, schema], suffix, max_new_tokens=1)
+        return (time.perf_counter() - started) / len(utterances) * 1000
+
+    cache = tiny_service.prefix_cache
+    tiny_service.prefix_cache = None
+    uncached_ms = ttft()
+    tiny_service.prefix_cache = cache
+    tiny_service._generate([header, schema], utterances[0], max_new_tokens=1)  # warm
+    cached_ms = ttft()
+
+    prompt_tokens = len(header) + len(schema)
+    print(f"\nTTFT, {prompt_tokens}-token prefix (tiny Phi, CPU):")
+    print(f"  no prefix cache: {uncached_ms:7.1f} ms")
+    print(f"  prefix cache:    {cached_ms:7.1f} ms")
+
+    assert cached_ms < uncached_ms
@@ -0,0 +1,233 @@
+"""
+Unit Tests for the Password Hashing Pool
+
+Tests for running bcrypt on the dedicated worker pool, queue metrics,
+rehash-on-login when BCRYPT_ROUNDS changes, and a load test of
+unrelated endpoint latency during a burst of 50 concurrent logins.
+
+Run: pytest tests/test_password_hashing.py -v -s
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import bcrypt
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+import auth
+from config.settings import settings
+from core import database, models
+from routers import auth as auth_router
+from utils.telemetry import metrics
+
+
+PASSWORD = "TestPassword123!"
+
+
+@pytest_asyncio.fixture
+async def app_client(tmp_path):
+    """Auth router plus an unrelated /ping endpoint on a throwaway SQLite db."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(auth_router.router)
+    app.dependency_overrides[database.get_db] = get_test_db
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        client.session_factory = session_factory
+        yield client
+
+    await engine.dispose()
+
+
+async def register(client, email, password=PASSWORD):
+    response = await client.post("/register", json={"email": email, "password": password})
+    assert response.status_code == 201
+
+
+async def login(client, email, password=PASSWORD):
+    return await client.post("/login", data={"username": email, "password": password})
+
+
+# ============================================================================
+# Worker Pool
+# ============================================================================
+
+class TestPasswordHashingPool:
+
+    @pytest.mark.asyncio
+    async def test_async_hash_and_verify(self):
+        hashed = await auth.get_password_hash_async(PASSWORD)
+
+        assert await auth.verify_password_async(PASSWORD, hashed) is True
+        assert await auth.verify_password_async("wrong", hashed) is False
+        assert auth.verify_password(PASSWORD, hashed) is True
+
+    @pytest.mark.asyncio
+    async def test_bcrypt_runs_off_the_event_loop(self):
+        threads = []
+
+        def checkpw(password, hashed):
+            threads.append(threading.current_thread().name)
+            return True
+
+        with patch.object(bcrypt, "checkpw", checkpw):
+            assert await auth.verify_password_async(PASSWORD, "$2b$04$x") is True
+
+        assert threads[0].startswith("password-hash")
+
+    @pytest.mark.asyncio
+    async def test_pool_size_is_bounded_and_queue_is_measured(self):
+        running = []
+        peak = []
+
+        def slow_hash(password):
+            running.append(1)
+            peak.append(len(running))
+            time.sleep(0.02)
+            running.pop()
+            return password
+
+        auth.shutdown_password_hashing()
+        with patch.object(settings, "PASSWORD_HASH_WORKERS", 2), \
+             patch.object(auth, "get_password_hash", slow_hash):
+            results = await asyncio.gather(*(auth.get_password_hash_async(str(i)) for i in range(8)))
+        auth.shutdown_password_hashing()
+
+        assert results == [str(i) for i in range(8)]
+        assert max(peak) == 2
+        assert metrics._gauges["auth.password_hash.pending"] == 0
+        assert any(key.startswith("auth.password_hash.queue_wait") for key in metrics._timings)
+
+    def test_needs_rehash_compares_cost(self):
+        with patch.object(settings, "BCRYPT_ROUNDS", 4):
+            current = auth.get_password_hash(PASSWORD)
+            assert auth.password_needs_rehash(current) is False
+        with patch.object(settings, "BCRYPT_ROUNDS", 5):
+            assert auth.password_needs_rehash(current) is True
+        assert auth.password_needs_rehash("not-a-hash") is False
+
+
+# ============================================================================
+# Login
+# ============================================================================
+
+class TestLoginRehash:
+
+    @pytest.mark.asyncio
+    async def test_login_upgrades_old_cost_hash(self, app_client):
+        with patch.object(settings, "BCRYPT_ROUNDS", 4):
+            await register(app_client, "old@example.com")
+
+        with patch.object(settings, "BCRYPT_ROUNDS", 5):
+            response = await login(app_client, "old@example.com")
+            assert response.status_code == 200
+            assert "access_token" in response.json()
+
+            async with app_client.session_factory() as db:
+                user = (await db.execute(
+                    select(models.User).filter(models.User.email == "old@example.com")
+                )).scalars().first()
+            assert user.password_hash.startswith("$2b$05$")
+            assert auth.verify_password(PASSWORD, user.password_hash)
+
+            assert (await login(app_client, "old@example.com")).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_rehash_can_be_disabled(self, app_client):
+        with patch.object(settings, "BCRYPT_ROUNDS", 4):
+            await register(app_client, "keep@example.com")
+
+        with patch.object(settings, "BCRYPT_ROUNDS", 5), \
+             patch.object(settings, "PASSWORD_REHASH_ON_LOGIN", False):
+            assert (await login(app_client, "keep@example.com")).status_code == 200
+
+        async with app_client.session_factory() as db:
+            user = (await db.execute(
+                select(models.User).filter(models.User.email == "keep@example.com")
+            )).scalars().first()
+        assert user.password_hash.startswith("$2b$04$")
+
+    @pytest.mark.asyncio
+    async def test_wrong_password_is_rejected(self, app_client):
+        with patch.object(settings, "BCRYPT_ROUNDS", 4):
+            await register(app_client, "user@example.com")
+            assert (await login(app_client, "user@example.com", "wrong")).status_code == 401
+
+
+# ============================================================================
+# Load Test
+# ============================================================================
+
+async def inline_verify(plain_password, hashed_password):
+    """verify_password_async as it behaved before the pool: bcrypt on the event loop."""
+    return auth.verify_password(plain_password, hashed_password)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def ping_on_schedule(client, until, interval=0.01):
+    """
+    GET /ping every interval until `until` is done.
+
+    Latency is measured from when each ping was due, so time spent
+    waiting for a blocked event loop counts against the request (pings
+    that fall behind schedule are sent back to back and each recorded).
+    """
+    latencies = []
+    due = time.perf_counter()
+    while not until.done():
+        assert (await client.get("/ping")).status_code == 200
+        latencies.append((time.perf_counter() - due) * 1000)
+        due += interval
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+    return latencies
+
+
+@pytest.mark.asyncio
+async def test_load_unrelated_latency_during_login_burst(app_client):
+    """p99 of GET /ping while 50 logins (bcrypt cost 10) run concurrently."""
+    logins = 50
+    results = {}
+
+    with patch.object(settings, "BCRYPT_ROUNDS", 10):
+        await register(app_client, "load@example.com")
+
+        for label in ("event loop", "hash pool"):
+            verify = inline_verify if label == "event loop" else auth.verify_password_async
+            with patch.object(auth, "verify_password_async", verify):
+                started = time.perf_counter()
+                burst = asyncio.gather(*(login(app_client, "load@example.com") for _ in range(logins)))
+                latencies = await ping_on_schedule(app_client, burst)
+                responses = await burst
+                elapsed = time.perf_counter() - started
+
+            assert all(r.status_code == 200 for r in responses)
+            results[label] = percentile(latencies, 99)
+            print(f"\n{label:>10}: /ping p50 {percentile(latencies, 50):6.1f} ms, "
+                  f"p99 {results[label]:6.1f} ms over {len(latencies)} pings; "
+                  f"{logins} logins in {elapsed:.2f} s")
+
+    assert results["hash pool"] * 3 < results["event loop"]
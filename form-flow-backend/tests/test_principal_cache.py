@@ -0,0 +1,237 @@
+"""
+Unit Tests for the Principal Cache
+
+Tests for caching resolved users in get_current_user: hits and misses,
+TTL and size bounds, invalidation when a user is updated, deleted or
+has profiling toggled, and a benchmark of queries per authenticated
+request.
+
+Run: pytest tests/test_principal_cache.py -v -s
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import auth
+from core import models
+from services.ai.profile.service import ProfileService
+from utils.telemetry import metrics
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    """Throwaway SQLite session; db.queries counts executed statements."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'principals.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+    queries = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: queries.append(statement))
+
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        session.queries = queries
+        yield session
+
+    await engine.dispose()
+
+
+@pytest.fixture
+def cache():
+    cache = auth.PrincipalCache(ttl_seconds=30)
+    with patch.object(auth, "_principal_cache", cache):
+        yield cache
+
+
+async def add_user(db, email="ada@example.com", **kwargs):
+    user = models.User(email=email, password_hash="x", first_name="Ada", **kwargs)
+    db.add(user)
+    await db.commit()
+    return user
+
+
+def token_for(email):
+    return auth.create_access_token({"sub": email})
+
+
+def principal(user_id=1, email="ada@example.com"):
+    return auth.UserPrincipal(
+        id=user_id, email=email, first_name=None, last_name=None, mobile=None, country=None,
+        state=None, city=None, pincode=None, profiling_enabled=True, created_at=None,
+    )
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+class TestPrincipalCache:
+
+    def test_ttl_expiry(self):
+        cache = auth.PrincipalCache(ttl_seconds=0.01)
+        cache.put("ada@example.com", principal())
+
+        assert cache.get("ada@example.com") is not None
+        time.sleep(0.02)
+        assert cache.get("ada@example.com") is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_size_is_bounded(self):
+        cache = auth.PrincipalCache(max_entries=2)
+        for i in range(3):
+            cache.put(f"u{i}@example.com", principal(i, f"u{i}@example.com"))
+
+        assert cache.get("u0@example.com") is None
+        assert cache.get("u2@example.com").id == 2
+
+    def test_invalidate_by_id_or_email(self):
+        cache = auth.PrincipalCache()
+        cache.put("a@example.com", principal(1, "a@example.com"))
+        cache.put("b@example.com", principal(2, "b@example.com"))
+
+        assert cache.invalidate_user(user_id=1) == 1
+        assert cache.invalidate_user(email="b@example.com") == 1
+        assert cache.get_stats()["entries"] == 0
+
+    def test_hit_rate_stats_and_metrics(self):
+        cache = auth.PrincipalCache()
+        hits_before = metrics._counters["auth.principal_cache.hit"]
+        cache.put("a@example.com", principal())
+
+        for _ in range(3):
+            cache.get("a@example.com")
+        cache.get("missing@example.com")
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (3, 1, 0.75)
+        assert metrics._counters["auth.principal_cache.hit"] == hits_before + 3
+
+    def test_principal_is_read_only(self):
+        with pytest.raises(Exception):
+            principal().email = "other@example.com"
+
+
+# ============================================================================
+# get_current_user
+# ============================================================================
+
+class TestGetCurrentUser:
+
+    @pytest.mark.asyncio
+    async def test_second_request_skips_database(self, db, cache):
+        user = await add_user(db, city="London")
+        token = token_for(user.email)
+        db.queries.clear()
+
+        first = await auth.get_current_user(token, db)
+        queries_after_first = len(db.queries)
+        second = await auth.get_current_user(token, db)
+
+        assert isinstance(first, auth.UserPrincipal)
+        assert (first.id, first.city, first.full_name) == (user.id, "London", "Ada")
+        assert second is first
+        assert queries_after_first == 1  # users row only, no relationship loads
+        assert len(db.queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_is_not_cached(self, db, cache):
+        await add_user(db)
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.get_current_user("not-a-token", db)
+
+        assert exc.value.status_code == 401
+        assert cache.get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_profiling_toggle_invalidates(self, db, cache):
+        user = await add_user(db)
+        token = token_for(user.email)
+        assert (await auth.get_current_user(token, db)).profiling_enabled is True
+
+        await ProfileService().set_profiling_enabled(db, user.id, enabled=False)
+
+        assert cache.get_stats()["entries"] == 0
+        assert (await auth.get_current_user(token, db)).profiling_enabled is False
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates_after_commit(self, db, cache):
+        user = await add_user(db)
+        token = token_for(user.email)
+        await auth.get_current_user(token, db)
+
+        user.city = "Paris"
+        await db.flush()
+        assert cache.get_stats()["entries"] == 0
+
+        # Re-cached from this session before commit, then corrected on commit
+        cache.put(user.email, principal(user.id, user.email))
+        await db.commit()
+
+        assert (await auth.get_current_user(token, db)).city == "Paris"
+
+    @pytest.mark.asyncio
+    async def test_deleted_user_is_rejected(self, db, cache):
+        user = await add_user(db)
+        token = token_for(user.email)
+        await auth.get_current_user(token, db)
+
+        await db.delete(user)
+        await db.commit()
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.get_current_user(token, db)
+        assert exc.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_optional_user(self, db, cache):
+        user = await add_user(db)
+
+        assert await auth.get_current_user_optional(None, db) is None
+        assert await auth.get_current_user_optional("bad", db) is None
+        assert (await auth.get_current_user_optional(token_for(user.email), db)).id == user.id
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_benchmark_queries_per_authenticated_request(db, cache):
+    """DB statements and time for 200 authenticated requests by 5 users."""
+    requests = 200
+    users = [await add_user(db, f"user{i}@example.com") for i in range(5)]
+    for user in users:
+        db.add(models.FormSubmission(user_id=user.id, form_url="https://example.com", status="Success"))
+    await db.commit()
+    tokens = [token_for(u.email) for u in users]
+
+    async def legacy_lookup(token):
+        # get_current_user before the cache: full User load with its selectin relationships
+        email = auth.decode_access_token(token)["sub"]
+        result = await db.execute(auth.select(models.User).filter(models.User.email == email))
+        return result.scalars().first()
+
+    results = {}
+    for label, lookup in (("uncached", legacy_lookup), ("cached", lambda t: auth.get_current_user(t, db))):
+        db.queries.clear()
+        db.expunge_all()
+        started = time.perf_counter()
+        for i in range(requests):
+            assert (await lookup(tokens[i % len(tokens)])).email.startswith("user")
+        elapsed = (time.perf_counter() - started) * 1000
+        results[label] = len(db.queries)
+        print(f"\n{label:>9}: {len(db.queries) / requests:.2f} queries/request, "
+              f"{elapsed / requests:.3f} ms/request")
+
+    print(f"hit rate: {cache.get_stats()['hit_rate']:.1%}")
+    assert results["cached"] == len(users)
+    assert results["cached"] * 10 < results["uncached"]
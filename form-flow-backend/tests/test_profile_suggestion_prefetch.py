@@ -0,0 +1,230 @@
+"""
+Unit Tests for Form-Level Suggestion Prefetch
+
+Tests for the batched per-form LLM call, the bounded suggestion cache and
+background refresh when previous answers change.
+
+Run: pytest tests/test_profile_suggestion_prefetch.py -v -s
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.ai.profile.suggestions import (
+    ProfileSuggestionEngine, FormSuggestionSet, IntelligentSuggestion, SuggestionTier
+)
+
+
+LABELS = [f"Field {i}" for i in range(20)] + ["City", "Country"]
+
+
+def form_context(labels=LABELS):
+    return {"purpose": "Job Application", "url": "https://example.com/apply", "field_labels": labels}
+
+
+def suggestion(value):
+    return IntelligentSuggestion(
+        value=value, confidence=0.85, tier=SuggestionTier.PROFILE_BASED,
+        reasoning="test", behavioral_match="llm_inference",
+    )
+
+
+class FakeBatchLLM:
+    """Stands in for _generate_form_suggestions; counts calls."""
+
+    def __init__(self, delay=0.0, country="France"):
+        self.calls = []
+        self.delay = delay
+        self.country = country
+
+    async def __call__(self, profile, form_context, previous_answers, form_intent):
+        self.calls.append(dict(previous_answers))
+        await asyncio.sleep(self.delay)
+        fields = ProfileSuggestionEngine._form_fields(form_context)
+        values = {f["name"].lower(): [suggestion(f"value for {f['name']}")] for f in fields}
+        values["country"] = [suggestion(self.country)]
+        return FormSuggestionSet(suggestions=values, answers=dict(previous_answers))
+
+
+@pytest.fixture
+def engine():
+    engine = ProfileSuggestionEngine()
+    engine.batch = FakeBatchLLM()
+    engine._generate_form_suggestions = engine.batch
+    engine._tier1_profile_based = AsyncMock(return_value=[suggestion("per-field")])
+    return engine
+
+
+@pytest.fixture
+def profile(monkeypatch):
+    profile = {"user_id": 1, "profile_text": "Software developer in Paris", "version": 3}
+    service = MagicMock()
+    service.get_profile = AsyncMock(side_effect=lambda db, user_id: profile)
+    monkeypatch.setattr("services.ai.profile.service.get_profile_service", lambda: service)
+    return profile
+
+
+async def ask(engine, label, previous_answers=None, context=None):
+    return await engine.get_suggestions(
+        user_id=1,
+        field_context={"name": label, "label": label},
+        form_context=context or form_context(),
+        previous_answers=previous_answers or {},
+        db=None,
+        form_intent=None,
+    )
+
+
+# ============================================================================
+# Tests
+# ============================================================================
+
+class TestFormPrefetch:
+
+    @pytest.mark.asyncio
+    async def test_one_llm_call_serves_every_field(self, engine, profile):
+        results = [await ask(engine, label) for label in LABELS]
+
+        assert len(engine.batch.calls) == 1
+        assert results[0][0].value == "value for Field 0"
+        assert results[-1][0].value == "France"
+        engine._tier1_profile_based.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_requests_share_the_call(self, engine, profile):
+        engine.batch.delay = 0.05
+
+        results = await asyncio.gather(*(ask(engine, label) for label in LABELS[:10]))
+
+        assert len(engine.batch.calls) == 1
+        assert all(r for r in results)
+
+    @pytest.mark.asyncio
+    async def test_prefetch_on_form_load(self, engine, profile):
+        assert await engine.prefetch_form(1, form_context(), {}, None, None)
+        await asyncio.sleep(0)
+        await asyncio.gather(*engine._inflight.values())
+
+        await ask(engine, "City")
+
+        assert len(engine.batch.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_profile_version_is_part_of_the_key(self, engine, profile):
+        await ask(engine, "City")
+        profile["version"] = 4
+        await ask(engine, "City")
+
+        assert len(engine.batch.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_fields_missing_from_batch_fall_back_to_per_field_call(self, engine, profile):
+        result = await ask(engine, "Not In Form", context=form_context(["City"]))
+
+        assert result[0].value == "per-field"
+        assert len(engine.batch.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_per_field_call(self, engine, profile):
+        engine._generate_form_suggestions = AsyncMock(return_value=None)
+
+        assert (await ask(engine, "City"))[0].value == "per-field"
+        assert engine._form_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, engine, profile):
+        engine.FORM_CACHE_SIZE = 3
+        for i in range(5):
+            await ask(engine, "City", context=form_context([f"Form {i} City"]))
+
+        assert len(engine._form_cache) == 3
+
+
+class TestBackgroundRefresh:
+
+    @pytest.mark.asyncio
+    async def test_accepting_a_suggestion_does_not_refresh(self, engine, profile):
+        await ask(engine, "City")
+
+        await ask(engine, "City", previous_answers={"Country": "France"})
+
+        assert len(engine.batch.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_answers_refresh_in_background(self, engine, profile):
+        await ask(engine, "Country")
+        engine.batch.delay = 0.05
+        engine.batch.country = "Germany"
+
+        stale = await ask(engine, "Country", previous_answers={"City": "Berlin"})
+        assert stale[0].value == "France"  # served immediately from the old batch
+
+        await asyncio.gather(*engine._inflight.values())
+        fresh = await ask(engine, "Country", previous_answers={"City": "Berlin"})
+
+        assert fresh[0].value == "Germany"
+        assert engine.batch.calls[-1] == {"City": "Berlin"}
+        assert len(engine.batch.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_refreshes_are_rate_limited(self, engine, profile):
+        await ask(engine, "City")
+
+        for i in range(5):
+            await ask(engine, "City", previous_answers={"Field 1": f"edit {i}"})
+            await asyncio.gather(*engine._inflight.values())
+
+        assert len(engine.batch.calls) == 2
+
+
+class TestBatchPrompt:
+
+    @pytest.mark.asyncio
+    async def test_batch_response_is_keyed_by_name_and_label(self):
+        gemini = MagicMock()
+        chain = AsyncMock()
+        chain.ainvoke.return_value = {"fields": {
+            "country": {"suggestions": ["France"], "reasoning": "City is Paris"},
+            "empty": {"suggestions": []},
+        }}
+        with patch("services.ai.profile.suggestions.get_gemini_service", return_value=gemini), \
+             patch("services.ai.profile.suggestions.ChatPromptTemplate") as prompt, \
+             patch("services.ai.profile.suggestions.JsonOutputParser"):
+            prompt.from_messages.return_value.__or__.return_value = MagicMock(
+                __or__=MagicMock(return_value=chain)
+            )
+            entry = await ProfileSuggestionEngine()._generate_form_suggestions(
+                {"profile_text": "Lives in Paris"},
+                {"fields": [{"name": "country", "label": "Country of Residence"}, {"name": "empty"}]},
+                {"City": "Paris"},
+                None,
+            )
+
+        variables = chain.ainvoke.call_args.args[0]
+        assert "Country of Residence (Internal Name: country)" in variables["fields"]
+        assert variables["profile"] == "Lives in Paris"
+        assert "- City: Paris" in variables["previous_answers_context"]
+        assert entry.lookup({"name": "country"})[0].value == "France"
+        assert entry.lookup({"label": "Country of Residence"})[0].reasoning == "City is Paris"
+        assert entry.lookup({"name": "empty"}) is None
+
+
+@pytest.mark.asyncio
+async def test_benchmark_cached_field_latency(engine, profile):
+    """Per-field latency once the form batch is cached."""
+    await ask(engine, LABELS[0])
+    rounds = 200
+
+    started = time.perf_counter()
+    for i in range(rounds):
+        await ask(engine, LABELS[i % len(LABELS)], previous_answers={"Country": "France"})
+    per_field_us = (time.perf_counter() - started) / rounds * 1_000_000
+
+    print(f"\nCached per-field suggestions: {per_field_us:.0f} µs/request, "
+          f"{len(engine.batch.calls)} LLM call(s) for {rounds} requests")
+
+    assert len(engine.batch.calls) == 1
+    assert per_field_us < 5000
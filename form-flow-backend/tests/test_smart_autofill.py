@@ -0,0 +1,254 @@
+"""
+Unit Tests for Smart Autofill
+
+Tests for the incremental per-user index, prefix lookups,
+per-field invalidation, concurrent learning across workers sharing
+Redis, and migration of legacy history blobs.
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from services.ai import smart_autofill as autofill_module
+from services.ai.smart_autofill import SmartAutofill, UserAutofillIndex, PrefixTrie
+
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+@pytest.fixture
+def autofill(monkeypatch):
+    """Create a SmartAutofill instance without RAG enhancement."""
+    monkeypatch.setattr(autofill_module, "RAG_AVAILABLE", False)
+    return SmartAutofill()
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """Shared fakeredis for every SmartAutofill instance ("worker") in a test."""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+    async def get_redis_client():
+        return client
+
+    monkeypatch.setattr(autofill_module, "RAG_AVAILABLE", False)
+    monkeypatch.setattr(autofill_module, "get_redis_client", get_redis_client)
+    return client
+
+
+@pytest.fixture
+def user_id():
+    """Unique user per test (the fallback cache is process-wide)."""
+    return f"user-{uuid.uuid4().hex[:8]}"
+
+
+# =============================================================================
+# Prefix Trie
+# =============================================================================
+
+class TestPrefixTrie:
+
+    def test_prefix_lookup_is_case_insensitive(self):
+        trie = PrefixTrie()
+        for value in ("John", "Johnny", "Jane"):
+            trie.insert(value)
+
+        assert trie.starting_with("jo") == {"John", "Johnny"}
+        assert trie.starting_with("JA") == {"Jane"}
+        assert trie.starting_with("x") == set()
+
+    def test_remove_prunes_values(self):
+        trie = PrefixTrie()
+        trie.insert("John")
+        trie.insert("Johnny")
+
+        trie.remove("Johnny")
+
+        assert trie.starting_with("john") == {"John"}
+        assert trie.starting_with("johnn") == set()
+
+
+# =============================================================================
+# User Index
+# =============================================================================
+
+class TestUserAutofillIndex:
+
+    def test_add_updates_counts_incrementally(self):
+        index = UserAutofillIndex()
+        now = datetime.now().isoformat()
+
+        index.add("email", "a@x.com", now)
+        index.add("email", "a@x.com", now)
+        index.add("email", "b@x.com", now)
+
+        assert index.fields["email"]["a@x.com"][0] == 2
+        assert index.fields["email"]["b@x.com"][0] == 1
+
+    def test_values_are_capped_per_field(self):
+        index = UserAutofillIndex(max_values_per_field=2)
+
+        index.add("city", "Pune", "2025-01-01T00:00:00")
+        index.add("city", "Mumbai", "2025-01-02T00:00:00")
+        index.matching("city", "")  # build the trie
+        index.add("city", "Delhi", "2025-01-03T00:00:00")
+
+        assert set(index.fields["city"]) == {"Mumbai", "Delhi"}
+        assert index.matching("city", "p") == set()
+
+    def test_round_trip_serialization(self):
+        index = UserAutofillIndex()
+        index.add("name", "John", "2025-01-01T00:00:00")
+
+        restored = UserAutofillIndex.from_dict({"name": index.field_to_json("name")})
+
+        assert restored.fields == index.fields
+
+
+# =============================================================================
+# Service
+# =============================================================================
+
+class TestSmartAutofill:
+
+    @pytest.mark.asyncio
+    async def test_suggestions_ranked_by_frequency(self, autofill, user_id):
+        await autofill.learn_from_submission(user_id, {"email": "work@corp.com"})
+        await autofill.learn_from_submission(user_id, {"email": "me@gmail.com"})
+        await autofill.learn_from_submission(user_id, {"email": "me@gmail.com"})
+
+        suggestions = await autofill.get_suggestions(user_id, "email", "email")
+
+        assert [s["value"] for s in suggestions] == ["me@gmail.com", "work@corp.com"]
+        assert suggestions[0]["usage_count"] == 2
+        assert suggestions[0]["label"] == "📧 me@gmail.com"
+
+    @pytest.mark.asyncio
+    async def test_current_value_filters_by_prefix(self, autofill, user_id):
+        await autofill.learn_from_submission(user_id, {"name": "John"})
+        await autofill.learn_from_submission(user_id, {"name": "Jane"})
+
+        suggestions = await autofill.get_suggestions(user_id, "name", current_value="jo")
+
+        assert [s["value"] for s in suggestions] == ["John"]
+
+    @pytest.mark.asyncio
+    async def test_learning_drops_the_in_process_copy(self, autofill, user_id):
+        await autofill.learn_from_submission(user_id, {"name": "John", "city": "Pune"})
+        await autofill.get_suggestions(user_id, "city")
+
+        await autofill.learn_from_submission(user_id, {"city": "Mumbai"})
+
+        assert user_id not in autofill._indexes
+        values = [s["value"] for s in await autofill.get_suggestions(user_id, "city")]
+        assert set(values) == {"Pune", "Mumbai"}
+
+    @pytest.mark.asyncio
+    async def test_sensitive_fields_are_not_learned(self, autofill, user_id):
+        await autofill.learn_from_submission(user_id, {"password": "hunter2", "name": "John"})
+
+        assert await autofill.get_suggestions(user_id, "password") == []
+
+    @pytest.mark.asyncio
+    async def test_index_survives_memory_eviction(self, autofill, user_id):
+        await autofill.learn_from_submission(user_id, {"name": "John"})
+
+        autofill._indexes.clear()
+
+        assert await autofill.get_profile_from_history(user_id) == {"name": "John"}
+
+
+# =============================================================================
+# Redis: several workers
+# =============================================================================
+
+class TestSharedRedisIndex:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_learns_are_not_lost(self, redis, user_id):
+        workers = [SmartAutofill() for _ in range(4)]
+        for worker in workers:
+            await worker.get_suggestions(user_id, "city")  # every worker holds a copy
+
+        await asyncio.gather(*(
+            workers[i % 4].learn_from_submission(user_id, {"city": "Pune"}) for i in range(20)
+        ))
+
+        suggestions = await SmartAutofill().get_suggestions(user_id, "city")
+        assert suggestions[0]["usage_count"] == 20
+
+    @pytest.mark.asyncio
+    async def test_other_workers_see_new_values_immediately(self, redis, user_id):
+        reader, writer = SmartAutofill(), SmartAutofill()
+        await writer.learn_from_submission(user_id, {"email": "a@x.com"})
+        assert len(await reader.get_suggestions(user_id, "email")) == 1
+
+        await writer.learn_from_submission(user_id, {"email": "b@x.com"})
+
+        values = {s["value"] for s in await reader.get_suggestions(user_id, "email")}
+        assert values == {"a@x.com", "b@x.com"}
+
+    @pytest.mark.asyncio
+    async def test_values_beyond_the_cap_are_evicted(self, redis, user_id):
+        autofill = SmartAutofill(max_history=2)
+        for city in ("Pune", "Mumbai", "Delhi"):
+            await autofill.learn_from_submission(user_id, {"city": city})
+
+        values = {s["value"] for s in await autofill.get_suggestions(user_id, "city")}
+
+        assert len(values) == 2 and "Delhi" in values
+        assert len(await redis.hkeys(f"autofill_index:{user_id}")) == 2 * 3 + 1
+
+
+# =============================================================================
+# Legacy history
+# =============================================================================
+
+LEGACY_HISTORY = [
+    {"timestamp": "2025-01-01T10:00:00", "form_id": "a", "fields": {
+        "name": {"value": "John", "type": "normal"},
+        "ssn": {"hash": "abc", "type": "sensitive"},
+    }},
+    {"timestamp": "2025-02-01T10:00:00", "form_id": "b", "fields": {
+        "name": {"value": "John", "type": "normal"},
+        "city": {"value": "Pune", "type": "normal"},
+    }},
+]
+
+
+class TestLegacyMigration:
+
+    @pytest.mark.asyncio
+    async def test_redis_history_is_migrated_once(self, redis, user_id):
+        # set_cached(key, json.dumps(history)) stored it JSON-encoded twice
+        await redis.set(f"autofill_history:{user_id}", json.dumps(json.dumps(LEGACY_HISTORY)))
+
+        profile = await SmartAutofill().get_profile_from_history(user_id)
+        suggestions = await SmartAutofill().get_suggestions(user_id, "name")
+
+        assert profile == {"name": "John", "city": "Pune"}
+        assert suggestions[0]["usage_count"] == 2
+        assert suggestions[0]["last_used"] == "2025-02-01T10:00:00"
+        assert await redis.exists(f"autofill_history:{user_id}") == 0
+
+    @pytest.mark.asyncio
+    async def test_learning_counts_on_top_of_migrated_history(self, redis, user_id):
+        await redis.set(f"autofill_history:{user_id}", json.dumps(json.dumps(LEGACY_HISTORY)))
+
+        await SmartAutofill().learn_from_submission(user_id, {"name": "John"})
+
+        suggestions = await SmartAutofill().get_suggestions(user_id, "name")
+        assert suggestions[0]["usage_count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_in_memory_history_is_migrated(self, autofill, user_id):
+        await autofill_module.set_cached(f"autofill_history:{user_id}", json.dumps(LEGACY_HISTORY))
+
+        assert await autofill.get_profile_from_history(user_id) == {"name": "John", "city": "Pune"}
+        assert await autofill_module.get_cached(f"autofill_history:{user_id}") is None
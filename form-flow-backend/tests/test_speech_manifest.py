@@ -0,0 +1,407 @@
+"""
+Unit Tests for the Per-Form Speech Manifest
+
+Tests for per-(form, field) audio caching, conversation-order prefetch,
+memory bounds, shared upstream streams, SpeechService.stream_speech and
+the /speech/{field_name} endpoint, plus benchmarks of prompt latency
+while walking through a form and of time-to-first-byte when streaming.
+
+Run: pytest tests/test_speech_manifest.py -v -s
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from routers.speech import get_field_speech_audio
+from services.ai.extraction.field_clusterer import FieldClusterer
+from services.voice.speech import SpeechService
+from services.voice.speech_manifest import SpeechManifest, form_key
+
+
+URL_A = "https://example.com/apply"
+URL_B = "https://example.com/signup"
+
+
+def schema(*names):
+    fields = [{"name": n, "label": n.replace("_", " ").title(), "type": "text"} for n in names]
+    fields.append({"name": "submit", "type": "submit"})
+    return [{"form_id": "f", "fields": fields}]
+
+
+APPLY = schema("first_name", "email", "city", "last_name", "phone", "country")
+
+
+class FakeSpeechService:
+    """Blocking TTS stand-in that records prompts."""
+
+    def __init__(self, delay=0.0, size=100):
+        self.delay = delay
+        self.size = size
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def _create_field_prompt(self, field_info):
+        return f"Please provide {field_info.get('label') or field_info['name']}"
+
+    def text_to_speech(self, text):
+        with self._lock:
+            self.prompts.append(text)
+        time.sleep(self.delay)
+        return (text.encode() + b"|").ljust(self.size, b".")
+
+
+class FakeStreamingService(FakeSpeechService):
+    """Async provider stand-in that sends audio in delayed chunks."""
+
+    def __init__(self, chunks=4, chunk_delay=0.0, fail_after=None, **kwargs):
+        super().__init__(**kwargs)
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.fail_after = fail_after
+        self.streams = 0
+
+    async def stream_speech(self, text):
+        self.streams += 1
+        self.prompts.append(text)
+        audio = (text.encode() + b"|").ljust(self.size, b".")
+        step = -(-len(audio) // self.chunks)
+        for i in range(0, len(audio), step):
+            if self.fail_after is not None and i // step == self.fail_after:
+                raise ConnectionError("provider dropped the stream")
+            await asyncio.sleep(self.chunk_delay)
+            yield audio[i:i + step]
+
+
+async def read_body(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+async def settle(manifest):
+    while manifest._background:
+        await asyncio.gather(*list(manifest._background))
+
+
+# ============================================================================
+# Manifest
+# ============================================================================
+
+class TestSpeechManifest:
+
+    def test_order_follows_field_clusterer(self):
+        manifest = SpeechManifest()
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        fields = APPLY[0]["fields"][:-1]
+        expected = [f["name"] for batch in FieldClusterer().create_batches(fields) for f in batch]
+        assert manifest.get_form(form_id).order == expected
+        assert "submit" not in manifest.get_form(form_id).fields
+        assert manifest.next_fields(form_id, None, 2) == expected[:2]
+        assert manifest.next_fields(form_id, expected[0], 2) == expected[1:3]
+        assert manifest.next_fields(form_id, "unknown", 2) == []
+
+    @pytest.mark.asyncio
+    async def test_request_prefetches_next_fields(self):
+        manifest = SpeechManifest(prefetch_ahead=2)
+        service = FakeSpeechService()
+        form_id = manifest.register_form(URL_A, APPLY)
+        order = manifest.get_form(form_id).order
+
+        await manifest.get_audio(form_id, order[0], service)
+        await settle(manifest)
+
+        assert manifest.get_stats()["cached_prompts"] == 3
+        calls = len(service.prompts)
+        audio = await manifest.get_audio(form_id, order[1], service)
+        assert audio.startswith(b"Please provide")
+        await settle(manifest)
+        assert len(service.prompts) == calls + 1  # only order[3] was new
+
+    @pytest.mark.asyncio
+    async def test_fields_are_keyed_per_form(self):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeSpeechService()
+        a = manifest.register_form(URL_A, schema("email"))
+        b = manifest.register_form(URL_B, [{"fields": [{"name": "email", "label": "Work Email", "type": "text"}]}])
+
+        audio_a = await manifest.get_audio(a, "email", service)
+        audio_b = await manifest.get_audio(b, "email", service)
+
+        assert audio_a != audio_b
+        assert b"Work Email" in audio_b
+        assert manifest.find_form("email") == b
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_generation(self):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeSpeechService(delay=0.05)
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        results = await asyncio.gather(*(manifest.get_audio(form_id, "email", service) for _ in range(5)))
+
+        assert len(set(results)) == 1
+        assert len(service.prompts) == 1
+
+    @pytest.mark.asyncio
+    async def test_audio_budget_is_enforced(self):
+        manifest = SpeechManifest(max_bytes=250, prefetch_ahead=0)
+        service = FakeSpeechService(size=100)
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        for name in ("first_name", "email", "city"):
+            await manifest.get_audio(form_id, name, service)
+
+        stats = manifest.get_stats()
+        assert stats["bytes"] <= 250
+        assert stats["cached_prompts"] == 2
+        assert manifest.cached_audio(form_id, "first_name") is None
+
+    @pytest.mark.asyncio
+    async def test_evicting_a_form_drops_its_audio(self):
+        manifest = SpeechManifest(max_forms=2, prefetch_ahead=0)
+        service = FakeSpeechService()
+        first = manifest.register_form("https://example.com/1", APPLY)
+        await manifest.get_audio(first, "email", service)
+
+        manifest.register_form("https://example.com/2", APPLY)
+        manifest.register_form("https://example.com/3", APPLY)
+
+        assert manifest.get_form(first) is None
+        stats = manifest.get_stats()
+        assert (stats["forms"], stats["cached_prompts"], stats["bytes"]) == (2, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_rescrape_keeps_unchanged_prompts(self):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeSpeechService()
+        form_id = manifest.register_form(URL_A, APPLY)
+        await manifest.get_audio(form_id, "email", service)
+        await manifest.get_audio(form_id, "city", service)
+
+        changed = schema("first_name", "email", "city", "last_name", "phone", "country")
+        changed[0]["fields"][2]["label"] = "Town"
+        manifest.register_form(URL_A, changed)
+
+        assert manifest.cached_audio(form_id, "email") is not None
+        assert manifest.cached_audio(form_id, "city") is None
+
+    @pytest.mark.asyncio
+    async def test_failed_generation_is_not_cached(self):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeSpeechService()
+        service.text_to_speech = lambda text: None
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        assert await manifest.get_audio(form_id, "email", service) is None
+        assert manifest.get_stats()["cached_prompts"] == 0
+
+
+# ============================================================================
+# Endpoint
+# ============================================================================
+
+class TestSpeechEndpoint:
+
+    @pytest.mark.asyncio
+    async def test_serves_audio_for_requested_form(self):
+        manifest = SpeechManifest(prefetch_ahead=1)
+        service = FakeSpeechService()
+        manifest.register_form(URL_A, APPLY)
+
+        response = await get_field_speech_audio("email", URL_A, service, manifest)
+        await settle(manifest)
+
+        assert response.status_code == 200
+        assert response.media_type == "audio/mpeg"
+        assert (await read_body(response)).startswith(b"Please provide Email")
+        assert manifest.get_stats()["cached_prompts"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_form_generates_without_caching(self):
+        manifest = SpeechManifest()
+        service = FakeSpeechService()
+
+        response = await get_field_speech_audio("nickname", None, service, manifest)
+
+        assert (await read_body(response)).startswith(b"Please provide nickname")
+        assert manifest.get_stats()["cached_prompts"] == 0
+        assert form_key(URL_A) != form_key(URL_B)
+
+    @pytest.mark.asyncio
+    async def test_no_audio_returns_204(self):
+        service = FakeSpeechService()
+        service.text_to_speech = lambda text: None
+
+        response = await get_field_speech_audio("email", None, service, SpeechManifest())
+
+        assert response.status_code == 204
+
+    @pytest.mark.asyncio
+    async def test_streams_provider_chunks(self):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeStreamingService(chunks=4)
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        response = await get_field_speech_audio("email", URL_A, service, manifest)
+        chunks = [chunk async for chunk in response.body_iterator]
+        await settle(manifest)
+
+        assert len(chunks) == 4
+        assert b"".join(chunks) == manifest.cached_audio(form_id, "email")
+
+
+# ============================================================================
+# Shared Streams
+# ============================================================================
+
+class TestSharedStreams:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_streams_share_one_upstream(self):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeStreamingService(chunks=5, chunk_delay=0.01)
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        async def listen(delay):
+            await asyncio.sleep(delay)
+            return b"".join([c async for c in manifest.stream_audio(form_id, "email", service)])
+
+        results = await asyncio.gather(*(listen(i * 0.01) for i in range(5)))
+
+        assert service.streams == 1
+        assert len(set(results)) == 1
+        assert manifest.cached_audio(form_id, "email") == results[0]
+        assert manifest.get_stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_disconnected_reader_still_fills_cache(self):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeStreamingService(chunks=4, chunk_delay=0.01)
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        stream = manifest.stream_audio(form_id, "email", service)
+        await anext(stream)
+        await stream.aclose()  # client went away after the first chunk
+        await manifest._inflight[(form_id, "email")].task
+
+        assert manifest.cached_audio(form_id, "email").startswith(b"Please provide Email")
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_is_not_cached(self):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeStreamingService(chunks=4, fail_after=2)
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        chunks = [c async for c in manifest.stream_audio(form_id, "email", service)]
+
+        assert len(chunks) == 2
+        assert manifest.cached_audio(form_id, "email") is None
+        assert await manifest.get_audio(form_id, "city", FakeStreamingService(fail_after=0)) is None
+        assert manifest.get_stats()["inflight"] == 0
+
+
+# ============================================================================
+# SpeechService.stream_speech
+# ============================================================================
+
+def elevenlabs_service(handler):
+    service = SpeechService(api_key="test-key", enable_cache=True)
+    service._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+class TestStreamSpeech:
+
+    @pytest.mark.asyncio
+    async def test_elevenlabs_chunks_are_streamed_and_cached(self):
+        requests = []
+
+        async def body():
+            for part in (b"ID3", b"-frame-1", b"-frame-2"):
+                yield part
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, content=body())
+
+        service = elevenlabs_service(handler)
+
+        chunks = [c async for c in service.stream_speech("Hello there")]
+        again = [c async for c in service.stream_speech("Hello there")]
+
+        assert b"".join(chunks) == b"ID3-frame-1-frame-2"
+        assert again == [b"ID3-frame-1-frame-2"]
+        assert len(requests) == 1
+        assert requests[0].url.path.endswith("/stream")
+        assert requests[0].headers["xi-api-key"] == "test-key"
+
+    @pytest.mark.asyncio
+    async def test_quota_error_disables_elevenlabs(self):
+        service = elevenlabs_service(lambda request: httpx.Response(429, text="quota exceeded"))
+
+        with patch("services.voice.speech.HAS_EDGE_TTS", False):
+            chunks = [c async for c in service.stream_speech("Hello there")]
+
+        assert chunks == []
+        assert service._elevenlabs_available is False
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_benchmark_prompt_latency_walking_a_form():
+    """Per-prompt latency with 60 ms TTS while the user spends 100 ms per answer."""
+    fields = [f"field_{i}" for i in range(12)]
+    results = {}
+
+    for label, ahead in (("on demand", 0), ("prefetch 3", 3)):
+        manifest = SpeechManifest(prefetch_ahead=ahead)
+        service = FakeSpeechService(delay=0.06)
+        form_id = manifest.register_form(URL_A, schema(*fields))
+        order = manifest.get_form(form_id).order
+
+        waits = []
+        for name in order:
+            started = time.perf_counter()
+            await manifest.get_audio(form_id, name, service)
+            waits.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.1)  # user answering
+        await settle(manifest)
+
+        results[label] = sum(waits[1:]) / len(waits[1:])
+        print(f"\n{label:>10}: first prompt {waits[0]:5.1f} ms, later prompts {results[label]:5.1f} ms avg, "
+              f"{len(service.prompts)} TTS calls, {manifest.get_stats()['bytes']} bytes cached")
+
+    assert results["prefetch 3"] * 5 < results["on demand"]
+
+
+@pytest.mark.asyncio
+async def test_benchmark_time_to_first_byte_streaming():
+    """TTFB for an uncached prompt whose provider sends 8 chunks 15 ms apart."""
+    results = {}
+
+    for label in ("buffered", "streamed"):
+        manifest = SpeechManifest(prefetch_ahead=0)
+        service = FakeStreamingService(chunks=8, chunk_delay=0.015)
+        form_id = manifest.register_form(URL_A, APPLY)
+
+        started = time.perf_counter()
+        if label == "buffered":
+            audio = await manifest.get_audio(form_id, "email", service)
+            first = total = time.perf_counter() - started
+        else:
+            response = await get_field_speech_audio("email", URL_A, service, manifest)
+            first = time.perf_counter() - started
+            audio = await read_body(response)
+            total = time.perf_counter() - started
+
+        results[label] = first * 1000
+        print(f"\n{label:>8}: first byte {first * 1000:6.1f} ms, complete {total * 1000:6.1f} ms, {len(audio)} bytes")
+
+    assert results["streamed"] * 3 < results["buffered"]
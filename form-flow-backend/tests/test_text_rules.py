@@ -0,0 +1,301 @@
+"""
+Unit Tests for Precompiled Text Rule Tables
+
+Tests for RuleTable / prefix chains, equivalence with the previous
+pattern-string loops on a generated utterance corpus, and a per-utterance
+normalization + intent micro-benchmark.
+
+Run: pytest tests/test_text_rules.py -v -s
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+from services.ai import normalizers
+from services.ai.conversation_intelligence import IntentRecognizer
+from services.ai.extraction.fallback_extractor import IntelligentFallbackExtractor, _SEGMENT_RULES
+from services.ai.text_refiner import TextRefiner, _NUMBER_WORDS, _WORD_TO_NUM
+from services.ai.text_rules import RuleTable, compile_prefix_chain, compile_word_table, replace_words, required_literal
+from services.ai.voice.correction_detector import CorrectionDetector
+
+
+PREFIX_CHAINS = {
+    name: (getattr(normalizers, f"_{name}_PREFIX_PATTERNS"), getattr(normalizers, f"_{name}_PREFIXES"))
+    for name in ("EMAIL", "PHONE", "NAME", "TEXT", "NUMBER")
+}
+
+VOCAB = (
+    "my name is email address it's its i'm im this call me you can reach at on here's number phone "
+    "mobile cell contact hi hey i am work for with the company we are have about around and also "
+    "plus then in , actually no not wait sorry i mean skip help back yes okay um uh like you know "
+    "basically right kind of sort guess think john smith gmail dot com 555 123 4567 twenty five one "
+    "three eleven ten years twelve what? which? how many how long thanks undo previous next later, . ! ? \t"
+).split(" ")
+
+
+def utterances(n=1500, seed=7):
+    rng = random.Random(seed)
+    corpus = [
+        "my email is john dot smith at gmail dot com and my phone is 555 123 4567",
+        "um my name is like John Smith",
+        "i work at microsoft as a senior engineer you know",
+        "yes", "no", "actually it's james", "skip this one", "what do you mean?",
+        "I live at 42 Baker Street in London", "it's 25", "not john, it's james",
+        "john... james", "Janu- no February", "okay so I think like three years",
+    ]
+    for _ in range(n):
+        words = [rng.choice(VOCAB) for _ in range(rng.randint(1, 14))]
+        text = " ".join(words)
+        corpus.append(text.capitalize() if rng.random() < 0.3 else text)
+    return corpus
+
+
+# ============================================================================
+# Previous implementations (inline pattern strings, one pass per pattern)
+# ============================================================================
+
+def legacy_strip(patterns, text):
+    for prefix in patterns:
+        text = re.sub(prefix, '', text, flags=re.IGNORECASE)
+    return text
+
+
+def legacy_segment(text):
+    for rule in _SEGMENT_RULES:
+        text = re.sub(rule.pattern, rule.value, text, flags=re.IGNORECASE)
+    return [s.strip() for s in text.split('|AND|') if s.strip()]
+
+
+class LegacyIntentRecognizer(IntentRecognizer):
+    """IntentRecognizer.detect_intent / has_data_content as they were."""
+
+    def __init__(self):
+        self._compiled_patterns = {
+            intent: [re.compile(p, re.IGNORECASE) for p in patterns]
+            for intent, patterns in self.INTENT_PATTERNS.items()
+        }
+
+    def _contains_strong_data_signals(self, user_input):
+        return bool(
+            re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', user_input)
+            or re.search(r'\d{5,}', user_input.replace(' ', ''))
+            or re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', user_input)
+            or re.search(r'[A-Z][a-z]+ [A-Z][a-z]+', user_input)
+        )
+
+    def has_data_content(self, user_input):
+        cleaned = user_input.lower()
+        for patterns in self.INTENT_PATTERNS.values():
+            for pattern in patterns:
+                cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+        return len(cleaned.strip().split()) >= 1
+
+    def detect_intent(self, user_input):
+        from services.ai.conversation_intelligence import UserIntent
+        user_input = user_input.strip()
+        user_lower = user_input.lower()
+        words = user_input.split()
+        for pattern in self._compiled_patterns[UserIntent.CORRECTION]:
+            if pattern.search(user_lower):
+                return UserIntent.CORRECTION, 0.95 if pattern.pattern.startswith('^') else 0.90
+        strong = self._contains_strong_data_signals(user_input)
+        if len(words) > 5 and strong:
+            return UserIntent.DATA, 0.90
+        if len(words) <= 5 and strong:
+            for intent, patterns in self._compiled_patterns.items():
+                if intent == UserIntent.CORRECTION:
+                    continue
+                for pattern in patterns:
+                    if pattern.pattern.startswith('^') and pattern.search(user_lower):
+                        return intent, 0.75
+            return UserIntent.DATA, 0.85
+        for intent, patterns in self._compiled_patterns.items():
+            if intent == UserIntent.CORRECTION:
+                continue
+            for pattern in patterns:
+                if pattern.search(user_lower):
+                    return intent, 0.95 if pattern.pattern.startswith('^') else 0.85
+        if self.has_data_content(user_input):
+            return UserIntent.DATA, 0.80
+        return None, 0.0
+
+
+def legacy_fillers(text, fillers=TextRefiner.FILLER_WORDS):
+    for filler in fillers:
+        text = re.sub(r'\b' + re.escape(filler) + r'\b', '', text, flags=re.IGNORECASE)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def legacy_number_words(text):
+    for word, num in {'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
+                      'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
+                      'eleven': '11', 'twelve': '12'}.items():
+        text = re.sub(r'\b' + word + r'\b', num, text, flags=re.IGNORECASE)
+    return text
+
+
+def legacy_correction_match(detector, text):
+    """First (name, groups) the old per-pattern loop would report."""
+    if any(re.search(p, text, re.IGNORECASE) for p in detector.FALSE_POSITIVE_GUARDS):
+        return "false_positive"
+    for group in (detector.EXPLICIT_STRONG_PATTERNS, detector.EXPLICIT_MEDIUM_PATTERNS,
+                  detector.NEGATION_PATTERNS, detector.RESTART_PATTERNS):
+        for pattern, name in group:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                return name, match.groups()
+    return None
+
+
+# ============================================================================
+# Rule tables
+# ============================================================================
+
+class TestRuleTable:
+    """Tests for literal prefiltering and ordered semantics."""
+
+    def test_required_literal(self):
+        assert required_literal(r'\bgo back\b', re.IGNORECASE) == ('go back', True)
+        assert required_literal(r'\bleave (?:it )?blank\b', re.IGNORECASE)[0] == 'leave '
+        assert required_literal(r'(?:sorry|oops)[,\s]+(.+)$', re.IGNORECASE)[0] == ''
+        assert required_literal(r'Hello', 0) == ('Hello', False)
+        assert required_literal(r'(?i)Hello', 0) == ('hello', True)
+        assert required_literal(r'[unbalanced', 0) == ('', False)
+
+    def test_search_returns_first_rule_in_order(self):
+        table = RuleTable([(r'\bback\b', 'back'), (r'^go\b', 'go'), (r'\bgo back\b', 'go_back')])
+
+        rule, match = table.search("go back please")
+
+        assert rule.value == 'back'
+        assert match.group() == 'back'
+        assert table.search("nothing here") is None
+
+    def test_prefilter_skips_regex_but_keeps_results(self):
+        table = RuleTable([r'\bskip\b', r'\bhelp\b'])
+
+        assert [r.pattern for r in table.candidates("please HELP me")] == [r'\bhelp\b']
+        assert table.matches("please HELP me")
+
+    def test_non_ascii_text_is_not_prefiltered(self):
+        # Under IGNORECASE the Kelvin sign matches 'k'; str.lower() would miss it
+        table = RuleTable([r'\bok\b'])
+
+        assert table.matches("oK")
+        assert re.search(r'\bok\b', "oK", re.IGNORECASE)
+
+    def test_sub_applies_rules_to_previous_result(self):
+        table = RuleTable([(r'ab', 'X'), (r'Xc', 'Y')])
+
+        assert table.sub("abc abc") == "Y Y"
+        assert table.sub("abc", repl='') == "c"
+
+    def test_prefix_chain_requires_anchors(self):
+        with pytest.raises(ValueError):
+            compile_prefix_chain([r'my\s+'])
+
+    def test_word_table_single_pass(self):
+        table = compile_word_table(['one', 'eleven', 'ten'])
+
+        assert replace_words("One or eleven, not tenth", table, {'one': '1', 'eleven': '11', 'ten': '10'}) == \
+            "1 or 11, not tenth"
+
+
+# ============================================================================
+# Equivalence with the previous loops
+# ============================================================================
+
+class TestEquivalence:
+    """Every compiled rule set must give the same output as the loops it replaced."""
+
+    @pytest.mark.parametrize("name", sorted(PREFIX_CHAINS))
+    def test_prefix_chains(self, name):
+        patterns, chain = PREFIX_CHAINS[name]
+        for text in utterances():
+            for variant in (text, text.lower()):
+                assert chain.sub('', variant, count=1) == legacy_strip(patterns, variant), variant
+
+    def test_segmenter(self):
+        for text in utterances():
+            assert IntelligentFallbackExtractor._segment_input(text) == legacy_segment(text), text
+
+    def test_intent_recognition(self):
+        current, legacy = IntentRecognizer(), LegacyIntentRecognizer()
+        for text in utterances():
+            assert current.detect_intent(text) == legacy.detect_intent(text), text
+            assert current.has_data_content(text) == legacy.has_data_content(text), text
+
+    def test_correction_detector(self):
+        detector = CorrectionDetector()
+        for text in utterances():
+            text = text.strip()
+            if len(text) < 2:
+                continue
+            expected = legacy_correction_match(detector, text)
+            result = detector.detect(text)
+            if expected == "false_positive":
+                assert not result.has_correction
+            elif expected is not None:
+                assert result.pattern_matched == expected[0], text
+
+    def test_filler_and_number_rules(self):
+        refiner = TextRefiner.__new__(TextRefiner)
+        for text in utterances():
+            assert re.sub(r'\s+', ' ', refiner._FILLER_RULES.sub(text, '')).strip() == legacy_fillers(text), text
+            assert refiner.quick_clean(text) == legacy_fillers(text, TextRefiner.FILLER_WORDS[:8]), text
+            assert replace_words(text, _NUMBER_WORDS, _WORD_TO_NUM) == legacy_number_words(text), text
+
+    def test_normalizer_examples(self):
+        assert normalizers.normalize_email_smart("my email is john dot smith at gmail dot com") == "john.smith@gmail.com"
+        assert normalizers.normalize_email_smart("Atharva Karwal @ gmail.com") == "atharvakarwal@gmail.com"
+        assert normalizers.normalize_phone_smart("you can reach me at +91 98765 43210") == "+919876543210"
+        assert normalizers.normalize_name_smart("hi my name is john doe") == "John Doe"
+        assert normalizers.normalize_text_smart("I work at Microsoft") == "Microsoft"
+        assert normalizers.normalize_number_smart("it's about 25 years") == "25"
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def legacy_pipeline(text, recognizer):
+    recognizer.detect_intent(text)
+    for segment in legacy_segment(text):
+        for patterns, _ in PREFIX_CHAINS.values():
+            legacy_strip(patterns, segment.lower())
+    legacy_fillers(text)
+
+
+def compiled_pipeline(text, recognizer):
+    recognizer.detect_intent(text)
+    for segment in IntelligentFallbackExtractor._segment_input(text):
+        for _, chain in PREFIX_CHAINS.values():
+            chain.sub('', segment.lower(), count=1)
+    TextRefiner._FILLER_RULES.sub(text, '')
+
+
+def test_benchmark_per_utterance_pipeline():
+    """Intent + segmentation + prefix normalization + filler removal per utterance."""
+    corpus = utterances(400, seed=11)
+    pipelines = (
+        ("legacy", legacy_pipeline, LegacyIntentRecognizer()),
+        ("compiled", compiled_pipeline, IntentRecognizer()),
+    )
+    results = {}
+
+    for name, pipeline, recognizer in pipelines:
+        for text in corpus[:50]:
+            pipeline(text, recognizer)  # warm re's pattern cache
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            for text in corpus:
+                pipeline(text, recognizer)
+            best = min(best, time.perf_counter() - started)
+        results[name] = best / len(corpus) * 1_000_000
+        print(f"\n{name:>8}: {results[name]:7.1f} µs/utterance")
+
+    assert results["compiled"] * 2 < results["legacy"]
@@ -102,3 +102,91 @@ async def test_delete_correction(test_db):
     # Verify cache cleared
     res = service.apply_corrections("todelete")
     assert res['corrected'] == "todelete"
+
+@pytest.mark.asyncio
+async def test_whole_word_and_longest_match(test_db):
+    service = VocabularyService()
+    
+    await service.add_correction(test_db, "g mail", "gmail")
+    await service.add_correction(test_db, "g mail dot com", "gmail.com")
+    await service.add_correction(test_db, "ram", "Raam")
+    
+    res = service.apply_corrections("john at g mail dot com")
+    assert res['corrected'] == "john at gmail.com"
+    
+    # "ram" must not fire inside other words
+    res = service.apply_corrections("Program by Ram")
+    assert res['corrected'] == "Program by Raam"
+    assert res['applied'] == [{"heard": "ram", "correct": "Raam", "count": 1}]
+
+@pytest.mark.asyncio
+async def test_usage_counts_are_flushed_in_batch(test_db):
+    service = VocabularyService()
+    
+    await service.add_correction(test_db, "Karval", "Karwal")
+    await service.add_correction(test_db, "g mail", "gmail")
+    
+    service.apply_corrections("Karval Karval uses g mail")
+    service.apply_corrections("Karval")
+    
+    updated = await service.flush_usage(test_db)
+    assert updated == 2
+    assert await service.flush_usage(test_db) == 0
+    
+    test_db.expire_all()
+    usage = {c.heard: c.usage_count for c in await service.get_corrections(test_db)}
+    assert usage == {"karval": 3, "g mail": 1}
+
+@pytest.mark.asyncio
+async def test_initialize_loads_existing_rules(test_db):
+    writer = VocabularyService()
+    await writer.add_correction(test_db, "Karval", "Karwal")
+    
+    reader = VocabularyService()
+    await reader.initialize(test_db)
+    
+    assert reader.apply_corrections("karval")['corrected'] == "Karwal"
+
+
+class TestCorrectionBenchmark:
+    """Benchmark: single-pass automaton vs one regex per rule."""
+    
+    RULES = 10_000
+    
+    def test_benchmark_10k_rules(self):
+        import re
+        import time
+        from services.voice.correction_automaton import CorrectionAutomaton
+        
+        rules = {f"word{i} heard": f"Word{i}" for i in range(self.RULES)}
+        transcript = "my name is word42 heard and my email is word9999 heard at g mail " * 5
+        
+        start = time.perf_counter()
+        automaton = CorrectionAutomaton()
+        automaton.load(rules)
+        automaton.find("warm up")
+        build_ms = (time.perf_counter() - start) * 1000
+        
+        iterations = 50
+        start = time.perf_counter()
+        for _ in range(iterations):
+            corrected, counts = automaton.replace(transcript)
+        automaton_ms = (time.perf_counter() - start) * 1000 / iterations
+        
+        compiled = [(re.compile(re.escape(h), re.IGNORECASE), c) for h, c in rules.items()]
+        start = time.perf_counter()
+        for _ in range(5):
+            naive = transcript
+            for pattern, correct in compiled:
+                if pattern.search(naive):
+                    naive = pattern.sub(correct, naive)
+        naive_ms = (time.perf_counter() - start) * 1000 / 5
+        
+        print(f"\n  Rules: {self.RULES}")
+        print(f"  Build: {build_ms:.1f}ms")
+        print(f"  Automaton: {automaton_ms:.3f}ms/transcript")
+        print(f"  Regex loop: {naive_ms:.3f}ms/transcript")
+        
+        assert corrected == naive
+        assert counts == {"word42 heard": 5, "word9999 heard": 5}
+        assert automaton_ms < naive_ms
@@ -332,7 +332,7 @@ const VoiceFormFiller = ({ formSchema, formContext, formUrl, initialFilledData,
         clearTimeout(idleTimeoutRef.current);
 
         try {
-            const audio = new Audio(`${API_BASE_URL}/speech/${fieldName}?t=${Date.now()}`);
+            const audio = new Audio(`${API_BASE_URL}/speech/${fieldName}?form_url=${encodeURIComponent(formUrl || '')}&t=${Date.now()}`);
             audioRef.current = audio;
             audio.onended = () => {
                 // Check ref to ensure we haven't been stopped